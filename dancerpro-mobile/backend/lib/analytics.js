@@ -0,0 +1,147 @@
+// Server-side analytics over a stored sync snapshot.
+// Mirrors the aggregate helpers in lib/db.js (getKpiSnapshot, getClientPerformance,
+// getVenuePerformance, getTopEarningOutfits) so clients can fetch results instead of raw data.
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function safeArray(arr) { return Array.isArray(arr) ? arr : []; }
+
+// Day-of-week / month / date for a timestamp, either in server local time or at a client UTC offset
+// (minutes, same sign convention as Date#getTimezoneOffset).
+function localParts(date, tzOffset) {
+  if (tzOffset == null) {
+    return { dow: date.getDay(), month: date.getMonth(), day: date.getDate() };
+  }
+  const shifted = new Date(date.getTime() - tzOffset * 60 * 1000);
+  return { dow: shifted.getUTCDay(), month: shifted.getUTCMonth(), day: shifted.getUTCDate() };
+}
+
+function computeTransactionTotals(rows = []) {
+  let income = 0;
+  let expense = 0;
+  safeArray(rows).forEach(r => {
+    const amt = Number(r.amount || 0);
+    if (r.type === 'income') income += amt;
+    else if (r.type === 'expense') expense += amt;
+  });
+  return { income, expense, net: income - expense };
+}
+
+function kpiSnapshot(snapshot = {}) {
+  const tx = safeArray(snapshot.transactions);
+  const totals = computeTransactionTotals(tx);
+  const byClientMap = new Map();
+  tx.forEach(t => {
+    const id = t.clientId || null;
+    if (!id) return;
+    const prev = byClientMap.get(id) || { income: 0, expense: 0 };
+    const amt = Number(t.amount || 0);
+    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
+    byClientMap.set(id, prev);
+  });
+  const byClient = Array.from(byClientMap.entries())
+    .map(([clientId, t]) => ({ clientId, net: (t.income || 0) - (t.expense || 0) }))
+    .sort((a, b) => (b.net || 0) - (a.net || 0));
+  return {
+    totals,
+    counts: {
+      clients: safeArray(snapshot.clients).length,
+      venues: safeArray(snapshot.venues).length,
+      outfits: safeArray(snapshot.outfits).length,
+      shifts: safeArray(snapshot.shifts).length,
+      transactions: tx.length,
+    },
+    byClient,
+    topClient: byClient[0] || null,
+  };
+}
+
+function topEarningOutfits(snapshot = {}, count = 5) {
+  const byOutfit = new Map();
+  safeArray(snapshot.transactions).forEach(t => {
+    const id = t.outfitId || null;
+    if (!id) return;
+    const prev = byOutfit.get(id) || { income: 0, expense: 0 };
+    const amt = Number(t.amount || 0);
+    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
+    byOutfit.set(id, prev);
+  });
+  return safeArray(snapshot.outfits)
+    .map(o => {
+      const totals = byOutfit.get(o.id) || { income: 0, expense: 0 };
+      return { ...o, net: (totals.income || 0) - (totals.expense || 0) };
+    })
+    .sort((a, b) => (b.net || 0) - (a.net || 0))
+    .slice(0, count);
+}
+
+// Shifts for one client/venue inside the trailing window, matched the same way as lib/db.js
+function shiftsInWindow(snapshot, field, id, days, now) {
+  const end = now;
+  const start = new Date(now.getTime() - Number(days || 0) * DAY_MS);
+  return safeArray(snapshot.shifts).filter(s => {
+    const dStr = s.start || s.end || s.date || null;
+    const d = dStr ? new Date(dStr) : null;
+    if (!d) return false;
+    return d >= start && d <= end && s[field] === id;
+  });
+}
+
+function summarizeShifts(shifts, now, tzOffset) {
+  const byDow = new Map();
+  const daily = new Map();
+  let totalEarnings = 0;
+  shifts.forEach(s => {
+    const earnings = Number(s.earnings || 0);
+    const d = new Date(s.start || s.date || now.getTime());
+    const { dow } = localParts(d, tzOffset);
+    const key = d.toISOString().slice(0, 10);
+    const dowPrev = byDow.get(dow) || { total: 0, count: 0 };
+    byDow.set(dow, { total: dowPrev.total + earnings, count: dowPrev.count + 1 });
+    daily.set(key, (daily.get(key) || 0) + earnings);
+    totalEarnings += earnings;
+  });
+  let bestDay = null; let bestDayAvg = 0;
+  byDow.forEach((v, dow) => {
+    const avg = v.count ? v.total / v.count : 0;
+    if (avg > bestDayAvg) { bestDayAvg = avg; bestDay = dow; }
+  });
+  const dailyEntries = Array.from(daily.entries()).sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+  return {
+    shiftCount: shifts.length,
+    totalEarnings,
+    avgEarnings: shifts.length ? totalEarnings / shifts.length : 0,
+    bestDay,
+    bestDayAvg,
+    dailyEntries,
+  };
+}
+
+function clientPerformance(snapshot = {}, clientId, days = 120, { now = new Date(), tzOffset = null } = {}) {
+  const shifts = shiftsInWindow(snapshot, 'clientId', clientId, days, now);
+  const { dailyEntries, ...summary } = summarizeShifts(shifts, now, tzOffset);
+  const earningsHistory = dailyEntries.map(([date, value]) => {
+    const { month, day } = localParts(new Date(date), tzOffset);
+    return { label: `${String(month + 1).padStart(2, '0')}/${String(day).padStart(2, '0')}`, value };
+  });
+  return { clientId, days, ...summary, earningsHistory };
+}
+
+function venuePerformance(snapshot = {}, venueId, days = 120, { now = new Date(), tzOffset = null } = {}) {
+  // lib/db.js walks venue shifts newest-first; keep that order so ties and float sums match
+  const shifts = shiftsInWindow(snapshot, 'venueId', venueId, days, now)
+    .map(s => ({ s, t: new Date(s.start || s.date || 0).getTime() }))
+    .sort((a, b) => b.t - a.t)
+    .map(x => x.s);
+  const { dailyEntries, ...summary } = summarizeShifts(shifts, now, tzOffset);
+  const earningsHistory = dailyEntries.map(([date, earnings]) => ({ date, earnings }));
+  return { venueId, days, ...summary, earningsHistory };
+}
+
+module.exports = {
+  computeTransactionTotals,
+  kpiSnapshot,
+  topEarningOutfits,
+  clientPerformance,
+  venuePerformance,
+};
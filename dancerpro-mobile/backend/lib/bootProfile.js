@@ -0,0 +1,35 @@
+const { performance } = require('perf_hooks');
+
+// Boot-time profiler: records how long each startup phase took, measured from process start
+// (performance.now() is relative to the process time origin), and checks the total against a budget.
+
+function createBootProfile() {
+  const phases = [];
+  let last = 0;
+
+  function mark(phase) {
+    const now = performance.now();
+    phases.push({ phase, ms: Math.round((now - last) * 10) / 10 });
+    last = now;
+    return now;
+  }
+
+  /**
+   * Log the phase breakdown. Warns when the total exceeds `budgetMs` (0 disables the check).
+   * @param {{ budgetMs?: number, verbose?: boolean }} options
+   */
+  function report({ budgetMs = 0, verbose = false } = {}) {
+    const totalMs = Math.round(last * 10) / 10;
+    const summary = phases.map(p => `${p.phase}=${p.ms}ms`).join(' ');
+    console.log(`⏱️  Time to listening: ${totalMs}ms (${summary})`);
+    if (verbose) console.table(phases);
+    if (budgetMs > 0 && totalMs > budgetMs) {
+      console.warn(`⚠️  Startup budget exceeded: ${totalMs}ms > ${budgetMs}ms`);
+    }
+    return { totalMs, phases: phases.slice(), budgetMs, withinBudget: !(budgetMs > 0 && totalMs > budgetMs) };
+  }
+
+  return { mark, report };
+}
+
+module.exports = { createBootProfile };
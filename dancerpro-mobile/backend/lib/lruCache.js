@@ -0,0 +1,82 @@
+// Byte-bounded LRU cache. Map iteration order doubles as recency order:
+// a hit re-inserts the key at the end, eviction removes from the front.
+
+class ByteLruCache {
+  /**
+   * @param {{ maxBytes: number }} options Upper bound for the summed `bytes` of all entries
+   */
+  constructor({ maxBytes }) {
+    this.maxBytes = Math.max(0, Number(maxBytes) || 0);
+    this.entries = new Map();
+    this.bytes = 0;
+    this.hits = 0;
+    this.misses = 0;
+    this.evictions = 0;
+    this.invalidations = 0;
+    this.rejected = 0;
+  }
+
+  get(key) {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.misses++;
+      return undefined;
+    }
+    this.hits++;
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    return entry.value;
+  }
+
+  set(key, value, bytes) {
+    const size = Math.max(0, Number(bytes) || 0);
+    this._remove(key);
+    if (size > this.maxBytes) {
+      // Never let a single oversized value flush the whole cache
+      this.rejected++;
+      return false;
+    }
+    while (this.bytes + size > this.maxBytes && this.entries.size) {
+      const oldestKey = this.entries.keys().next().value;
+      this._remove(oldestKey);
+      this.evictions++;
+    }
+    this.entries.set(key, { value, bytes: size });
+    this.bytes += size;
+    return true;
+  }
+
+  delete(key) {
+    if (this._remove(key)) this.invalidations++;
+  }
+
+  clear() {
+    this.entries.clear();
+    this.bytes = 0;
+  }
+
+  stats() {
+    const lookups = this.hits + this.misses;
+    return {
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups ? this.hits / lookups : 0,
+      evictions: this.evictions,
+      invalidations: this.invalidations,
+      rejected: this.rejected,
+    };
+  }
+
+  _remove(key) {
+    const entry = this.entries.get(key);
+    if (!entry) return false;
+    this.entries.delete(key);
+    this.bytes -= entry.bytes;
+    return true;
+  }
+}
+
+module.exports = { ByteLruCache };
@@ -0,0 +1,188 @@
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+
+// Versioned snapshot history stored as content-addressed chunks.
+//
+// Layout (per user, so pruning never has to look at other accounts):
+//   <root>/<userId>/chunks/<aa>/<sha256>.json   JSON array holding a block of records
+//   <root>/<userId>/manifests/<version>.json    ordered chunk hashes per collection + metadata
+//
+// Collections are cut into blocks with content-defined boundaries: a block ends after a record whose
+// hash hits the boundary mask. Inserting or deleting a record therefore only changes the block around
+// it (not every block after it, as fixed positions would), and unchanged blocks hash to files that
+// already exist, so an export only writes what changed.
+
+const MIN_BLOCK = 16;
+const AVG_BLOCK = 64;
+const MAX_BLOCK = 256;
+
+function sha256(text) {
+  return crypto.createHash('sha256').update(text).digest('hex');
+}
+
+function writeFileAtomic(file, data) {
+  const tmp = `${file}.${process.pid}.${Date.now()}.tmp`;
+  fs.writeFileSync(tmp, data, 'utf8');
+  fs.renameSync(tmp, file);
+}
+
+function chunkRecords(records) {
+  const blocks = [];
+  let current = [];
+  records.forEach(record => {
+    const json = JSON.stringify(record === undefined ? null : record);
+    current.push(json);
+    const boundary = parseInt(sha256(json).slice(0, 8), 16) % AVG_BLOCK === 0;
+    if ((boundary && current.length >= MIN_BLOCK) || current.length >= MAX_BLOCK) {
+      blocks.push(current);
+      current = [];
+    }
+  });
+  if (current.length) blocks.push(current);
+  return blocks.map(lines => `[${lines.join(',')}]`);
+}
+
+function createSnapshotHistory({ rootDir, keep = 20, maxAgeDays = 0 }) {
+  const userDir = userId => path.join(rootDir, String(userId));
+  const manifestDir = userId => path.join(userDir(userId), 'manifests');
+  const chunkFile = (userId, hash) => path.join(userDir(userId), 'chunks', hash.slice(0, 2), `${hash}.json`);
+  const manifestFile = (userId, version) => path.join(manifestDir(userId), `${String(version).padStart(8, '0')}.json`);
+
+  function listVersionNumbers(userId) {
+    try {
+      return fs.readdirSync(manifestDir(userId))
+        .filter(name => name.endsWith('.json'))
+        .map(name => parseInt(name, 10))
+        .filter(Number.isFinite)
+        .sort((a, b) => a - b);
+    } catch {
+      return [];
+    }
+  }
+
+  function readManifest(userId, version) {
+    try {
+      return JSON.parse(fs.readFileSync(manifestFile(userId, version), 'utf8'));
+    } catch {
+      return null;
+    }
+  }
+
+  function summarize(manifest) {
+    const recordCounts = {};
+    Object.entries(manifest.collections).forEach(([name, c]) => { recordCounts[name] = c.count; });
+    return {
+      version: manifest.version,
+      createdAt: manifest.createdAt,
+      updatedAt: manifest.metadata?.updatedAt || null,
+      deviceId: manifest.metadata?.deviceId || null,
+      recordCounts,
+      bytesAdded: manifest.bytesAdded,
+      chunksAdded: manifest.chunksAdded,
+    };
+  }
+
+  // Store `payload` ({ snapshot, metadata }) as the next version; returns the version summary
+  function record(userId, payload) {
+    const snapshot = payload.snapshot || {};
+    const versions = listVersionNumbers(userId);
+    const version = (versions[versions.length - 1] || 0) + 1;
+    const manifest = {
+      version,
+      createdAt: new Date().toISOString(),
+      metadata: payload.metadata || {},
+      keys: Object.keys(snapshot),
+      collections: {},
+      values: {},
+      chunksAdded: 0,
+      bytesAdded: 0,
+    };
+    manifest.keys.forEach(key => {
+      const value = snapshot[key];
+      if (!Array.isArray(value)) {
+        manifest.values[key] = value;
+        return;
+      }
+      const hashes = chunkRecords(value).map(block => {
+        const hash = sha256(block);
+        const file = chunkFile(userId, hash);
+        if (!fs.existsSync(file)) {
+          fs.mkdirSync(path.dirname(file), { recursive: true });
+          writeFileAtomic(file, block);
+          manifest.chunksAdded += 1;
+          manifest.bytesAdded += Buffer.byteLength(block);
+        }
+        return hash;
+      });
+      manifest.collections[key] = { count: value.length, chunks: hashes };
+    });
+    fs.mkdirSync(manifestDir(userId), { recursive: true });
+    writeFileAtomic(manifestFile(userId, version), JSON.stringify(manifest));
+    prune(userId);
+    return summarize(manifest);
+  }
+
+  function list(userId) {
+    return listVersionNumbers(userId)
+      .reverse()
+      .map(v => readManifest(userId, v))
+      .filter(Boolean)
+      .map(summarize);
+  }
+
+  // Rebuild the full { snapshot, metadata } payload of a stored version, or null if unknown
+  function load(userId, version) {
+    const manifest = readManifest(userId, version);
+    if (!manifest) return null;
+    const snapshot = {};
+    manifest.keys.forEach(key => {
+      const entry = manifest.collections[key];
+      if (!entry) {
+        snapshot[key] = manifest.values[key];
+        return;
+      }
+      snapshot[key] = [];
+      entry.chunks.forEach(hash => {
+        const records = JSON.parse(fs.readFileSync(chunkFile(userId, hash), 'utf8'));
+        for (const r of records) snapshot[key].push(r);
+      });
+    });
+    return { snapshot, metadata: manifest.metadata, version: manifest.version };
+  }
+
+  // Apply retention (newest `keep` versions, optionally nothing older than `maxAgeDays`; the latest
+  // version is always kept), then delete chunks no remaining manifest references.
+  function prune(userId) {
+    const versions = listVersionNumbers(userId);
+    if (!versions.length) return { removedVersions: 0, removedChunks: 0 };
+    const latest = versions[versions.length - 1];
+    const cutoff = maxAgeDays > 0 ? Date.now() - maxAgeDays * 24 * 60 * 60 * 1000 : null;
+    const keepSet = new Set(versions.slice(-Math.max(1, keep)));
+    const remove = versions.filter(v => {
+      if (v === latest) return false;
+      if (!keepSet.has(v)) return true;
+      if (cutoff == null) return false;
+      const m = readManifest(userId, v);
+      return !m || new Date(m.createdAt).getTime() < cutoff;
+    });
+    if (!remove.length) return { removedVersions: 0, removedChunks: 0 };
+
+    const candidates = new Set();
+    remove.forEach(v => {
+      const m = readManifest(userId, v);
+      if (m) Object.values(m.collections).forEach(c => c.chunks.forEach(h => candidates.add(h)));
+      fs.rmSync(manifestFile(userId, v), { force: true });
+    });
+    listVersionNumbers(userId).forEach(v => {
+      const m = readManifest(userId, v);
+      if (m) Object.values(m.collections).forEach(c => c.chunks.forEach(h => candidates.delete(h)));
+    });
+    candidates.forEach(hash => fs.rmSync(chunkFile(userId, hash), { force: true }));
+    return { removedVersions: remove.length, removedChunks: candidates.size };
+  }
+
+  return { record, list, load, prune };
+}
+
+module.exports = { createSnapshotHistory, chunkRecords };
@@ -0,0 +1,21 @@
+// X-Twilio-Signature: base64 HMAC-SHA1, keyed with the auth token, of the full webhook URL
+// followed by every POST parameter name and value, sorted by name.
+const crypto = require('crypto');
+
+function twilioSignature(authToken, url, params = {}) {
+  let data = url;
+  for (const name of Object.keys(params).sort()) {
+    const value = params[name];
+    for (const item of Array.isArray(value) ? value : [value]) data += name + (item == null ? '' : String(item));
+  }
+  return crypto.createHmac('sha1', authToken).update(data, 'utf8').digest('base64');
+}
+
+function isValidTwilioSignature(authToken, signature, url, params) {
+  if (!authToken || typeof signature !== 'string' || !signature) return false;
+  const expected = Buffer.from(twilioSignature(authToken, url, params));
+  const given = Buffer.from(signature);
+  return expected.length === given.length && crypto.timingSafeEqual(expected, given);
+}
+
+module.exports = { twilioSignature, isValidTwilioSignature };
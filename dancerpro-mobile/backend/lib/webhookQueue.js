@@ -0,0 +1,124 @@
+// Bounded in-process queue for Twilio webhooks. Handlers push and acknowledge at once; the
+// queue is drained in batches on later turns of the event loop (setImmediate), so a burst of
+// callbacks is spread between user requests instead of running inline with them.
+// Events pushed with the same key while one is still pending (status updates of one message
+// SID) collapse into that entry, which keeps the most advanced event by `rank`.
+
+const LAG_SAMPLES = 1024;
+
+class WebhookQueue {
+  /**
+   * @param {{ maxSize?: number, batchSize?: number, handle: (event: any) => void,
+   *           rank?: (event: any) => number }} options
+   *   handle processes one event; rank orders events sharing a key (higher wins, ties: newest)
+   */
+  constructor({ maxSize = 10000, batchSize = 200, handle, rank = () => 0 }) {
+    this.maxSize = Math.max(1, Number(maxSize) || 1);
+    this.batchSize = Math.max(1, Number(batchSize) || 1);
+    this.handle = handle;
+    this.rank = rank;
+    // Entries { key, event, enqueuedAt } in arrival order; `head` is the next one to process
+    this.entries = [];
+    this.head = 0;
+    this.pendingByKey = new Map();
+    this.scheduled = false;
+    this.received = 0;
+    this.coalesced = 0;
+    this.dropped = 0;
+    this.processed = 0;
+    this.failures = 0;
+    this.batches = 0;
+    this.maxDepth = 0;
+    this.lags = new Float64Array(LAG_SAMPLES);
+    this.lagCount = 0;
+    this.maxLagMs = 0;
+  }
+
+  get size() {
+    return this.entries.length - this.head;
+  }
+
+  /** Queues `event`; false when the queue is full and the event was dropped. */
+  push(event, key = null) {
+    this.received++;
+    if (key != null) {
+      const pending = this.pendingByKey.get(key);
+      if (pending) {
+        if (this.rank(event) >= this.rank(pending.event)) pending.event = event;
+        this.coalesced++;
+        return true;
+      }
+    }
+    if (this.size >= this.maxSize) {
+      this.dropped++;
+      return false;
+    }
+    const entry = { key, event, enqueuedAt: performance.now() };
+    this.entries.push(entry);
+    if (key != null) this.pendingByKey.set(key, entry);
+    if (this.size > this.maxDepth) this.maxDepth = this.size;
+    if (!this.scheduled) {
+      this.scheduled = true;
+      setImmediate(() => this._drainBatch());
+    }
+    return true;
+  }
+
+  _drainBatch() {
+    this.scheduled = false;
+    if (!this.size) return;
+    const end = Math.min(this.entries.length, this.head + this.batchSize);
+    while (this.head < end) {
+      const entry = this.entries[this.head];
+      this.entries[this.head++] = undefined;
+      if (entry.key != null) this.pendingByKey.delete(entry.key);
+      const lag = performance.now() - entry.enqueuedAt;
+      this.lags[this.lagCount++ % LAG_SAMPLES] = lag;
+      if (lag > this.maxLagMs) this.maxLagMs = lag;
+      try {
+        this.handle(entry.event);
+        this.processed++;
+      } catch (e) {
+        this.failures++;
+        console.error('Webhook event failed:', e);
+      }
+    }
+    this.batches++;
+    if (this.head === this.entries.length) {
+      this.entries = [];
+      this.head = 0;
+    } else if (this.head >= 4096 && this.head * 2 >= this.entries.length) {
+      this.entries = this.entries.slice(this.head);
+      this.head = 0;
+    }
+    if (this.size && !this.scheduled) {
+      this.scheduled = true;
+      setImmediate(() => this._drainBatch());
+    }
+  }
+
+  /** Processes everything pending now (shutdown, tests). */
+  flush() {
+    while (this.size) this._drainBatch();
+  }
+
+  stats() {
+    const recent = Array.from(this.lags.subarray(0, Math.min(this.lagCount, LAG_SAMPLES))).sort((a, b) => a - b);
+    const at = q => (recent.length ? Math.round(recent[Math.min(recent.length - 1, Math.floor(q * recent.length))] * 100) / 100 : null);
+    return {
+      size: this.size,
+      maxSize: this.maxSize,
+      batchSize: this.batchSize,
+      received: this.received,
+      coalesced: this.coalesced,
+      dropped: this.dropped,
+      processed: this.processed,
+      failures: this.failures,
+      batches: this.batches,
+      maxDepth: this.maxDepth,
+      lagMs: { p50: at(0.5), p95: at(0.95), p99: at(0.99), max: Math.round(this.maxLagMs * 100) / 100 },
+    };
+  }
+}
+
+module.exports = { WebhookQueue };
@@ -0,0 +1,131 @@
+// Compare the JSON-file and SQLite storage drivers on synthetic data.
+// Usage: node scripts/bench-storage.js [--users 10000] [--records 1000000] [--snapshot-users 200] [--ops 200]
+// Data is generated in a temp directory and removed afterwards.
+
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { createFileStore } = require('../storage/fileStore');
+const { createSqliteStore } = require('../storage/sqliteStore');
+const { SNAPSHOT_COLLECTIONS } = require('../storage/common');
+
+function argNumber(name, fallback) {
+  const idx = process.argv.indexOf(`--${name}`);
+  const value = idx !== -1 ? Number(process.argv[idx + 1]) : NaN;
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const USER_COUNT = argNumber('users', 10000);
+const RECORD_COUNT = argNumber('records', 1000000);
+const SNAPSHOT_USERS = Math.min(argNumber('snapshot-users', 200), USER_COUNT);
+const OPS = argNumber('ops', 200);
+
+function makeUsers(count) {
+  const users = [];
+  for (let i = 0; i < count; i++) {
+    users.push({
+      id: `u${i}`,
+      email: `user${i}@example.com`,
+      password: '$2a$10$abcdefghijklmnopqrstuuQ0Jp6o0a6x9e4Yb2yHqkT1xW7p8m1u',
+      firstName: 'Bench',
+      lastName: `User${i}`,
+      phoneNumber: null,
+      createdAt: new Date(0).toISOString(),
+      lastLogin: null,
+      webauthn: { credentials: [{ id: `cred${i}`, publicKey: 'AAAA', counter: 0, transports: [] }], currentChallenge: null },
+    });
+  }
+  return users;
+}
+
+function makeSnapshot(userIndex, recordsPerUser) {
+  const perCollection = Math.floor(recordsPerUser / SNAPSHOT_COLLECTIONS.length);
+  const snapshot = { events: [] };
+  SNAPSHOT_COLLECTIONS.forEach(name => {
+    const list = [];
+    for (let i = 0; i < perCollection; i++) {
+      list.push({
+        id: `${name[0]}_${userIndex}_${i}`,
+        clientId: `c_${userIndex}_${i % 50}`,
+        venueId: `v_${userIndex}_${i % 20}`,
+        amount: (i % 400) + 0.5,
+        type: i % 3 ? 'income' : 'expense',
+        date: new Date(Date.UTC(2024, 0, 1) + i * 3600000).toISOString(),
+        notes: 'bench',
+      });
+    }
+    snapshot[name] = list;
+  });
+  return snapshot;
+}
+
+function time(fn) {
+  const start = process.hrtime.bigint();
+  fn();
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+function measure(label, ops, fn) {
+  const samples = [];
+  for (let i = 0; i < ops; i++) samples.push(time(() => fn(i)));
+  samples.sort((a, b) => a - b);
+  const mean = samples.reduce((a, b) => a + b, 0) / samples.length;
+  return { op: label, ops, meanMs: mean.toFixed(3), p95Ms: samples[Math.floor(samples.length * 0.95)].toFixed(3) };
+}
+
+function runSuite(store, users) {
+  const pick = i => (i * 7919) % USER_COUNT;
+  const pickSnapshot = i => (i * 31) % SNAPSHOT_USERS;
+  const recordsPerUser = Math.floor(RECORD_COUNT / SNAPSHOT_USERS);
+  const rows = [];
+
+  const seedUsersMs = time(() => store.writeUsers(users));
+  const seedSnapshotsMs = time(() => {
+    for (let i = 0; i < SNAPSHOT_USERS; i++) store.writeUserSnapshot(`u${i}`, makeSnapshot(i, recordsPerUser));
+  });
+  rows.push({ op: 'seed users', ops: 1, meanMs: seedUsersMs.toFixed(1), p95Ms: '-' });
+  rows.push({ op: 'seed snapshots', ops: SNAPSHOT_USERS, meanMs: (seedSnapshotsMs / SNAPSHOT_USERS).toFixed(1), p95Ms: '-' });
+
+  rows.push(measure('findUserByEmail', OPS, i => store.findUserByEmail(`USER${pick(i)}@example.com`)));
+  rows.push(measure('findUserById', OPS, i => store.findUserById(`u${pick(i)}`)));
+  rows.push(measure('findUserByCredentialId', OPS, i => store.findUserByCredentialId(`cred${pick(i)}`)));
+  rows.push(measure('upsertUser', Math.max(1, Math.floor(OPS / 4)), i => {
+    const u = users[pick(i)];
+    store.upsertUser({ ...u, lastLogin: new Date().toISOString() });
+  }));
+  const snapshotOps = Math.max(1, Math.floor(OPS / 10));
+  rows.push(measure('readUserSnapshot', snapshotOps, i => store.readUserSnapshot(`u${pickSnapshot(i)}`)));
+  rows.push(measure('writeUserSnapshot', snapshotOps, i => {
+    const idx = pickSnapshot(i);
+    store.writeUserSnapshot(`u${idx}`, makeSnapshot(idx, recordsPerUser));
+  }));
+  return rows;
+}
+
+function main() {
+  const root = fs.mkdtempSync(path.join(os.tmpdir(), 'dancerpro-bench-'));
+  const users = makeUsers(USER_COUNT);
+  console.log(`Benchmark: ${USER_COUNT} users, ${RECORD_COUNT} records across ${SNAPSHOT_USERS} snapshots, ${OPS} lookups per op`);
+  try {
+    const drivers = [
+      ['file', () => createFileStore({ usersFile: path.join(root, 'users.json'), snapshotDir: path.join(root, 'snapshots') })],
+      ['sqlite', () => createSqliteStore({ file: path.join(root, 'bench.sqlite') })],
+    ];
+    drivers.forEach(([name, factory]) => {
+      let store;
+      try {
+        store = factory();
+      } catch (e) {
+        console.warn(`Skipping ${name} driver: ${e.message}`);
+        return;
+      }
+      console.log(`\n[${name}]`);
+      console.table(runSuite(store, users));
+      store.close();
+    });
+  } finally {
+    fs.rmSync(root, { recursive: true, force: true });
+  }
+}
+
+main();
@@ -0,0 +1,56 @@
+// One-off import of users.json and snapshots/*.json into the SQLite store.
+// Usage: node scripts/migrate-json-to-sqlite.js [--users users.json] [--snapshots snapshots] [--db dancerpro.sqlite]
+// Safe to re-run: users are upserted by id and each snapshot replaces the user's rows.
+
+const path = require('path');
+const { createFileStore } = require('../storage/fileStore');
+const { createSqliteStore } = require('../storage/sqliteStore');
+
+function argValue(name, fallback) {
+  const idx = process.argv.indexOf(`--${name}`);
+  return idx !== -1 && process.argv[idx + 1] ? process.argv[idx + 1] : fallback;
+}
+
+const backendDir = path.join(__dirname, '..');
+const usersFile = path.resolve(argValue('users', path.join(backendDir, 'users.json')));
+const snapshotDir = path.resolve(argValue('snapshots', path.join(backendDir, 'snapshots')));
+const dbFile = path.resolve(argValue('db', process.env.SQLITE_FILE || path.join(backendDir, 'dancerpro.sqlite')));
+
+function main() {
+  const source = createFileStore({ usersFile, snapshotDir });
+  const target = createSqliteStore({ file: dbFile });
+  const started = Date.now();
+
+  const users = source.readUsers();
+  let importedUsers = 0;
+  users.forEach(u => {
+    if (u && u.id != null && target.upsertUser(u)) importedUsers++;
+  });
+
+  let importedSnapshots = 0;
+  let importedRecords = 0;
+  source.listSnapshotUserIds().forEach(userId => {
+    const data = source.readUserSnapshot(userId);
+    if (!data) {
+      console.warn(`Skipping unreadable snapshot for user ${userId}`);
+      return;
+    }
+    // Keep the original metadata (updatedAt, deviceId, ...) instead of stamping a new export time
+    if (target.writeUserSnapshot(userId, data.snapshot, data.metadata || {})) {
+      importedSnapshots++;
+      target.collections.forEach(name => {
+        importedRecords += Array.isArray(data.snapshot?.[name]) ? data.snapshot[name].length : 0;
+      });
+    }
+  });
+
+  target.close();
+  console.log(`Imported ${importedUsers}/${users.length} users, ${importedSnapshots} snapshots (${importedRecords} records) into ${dbFile} in ${Date.now() - started}ms`);
+}
+
+try {
+  main();
+} catch (e) {
+  console.error('Migration failed:', e);
+  process.exit(1);
+}
@@ -1,21 +1,32 @@
+const { createBootProfile } = require('./lib/bootProfile');
+const bootProfile = createBootProfile();
+bootProfile.mark('runtime');
+
 const express = require('express');
 const cors = require('cors');
-const twilio = require('twilio');
 const bodyParser = require('body-parser');
 const http = require('http');
 const socketIo = require('socket.io');
 const bcrypt = require('bcryptjs');
 const jwt = require('jsonwebtoken');
-const fs = require('fs');
 const path = require('path');
-// WebAuthn server utilities
-const {
-  generateRegistrationOptions,
-  verifyRegistrationResponse,
-  generateAuthenticationOptions,
-  verifyAuthenticationResponse,
-} = require('@simplewebauthn/server');
+const crypto = require('crypto');
+const { monitorEventLoopDelay, performance } = require('perf_hooks');
 require('dotenv').config();
+const { createStore } = require('./storage');
+const { ByteLruCache } = require('./lib/lruCache');
+const analytics = require('./lib/analytics');
+const { createSnapshotHistory } = require('./lib/snapshotHistory');
+const { WebhookQueue } = require('./lib/webhookQueue');
+const { isValidTwilioSignature } = require('./lib/twilioSignature');
+bootProfile.mark('modules');
+
+// Heavy integrations are loaded on first use so they stay off the boot path
+let twilioModule = null;
+const getTwilio = () => twilioModule || (twilioModule = require('twilio'));
+// WebAuthn server utilities
+let webauthnModule = null;
+const webauthn = () => webauthnModule || (webauthnModule = require('@simplewebauthn/server'));
 
 const app = express();
 const server = http.createServer(app);
@@ -35,54 +46,81 @@ const LOGIN_RATE_WINDOW_MS = parseInt(process.env.LOGIN_RATE_WINDOW_MS || (60 *
 const USERS_FILE = path.join(__dirname, 'users.json');
 // Cloud sync snapshot storage (per user)
 const SNAPSHOT_DIR = path.join(__dirname, 'snapshots');
+// Embedded database used when STORAGE_DRIVER=sqlite
+const SQLITE_FILE = path.join(__dirname, 'dancerpro.sqlite');
+
+const store = createStore({ usersFile: USERS_FILE, snapshotDir: SNAPSHOT_DIR, sqliteFile: SQLITE_FILE });
+console.log(`Storage driver: ${store.driver}`);
+bootProfile.mark('storage');
+
+// Hot snapshot cache: parsed payload plus the serialized sync response body, keyed by user id.
+// Entry cost is estimated as 3x the serialized size (response bytes + parsed object graph).
+const SNAPSHOT_CACHE_MAX_BYTES = parseInt(process.env.SNAPSHOT_CACHE_MAX_BYTES || String(64 * 1024 * 1024), 10);
+const snapshotCache = new ByteLruCache({ maxBytes: SNAPSHOT_CACHE_MAX_BYTES });
+
+// Sync response body plus validators: `versions` has a digest per snapshot collection (clients
+// re-merge only the collections whose digest changed) and the ETag is derived from those digests
+// and the metadata, so conditional requests for an unchanged snapshot get a 304.
+function buildSyncResponse(data) {
+  const snapshot = data.snapshot || {};
+  const metadata = data.metadata || {};
+  const versions = {};
+  const parts = [];
+  Object.keys(snapshot).forEach(name => {
+    const json = JSON.stringify(snapshot[name]);
+    if (json === undefined) return;
+    versions[name] = crypto.createHash('sha1').update(json).digest('hex').slice(0, 16);
+    parts.push(`${JSON.stringify(name)}:${json}`);
+  });
+  const body = Buffer.from(`{"success":true,"snapshot":{${parts.join(',')}},"metadata":${JSON.stringify(metadata)},"versions":${JSON.stringify(versions)}}`);
+  const etag = `"${crypto.createHash('sha1').update(JSON.stringify([versions, metadata])).digest('hex').slice(0, 32)}"`;
+  return { body, etag };
+}
 
-function ensureDir(dirPath) {
-  try {
-    if (!fs.existsSync(dirPath)) {
-      fs.mkdirSync(dirPath, { recursive: true });
-    }
-    return true;
-  } catch (e) {
-    console.error('Failed to ensure directory:', dirPath, e);
-    return false;
-  }
+// Returns { data, body, etag } or null. Cached values are shared between requests and must not be mutated.
+function getCachedSnapshot(userId) {
+  const key = String(userId);
+  const cached = snapshotCache.get(key);
+  if (cached) return cached;
+  const data = store.readUserSnapshot(userId);
+  if (!data) return null;
+  const { body, etag } = buildSyncResponse(data);
+  const entry = { data, body, etag };
+  snapshotCache.set(key, entry, body.length * 3);
+  return entry;
 }
 
-function getSnapshotFile(userId) {
-  return path.join(SNAPSHOT_DIR, `${userId}.json`);
+function sendSyncSnapshot(req, res, entry) {
+  res.set({ 'ETag': entry.etag, 'Cache-Control': 'private, no-cache' });
+  if (req.fresh) return res.status(304).end();
+  return res.type('application/json').send(entry.body);
 }
 
 function readUserSnapshot(userId) {
-  try {
-    ensureDir(SNAPSHOT_DIR);
-    const file = getSnapshotFile(userId);
-    if (!fs.existsSync(file)) return null;
-    const raw = fs.readFileSync(file, 'utf8');
-    return JSON.parse(raw);
-  } catch (e) {
-    console.error('Error reading snapshot for user:', userId, e);
-    return null;
-  }
+  const entry = getCachedSnapshot(userId);
+  return entry ? entry.data : null;
 }
 
+// Restore points: every saved snapshot is also recorded as a deduplicated history version
+const snapshotHistory = createSnapshotHistory({
+  rootDir: process.env.SNAPSHOT_HISTORY_DIR || path.join(__dirname, 'snapshot-history'),
+  keep: parseInt(process.env.SNAPSHOT_HISTORY_KEEP || '20', 10),
+  maxAgeDays: parseInt(process.env.SNAPSHOT_HISTORY_MAX_AGE_DAYS || '0', 10),
+});
+const SNAPSHOT_HISTORY_ENABLED = process.env.SNAPSHOT_HISTORY_ENABLED !== 'false';
+
 function writeUserSnapshot(userId, snapshot, meta = {}) {
-  try {
-    ensureDir(SNAPSHOT_DIR);
-    const file = getSnapshotFile(userId);
-    const payload = {
-      snapshot: snapshot || {},
-      metadata: {
-        updatedAt: new Date().toISOString(),
-        version: 1,
-        ...meta,
-      },
-    };
-    fs.writeFileSync(file, JSON.stringify(payload, null, 2), 'utf8');
-    return payload;
-  } catch (e) {
-    console.error('Error writing snapshot for user:', userId, e);
-    return null;
+  const saved = store.writeUserSnapshot(userId, snapshot, meta);
+  snapshotCache.delete(String(userId));
+  if (saved && SNAPSHOT_HISTORY_ENABLED) {
+    try {
+      snapshotHistory.record(userId, saved);
+    } catch (e) {
+      // History is best-effort; the current snapshot is already saved
+      console.error('Failed to record snapshot history for user:', userId, e);
+    }
   }
+  return saved;
 }
 
 // Twilio configuration
@@ -92,20 +130,39 @@ const apiKeySid = process.env.TWILIO_API_KEY_SID;
 const apiKeySecret = process.env.TWILIO_API_KEY_SECRET;
 const twilioPhoneNumber = process.env.TWILIO_PHONE_NUMBER;
 
-// Initialize Twilio client using API Key if provided, otherwise fallback to auth token
-let client;
-try {
+// TWILIO_API_BASE_URL sends the REST calls to another host, e.g. the local stand-in used for
+// load tests (ops/dancerpro_ops/twilio_standin.py); unset means api.twilio.com
+const twilioApiBaseUrl = (process.env.TWILIO_API_BASE_URL || '').replace(/\/+$/, '');
+
+function twilioClientOptions() {
+  if (!twilioApiBaseUrl) return {};
+  const RequestClient = require('twilio/lib/base/RequestClient');
+  class BaseUrlRequestClient extends RequestClient {
+    request(opts) {
+      return super.request({ ...opts, uri: String(opts.uri).replace(/^https?:\/\/[^/]+/, twilioApiBaseUrl) });
+    }
+  }
+  return { httpClient: new BaseUrlRequestClient() };
+}
+
+// Twilio client is created on first use: API Key if provided, otherwise fallback to auth token
+let client = null;
+function getTwilioClient() {
+  if (client) return client;
   if (apiKeySid && apiKeySecret && accountSid) {
-    client = twilio(apiKeySid, apiKeySecret, { accountSid });
+    client = getTwilio()(apiKeySid, apiKeySecret, { accountSid, ...twilioClientOptions() });
     console.log('Twilio client initialized with API Key SID');
   } else if (accountSid && authToken) {
-    client = twilio(accountSid, authToken);
+    client = getTwilio()(accountSid, authToken, twilioClientOptions());
     console.log('Twilio client initialized with Account SID + Auth Token');
   } else {
-    console.log('Twilio credentials incomplete; running in mock mode unless overridden');
+    throw new Error('Twilio credentials incomplete');
   }
-} catch (e) {
-  console.error('Failed to initialize Twilio client:', e);
+  if (twilioApiBaseUrl) console.log(`Twilio REST calls go to ${twilioApiBaseUrl}`);
+  return client;
+}
+if (!((apiKeySid && apiKeySecret && accountSid) || (accountSid && authToken))) {
+  console.log('Twilio credentials incomplete; running in mock mode unless overridden');
 }
 
 // In-memory token blacklist for logout invalidation
@@ -116,7 +173,8 @@ const loginAttempts = new Map();
 const registerAttempts = new Map();
 
 // Middleware
-app.use(cors());
+// ETag is read by the app's conditional snapshot fetch (lib/api.js)
+app.use(cors({ exposedHeaders: ['ETag'] }));
 app.use(bodyParser.json());
 app.use(bodyParser.urlencoded({ extended: true }));
 
@@ -141,80 +199,51 @@ const activeConnections = new Map();
 const userSessions = new Map();
 
 // Helper functions for user management
-const readUsers = () => {
-  try {
-    if (fs.existsSync(USERS_FILE)) {
-      const data = fs.readFileSync(USERS_FILE, 'utf8');
-      return JSON.parse(data);
-    }
-    return [];
-  } catch (error) {
-    console.error('Error reading users file:', error);
-    return [];
-  }
-};
-
-const writeUsers = (users) => {
-  try {
-    fs.writeFileSync(USERS_FILE, JSON.stringify(users, null, 2));
-    return true;
-  } catch (error) {
-    console.error('Error writing users file:', error);
-    return false;
-  }
-};
+const writeUsers = (users) => store.writeUsers(users);
 
-const findUserByEmail = (email) => {
-  const users = readUsers();
-  return users.find(user => user.email.toLowerCase() === email.toLowerCase());
-};
+const findUserByEmail = (email) => store.findUserByEmail(email);
 
-const findUserById = (id) => {
-  const users = readUsers();
-  return users.find(user => user.id === id);
-};
+const findUserById = (id) => store.findUserById(id);
 
 // Helper to upsert and persist a user record
 function upsertUser(updatedUser) {
-  const users = readUsers();
-  const idx = users.findIndex(u => u.id === updatedUser.id);
-  if (idx === -1) {
-    users.push(updatedUser);
-  } else {
-    users[idx] = updatedUser;
-  }
-  writeUsers(users);
-  return updatedUser;
+  return store.upsertUser(updatedUser);
 }
 
 // Seed a default test user for integration tests (e.g., TC006 login)
-function ensureSeedUsers() {
+// - SEED_TEST_USER=false skips seeding entirely.
+// - SEED_USER_PASSWORD_HASH supplies a precomputed bcrypt hash, so no hashing happens at boot.
+// - FAST_START=true trusts an existing seed user instead of re-verifying its password.
+// Hashing/compare use the async bcrypt API so they never block the event loop.
+const SEED_EMAIL = 'testuser@example.com';
+const SEED_PASSWORD = 'StrongPassword123!';
+
+async function ensureSeedUsers() {
+  if (process.env.SEED_TEST_USER === 'false') return;
   try {
-    const seedEmail = 'testuser@example.com';
-    const users = readUsers();
-    const exists = users.find(u => u.email.toLowerCase() === seedEmail.toLowerCase());
-    const hashed = bcrypt.hashSync('StrongPassword123!', 10);
+    const presetHash = process.env.SEED_USER_PASSWORD_HASH || null;
+    const exists = findUserByEmail(SEED_EMAIL);
     if (!exists) {
       const newUser = {
         id: Date.now().toString(),
-        email: seedEmail.toLowerCase(),
-        password: hashed,
+        email: SEED_EMAIL,
+        password: presetHash || await bcrypt.hash(SEED_PASSWORD, 10),
         firstName: 'Test',
         lastName: 'User',
         phoneNumber: '+12345678901',
         createdAt: new Date().toISOString(),
         lastLogin: null
       };
-      users.push(newUser);
-      writeUsers(users);
-      console.log('Seeded default test user:', seedEmail);
-    } else {
-      const passwordMatches = bcrypt.compareSync('StrongPassword123!', exists.password);
-      if (!passwordMatches) {
-        exists.password = hashed;
-        writeUsers(users);
-        console.log('Updated seed user password to expected StrongPassword123!');
-      }
+      upsertUser(newUser);
+      console.log('Seeded default test user:', SEED_EMAIL);
+      return;
+    }
+    if (process.env.FAST_START === 'true' || (presetHash && exists.password === presetHash)) return;
+    const passwordMatches = await bcrypt.compare(SEED_PASSWORD, exists.password || '');
+    if (!passwordMatches) {
+      exists.password = presetHash || await bcrypt.hash(SEED_PASSWORD, 10);
+      upsertUser(exists);
+      console.log(`Updated seed user password to expected ${SEED_PASSWORD}`);
     }
   } catch (e) {
     console.error('Failed to seed default test user:', e);
@@ -469,7 +498,6 @@ app.post('/api/auth/register', registerRateLimiter, async (req, res) => {
     const hashedPassword = await bcrypt.hash(password, saltRounds);
 
     // Create new user
-    const users = readUsers();
     const newUser = {
       id: Date.now().toString(),
       email: email.toLowerCase(),
@@ -481,9 +509,7 @@ app.post('/api/auth/register', registerRateLimiter, async (req, res) => {
       lastLogin: null
     };
 
-    users.push(newUser);
-    
-    if (!writeUsers(users)) {
+    if (!upsertUser(newUser)) {
       return res.status(500).json({ 
         error: 'Failed to save user data' 
       });
@@ -547,12 +573,7 @@ app.post('/api/auth/login', loginRateLimiter, async (req, res) => {
     }
 
     // Update last login
-    const users = readUsers();
-    const userIndex = users.findIndex(u => u.id === user.id);
-    if (userIndex !== -1) {
-      users[userIndex].lastLogin = new Date().toISOString();
-      writeUsers(users);
-    }
+    upsertUser({ ...user, lastLogin: new Date().toISOString() });
 
     // Generate JWT token
     const token = jwt.sign(
@@ -686,13 +707,8 @@ app.post('/api/auth/change-password', authenticateToken, async (req, res) => {
       }
     }
 
-    const users = readUsers();
-    const idx = users.findIndex(u => u.id === user.id);
-    if (idx === -1) {
-      return res.status(404).json({ error: 'User not found' });
-    }
-    users[idx].password = await bcrypt.hash(newPassword, 10);
-    if (!writeUsers(users)) {
+    user.password = await bcrypt.hash(newPassword, 10);
+    if (!upsertUser(user)) {
       return res.status(500).json({ error: 'Failed to update password' });
     }
 
@@ -706,13 +722,10 @@ app.post('/api/auth/change-password', authenticateToken, async (req, res) => {
 // Delete account (protected)
 app.delete('/api/auth/delete-account', authenticateToken, (req, res) => {
   try {
-    const users = readUsers();
-    const idx = users.findIndex(u => u.id === req.user.id);
-    if (idx === -1) {
+    if (!findUserById(req.user.id)) {
       return res.status(404).json({ error: 'User not found' });
     }
-    const [deleted] = users.splice(idx, 1);
-    if (!writeUsers(users)) {
+    if (!store.deleteUser(req.user.id)) {
       return res.status(500).json({ error: 'Failed to delete account' });
     }
     const authHeader = req.headers['authorization'];
@@ -745,15 +758,7 @@ function getUserWebAuthn(user) {
 // Helper: find user by WebAuthn credential ID (for usernameless login)
 function findUserByCredentialId(credId) {
   try {
-    const users = readUsers();
-    for (const u of users) {
-      const wa = u.webauthn && Array.isArray(u.webauthn.credentials) ? u.webauthn : null;
-      if (wa) {
-        const found = wa.credentials.find(c => c.id === credId);
-        if (found) return u;
-      }
-    }
-    return null;
+    return store.findUserByCredentialId(credId);
   } catch (e) {
     console.error('Error finding user by credential ID:', e);
     return null;
@@ -789,7 +794,7 @@ app.post('/api/webauthn/register/start', async (req, res) => {
 
     const wa = getUserWebAuthn(user);
     const rpID = rpIdFromClient || (process.env.BASE_URL ? new URL(process.env.BASE_URL).hostname : 'localhost');
-    const options = await generateRegistrationOptions({
+    const options = await webauthn().generateRegistrationOptions({
       rpName: 'DancerPro',
       rpID,
       userID: user.id,
@@ -827,7 +832,7 @@ app.post('/api/webauthn/register/finish', async (req, res) => {
     const wa = getUserWebAuthn(user);
     const rpID = rpIdFromClient || (process.env.BASE_URL ? new URL(process.env.BASE_URL).hostname : 'localhost');
 
-    const verification = await verifyRegistrationResponse({
+    const verification = await webauthn().verifyRegistrationResponse({
       response,
       expectedChallenge: wa.currentChallenge,
       expectedOrigin: origin || (process.env.BASE_URL || `http://localhost:${PORT}`),
@@ -873,7 +878,7 @@ app.post('/api/webauthn/login/start', async (req, res) => {
     }
     const wa = getUserWebAuthn(user);
     const rpID = rpIdFromClient || (process.env.BASE_URL ? new URL(process.env.BASE_URL).hostname : 'localhost');
-    const options = await generateAuthenticationOptions({
+    const options = await webauthn().generateAuthenticationOptions({
       rpID,
       allowCredentials: wa.credentials.map(c => ({ id: Buffer.from(c.id, 'base64url'), type: 'public-key', transports: c.transports })),
       userVerification: 'preferred',
@@ -902,7 +907,7 @@ app.post('/api/webauthn/login/finish', async (req, res) => {
     const rpID = rpIdFromClient || (process.env.BASE_URL ? new URL(process.env.BASE_URL).hostname : 'localhost');
     const dbCreds = new Map(wa.credentials.map(c => [c.id, c]));
 
-    const verification = await verifyAuthenticationResponse({
+    const verification = await webauthn().verifyAuthenticationResponse({
       response,
       expectedChallenge: wa.currentChallenge,
       expectedOrigin: origin || (process.env.BASE_URL || `http://localhost:${PORT}`),
@@ -936,7 +941,7 @@ app.post('/api/webauthn/login/start/usernameless', async (req, res) => {
   try {
     const { rpID: rpIdFromClient } = req.body || {};
     const rpID = rpIdFromClient || (process.env.BASE_URL ? new URL(process.env.BASE_URL).hostname : 'localhost');
-    const options = await generateAuthenticationOptions({
+    const options = await webauthn().generateAuthenticationOptions({
       rpID,
       userVerification: 'preferred',
       // No allowCredentials so the authenticator can offer discoverable credentials
@@ -969,7 +974,7 @@ app.post('/api/webauthn/login/finish/usernameless', async (req, res) => {
     const wa = getUserWebAuthn(user);
     const dbCreds = new Map(wa.credentials.map(c => [c.id, c]));
 
-    const verification = await verifyAuthenticationResponse({
+    const verification = await webauthn().verifyAuthenticationResponse({
       response,
       expectedChallenge,
       expectedOrigin: origin || (process.env.BASE_URL || `http://localhost:${PORT}`),
@@ -999,7 +1004,7 @@ app.post('/api/webauthn/login/finish/usernameless', async (req, res) => {
 });
 
 // Dev-only: reset users store for testing
-app.post('/api/test/reset-users', (req, res) => {
+app.post('/api/test/reset-users', async (req, res) => {
   try {
     const environment = process.env.NODE_ENV || 'development';
     if (environment === 'production') {
@@ -1009,9 +1014,8 @@ app.post('/api/test/reset-users', (req, res) => {
     if (!writeUsers([])) {
       return res.status(500).json({ error: 'Failed to reset users' });
     }
-    ensureSeedUsers();
-    const users = readUsers();
-    return res.json({ success: true, message: 'Users reset successfully', count: users.length });
+    await ensureSeedUsers();
+    return res.json({ success: true, message: 'Users reset successfully', count: store.countUsers() });
   } catch (error) {
     console.error('Reset users error:', error);
     res.status(500).json({ error: 'Internal server error during reset' });
@@ -1032,8 +1036,7 @@ app.post('/api/test/clear-user-data', (req, res) => {
     }
     
     // Find user by email
-    const users = readUsers();
-    const user = users.find(u => u.email === email);
+    const user = findUserByEmail(email);
     if (!user) {
       return res.status(404).json({ error: 'User not found' });
     }
@@ -1069,6 +1072,83 @@ app.post('/api/test/clear-user-data', (req, res) => {
   }
 });
 
+// Runtime metrics (cache hit rates etc.); disabled in production unless METRICS_ENABLED=true
+app.get('/api/debug/metrics', (req, res) => {
+  const environment = process.env.NODE_ENV || 'development';
+  if (environment === 'production' && process.env.METRICS_ENABLED !== 'true') {
+    return res.status(403).json({ error: 'Not allowed in production' });
+  }
+  return res.json({
+    success: true,
+    timestamp: new Date().toISOString(),
+    snapshotCache: snapshotCache.stats(),
+    analyticsCache: analyticsCache.stats(),
+    webhookQueue: { ...webhookQueue.stats(), signatureFailures: webhookSignatureFailures },
+  });
+});
+
+// Process and in-memory state sizes, sampled by the soak harness (ops/dancerpro_ops/soak.py).
+// ?reset=true restarts the event loop delay histogram; ?gc=true collects garbage first
+// (only when started with node --expose-gc), so heap samples are less noisy.
+const loopDelay = monitorEventLoopDelay({ resolution: 10 });
+loopDelay.enable();
+let loopUtilizationFrom = performance.eventLoopUtilization();
+
+app.get('/api/debug/runtime', (req, res) => {
+  const environment = process.env.NODE_ENV || 'development';
+  if (environment === 'production' && process.env.METRICS_ENABLED !== 'true') {
+    return res.status(403).json({ error: 'Not allowed in production' });
+  }
+  if (req.query.gc === 'true' && typeof global.gc === 'function') global.gc();
+  const memory = process.memoryUsage();
+  const ms = ns => Math.round(ns / 1e4) / 100;
+  const utilization = performance.eventLoopUtilization(loopUtilizationFrom);
+  const eventLoop = {
+    delayMs: { mean: ms(loopDelay.mean || 0), p50: ms(loopDelay.percentile(50)), p99: ms(loopDelay.percentile(99)), max: ms(loopDelay.max) },
+    utilization: Math.round(utilization.utilization * 1000) / 1000,
+  };
+  if (req.query.reset === 'true') {
+    loopDelay.reset();
+    loopUtilizationFrom = performance.eventLoopUtilization();
+  }
+  let users = null;
+  let pendingWebAuthnChallenges = null;
+  try {
+    const all = store.readUsers();
+    users = all.length;
+    pendingWebAuthnChallenges = all.filter(u => u.webauthn && u.webauthn.currentChallenge).length;
+  } catch (e) {
+    console.error('Runtime metrics: failed to read users:', e);
+  }
+  return res.json({
+    success: true,
+    timestamp: new Date().toISOString(),
+    uptimeSeconds: Math.round(process.uptime()),
+    gcExposed: typeof global.gc === 'function',
+    memory: {
+      rssBytes: memory.rss,
+      heapUsedBytes: memory.heapUsed,
+      heapTotalBytes: memory.heapTotal,
+      externalBytes: memory.external,
+      arrayBuffersBytes: memory.arrayBuffers,
+    },
+    eventLoop,
+    state: {
+      blacklistedTokens: blacklistedTokens.size,
+      loginAttempts: loginAttempts.size,
+      registerAttempts: registerAttempts.size,
+      activeConnections: activeConnections.size,
+      userSessions: userSessions.size,
+      usernamelessChallenges: usernamelessChallenges.size,
+      pendingWebAuthnChallenges,
+      users,
+      socketClients: io.engine.clientsCount,
+      snapshotCacheEntries: snapshotCache.entries.size,
+      webhookQueue: webhookQueue.size,
+    },
+  });
+});
+
 // ---- Cloud Sync API (JWT protected) ----
 // Push local data snapshot to cloud
 app.post('/api/sync/export', authenticateToken, (req, res) => {
@@ -1091,11 +1171,11 @@ app.post('/api/sync/export', authenticateToken, (req, res) => {
 // Retrieve cloud snapshot (for restore)
 app.get('/api/sync/export', authenticateToken, (req, res) => {
   try {
-    const data = readUserSnapshot(req.user.id);
-    if (!data) {
+    const entry = getCachedSnapshot(req.user.id);
+    if (!entry) {
       return res.status(404).json({ error: 'No cloud snapshot found' });
     }
-    return res.json({ success: true, snapshot: data.snapshot || {}, metadata: data.metadata || {} });
+    return sendSyncSnapshot(req, res, entry);
   } catch (error) {
     console.error('Sync fetch error:', error);
     return res.status(500).json({ error: 'Internal server error during sync fetch' });
@@ -1105,11 +1185,11 @@ app.get('/api/sync/export', authenticateToken, (req, res) => {
 // Alias endpoint for restore semantics
 app.get('/api/sync/import', authenticateToken, (req, res) => {
   try {
-    const data = readUserSnapshot(req.user.id);
-    if (!data) {
+    const entry = getCachedSnapshot(req.user.id);
+    if (!entry) {
       return res.status(404).json({ error: 'No cloud snapshot found' });
     }
-    return res.json({ success: true, snapshot: data.snapshot || {}, metadata: data.metadata || {} });
+    return sendSyncSnapshot(req, res, entry);
   } catch (error) {
     console.error('Sync import fetch error:', error);
     return res.status(500).json({ error: 'Internal server error during sync import' });
@@ -1123,11 +1203,7 @@ app.get('/api/sync/status', authenticateToken, (req, res) => {
     if (!data) {
       return res.json({ success: true, exists: false });
     }
-    let size = 0;
-    try {
-      const stat = fs.statSync(getSnapshotFile(req.user.id));
-      size = stat.size || 0;
-    } catch {}
+    const size = store.getSnapshotSize(req.user.id);
     return res.json({ success: true, exists: true, metadata: data.metadata || {}, size });
   } catch (error) {
     console.error('Sync status error:', error);
@@ -1135,6 +1211,124 @@ app.get('/api/sync/status', authenticateToken, (req, res) => {
   }
 });
 
+// List stored snapshot versions, newest first
+app.get('/api/sync/history', authenticateToken, (req, res) => {
+  try {
+    return res.json({ success: true, versions: snapshotHistory.list(req.user.id) });
+  } catch (error) {
+    console.error('Sync history error:', error);
+    return res.status(500).json({ error: 'Internal server error during sync history' });
+  }
+});
+
+// Fetch the full snapshot of one stored version
+app.get('/api/sync/history/:version', authenticateToken, (req, res) => {
+  try {
+    const data = snapshotHistory.load(req.user.id, parseInt(req.params.version, 10));
+    if (!data) {
+      return res.status(404).json({ error: 'Snapshot version not found' });
+    }
+    return res.json({ success: true, version: data.version, snapshot: data.snapshot, metadata: data.metadata || {} });
+  } catch (error) {
+    console.error('Sync history fetch error:', error);
+    return res.status(500).json({ error: 'Internal server error during sync history fetch' });
+  }
+});
+
+// Make a stored version the current cloud snapshot (recorded as a new version itself)
+app.post('/api/sync/history/:version/restore', authenticateToken, (req, res) => {
+  try {
+    const version = parseInt(req.params.version, 10);
+    const data = snapshotHistory.load(req.user.id, version);
+    if (!data) {
+      return res.status(404).json({ error: 'Snapshot version not found' });
+    }
+    const saved = writeUserSnapshot(req.user.id, data.snapshot, {
+      deviceId: (req.body && req.body.deviceId) || 'server-restore',
+      restoredFrom: version,
+    });
+    if (!saved) {
+      return res.status(500).json({ error: 'Failed to restore snapshot' });
+    }
+    return res.json({ success: true, metadata: saved.metadata });
+  } catch (error) {
+    console.error('Sync history restore error:', error);
+    return res.status(500).json({ error: 'Internal server error during sync restore' });
+  }
+});
+
+// ---- Server-side analytics over the stored snapshot (JWT protected) ----
+// Results are cached per snapshot version (metadata.updatedAt); a new export changes the key.
+// Trailing-day windows still move with the clock, so entries also expire after ANALYTICS_CACHE_TTL_MS.
+const ANALYTICS_CACHE_TTL_MS = parseInt(process.env.ANALYTICS_CACHE_TTL_MS || String(10 * 60 * 1000), 10);
+const analyticsCache = new ByteLruCache({ maxBytes: parseInt(process.env.ANALYTICS_CACHE_MAX_BYTES || String(8 * 1024 * 1024), 10) });
+
+function parseTzOffset(value) {
+  const n = parseInt(value, 10);
+  return Number.isFinite(n) && Math.abs(n) <= 14 * 60 ? n : null;
+}
+
+function sendAnalytics(req, res, name, params, compute) {
+  try {
+    const entry = getCachedSnapshot(req.user.id);
+    if (!entry) {
+      return res.status(404).json({ error: 'No cloud snapshot found' });
+    }
+    const version = entry.data.metadata?.updatedAt || null;
+    const key = `${req.user.id}|${version}|${name}|${JSON.stringify(params)}`;
+    let cached = analyticsCache.get(key);
+    if (!cached || (Date.now() - cached.computedAt) > ANALYTICS_CACHE_TTL_MS) {
+      const result = compute(entry.data.snapshot || {});
+      cached = { computedAt: Date.now(), body: Buffer.from(JSON.stringify({ success: true, version, ...result })) };
+      analyticsCache.set(key, cached, cached.body.length);
+    }
+    return res.type('application/json').send(cached.body);
+  } catch (error) {
+    console.error(`Analytics ${name} error:`, error);
+    return res.status(500).json({ error: 'Internal server error during analytics' });
+  }
+}
+
+// Totals, collection counts and per-client net
+app.get('/api/analytics/kpis', authenticateToken, (req, res) => {
+  sendAnalytics(req, res, 'kpis', {}, snapshot => analytics.kpiSnapshot(snapshot));
+});
+
+// Outfits ranked by net earnings
+app.get('/api/analytics/outfits/top', authenticateToken, (req, res) => {
+  const count = Math.max(1, Math.min(50, parseInt(req.query.count || '5', 10) || 5));
+  sendAnalytics(req, res, 'outfits', { count }, snapshot => ({ outfits: analytics.topEarningOutfits(snapshot, count) }));
+});
+
+// Dashboard summary: KPI totals/counts, top client and top outfits in one small payload
+app.get('/api/analytics/summary', authenticateToken, (req, res) => {
+  const count = Math.max(1, Math.min(50, parseInt(req.query.count || '5', 10) || 5));
+  sendAnalytics(req, res, 'summary', { count }, snapshot => {
+    const { totals, counts, topClient } = analytics.kpiSnapshot(snapshot);
+    return { totals, counts, topClient, topOutfits: analytics.topEarningOutfits(snapshot, count) };
+  });
+});
+
+// Per-client performance: shift count, average, best day and daily earnings history
+app.get('/api/analytics/clients/:clientId', authenticateToken, (req, res) => {
+  const days = Math.max(1, parseInt(req.query.days || '120', 10) || 120);
+  const tzOffset = parseTzOffset(req.query.tzOffset);
+  const { clientId } = req.params;
+  sendAnalytics(req, res, 'client', { clientId, days, tzOffset }, snapshot => (
+    analytics.clientPerformance(snapshot, clientId, days, { tzOffset })
+  ));
+});
+
+// Per-venue performance: shift count, average, best day and daily earnings history
+app.get('/api/analytics/venues/:venueId', authenticateToken, (req, res) => {
+  const days = Math.max(1, parseInt(req.query.days || '120', 10) || 120);
+  const tzOffset = parseTzOffset(req.query.tzOffset);
+  const { venueId } = req.params;
+  sendAnalytics(req, res, 'venue', { venueId, days, tzOffset }, snapshot => (
+    analytics.venuePerformance(snapshot, venueId, days, { tzOffset })
+  ));
+});
+
 // Send SMS endpoint (secured)
 app.post('/api/send-sms', authenticateToken, async (req, res) => {
   try {
@@ -1166,7 +1360,7 @@ app.post('/api/send-sms', authenticateToken, async (req, res) => {
       };
     } else {
       // Send SMS via Twilio
-      message = await client.messages.create({
+      message = await getTwilioClient().messages.create({
         body: smsBody,
         from: twilioPhoneNumber,
         to: to,
@@ -1214,84 +1408,103 @@ app.post('/api/send-sms', authenticateToken, async (req, res) => {
   }
 });
 
-// Twilio webhook for incoming messages
-app.post('/api/webhook/incoming', (req, res) => {
-  try {
-    const { From, Body, MessageSid, To } = req.body;
+// ---- Twilio webhooks ----
+// Handlers validate (optionally), queue and acknowledge at once; broadcasting happens in
+// batches off the request path (lib/webhookQueue.js). Status updates of one message or call
+// that are still pending collapse into the most advanced one. A full queue answers 503.
+const EMPTY_TWIML = '<?xml version="1.0" encoding="UTF-8"?><Response></Response>';
+
+// Normalize Twilio message status to app UI status
+function normalizeMessageStatus(status) {
+  switch ((status || '').toLowerCase()) {
+    case 'delivered':
+      return 'delivered';
+    case 'sent':
+    case 'accepted':
+    case 'queued':
+      return 'sent';
+    case 'undelivered':
+    case 'failed':
+      return 'failed';
+    default:
+      return status || 'sent';
+  }
+}
 
-    console.log('Incoming message:', { From, Body, MessageSid, To });
+// Later stages win when pending updates collapse (callbacks may arrive out of order)
+const STATUS_RANK = {
+  accepted: 0, queued: 0, sending: 1, sent: 2, receiving: 2, received: 3, delivered: 3, read: 4, undelivered: 3, failed: 3,
+  initiated: 0, ringing: 1, 'in-progress': 2, completed: 3, busy: 3, 'no-answer': 3, canceled: 3,
+};
 
-    // Create message data for broadcasting
-    const messageData = {
-      messageId: MessageSid,
-      from: From,
-      to: To,
-      body: Body,
-      timestamp: new Date().toISOString(),
+function processWebhookEvent(event) {
+  const { type, params, receivedAt } = event;
+  if (type === 'incoming') {
+    broadcastToConversation(params.From, 'message_received', {
+      messageId: params.MessageSid,
+      from: params.From,
+      to: params.To,
+      body: params.Body,
+      timestamp: receivedAt,
       type: 'sms',
       sender: 'client'
-    };
-
-    // Broadcast to all connected users (in production, filter by conversation participants)
-    const broadcastCount = broadcastToConversation(From, 'message_received', messageData);
-    
-    console.log(`Broadcasted incoming message to ${broadcastCount} connected clients`);
-
-    // Respond to Twilio with TwiML (optional auto-reply)
-    const twiml = new twilio.twiml.MessagingResponse();
-    // Uncomment to send auto-reply
-    // twiml.message('Thank you for your message. We will get back to you soon!');
-
-    res.type('text/xml').send(twiml.toString());
-
-  } catch (error) {
-    console.error('Error processing incoming message:', error);
-    res.status(500).send('Error processing message');
+    });
+  } else if (type === 'status') {
+    io.emit('message_status_update', {
+      messageId: params.MessageSid,
+      status: normalizeMessageStatus(params.MessageStatus),
+      to: params.To,
+      from: params.From,
+      timestamp: receivedAt
+    });
+  } else if (type === 'voice') {
+    io.emit('call_status_update', {
+      callSid: params.CallSid,
+      status: params.CallStatus,
+      to: params.To,
+      from: params.From,
+      timestamp: receivedAt
+    });
   }
+}
+
+const webhookQueue = new WebhookQueue({
+  maxSize: parseInt(process.env.WEBHOOK_QUEUE_MAX || '10000', 10),
+  batchSize: parseInt(process.env.WEBHOOK_BATCH_SIZE || '200', 10),
+  handle: processWebhookEvent,
+  rank: event => STATUS_RANK[String(event.params.MessageStatus || event.params.CallStatus || '').toLowerCase()] ?? 0,
 });
 
-// Twilio webhook for message status updates
-app.post('/api/webhook/status', (req, res) => {
-  try {
-    const { MessageSid, MessageStatus, To, From } = req.body;
-
-    console.log('Message status update:', { MessageSid, MessageStatus, To, From });
-
-    // Normalize Twilio status to app UI status
-    const normalizeStatus = (status) => {
-      switch ((status || '').toLowerCase()) {
-        case 'delivered':
-          return 'delivered';
-        case 'sent':
-        case 'accepted':
-        case 'queued':
-          return 'sent';
-        case 'undelivered':
-        case 'failed':
-          return 'failed';
-        default:
-          return status || 'sent';
+// TWILIO_VALIDATE_WEBHOOKS=true rejects callbacks without a valid X-Twilio-Signature (auth token
+// accounts only: Twilio signs with the auth token, not with an API key)
+const VALIDATE_WEBHOOKS = process.env.TWILIO_VALIDATE_WEBHOOKS === 'true';
+let webhookSignatureFailures = 0;
+
+function queueWebhook(type, keyOf, acknowledge) {
+  return (req, res) => {
+    const params = req.body || {};
+    if (VALIDATE_WEBHOOKS) {
+      const url = `${process.env.BASE_URL || `http://localhost:${PORT}`}${req.originalUrl}`;
+      if (!isValidTwilioSignature(authToken, req.headers['x-twilio-signature'], url, params)) {
+        webhookSignatureFailures++;
+        return res.status(403).send('Invalid signature');
       }
-    };
-
-    const uiStatus = normalizeStatus(MessageStatus);
+    }
+    const key = keyOf ? keyOf(params) : null;
+    if (!webhookQueue.push({ type, params, receivedAt: new Date().toISOString() }, key ? `${type}:${key}` : null)) {
+      return res.status(503).set('Retry-After', '1').send('Busy');
+    }
+    return acknowledge(res);
+  };
+}
 
-    // Broadcast status update via socket.io to all clients
-    io.emit('message_status_update', {
-      messageId: MessageSid,
-      status: uiStatus,
-      to: To,
-      from: From,
-      timestamp: new Date().toISOString()
-    });
+const acknowledgeOk = res => res.status(200).send('OK');
 
-    res.status(200).send('OK');
+// Incoming messages are never collapsed; the reply is empty TwiML (no auto-reply)
+app.post('/api/webhook/incoming', queueWebhook('incoming', null, res => res.type('text/xml').send(EMPTY_TWIML)));
 
-  } catch (error) {
-    console.error('Error processing status update:', error);
-    res.status(500).send('Error processing status update');
-  }
-});
+// Message status updates
+app.post('/api/webhook/status', queueWebhook('status', params => params.MessageSid, acknowledgeOk));
 
 // WebSocket simulation endpoint for real-time connections
 app.post('/api/connect', (req, res) => {
@@ -1344,12 +1557,12 @@ app.get('/api/conversations/:phoneNumber', authenticateToken, async (req, res) =
     const { limit = 50 } = req.query;
 
     // Fetch messages from Twilio
-    const messages = await client.messages.list({
+    const messages = await getTwilioClient().messages.list({
       from: phoneNumber,
       limit: parseInt(limit)
     });
 
-    const sentMessages = await client.messages.list({
+    const sentMessages = await getTwilioClient().messages.list({
       to: phoneNumber,
       limit: parseInt(limit)
     });
@@ -1382,8 +1595,9 @@ app.get('/api/conversations/:phoneNumber', authenticateToken, async (req, res) =
   }
 });
 
-// Voice: TwiML bridge to dial client, masking numbers
-app.get('/api/voice/bridge', async (req, res) => {
+// Voice: TwiML bridge to dial client, masking numbers. Twilio fetches the call Url with POST
+// unless told otherwise; both read the parameters from the query string
+app.all('/api/voice/bridge', async (req, res) => {
   try {
     const clientPhone = req.query.clientPhone;
     const record = String(req.query.record || 'false') === 'true';
@@ -1391,7 +1605,8 @@ app.get('/api/voice/bridge', async (req, res) => {
       return res.status(400).send('Missing clientPhone');
     }
 
-    const twiml = new twilio.twiml.VoiceResponse();
+    const { VoiceResponse } = getTwilio().twiml;
+    const twiml = new VoiceResponse();
     const dial = twiml.dial({ callerId: twilioPhoneNumber, record: record ? 'record-from-answer' : 'do-not-record' });
     dial.number(clientPhone);
     res.type('text/xml').send(twiml.toString());
@@ -1410,8 +1625,7 @@ app.post('/api/calls/start', authenticateToken, async (req, res) => {
     }
 
     // Find calling user's phone number to bridge
-    const users = readUsers();
-    const me = users.find(u => String(u.id) === String(req.user.id)) || users.find(u => u.email === req.user.email);
+    const me = findUserById(String(req.user.id)) || findUserByEmail(req.user.email);
     const userPhone = me?.phoneNumber || me?.phone;
     if (!userPhone) {
       return res.status(400).json({ error: 'Your profile has no phoneNumber set' });
@@ -1419,7 +1633,7 @@ app.post('/api/calls/start', authenticateToken, async (req, res) => {
 
     // First leg: call the user, then bridge to client via TwiML
     const baseUrl = process.env.BASE_URL || `http://localhost:${PORT}`;
-    const call = await client.calls.create({
+    const call = await getTwilioClient().calls.create({
       to: userPhone,
       from: twilioPhoneNumber,
       url: `${baseUrl}/api/voice/bridge?clientPhone=${encodeURIComponent(clientPhone)}&record=${record ? 'true' : 'false'}`,
@@ -1443,30 +1657,15 @@ app.post('/api/calls/start', authenticateToken, async (req, res) => {
 });
 
 // Voice status webhook (Twilio -> server)
-app.post('/api/voice/status', (req, res) => {
-  try {
-    const { CallSid, CallStatus, To, From } = req.body;
-    io.emit('call_status_update', {
-      callSid: CallSid,
-      status: CallStatus,
-      to: To,
-      from: From,
-      timestamp: new Date().toISOString()
-    });
-    res.status(200).send('OK');
-  } catch (error) {
-    console.error('Error processing voice status:', error);
-    res.status(500).send('Error processing voice status');
-  }
-});
+app.post('/api/voice/status', queueWebhook('voice', params => params.CallSid, acknowledgeOk));
 
 // Call history (secured)
 app.get('/api/calls/history/:phoneNumber', authenticateToken, async (req, res) => {
   try {
     const { phoneNumber } = req.params;
     const { limit = 50 } = req.query;
-    const outgoing = await client.calls.list({ to: phoneNumber, limit: parseInt(limit) });
-    const incoming = await client.calls.list({ from: phoneNumber, limit: parseInt(limit) });
+    const outgoing = await getTwilioClient().calls.list({ to: phoneNumber, limit: parseInt(limit) });
+    const incoming = await getTwilioClient().calls.list({ from: phoneNumber, limit: parseInt(limit) });
     const all = [...outgoing, ...incoming]
       .sort((a,b) => new Date(a.startTime || a.dateCreated) - new Date(b.startTime || b.dateCreated))
       .map(c => ({
@@ -1495,15 +1694,25 @@ app.use((error, req, res, next) => {
   });
 });
 
+bootProfile.mark('routes');
+
 // Start server with WebSocket support
 server.listen(PORT, () => {
+  bootProfile.mark('listen');
   console.log(`🚀 Twilio backend server running on port ${PORT}`);
   console.log(`🔌 WebSocket server enabled`);
   console.log(`📱 Webhook URL: http://localhost:${PORT}/api/webhook/incoming`);
   console.log(`📊 Status webhook: http://localhost:${PORT}/api/webhook/status`);
   console.log(`🏥 Health check: http://localhost:${PORT}/health`);
-  // Ensure default test user exists for integration tests
-  ensureSeedUsers();
+  bootProfile.report({
+    budgetMs: parseInt(process.env.STARTUP_BUDGET_MS || '0', 10),
+    verbose: process.env.BOOT_PROFILE === 'true',
+  });
+  // Ensure default test user exists for integration tests (off the boot path)
+  const seedStart = Date.now();
+  ensureSeedUsers().then(() => {
+    if (process.env.BOOT_PROFILE === 'true') console.log(`⏱️  Seed users: ${Date.now() - seedStart}ms`);
+  });
 });
 
 module.exports = { app, server, io };
\ No newline at end of file
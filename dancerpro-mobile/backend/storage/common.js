@@ -0,0 +1,27 @@
+// Helpers shared by every storage driver.
+
+// Snapshot collections that get per-record storage; any other snapshot key (e.g. `events`) is kept as-is.
+const SNAPSHOT_COLLECTIONS = ['venues', 'shifts', 'transactions', 'clients', 'outfits'];
+
+function buildSnapshotPayload(snapshot, meta = {}) {
+  return {
+    snapshot: snapshot || {},
+    metadata: {
+      updatedAt: new Date().toISOString(),
+      version: 1,
+      ...meta,
+    },
+  };
+}
+
+// Drivers look emails up case-insensitively (the server's semantics). Callers that match exactly, like
+// the Netlify functions, use this: the indexed lookup covers the common case, and only when the stored
+// address differs in case do we scan for an exact match (two accounts may differ only by case).
+function findUserByExactEmail(store, email) {
+  const user = store.findUserByEmail(email);
+  if (!user) return undefined;
+  if (user.email === email) return user;
+  return store.readUsers().find(u => u.email === email);
+}
+
+module.exports = { SNAPSHOT_COLLECTIONS, buildSnapshotPayload, findUserByExactEmail };
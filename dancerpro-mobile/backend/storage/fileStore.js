@@ -0,0 +1,154 @@
+const fs = require('fs');
+const path = require('path');
+const { SNAPSHOT_COLLECTIONS, buildSnapshotPayload } = require('./common');
+
+// JSON-file storage: users live in one array file, snapshots as one file per user.
+// Every lookup re-reads the file, which keeps multiple processes consistent at the cost of speed.
+
+function ensureDir(dirPath) {
+  try {
+    if (!fs.existsSync(dirPath)) {
+      fs.mkdirSync(dirPath, { recursive: true });
+    }
+    return true;
+  } catch (e) {
+    console.error('Failed to ensure directory:', dirPath, e);
+    return false;
+  }
+}
+
+function createFileStore({ usersFile, snapshotDir }) {
+  function getSnapshotFile(userId) {
+    return path.join(snapshotDir, `${userId}.json`);
+  }
+
+  function readUsers() {
+    try {
+      if (!fs.existsSync(usersFile)) {
+        return [];
+      }
+      const data = fs.readFileSync(usersFile, 'utf8');
+      return JSON.parse(data);
+    } catch (error) {
+      console.error('Error reading users file:', error);
+      return [];
+    }
+  }
+
+  function writeUsers(users) {
+    try {
+      fs.writeFileSync(usersFile, JSON.stringify(users, null, 2));
+      return true;
+    } catch (error) {
+      console.error('Error writing users file:', error);
+      return false;
+    }
+  }
+
+  function findUserByEmail(email) {
+    const needle = String(email || '').toLowerCase();
+    return readUsers().find(user => String(user.email || '').toLowerCase() === needle);
+  }
+
+  function findUserById(id) {
+    return readUsers().find(user => user.id === id);
+  }
+
+  function findUserByCredentialId(credId) {
+    for (const u of readUsers()) {
+      const creds = u.webauthn && Array.isArray(u.webauthn.credentials) ? u.webauthn.credentials : [];
+      if (creds.some(c => c.id === credId)) return u;
+    }
+    return null;
+  }
+
+  function upsertUser(user) {
+    const users = readUsers();
+    const idx = users.findIndex(u => u.id === user.id);
+    if (idx === -1) {
+      users.push(user);
+    } else {
+      users[idx] = user;
+    }
+    return writeUsers(users) ? user : null;
+  }
+
+  function deleteUser(id) {
+    const users = readUsers();
+    const idx = users.findIndex(u => u.id === id);
+    if (idx === -1) return false;
+    users.splice(idx, 1);
+    return writeUsers(users);
+  }
+
+  function countUsers() {
+    return readUsers().length;
+  }
+
+  function readUserSnapshot(userId) {
+    try {
+      ensureDir(snapshotDir);
+      const file = getSnapshotFile(userId);
+      if (!fs.existsSync(file)) return null;
+      const raw = fs.readFileSync(file, 'utf8');
+      return JSON.parse(raw);
+    } catch (e) {
+      console.error('Error reading snapshot for user:', userId, e);
+      return null;
+    }
+  }
+
+  function writeUserSnapshot(userId, snapshot, meta = {}) {
+    try {
+      ensureDir(snapshotDir);
+      const payload = buildSnapshotPayload(snapshot, meta);
+      fs.writeFileSync(getSnapshotFile(userId), JSON.stringify(payload, null, 2), 'utf8');
+      return payload;
+    } catch (e) {
+      console.error('Error writing snapshot for user:', userId, e);
+      return null;
+    }
+  }
+
+  function getSnapshotSize(userId) {
+    try {
+      return fs.statSync(getSnapshotFile(userId)).size || 0;
+    } catch {
+      return 0;
+    }
+  }
+
+  function listSnapshotUserIds() {
+    try {
+      if (!fs.existsSync(snapshotDir)) return [];
+      return fs.readdirSync(snapshotDir)
+        .filter(name => name.endsWith('.json'))
+        .map(name => name.slice(0, -'.json'.length));
+    } catch (e) {
+      console.error('Error listing snapshots:', e);
+      return [];
+    }
+  }
+
+  return {
+    driver: 'file',
+    collections: SNAPSHOT_COLLECTIONS,
+    ensureDir,
+    getSnapshotFile,
+    readUsers,
+    writeUsers,
+    findUserByEmail,
+    findUserById,
+    findUserByCredentialId,
+    upsertUser,
+    deleteUser,
+    countUsers,
+    readUserSnapshot,
+    writeUserSnapshot,
+    getSnapshotSize,
+    listSnapshotUserIds,
+    close() {},
+  };
+}
+
+module.exports = { createFileStore, ensureDir };
@@ -0,0 +1,26 @@
+const { createFileStore, ensureDir } = require('./fileStore');
+const { SNAPSHOT_COLLECTIONS, buildSnapshotPayload, findUserByExactEmail } = require('./common');
+
+/**
+ * Create the storage backend used for users and cloud sync snapshots.
+ * Driver is picked from `options.driver` or STORAGE_DRIVER ('file' | 'sqlite'); defaults to JSON files.
+ * A sqlite driver that fails to load or open throws, unless `options.fallback` or STORAGE_FALLBACK
+ * is 'file', in which case the JSON-file store is used instead.
+ * @param {{ driver?: string, fallback?: string, usersFile: string, snapshotDir: string, sqliteFile?: string }} options
+ */
+function createStore(options = {}) {
+  const driver = String(options.driver || process.env.STORAGE_DRIVER || 'file').toLowerCase();
+  if (driver === 'sqlite') {
+    try {
+      const { createSqliteStore } = require('./sqliteStore');
+      return createSqliteStore({ file: process.env.SQLITE_FILE || options.sqliteFile });
+    } catch (e) {
+      const fallback = String(options.fallback || process.env.STORAGE_FALLBACK || '').toLowerCase();
+      if (fallback !== 'file') throw e;
+      console.error('SQLite storage unavailable; falling back to JSON files (STORAGE_FALLBACK=file):', e.message);
+    }
+  }
+  return createFileStore(options);
+}
+
+module.exports = { createStore, ensureDir, SNAPSHOT_COLLECTIONS, buildSnapshotPayload, findUserByExactEmail };
@@ -0,0 +1,239 @@
+const fs = require('fs');
+const path = require('path');
+const { SNAPSHOT_COLLECTIONS, buildSnapshotPayload } = require('./common');
+
+// Embedded SQLite storage (better-sqlite3).
+// - Users are indexed by id, lowercased email and WebAuthn credential id.
+// - Snapshot collections are stored one row per record so reads and writes stay proportional to one user.
+// - WAL journaling lets readers proceed while an export is being written.
+
+function createSqliteStore({ file }) {
+  // Required lazily so the JSON-file driver keeps working when the native module is not installed.
+  const Database = require('better-sqlite3');
+  fs.mkdirSync(path.dirname(file), { recursive: true });
+  const db = new Database(file);
+  db.pragma('journal_mode = WAL');
+  db.pragma('synchronous = NORMAL');
+  db.pragma('foreign_keys = ON');
+
+  db.exec(`
+    CREATE TABLE IF NOT EXISTS users (
+      id TEXT PRIMARY KEY,
+      email TEXT NOT NULL,
+      data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+    CREATE TABLE IF NOT EXISTS user_credentials (
+      credential_id TEXT PRIMARY KEY,
+      user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE
+    );
+    CREATE INDEX IF NOT EXISTS idx_user_credentials_user ON user_credentials(user_id);
+    CREATE TABLE IF NOT EXISTS snapshots (
+      user_id TEXT PRIMARY KEY,
+      metadata TEXT NOT NULL,
+      extras TEXT NOT NULL,
+      size INTEGER NOT NULL DEFAULT 0
+    );
+  `);
+  SNAPSHOT_COLLECTIONS.forEach(name => {
+    db.exec(`
+      CREATE TABLE IF NOT EXISTS ${name} (
+        user_id TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        record_id TEXT,
+        data TEXT NOT NULL,
+        PRIMARY KEY (user_id, position)
+      ) WITHOUT ROWID;
+      CREATE INDEX IF NOT EXISTS idx_${name}_record ON ${name}(user_id, record_id);
+    `);
+  });
+
+  const stmts = {
+    allUsers: db.prepare('SELECT data FROM users ORDER BY rowid'),
+    countUsers: db.prepare('SELECT COUNT(*) AS n FROM users'),
+    userById: db.prepare('SELECT data FROM users WHERE id = ?'),
+    userByEmail: db.prepare('SELECT data FROM users WHERE email = ? ORDER BY rowid LIMIT 1'),
+    userByCredential: db.prepare(`
+      SELECT u.data FROM user_credentials c JOIN users u ON u.id = c.user_id
+      WHERE c.credential_id = ?
+    `),
+    upsertUser: db.prepare(`
+      INSERT INTO users (id, email, data) VALUES (@id, @email, @data)
+      ON CONFLICT(id) DO UPDATE SET email = excluded.email, data = excluded.data
+    `),
+    deleteUser: db.prepare('DELETE FROM users WHERE id = ?'),
+    deleteAllUsers: db.prepare('DELETE FROM users'),
+    deleteCredentialsForUser: db.prepare('DELETE FROM user_credentials WHERE user_id = ?'),
+    insertCredential: db.prepare('INSERT OR REPLACE INTO user_credentials (credential_id, user_id) VALUES (?, ?)'),
+    snapshotMeta: db.prepare('SELECT metadata, extras FROM snapshots WHERE user_id = ?'),
+    snapshotSize: db.prepare('SELECT size FROM snapshots WHERE user_id = ?'),
+    snapshotUserIds: db.prepare('SELECT user_id FROM snapshots'),
+    upsertSnapshot: db.prepare(`
+      INSERT INTO snapshots (user_id, metadata, extras, size) VALUES (@userId, @metadata, @extras, @size)
+      ON CONFLICT(user_id) DO UPDATE SET metadata = excluded.metadata, extras = excluded.extras, size = excluded.size
+    `),
+    records: {},
+  };
+  SNAPSHOT_COLLECTIONS.forEach(name => {
+    stmts.records[name] = {
+      select: db.prepare(`SELECT data FROM ${name} WHERE user_id = ? ORDER BY position`),
+      clear: db.prepare(`DELETE FROM ${name} WHERE user_id = ?`),
+      insert: db.prepare(`INSERT INTO ${name} (user_id, position, record_id, data) VALUES (?, ?, ?, ?)`),
+    };
+  });
+
+  const parseRow = row => (row ? JSON.parse(row.data) : undefined);
+
+  const putUser = (user) => {
+    stmts.upsertUser.run({ id: String(user.id), email: String(user.email || '').toLowerCase(), data: JSON.stringify(user) });
+    stmts.deleteCredentialsForUser.run(String(user.id));
+    const creds = user.webauthn && Array.isArray(user.webauthn.credentials) ? user.webauthn.credentials : [];
+    creds.forEach(c => { if (c && c.id) stmts.insertCredential.run(String(c.id), String(user.id)); });
+  };
+
+  const upsertUserTx = db.transaction(putUser);
+  const writeUsersTx = db.transaction((users) => {
+    stmts.deleteAllUsers.run();
+    users.forEach(putUser);
+  });
+
+  const writeSnapshotTx = db.transaction((userId, payload) => {
+    const snapshot = payload.snapshot || {};
+    const keys = Object.keys(snapshot);
+    const values = {};
+    let size = 0;
+    SNAPSHOT_COLLECTIONS.forEach(name => stmts.records[name].clear.run(userId));
+    keys.forEach(key => {
+      const list = snapshot[key];
+      const stmt = stmts.records[key];
+      if (!stmt || !Array.isArray(list)) {
+        values[key] = list;
+        return;
+      }
+      list.forEach((record, position) => {
+        const data = JSON.stringify(record);
+        size += data.length;
+        const recordId = record && record.id != null ? String(record.id) : null;
+        stmt.insert.run(userId, position, recordId, data);
+      });
+    });
+    const metadata = JSON.stringify(payload.metadata || {});
+    const extras = JSON.stringify({ keys, values });
+    stmts.upsertSnapshot.run({ userId, metadata, extras, size: size + metadata.length + extras.length });
+  });
+
+  function readUsers() {
+    try {
+      return stmts.allUsers.all().map(parseRow);
+    } catch (error) {
+      console.error('Error reading users table:', error);
+      return [];
+    }
+  }
+
+  function writeUsers(users) {
+    try {
+      writeUsersTx(Array.isArray(users) ? users : []);
+      return true;
+    } catch (error) {
+      console.error('Error writing users table:', error);
+      return false;
+    }
+  }
+
+  function findUserByEmail(email) {
+    return parseRow(stmts.userByEmail.get(String(email || '').toLowerCase()));
+  }
+
+  function findUserById(id) {
+    return parseRow(stmts.userById.get(String(id)));
+  }
+
+  function findUserByCredentialId(credId) {
+    return parseRow(stmts.userByCredential.get(String(credId))) || null;
+  }
+
+  function upsertUser(user) {
+    try {
+      upsertUserTx(user);
+      return user;
+    } catch (error) {
+      console.error('Error saving user:', error);
+      return null;
+    }
+  }
+
+  function deleteUser(id) {
+    try {
+      return stmts.deleteUser.run(String(id)).changes > 0;
+    } catch (error) {
+      console.error('Error deleting user:', error);
+      return false;
+    }
+  }
+
+  function countUsers() {
+    return stmts.countUsers.get().n;
+  }
+
+  function readUserSnapshot(userId) {
+    try {
+      const row = stmts.snapshotMeta.get(String(userId));
+      if (!row) return null;
+      const { keys, values } = JSON.parse(row.extras);
+      const snapshot = {};
+      keys.forEach(key => {
+        if (Object.prototype.hasOwnProperty.call(values, key)) {
+          snapshot[key] = values[key];
+        } else if (stmts.records[key]) {
+          snapshot[key] = stmts.records[key].select.all(String(userId)).map(parseRow);
+        }
+      });
+      return { snapshot, metadata: JSON.parse(row.metadata) };
+    } catch (e) {
+      console.error('Error reading snapshot for user:', userId, e);
+      return null;
+    }
+  }
+
+  function writeUserSnapshot(userId, snapshot, meta = {}) {
+    try {
+      const payload = buildSnapshotPayload(snapshot, meta);
+      writeSnapshotTx(String(userId), payload);
+      return payload;
+    } catch (e) {
+      console.error('Error writing snapshot for user:', userId, e);
+      return null;
+    }
+  }
+
+  function getSnapshotSize(userId) {
+    const row = stmts.snapshotSize.get(String(userId));
+    return row ? row.size : 0;
+  }
+
+  function listSnapshotUserIds() {
+    return stmts.snapshotUserIds.all().map(r => r.user_id);
+  }
+
+  return {
+    driver: 'sqlite',
+    collections: SNAPSHOT_COLLECTIONS,
+    db,
+    readUsers,
+    writeUsers,
+    findUserByEmail,
+    findUserById,
+    findUserByCredentialId,
+    upsertUser,
+    deleteUser,
+    countUsers,
+    readUserSnapshot,
+    writeUserSnapshot,
+    getSnapshotSize,
+    listSnapshotUserIds,
+    close() { db.close(); },
+  };
+}
+
+module.exports = { createSqliteStore };
@@ -1,12 +1,11 @@
 // AI Insights Engine for mobile project
-import { openDb, getAllDataSnapshot, getClientPerformance, getVenuePerformance } from './db';
-import { fetchCloudSnapshot } from './api';
-
-function safeArray(arr) { return Array.isArray(arr) ? arr : []; }
-function normalize(value, max) { const m = Number(max || 0); const v = Math.max(0, Number(value || 0)); return m > 0 ? Math.min(1, v / m) : 0; }
-function toDowLabel(dow) { const labels = ['Sun','Mon','Tue','Wed','Thu','Fri','Sat']; return labels[(Number(dow) || 0) % 7]; }
-function adjacentDowScore(a, b) { if (a == null || b == null) return 0; const diff = Math.abs(Number(a) - Number(b)); if (diff === 0) return 1; if (diff === 1 || diff === 6) return 0.6; return 0.25; }
-function stringIncludes(haystack, needle) { if (!haystack || !needle) return false; return String(haystack).toLowerCase().includes(String(needle).toLowerCase()); }
+import { openDb, getAllDataSnapshot, getDataVersion } from './db';
+import { fetchCloudSnapshotIfChanged } from './api';
+import { createCloudSnapshotCache, mergeSnapshot } from './cloudSnapshot';
+import { safeArray, toDowLabel, rankedRows, scheduleEntries, actionItems } from './aiScoring';
+import { encodeShiftsJob, runJob, cancelledError, TOP_N, SCHEDULE_WEEKS } from './aiJob';
+import { runInsightsJob } from './aiWorkerClient';
+import { parseIntent, createQueryIndex, answerIntent } from './aiQuery';
 
 // ----- Scoring Weights (refinable) -----
 const defaultWeights = {
@@ -20,6 +19,8 @@ const defaultWeights = {
 };
 
 let scoringWeights = { ...defaultWeights };
+// Bumped when the weights actually change; part of the pipeline cache key
+let weightsVersion = 0;
 
 export function setScoringWeights(newWeights = {}) {
   const keys = Object.keys(defaultWeights);
@@ -27,297 +28,234 @@ export function setScoringWeights(newWeights = {}) {
   keys.forEach(k => {
     if (newWeights[k] != null) next[k] = Number(newWeights[k]);
   });
+  if (keys.some(k => !Object.is(next[k], scoringWeights[k]))) weightsVersion += 1;
   scoringWeights = next;
 }
 
 export function getScoringWeights() { return { ...scoringWeights }; }
 
-function computeAggregates(snapshot) {
-  const shifts = safeArray(snapshot.shifts);
-  const byClientVenue = new Map();
-  const byVenue = new Map();
-  const byClient = new Map();
-  const eventFlagByVenue = new Map();
-  shifts.forEach(s => {
-    const earnings = Number(s.earnings || 0);
-    const venueId = s.venueId || null;
-    const clientId = s.clientId || null;
-    if (!venueId) return;
-    const vPrev = byVenue.get(venueId) || { total: 0, count: 0 };
-    byVenue.set(venueId, { total: vPrev.total + earnings, count: vPrev.count + 1 });
-    if (stringIncludes(s.notes, 'event')) {
-      eventFlagByVenue.set(venueId, true);
-    }
-    if (clientId) {
-      const cPrev = byClient.get(clientId) || { total: 0, count: 0 };
-      byClient.set(clientId, { total: cPrev.total + earnings, count: cPrev.count + 1 });
-      const key = `${clientId}|${venueId}`;
-      const cvPrev = byClientVenue.get(key) || { total: 0, count: 0 };
-      byClientVenue.set(key, { total: cvPrev.total + earnings, count: cvPrev.count + 1 });
-    }
-  });
-  // Merge any explicit upcoming events if present
-  safeArray(snapshot.events).forEach(e => {
-    const vid = e.venueId || e.venue || null;
-    if (vid) eventFlagByVenue.set(vid, true);
-  });
-  const venueMaxAvg = Array.from(byVenue.values()).reduce((m, v) => Math.max(m, v.count ? (v.total / v.count) : 0), 0);
-  const clientMaxAvg = Array.from(byClient.values()).reduce((m, v) => Math.max(m, v.count ? (v.total / v.count) : 0), 0);
-  const clientVenueMaxAvg = Array.from(byClientVenue.values()).reduce((m, v) => Math.max(m, v.count ? (v.total / v.count) : 0), 0);
-  const maxCapacity = safeArray(snapshot.venues).reduce((acc, v) => Math.max(acc, Number(v.capacity || 0)), 0);
-  return { byClientVenue, byVenue, byClient, venueMaxAvg, clientMaxAvg, clientVenueMaxAvg, maxCapacity, eventFlagByVenue };
-}
-
 // ----- Cloud Snapshot Merge & Caching -----
-let cloudCache = { snapshot: null, fetchedAt: 0 };
-
-function mergeLists(localArr, cloudArr, idKey = 'id') {
-  const map = new Map();
-  safeArray(localArr).forEach(it => { const k = it[idKey] ?? `${idKey}:${Math.random()}`; if (!map.has(k)) map.set(k, it); });
-  safeArray(cloudArr).forEach(it => { const k = it[idKey] ?? `${idKey}:${Math.random()}`; map.set(k, { ...(map.get(k) || {}), ...it }); });
-  return Array.from(map.values());
-}
+// Persisted per user and revalidated with ETags; see lib/cloudSnapshot.js
+const cloudSnapshots = createCloudSnapshotCache({ fetchIfChanged: fetchCloudSnapshotIfChanged });
 
+// Also returns the ETag of the cloud entry that was merged ('' for none)
 async function getMergedSnapshot(db, useCloud = true) {
   const local = await getAllDataSnapshot(db);
-  if (!useCloud) return local;
-  let cloud = null;
-  try {
-    if (cloudCache.snapshot && (Date.now() - cloudCache.fetchedAt) < 5 * 60 * 1000) {
-      cloud = cloudCache.snapshot;
-    } else {
-      const res = await fetchCloudSnapshot();
-      cloud = res?.snapshot || res || {};
-      cloudCache = { snapshot: cloud, fetchedAt: Date.now() };
+  const cloud = useCloud ? await cloudSnapshots.get() : null;
+  return { snapshot: mergeSnapshot(local, cloud), cloudVersion: cloud?.etag || '' };
+}
+
+// ----- Pipeline -----
+// One run merges the snapshot, aggregates it and scores every client x venue pair once; the
+// assignments, schedule and action items are all read off that score matrix. The heavy part runs
+// as lib/aiJob.js's insightsJob, in a Web Worker on web and in short slices on the JS thread
+// elsewhere (lib/aiWorkerClient.js), and its stages arrive as they finish: top pairs first, then
+// schedule, then actions (see streamAiInsights).
+//
+// Runs are memoized per period by (lib/db.js data version, scoring weights version) and remember the
+// ETag of the cloud snapshot they merged: reopening AI Insights or asking follow-up questions
+// reuses them until a record is written, the weights change or a different cloud snapshot has been
+// seen. The ETag is checked on reuse rather than put in the key: it is only known once a run has
+// loaded the cloud entry.
+const MAX_CACHED_PERIODS = 4;
+let pipelineCache = { key: null, byPeriod: new Map() };
+
+function createPipeline(snapshot, weights) {
+  const clients = safeArray(snapshot.clients);
+  const venues = safeArray(snapshot.venues);
+  const pipeline = { snapshot, clients, venues, weights, aggregates: null, matrix: null, now: null };
+  const rankedByN = new Map();
+  // Best `n` venues per client (client order) as { venueIndex, ...explainPair() }; computed once
+  // per n, and read off a wider ranking when there is one
+  pipeline.ranked = n => {
+    if (!rankedByN.has(n)) {
+      const wider = Array.from(rankedByN.keys()).find(m => m >= n);
+      rankedByN.set(n, wider != null
+        ? rankedByN.get(wider).map(row => row.slice(0, n))
+        : rankedRows(pipeline.matrix, pipeline.aggregates, weights, n));
     }
-  } catch {
-    cloud = null;
-  }
-  return {
-    clients: mergeLists(local.clients, cloud?.clients),
-    venues: mergeLists(local.venues, cloud?.venues),
-    shifts: mergeLists(local.shifts, cloud?.shifts),
-    outfits: mergeLists(local.outfits, cloud?.outfits),
-    transactions: mergeLists(local.transactions, cloud?.transactions),
-    events: safeArray(cloud?.events),
+    return rankedByN.get(n);
+  };
+  pipeline.setRanked = (n, rows) => rankedByN.set(n, rows);
+  // Derived views (assignments, schedule, ...) are memoized on the run as well
+  const derived = new Map();
+  pipeline.memo = (key, compute) => {
+    if (!derived.has(key)) derived.set(key, compute());
+    return derived.get(key);
   };
+  pipeline.recommendations = n => pipeline.memo(`recommendations:${n}`, () => pipeline.ranked(n)
+    .map((row, i) => row.map(({ venueIndex, ...detail }) => ({ client: clients[i], venue: venues[venueIndex], ...detail }))));
+  return pipeline;
 }
 
-function tagRelevanceScore(client, venue) {
-  const cTags = safeArray(client.tags);
-  const vTags = safeArray(venue.tags);
-  if (cTags.length && vTags.length) {
-    const setC = new Set(cTags.map(t => String(t).toLowerCase()));
-    const setV = new Set(vTags.map(t => String(t).toLowerCase()));
-    let inter = 0;
-    setC.forEach(t => { if (setV.has(t)) inter += 1; });
-    const denom = Math.max(1, Math.min(setC.size, setV.size));
-    return inter / denom;
+function hydrateSchedule(pipeline, entries) {
+  return entries.map(({ clientIndex, venueIndex, bestDay, text }) => ({ client: pipeline.clients[clientIndex], venue: pipeline.venues[venueIndex], bestDay, text }));
+}
+
+// Feeds the job's partials into the pipeline memo and returns what the screen can show so far
+function applyPartial(pipeline, partial) {
+  if (partial.stage === 'pairs') {
+    pipeline.setRanked(TOP_N, partial.ranked);
+    return { assignments: assignmentsFrom(pipeline, TOP_N), compatibilityTop: compatibilityFrom(pipeline) };
+  }
+  if (partial.stage === 'schedule') {
+    return { schedule: pipeline.memo(`schedule:${SCHEDULE_WEEKS}`, () => hydrateSchedule(pipeline, partial.schedule)) };
+  }
+  if (partial.stage === 'actions') {
+    return { actions: pipeline.memo('actions', () => partial.actions) };
   }
-  const loc = venue.location || venue.city || '';
-  return (stringIncludes(client.notes, venue.name) || stringIncludes(client.notes, loc)) ? 1 : 0;
+  return {};
 }
 
-function cityProximityScore(client, venue) {
-  const cCity = client.city || client.location || null;
-  const vCity = venue.city || venue.location || null;
-  if (cCity && vCity) {
-    return (stringIncludes(cCity, vCity) || stringIncludes(vCity, cCity)) ? 1 : 0;
+async function runPipeline(periodDays, run) {
+  const { signal } = run.controller;
+  const { snapshot, cloudVersion } = await getMergedSnapshot(openDb(), true);
+  run.cloudVersion = cloudVersion;
+  const pipeline = createPipeline(snapshot, scoringWeights);
+  const shiftTable = await runJob(encodeShiftsJob(safeArray(snapshot.shifts)), { signal });
+  pipeline.now = Date.now();
+  const input = { clients: pipeline.clients, venues: pipeline.venues, events: safeArray(snapshot.events), shiftTable, periodDays, weights: pipeline.weights, now: pipeline.now };
+  const result = await runInsightsJob(input, {
+    signal,
+    onPartial: partial => {
+      run.insights = { ...run.insights, ...applyPartial(pipeline, partial) };
+      run.listeners.forEach(listener => listener(run.insights));
+    },
+  });
+  pipeline.aggregates = result.aggregates;
+  pipeline.matrix = { clients: pipeline.clients, venues: pipeline.venues, scores: result.scores };
+  return pipeline;
+}
+
+function getRun(periodDays) {
+  const key = `${getDataVersion(openDb())}|${weightsVersion}`;
+  if (pipelineCache.key !== key) pipelineCache = { key, byPeriod: new Map() };
+  const { byPeriod } = pipelineCache;
+  const period = Number(periodDays);
+  const cached = byPeriod.get(period);
+  // A run still loading its snapshot is shared; a later one is stale once a newer cloud snapshot is seen
+  if (cached && cached.cloudVersion != null && cached.cloudVersion !== cloudSnapshots.version()) byPeriod.delete(period);
+  if (!byPeriod.has(period)) {
+    if (byPeriod.size >= MAX_CACHED_PERIODS) byPeriod.delete(byPeriod.keys().next().value);
+    // `pinned`: someone awaits the full result and cannot cancel, so the run must finish
+    const run = { controller: new AbortController(), listeners: new Set(), insights: {}, pinned: false, settled: false, cloudVersion: null };
+    // A failed or cancelled run is not cached
+    run.evict = () => { if (byPeriod.get(period) === run) byPeriod.delete(period); };
+    run.promise = runPipeline(period, run);
+    byPeriod.set(period, run);
+    run.promise.then(() => { run.settled = true; }, run.evict);
   }
-  if (vCity) return stringIncludes(client.notes, vCity) ? 1 : 0;
-  return 0;
+  return byPeriod.get(period);
+}
+
+function getPipeline(periodDays) {
+  const run = getRun(periodDays);
+  run.pinned = true;
+  return run.promise;
+}
+
+// Drop memoized results and revalidate the cloud snapshot on the next run
+export function invalidateAiInsights() {
+  pipelineCache = { key: null, byPeriod: new Map() };
+  cloudSnapshots.expire();
+}
+
+function assignmentsFrom(pipeline, topN) {
+  return pipeline.memo(`assignments:${topN}`, () => {
+    const rows = pipeline.recommendations(topN).map((recommendations, i) => ({ client: pipeline.clients[i], recommendations }));
+    return rows.sort((a, b) => (b.recommendations[0]?.score || 0) - (a.recommendations[0]?.score || 0));
+  });
+}
+
+function compatibilityFrom(pipeline) {
+  return pipeline.memo('compatibilityTop', () => {
+    const pairs = [];
+    assignmentsFrom(pipeline, TOP_N).forEach(row => { row.recommendations.forEach(r => { pairs.push({ client: row.client, venue: r.venue, score: r.score, rationale: r.rationale }); }); });
+    return pairs.sort((a, b) => (b.score || 0) - (a.score || 0)).slice(0, 10);
+  });
+}
+
+function scheduleFrom(pipeline, weeks) {
+  return pipeline.memo(`schedule:${weeks}`, () => hydrateSchedule(pipeline,
+    scheduleEntries(pipeline.clients, pipeline.venues, pipeline.ranked(1).map(row => row[0]), weeks)));
 }
 
-async function compatibilityScore(db, client, venue, aggregates, periodDays = 120) {
-  const key = `${client.id}|${venue.id}`;
-  const cv = aggregates.byClientVenue.get(key) || { total: 0, count: 0 };
-  const clientVenueAvg = cv.count ? cv.total / cv.count : 0;
-  const vAgg = aggregates.byVenue.get(venue.id) || { total: 0, count: 0 };
-  const venueAvg = vAgg.count ? vAgg.total / vAgg.count : 0;
-  const cp = await getClientPerformance(db, client.id, periodDays);
-  const vp = await getVenuePerformance(db, venue.id, periodDays);
-  const dowMatch = adjacentDowScore(cp.bestDay, vp.bestDay);
-  const w = scoringWeights;
-  const capacityNorm = normalize(Number(venue.capacity || 0), aggregates.maxCapacity || 0);
-  const tagScore = tagRelevanceScore(client, venue);
-  const cityScore = cityProximityScore(client, venue);
-  const eventScore = aggregates.eventFlagByVenue.get(venue.id) ? 1 : 0;
-  const score = (
-    w.base_client_venue_weight * normalize(clientVenueAvg, aggregates.clientVenueMaxAvg) +
-    w.base_venue_avg_weight * normalize(venueAvg, aggregates.venueMaxAvg) +
-    w.base_dow_weight * dowMatch +
-    w.tag_weight * tagScore +
-    w.city_match_weight * cityScore +
-    w.capacity_weight * capacityNorm +
-    w.event_weight * eventScore
-  );
-  const rationale = [
-    clientVenueAvg ? `Strong personal earnings at ${venue.name}` : null,
-    venueAvg ? `Venue averages ${(venueAvg).toFixed(0)} per shift` : null,
-    cp.bestDay != null && vp.bestDay != null ? `Best day alignment: ${toDowLabel(cp.bestDay)} vs ${toDowLabel(vp.bestDay)}` : null,
-    tagScore ? 'Tag relevance matched' : null,
-    cityScore ? `City proximity: ${venue.city || venue.location || 'local'}` : null,
-    capacityNorm ? `Capacity factor considered` : null,
-    eventScore ? 'Special event impact detected' : null,
-  ].filter(Boolean);
-  return { score, rationale, clientVenueAvg, venueAvg, clientBestDay: cp.bestDay, venueBestDay: vp.bestDay };
+function actionsFrom(pipeline) {
+  return pipeline.memo('actions', () => actionItems(pipeline.clients, pipeline.venues, pipeline.aggregates, pipeline.ranked(1).map(row => row[0])));
 }
 
 export async function generateClientAssignments(periodDays = 120, topN = 3) {
-  const db = openDb();
-  const snapshot = await getMergedSnapshot(db, true);
-  const clients = safeArray(snapshot.clients);
-  const venues = safeArray(snapshot.venues);
-  const aggregates = computeAggregates(snapshot);
-  const results = [];
-  for (const client of clients) {
-    const rows = [];
-    for (const venue of venues) {
-      const comp = await compatibilityScore(db, client, venue, aggregates, periodDays);
-      rows.push({ client, venue, ...comp });
-    }
-    const ranked = rows.sort((a, b) => (b.score || 0) - (a.score || 0)).slice(0, topN);
-    results.push({ client, recommendations: ranked });
-  }
-  return results.sort((a, b) => (b.recommendations[0]?.score || 0) - (a.recommendations[0]?.score || 0));
+  return assignmentsFrom(await getPipeline(periodDays), topN);
 }
 
 export async function generateScheduleSuggestions(periodDays = 120, weeks = 4) {
-  const db = openDb();
-  const snapshot = await getMergedSnapshot(db, true);
-  const clients = safeArray(snapshot.clients);
-  const venues = safeArray(snapshot.venues);
-  const aggregates = computeAggregates(snapshot);
-  const suggestions = [];
-  for (const client of clients) {
-    const ranks = [];
-    for (const venue of venues) {
-      const comp = await compatibilityScore(db, client, venue, aggregates, periodDays);
-      ranks.push({ venue, comp });
-    }
-    const best = ranks.sort((a, b) => (b.comp.score || 0) - (a.comp.score || 0))[0];
-    if (!best) continue;
-    const dow = best.comp.clientBestDay ?? best.comp.venueBestDay ?? 5;
-    const label = toDowLabel(dow);
-    suggestions.push({ client, venue: best.venue, bestDay: dow, text: `Schedule ${client.name} at ${best.venue.name} on ${label} for the next ${weeks} weeks` });
-  }
-  return suggestions;
+  return scheduleFrom(await getPipeline(periodDays), weeks);
 }
 
 export async function generateActionItems(periodDays = 120) {
-  const db = openDb();
-  const snapshot = await getMergedSnapshot(db, true);
-  const clients = safeArray(snapshot.clients);
-  const venues = safeArray(snapshot.venues);
-  const aggregates = computeAggregates(snapshot);
-  const items = [];
-  for (const client of clients) {
-    const cp = await getClientPerformance(db, client.id, periodDays);
-    const shiftsLow = (cp.shiftCount || 0) < 3;
-    const highValue = Number(client.valueScore || 0) >= 8 || safeArray(client.tags).includes('VIP');
-    if (highValue && shiftsLow) {
-      const ranks = [];
-      for (const venue of venues) {
-        const comp = await compatibilityScore(db, client, venue, aggregates, periodDays);
-        ranks.push({ venue, comp });
-      }
-      const best = ranks.sort((a, b) => (b.comp.score || 0) - (a.comp.score || 0))[0];
-      const label = toDowLabel(best?.comp?.clientBestDay ?? best?.comp?.venueBestDay ?? 5);
-      items.push({ priority: 'high', title: `Book ${client.name} on ${label} at ${best?.venue?.name || 'top venue'}`, description: 'High-value client with low recent shifts. Boost retention and revenue.' });
-    }
-  }
-  for (const venue of venues) {
-    const vAgg = aggregates.byVenue.get(venue.id) || { total: 0, count: 0 };
-    const avg = vAgg.count ? vAgg.total / vAgg.count : 0;
-    if (avg > (aggregates.venueMaxAvg * 0.75) && vAgg.count < 3) {
-      items.push({ priority: 'medium', title: `Underutilized high-earning venue: ${venue.name}`, description: 'Increase scheduling at this venue to capitalize on strong averages.' });
-    }
-  }
-  return items;
+  return actionsFrom(await getPipeline(periodDays));
 }
 
 export async function buildAiInsights(periodDays = 120, weightsOverride = null) {
   if (weightsOverride) setScoringWeights(weightsOverride);
-  const assignments = await generateClientAssignments(periodDays, 3);
-  const schedule = await generateScheduleSuggestions(periodDays, 4);
-  const actions = await generateActionItems(periodDays);
-  const pairs = [];
-  assignments.forEach(row => { row.recommendations.forEach(r => { pairs.push({ client: row.client, venue: r.venue, score: r.score, rationale: r.rationale }); }); });
-  const compatibilityTop = pairs.sort((a, b) => (b.score || 0) - (a.score || 0)).slice(0, 10);
-  return { assignments, schedule, actions, compatibilityTop };
+  const pipeline = await getPipeline(periodDays);
+  return insightsFrom(pipeline);
 }
 
-export async function answerQuery(question, opts = {}) {
-  const periodDays = Number(opts.periodDays || 120);
-  const { assignments } = await buildAiInsights(periodDays);
-  const db = openDb();
-  const snapshot = await getMergedSnapshot(db, true);
-  const aggregates = computeAggregates(snapshot);
-  const q = String(question || '').toLowerCase();
-  // Intent: Top 3 venues ranked by criteria
-  if (q.includes('top') && q.includes('venues')) {
-    const critMatch = q.match(/ranked\s+by\s+([a-zA-Z ]+)/);
-    const criteria = String(critMatch?.[1] || '').trim().toLowerCase();
-    let topVenues = [];
-    if (criteria.includes('earning') || criteria.includes('revenue')) {
-      topVenues = Array.from(aggregates.byVenue.entries())
-        .map(([id, v]) => ({ id, avg: v.count ? v.total / v.count : 0 }))
-        .sort((a, b) => b.avg - a.avg)
-        .slice(0, 3)
-        .map(v => snapshot.venues.find(x => x.id === v.id)?.name || v.id);
-    } else {
-      // default to compatibility-based ranking
-      const pairs = [];
-      assignments.forEach(row => row.recommendations.forEach(r => pairs.push({ venue: r.venue.name, score: r.score })));
-      const grouped = pairs.reduce((acc, p) => { acc[p.venue] = Math.max(acc[p.venue] || 0, p.score); return acc; }, {});
-      topVenues = Object.entries(grouped).sort((a, b) => b[1] - a[1]).slice(0, 3).map(([name]) => name);
-    }
-    return `Top 3 venues: ${topVenues.join(', ')}`;
-  }
-
-  // Intent: Weekly plan for <time_period>
-  if (q.includes('weekly plan')) {
-    const tpMatch = q.match(/for\s+(this week|next week|\d+\s*days)/);
-    const tpStr = tpMatch?.[1] || 'this week';
-    const days = tpStr.includes('days') ? Number(tpStr.replace(/[^0-9]/g, '')) : 7;
-    const plan = await generateScheduleSuggestions(days, 1);
-    const summary = plan.slice(0, 5).map(p => `${p.client.name}: ${p.venue.name} on ${toDowLabel(p.bestDay)}`).join(' | ');
-    return `Weekly plan (${tpStr}): ${summary}`;
-  }
+function insightsFrom(pipeline) {
+  return pipeline.memo('insights', () => ({
+    assignments: assignmentsFrom(pipeline, TOP_N),
+    schedule: scheduleFrom(pipeline, SCHEDULE_WEEKS),
+    actions: actionsFrom(pipeline),
+    compatibilityTop: compatibilityFrom(pipeline),
+  }));
+}
 
-  // Intent: Clients to focus based on metrics
-  if (q.includes('clients to focus') || q.includes('focus clients')) {
-    const focus = [];
-    for (const a of assignments) {
-      const valueScore = Number(a.client.valueScore || 0);
-      const top = a.recommendations[0];
-      if (valueScore >= 8 && (top?.score || 0) >= 0.5) {
-        focus.push(`${a.client.name} → ${top?.venue?.name || '—'}`);
+/**
+ * buildAiInsights() for screens: `onProgress` gets the insights available so far (compatibility
+ * pairs and assignments first, then schedule, then actions) while the run is in progress, at once
+ * when it is already memoized. `cancel()` stops the callbacks and, when nothing else waits on the
+ * run, the computation itself - call it when the period changes or the screen unmounts.
+ * @returns {{ promise: Promise<object>, cancel: () => void }} promise resolves to the full insights,
+ *   or rejects with an AbortError after cancel()
+ */
+export function streamAiInsights(periodDays = 120, onProgress = () => {}) {
+  const run = getRun(periodDays);
+  let active = true;
+  const listener = insights => { if (active) onProgress(insights); };
+  if (Object.keys(run.insights).length) listener(run.insights);
+  run.listeners.add(listener);
+  let rejectCancelled;
+  const cancelled = new Promise((_, reject) => { rejectCancelled = reject; });
+  const promise = Promise.race([run.promise.then(insightsFrom), cancelled])
+    .finally(() => run.listeners.delete(listener));
+  return {
+    promise,
+    cancel() {
+      if (!active) return;
+      active = false;
+      run.listeners.delete(listener);
+      rejectCancelled(cancelledError());
+      if (!run.settled && !run.pinned && !run.listeners.size) {
+        run.evict();
+        run.controller.abort();
       }
-    }
-    return focus.length ? `Focus clients: ${focus.join(', ')}` : 'No high-priority clients identified.';
-  }
+    },
+  };
+}
 
-  // Intent: Underperforming venues below threshold
-  if (q.includes('underperforming venues')) {
-    const m = q.match(/(below|under)\s*\$?(\d+)/);
-    const thr = m ? Number(m[2]) : Math.round((aggregates.venueMaxAvg || 0) * 0.4);
-    const list = Array.from(aggregates.byVenue.entries())
-      .map(([id, v]) => ({ id, avg: v.count ? v.total / v.count : 0 }))
-      .filter(v => v.avg < thr)
-      .sort((a, b) => a.avg - b.avg)
-      .slice(0, 5)
-      .map(v => `${snapshot.venues.find(x => x.id === v.id)?.name || v.id} ($${Math.round(v.avg)})`);
-    return list.length ? `Underperforming venues (avg < $${thr}): ${list.join(', ')}` : 'No venues under the performance threshold.';
+// Answers come from a query index built once per run (lib/aiQuery.js); parsed intents are cached
+// by question text, so a repeated or follow-up question costs a few lookups
+export async function answerQuery(question, opts = {}) {
+  const intent = parseIntent(question);
+  if (intent.type === 'weeklyPlan') {
+    const plan = await generateScheduleSuggestions(intent.days, 1);
+    const summary = plan.slice(0, 5).map(p => `${p.client.name}: ${p.venue.name} on ${toDowLabel(p.bestDay)}`).join(' | ');
+    return `Weekly plan (${intent.label}): ${summary}`;
   }
-
-  // Fallback quick plan
-  const summary = assignments.slice(0, 3).map(a => {
-    const best = a.recommendations[0];
-    const day = toDowLabel(best?.clientBestDay ?? best?.venueBestDay ?? 5);
-    return `${a.client.name}: ${best?.venue?.name || '—'} on ${day}`;
-  }).join(' | ');
-  return `Here’s the quick plan: ${summary}. Ask “top 3 venues ranked by <compatibility|earnings>”, “weekly plan for <this week|next week|7 days>”, “clients to focus”, or “underperforming venues under <amount>”.`;
+  const pipeline = await getPipeline(Number(opts.periodDays || 120));
+  const index = pipeline.memo('queryIndex', () => createQueryIndex({ ...pipeline, assignments: assignmentsFrom(pipeline, TOP_N) }));
+  return answerIntent(index, intent);
 }
 
-export default { buildAiInsights, generateClientAssignments, generateScheduleSuggestions, generateActionItems, answerQuery, setScoringWeights, getScoringWeights };
\ No newline at end of file
+export default { buildAiInsights, streamAiInsights, generateClientAssignments, generateScheduleSuggestions, generateActionItems, answerQuery, setScoringWeights, getScoringWeights, invalidateAiInsights };
\ No newline at end of file
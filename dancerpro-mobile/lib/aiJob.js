@@ -0,0 +1,125 @@
+// AI insights as a resumable job (a generator), so a run never holds the JS thread for long.
+//
+// insightsJob() does the work of lib/aiEngine.js's pipeline in small steps: aggregate the shift
+// table a chunk of rows at a time, score a block of client rows per step, rank, then build the
+// schedule and action items. It yields `undefined` between steps and a partial result when a stage
+// is ready ({ stage: 'pairs' | 'schedule' | 'actions', ... }), and returns the aggregates and the
+// score matrix. Partials and the result refer to clients and venues by index and hold only plain
+// data and typed arrays, so they can be posted from public/ai-worker.js as they are.
+//
+// runJob() drives a job: on the UI thread in slices of a few ms, yielding to the event loop in
+// between so scrolling and typing keep up; in the worker with longer slices, only so that cancel
+// messages get through.
+import { createShiftEncoder, createAggregator, createScoreMatrix, rankedRows, scheduleEntries, actionItems } from './aiScoring.js';
+
+const SHIFT_ROWS_PER_STEP = 1024;
+const PAIRS_PER_STEP = 2048;
+const RANKED_CLIENTS_PER_STEP = 16;
+export const TOP_N = 3;
+export const SCHEDULE_WEEKS = 4;
+
+export function cancelledError() {
+  const error = new Error('AI insights run cancelled');
+  error.name = 'AbortError';
+  return error;
+}
+
+export function isCancelled(error) {
+  return error?.name === 'AbortError';
+}
+
+/**
+ * Encode shifts into a shift table (see createShiftEncoder) a chunk at a time.
+ */
+export function* encodeShiftsJob(shifts) {
+  const encoder = createShiftEncoder(shifts.length);
+  for (let i = 0; i < shifts.length; i++) {
+    encoder.push(shifts[i]);
+    if (i % SHIFT_ROWS_PER_STEP === SHIFT_ROWS_PER_STEP - 1) yield;
+  }
+  return encoder.finish();
+}
+
+/**
+ * @param {{ clients: object[], venues: object[], events?: object[], shiftTable: object, periodDays: number, weights: object, now?: number }} input
+ * @returns {Generator<undefined | object, { aggregates: object, scores: Float64Array }>}
+ */
+export function* insightsJob({ clients, venues, events, shiftTable, periodDays, weights, now = Date.now() }) {
+  const aggregator = createAggregator(shiftTable, { venues, events }, { periodDays, now });
+  for (let from = 0; from < shiftTable.length; from += SHIFT_ROWS_PER_STEP) {
+    aggregator.add(from, Math.min(shiftTable.length, from + SHIFT_ROWS_PER_STEP));
+    yield;
+  }
+  const aggregates = aggregator.finish();
+  yield;
+
+  const { matrix, scoreRows } = createScoreMatrix(clients, venues, aggregates, weights);
+  const rowsPerStep = Math.max(1, Math.floor(PAIRS_PER_STEP / Math.max(1, venues.length)));
+  for (let from = 0; from < clients.length; from += rowsPerStep) {
+    scoreRows(from, Math.min(clients.length, from + rowsPerStep));
+    yield;
+  }
+
+  const ranked = [];
+  for (let from = 0; from < clients.length; from += RANKED_CLIENTS_PER_STEP) {
+    ranked.push(...rankedRows(matrix, aggregates, weights, TOP_N, from, Math.min(clients.length, from + RANKED_CLIENTS_PER_STEP)));
+    yield;
+  }
+  yield { stage: 'pairs', ranked };
+
+  const best = ranked.map(row => row[0]);
+  yield { stage: 'schedule', schedule: scheduleEntries(clients, venues, best, SCHEDULE_WEEKS) };
+  yield { stage: 'actions', actions: actionItems(clients, venues, aggregates, best) };
+  return { aggregates, scores: matrix.scores };
+}
+
+const clock = typeof performance !== 'undefined' && performance.now ? () => performance.now() : () => Date.now();
+
+// Next macrotask without the 4ms clamp nested setTimeouts get in browsers
+function makeScheduler() {
+  if (typeof setImmediate === 'function') return fn => setImmediate(fn);
+  if (typeof MessageChannel === 'function') {
+    const channel = new MessageChannel();
+    const queue = [];
+    channel.port1.onmessage = () => queue.shift()?.();
+    return fn => { queue.push(fn); channel.port2.postMessage(null); };
+  }
+  return fn => setTimeout(fn, 0);
+}
+
+let schedule = null;
+
+/**
+ * Run `job` to completion in slices of about `budgetMs`.
+ * @param {{ onPartial?: (partial: object) => void, signal?: AbortSignal, budgetMs?: number }} options
+ * @returns {Promise<any>} the job's return value; rejects with cancelledError() once `signal` aborts
+ */
+export function runJob(job, { onPartial, signal, budgetMs = 8 } = {}) {
+  if (!schedule) schedule = makeScheduler();
+  return new Promise((resolve, reject) => {
+    const slice = () => {
+      const start = clock();
+      try {
+        for (;;) {
+          if (signal?.aborted) {
+            job.return();
+            reject(cancelledError());
+            return;
+          }
+          const { value, done } = job.next();
+          if (done) {
+            resolve(value);
+            return;
+          }
+          if (value) onPartial?.(value);
+          if (clock() - start >= budgetMs) break;
+        }
+      } catch (e) {
+        reject(e);
+        return;
+      }
+      schedule(slice);
+    };
+    schedule(slice);
+  });
+}
@@ -0,0 +1,287 @@
+// Question answering for lib/aiEngine.js's answerQuery.
+//
+// parseIntent() turns a question into { type, ...params } once per normalized text (lowercased,
+// whitespace collapsed) and keeps the last PARSED_INTENTS_MAX parses. createQueryIndex() is built
+// once per pipeline run (aiEngine memoizes it with the run) and holds everything an answer reads:
+// client/venue/outfit maps by id and by name, venues ranked by average earnings and by
+// compatibility, and the focus list. Per-client trends and outfit ROI need one pass over shifts or
+// transactions and are built the first time they are asked for. An answer is then a few map
+// lookups and a slice, not a recompute of the insights.
+import { safeArray, toDowLabel, venuePerformance } from './aiScoring.js';
+import { parseTime } from './recordIndex.js';
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const PARSED_INTENTS_MAX = 200;
+
+export const normalizeQuestion = question => String(question || '').toLowerCase().trim().replace(/\s+/g, ' ');
+
+// Words with surrounding punctuation dropped ("ana's?" -> "ana's"); names are split the same way
+const wordsOf = text => normalizeQuestion(text).split(' ')
+  .map(w => w.replace(/^[^\p{L}\p{N}$]+|[^\p{L}\p{N}]+$/gu, ''))
+  .filter(Boolean);
+
+function classify(q) {
+  // Intent: Top 3 venues ranked by criteria
+  if (q.includes('top') && q.includes('venues')) {
+    const critMatch = q.match(/ranked\s+by\s+([a-zA-Z ]+)/);
+    const criteria = String(critMatch?.[1] || '').trim().toLowerCase();
+    return { type: 'topVenues', by: criteria.includes('earning') || criteria.includes('revenue') ? 'earnings' : 'compatibility' };
+  }
+  // Intent: Weekly plan for <time_period>
+  if (q.includes('weekly plan')) {
+    const tpMatch = q.match(/for\s+(this week|next week|\d+\s*days)/);
+    const label = tpMatch?.[1] || 'this week';
+    return { type: 'weeklyPlan', label, days: label.includes('days') ? Number(label.replace(/[^0-9]/g, '')) : 7 };
+  }
+  // Intent: Clients to focus based on metrics
+  if (q.includes('clients to focus') || q.includes('focus clients')) return { type: 'focusClients' };
+  // Intent: Underperforming venues below threshold
+  if (q.includes('underperforming venues')) {
+    const m = q.match(/(below|under)\s*\$?(\d+)/);
+    return { type: 'underperforming', threshold: m ? Number(m[2]) : null };
+  }
+  // Intent: ROI of outfits (or of the outfit named in the question)
+  if (/\broi\b|return on investment/.test(q)) return { type: 'outfitRoi' };
+  // Intent: Best day of the week per venue (or at the venue named)
+  if (/\bbest days? (for|at|per|by)\b|\bvenue best days?\b/.test(q)) return { type: 'venueBestDay' };
+  // Intent: Earnings trend of a client (or the clients moving most)
+  if (/\btrending\b|\btrends? (for|of)\b|\bclient trends?\b/.test(q)) return { type: 'clientTrend' };
+  return { type: 'fallback' };
+}
+
+const parsedIntents = new Map();
+
+/**
+ * @returns {{ type: string, words: string[] }} plus the intent's parameters (`by`, `days`,
+ *   `label`, `threshold`); frozen and shared between equal questions
+ */
+export function parseIntent(question) {
+  const q = normalizeQuestion(question);
+  let intent = parsedIntents.get(q);
+  if (intent) {
+    // Refresh its place so frequent questions stay cached
+    parsedIntents.delete(q);
+  } else {
+    intent = Object.freeze({ ...classify(q), words: Object.freeze(wordsOf(q)) });
+    if (parsedIntents.size >= PARSED_INTENTS_MAX) parsedIntents.delete(parsedIntents.keys().next().value);
+  }
+  parsedIntents.set(q, intent);
+  return intent;
+}
+
+// id -> entity (first one wins, like Array.prototype.find) and name -> entity
+function entityMaps(list) {
+  const byId = new Map();
+  const byName = new Map();
+  let maxWords = 0;
+  list.forEach(entity => {
+    if (entity?.id != null && !byId.has(entity.id)) byId.set(entity.id, entity);
+    const words = wordsOf(entity?.name);
+    if (!words.length) return;
+    const key = words.join(' ');
+    if (!byName.has(key)) byName.set(key, entity);
+    maxWords = Math.max(maxWords, words.length);
+  });
+  return { byId, byName, maxWords };
+}
+
+// Longest run of question words that is an entity name
+function findNamed(maps, words) {
+  for (let size = Math.min(maps.maxWords, words.length); size > 0; size--) {
+    for (let i = 0; i + size <= words.length; i++) {
+      const hit = maps.byName.get(words.slice(i, i + size).join(' '));
+      if (hit) return hit;
+    }
+  }
+  return null;
+}
+
+const money = value => `$${Math.round(value)}`;
+const percent = value => `${value >= 0 ? '+' : ''}${Math.round(value)}%`;
+
+/**
+ * Lookup structures for one pipeline run.
+ * @param {{ snapshot: object, clients: object[], venues: object[], aggregates: object,
+ *   assignments: object[], now: number }} run `assignments` as generateClientAssignments(_, 3)
+ */
+export function createQueryIndex({ snapshot, clients, venues, aggregates, assignments, now = Date.now() }) {
+  const clientMaps = entityMaps(clients);
+  const venueMaps = entityMaps(venues);
+  const venueLabel = id => venueMaps.byId.get(id)?.name || id;
+
+  // Average earnings per venue, in aggregates order; the sorts below are stable on it
+  const venueAverages = Array.from(aggregates.byVenue.entries())
+    .map(([id, v]) => ({ id, avg: v.count ? v.total / v.count : 0 }));
+  const venuesByEarnings = [...venueAverages].sort((a, b) => b.avg - a.avg);
+  const venuesByAverageAscending = [...venueAverages].sort((a, b) => a.avg - b.avg);
+
+  // Best compatibility score per venue name over each client's top recommendations
+  const grouped = {};
+  assignments.forEach(row => row.recommendations.forEach(r => { grouped[r.venue.name] = Math.max(grouped[r.venue.name] || 0, r.score); }));
+  const venuesByCompatibility = Object.entries(grouped).sort((a, b) => b[1] - a[1]).map(([name]) => name);
+
+  const focus = [];
+  assignments.forEach(a => {
+    const top = a.recommendations[0];
+    if (Number(a.client.valueScore || 0) >= 8 && (top?.score || 0) >= 0.5) focus.push(`${a.client.name} → ${top?.venue?.name || '—'}`);
+  });
+
+  const quickPlan = assignments.slice(0, 3).map(a => {
+    const best = a.recommendations[0];
+    const day = toDowLabel(best?.clientBestDay ?? best?.venueBestDay ?? 5);
+    return `${a.client.name}: ${best?.venue?.name || '—'} on ${day}`;
+  }).join(' | ');
+
+  // Earnings per client in the recent and the previous half of the performance window
+  let trends = null;
+  function clientTrends() {
+    if (trends) return trends;
+    trends = new Map();
+    const half = (Number(aggregates.performance?.periodDays || 0) * DAY_MS) / 2;
+    const middle = now - half;
+    const start = middle - half;
+    safeArray(snapshot.shifts).forEach(s => {
+      if (!s?.clientId) return;
+      const t = parseTime(s.start || s.end || s.date);
+      if (!(t >= start && t <= now)) return;
+      let trend = trends.get(s.clientId);
+      if (!trend) { trend = { recent: 0, previous: 0, shifts: 0 }; trends.set(s.clientId, trend); }
+      trend[t >= middle ? 'recent' : 'previous'] += Number(s.earnings || 0);
+      trend.shifts += 1;
+    });
+    return trends;
+  }
+
+  // `change` in percent, null when nothing was earned in the previous half
+  function clientTrend(clientId) {
+    const trend = clientTrends().get(clientId) || { recent: 0, previous: 0, shifts: 0 };
+    return { ...trend, change: trend.previous ? ((trend.recent - trend.previous) / trend.previous) * 100 : null };
+  }
+
+  // Net per outfit from its transactions, and ROI against its cost (as on the Outfits screen)
+  let outfitRows = null;
+  function outfitRoi() {
+    if (outfitRows) return outfitRows;
+    const net = new Map();
+    safeArray(snapshot.transactions).forEach(t => {
+      if (!t?.outfitId) return;
+      const amt = Number(t.amount || 0);
+      const sign = t.type === 'income' ? 1 : t.type === 'expense' ? -1 : 0;
+      net.set(t.outfitId, (net.get(t.outfitId) || 0) + sign * amt);
+    });
+    outfitRows = safeArray(snapshot.outfits)
+      .map(outfit => ({ outfit, net: net.get(outfit?.id) || 0, cost: Number(outfit?.cost || 0) }))
+      .filter(row => row.net && row.cost > 0)
+      .map(row => ({ ...row, roi: ((row.net - row.cost) / row.cost) * 100 }))
+      .sort((a, b) => b.roi - a.roi);
+    return outfitRows;
+  }
+  let outfitMaps = null;
+
+  return {
+    clientById: clientMaps.byId,
+    venueById: venueMaps.byId,
+    venuesByEarnings,
+    venuesByCompatibility,
+
+    topVenues(by, n = 3) {
+      return by === 'earnings' ? venuesByEarnings.slice(0, n).map(v => venueLabel(v.id)) : venuesByCompatibility.slice(0, n);
+    },
+
+    // Below `threshold` (default: 40% of the best venue average), lowest first
+    underperforming(threshold, n = 5) {
+      const thr = threshold ?? Math.round((aggregates.venueMaxAvg || 0) * 0.4);
+      const list = [];
+      for (const v of venuesByAverageAscending) {
+        if (!(v.avg < thr) || list.length >= n) break;
+        list.push({ venue: venueLabel(v.id), avg: v.avg });
+      }
+      return { threshold: thr, list };
+    },
+
+    focusClients: () => focus,
+    quickPlan: () => quickPlan,
+
+    clientTrend,
+
+    // Clients whose earnings moved most between the two halves of the window
+    movers(n = 3) {
+      return Array.from(clientTrends().keys())
+        .map(id => ({ client: clientMaps.byId.get(id), ...clientTrend(id) }))
+        .filter(row => row.client && row.change != null)
+        .sort((a, b) => Math.abs(b.change) - Math.abs(a.change))
+        .slice(0, n);
+    },
+
+    venueBestDay: venueId => venuePerformance(aggregates, venueId),
+
+    outfitRoi,
+    findClient: words => findNamed(clientMaps, words),
+    findVenue: words => findNamed(venueMaps, words),
+    findOutfit(words) {
+      if (!outfitMaps) outfitMaps = entityMaps(safeArray(snapshot.outfits));
+      return findNamed(outfitMaps, words);
+    },
+  };
+}
+
+function describeTrend(index, client) {
+  const trend = index.clientTrend(client.id);
+  if (!trend.shifts) return `${client.name}: no shifts in the period`;
+  if (trend.change == null) return `${client.name}: ${money(trend.recent)} recently, nothing before`;
+  return `${client.name}: ${percent(trend.change)} (${money(trend.recent)} recently vs ${money(trend.previous)} before)`;
+}
+
+function describeBestDay(venue, perf) {
+  return perf.bestDay == null
+    ? `${venue.name}: no shifts in the period`
+    : `${venue.name}: ${toDowLabel(perf.bestDay)} (avg ${money(perf.bestDayAvg)})`;
+}
+
+/**
+ * Answer text for a parsed intent read off a query index. `weeklyPlan` is answered by the caller,
+ * which needs a schedule for the plan's own period.
+ */
+export function answerIntent(index, intent) {
+  switch (intent.type) {
+    case 'topVenues':
+      return `Top 3 venues: ${index.topVenues(intent.by, 3).join(', ')}`;
+    case 'focusClients': {
+      const focus = index.focusClients();
+      return focus.length ? `Focus clients: ${focus.join(', ')}` : 'No high-priority clients identified.';
+    }
+    case 'underperforming': {
+      const { threshold, list } = index.underperforming(intent.threshold, 5);
+      return list.length
+        ? `Underperforming venues (avg < $${threshold}): ${list.map(v => `${v.venue} (${money(v.avg)})`).join(', ')}`
+        : 'No venues under the performance threshold.';
+    }
+    case 'outfitRoi': {
+      const named = index.findOutfit(intent.words);
+      const rows = index.outfitRoi();
+      if (named) {
+        const row = rows.find(r => r.outfit === named);
+        return row ? `${named.name}: ROI ${percent(row.roi)} (${money(row.net)} net on ${money(row.cost)} cost)` : `${named.name}: no cost or earnings recorded yet.`;
+      }
+      return rows.length
+        ? `Outfit ROI: ${rows.slice(0, 3).map(r => `${r.outfit.name} (${percent(r.roi)})`).join(', ')}`
+        : 'No outfits with both a cost and earnings yet.';
+    }
+    case 'venueBestDay': {
+      const named = index.findVenue(intent.words);
+      if (named) return `Best day at ${describeBestDay(named, index.venueBestDay(named.id))}`;
+      const list = index.venuesByEarnings.slice(0, 3).map(v => index.venueById.get(v.id)).filter(Boolean);
+      return list.length ? `Best days: ${list.map(v => describeBestDay(v, index.venueBestDay(v.id))).join(' | ')}` : 'No venue shifts in the period.';
+    }
+    case 'clientTrend': {
+      const named = index.findClient(intent.words);
+      if (named) return `Trend for ${describeTrend(index, named)}`;
+      const movers = index.movers(3);
+      return movers.length
+        ? `Client trends: ${movers.map(m => `${m.client.name} ${percent(m.change)}`).join(', ')}`
+        : 'Not enough shifts to compare client earnings yet.';
+    }
+    default:
+      return `Here’s the quick plan: ${index.quickPlan()}. Ask “top 3 venues ranked by <compatibility|earnings>”, “weekly plan for <this week|next week|7 days>”, “clients to focus”, “underperforming venues under <amount>”, “best day at <venue>”, “trend for <client>”, or “outfit ROI”.`;
+  }
+}
@@ -0,0 +1,462 @@
+// Client x venue compatibility scoring for lib/aiEngine.js.
+//
+// computeAggregates() makes one pass over the shifts and precomputes everything a score needs:
+// all-time earnings per client, venue and client+venue, and per-client/per-venue performance
+// inside the trailing `periodDays` window (shift count, earnings, average, best day of week).
+// scoreMatrix() then scores every pair into one Float64Array from per-client and per-venue
+// features prepared once (lowercased strings, tag sets, normalized averages), and topVenues()
+// keeps the best N per client with a bounded heap instead of sorting every row. Rationale text
+// is built only for the pairs that are returned (explainPair).
+//
+// Shifts are aggregated from a columnar table (createShiftEncoder) and the matrix can be filled a
+// block of rows at a time (createScoreMatrix), so lib/aiJob.js can spread a run over short slices
+// or hand it to a Web Worker.
+import { parseTime } from './recordIndex.js';
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+export function safeArray(arr) { return Array.isArray(arr) ? arr : []; }
+export function normalize(value, max) { const m = Number(max || 0); const v = Math.max(0, Number(value || 0)); return m > 0 ? Math.min(1, v / m) : 0; }
+export function toDowLabel(dow) { const labels = ['Sun','Mon','Tue','Wed','Thu','Fri','Sat']; return labels[(Number(dow) || 0) % 7]; }
+export function adjacentDowScore(a, b) { if (a == null || b == null) return 0; const diff = Math.abs(Number(a) - Number(b)); if (diff === 0) return 1; if (diff === 1 || diff === 6) return 0.6; return 0.25; }
+export function stringIncludes(haystack, needle) { if (!haystack || !needle) return false; return String(haystack).toLowerCase().includes(String(needle).toLowerCase()); }
+
+function createPerformance() {
+  return { shiftCount: 0, totalEarnings: 0, dowTotal: new Float64Array(7), dowCount: new Int32Array(7) };
+}
+
+// Same shape and best-day rule as getClientPerformance/getVenuePerformance in lib/db.js
+function finishPerformance(p) {
+  let bestDay = null; let bestDayAvg = 0;
+  for (let dow = 0; dow < 7; dow++) {
+    const avg = p.dowCount[dow] ? p.dowTotal[dow] / p.dowCount[dow] : 0;
+    if (avg > bestDayAvg) { bestDayAvg = avg; bestDay = dow; }
+  }
+  return {
+    shiftCount: p.shiftCount,
+    totalEarnings: p.totalEarnings,
+    avgEarnings: p.shiftCount ? p.totalEarnings / p.shiftCount : 0,
+    bestDay,
+    bestDayAvg,
+  };
+}
+
+const EMPTY_PERFORMANCE = Object.freeze(finishPerformance(createPerformance()));
+
+/**
+ * Columnar copy of the shift fields scoring reads: start time, earnings, client/venue codes and
+ * the "event" note flag. Encoding can be spread over several slices (push a chunk at a time), and
+ * the typed columns are cheap to aggregate and to hand to a Web Worker (see shiftTableBuffers).
+ * @param {number} capacity upper bound on the number of shifts pushed
+ */
+export function createShiftEncoder(capacity) {
+  const time = new Float64Array(capacity);
+  const earnings = new Float64Array(capacity);
+  const client = new Int32Array(capacity);
+  const venue = new Int32Array(capacity);
+  const event = new Uint8Array(capacity);
+  const clientIds = [];
+  const venueIds = [];
+  const clientCodes = new Map();
+  const venueCodes = new Map();
+  let length = 0;
+  const codeOf = (codes, ids, id) => {
+    if (!id) return -1;
+    let code = codes.get(id);
+    if (code === undefined) {
+      code = ids.length;
+      codes.set(id, code);
+      ids.push(id);
+    }
+    return code;
+  };
+  return {
+    push(s) {
+      if (!s) return;
+      const i = length++;
+      time[i] = parseTime(s.start || s.end || s.date);
+      earnings[i] = Number(s.earnings || 0);
+      client[i] = codeOf(clientCodes, clientIds, s.clientId);
+      venue[i] = codeOf(venueCodes, venueIds, s.venueId);
+      event[i] = stringIncludes(s.notes, 'event') ? 1 : 0;
+    },
+    finish: () => ({ length, time, earnings, client, venue, event, clientIds, venueIds }),
+  };
+}
+
+export function encodeShifts(shifts) {
+  const list = safeArray(shifts);
+  const encoder = createShiftEncoder(list.length);
+  list.forEach(encoder.push);
+  return encoder.finish();
+}
+
+// Transfer list for postMessage: the columns move to the worker instead of being copied
+export function shiftTableBuffers(table) {
+  return [table.time.buffer, table.earnings.buffer, table.client.buffer, table.venue.buffer, table.event.buffer];
+}
+
+/**
+ * Aggregation over a shift table, fed in row ranges so a caller can yield between them.
+ * @param {object} table from createShiftEncoder().finish()
+ * @param {{ venues?: object[], events?: object[] }} snapshot capacities and event flags
+ * @param {{ periodDays?: number, now?: number }} options window of the `performance` tables
+ */
+export function createAggregator(table, snapshot, { periodDays = 120, now = Date.now() } = {}) {
+  const clientCount = table.clientIds.length;
+  const venueCount = table.venueIds.length;
+  const windowStart = now - Number(periodDays || 0) * DAY_MS;
+  // Running totals per code: no per-shift allocations
+  const venueTotal = new Float64Array(venueCount);
+  const venueShifts = new Int32Array(venueCount);
+  const venueEvent = new Uint8Array(venueCount);
+  const clientTotal = new Float64Array(clientCount);
+  const clientShifts = new Int32Array(clientCount);
+  const cells = [];                 // client code -> Map<venue code, { total, count }>
+  const cellOrder = [];             // [client code, venue code, cell] in first-seen order
+  const clientPerf = Array.from({ length: clientCount }, () => null);
+  const venuePerf = Array.from({ length: venueCount }, () => null);
+  const addPerformance = (list, code, earnings, dow) => {
+    let p = list[code];
+    if (!p) { p = createPerformance(); list[code] = p; }
+    p.shiftCount += 1;
+    p.totalEarnings += earnings;
+    p.dowTotal[dow] += earnings;
+    p.dowCount[dow] += 1;
+  };
+
+  function add(from, to) {
+    const { time, earnings: earningsColumn, client, venue, event } = table;
+    for (let i = from; i < to; i++) {
+      const earnings = earningsColumn[i];
+      const v = venue[i];
+      const c = client[i];
+      const t = time[i];
+      if (t >= windowStart && t <= now) {
+        const perfEarnings = Number.isFinite(earnings) ? earnings : 0;
+        const dow = new Date(t).getDay();
+        if (c >= 0) addPerformance(clientPerf, c, perfEarnings, dow);
+        if (v >= 0) addPerformance(venuePerf, v, perfEarnings, dow);
+      }
+      if (v < 0) continue;
+      venueTotal[v] += earnings;
+      venueShifts[v] += 1;
+      if (event[i]) venueEvent[v] = 1;
+      if (c < 0) continue;
+      clientTotal[c] += earnings;
+      clientShifts[c] += 1;
+      let venuesOfClient = cells[c];
+      if (!venuesOfClient) { venuesOfClient = new Map(); cells[c] = venuesOfClient; }
+      const cell = venuesOfClient.get(v);
+      if (cell) { cell.total += earnings; cell.count += 1; } else {
+        const fresh = { total: earnings, count: 1 };
+        venuesOfClient.set(v, fresh);
+        cellOrder.push([c, v, fresh]);
+      }
+    }
+  }
+
+  function finish() {
+    const { clientIds, venueIds } = table;
+    const byVenue = new Map();
+    const byClient = new Map();
+    const byClientVenue = new Map();
+    const clientVenues = new Map(); // clientId -> Map<venueId, { total, count }>
+    const eventFlagByVenue = new Map();
+    const avgOf = (total, count) => (count ? total / count : 0);
+    let venueMaxAvg = 0; let clientMaxAvg = 0; let clientVenueMaxAvg = 0;
+    for (let v = 0; v < venueCount; v++) {
+      if (!venueShifts[v]) continue;
+      byVenue.set(venueIds[v], { total: venueTotal[v], count: venueShifts[v] });
+      venueMaxAvg = Math.max(venueMaxAvg, avgOf(venueTotal[v], venueShifts[v]));
+      if (venueEvent[v]) eventFlagByVenue.set(venueIds[v], true);
+    }
+    for (let c = 0; c < clientCount; c++) {
+      if (!clientShifts[c]) continue;
+      byClient.set(clientIds[c], { total: clientTotal[c], count: clientShifts[c] });
+      clientMaxAvg = Math.max(clientMaxAvg, avgOf(clientTotal[c], clientShifts[c]));
+    }
+    cellOrder.forEach(([c, v, cell]) => {
+      byClientVenue.set(`${clientIds[c]}|${venueIds[v]}`, cell);
+      let venuesOfClient = clientVenues.get(clientIds[c]);
+      if (!venuesOfClient) { venuesOfClient = new Map(); clientVenues.set(clientIds[c], venuesOfClient); }
+      venuesOfClient.set(venueIds[v], cell);
+      clientVenueMaxAvg = Math.max(clientVenueMaxAvg, avgOf(cell.total, cell.count));
+    });
+    // Merge any explicit upcoming events if present
+    safeArray(snapshot.events).forEach(e => {
+      const vid = e.venueId || e.venue || null;
+      if (vid) eventFlagByVenue.set(vid, true);
+    });
+    const maxCapacity = safeArray(snapshot.venues).reduce((acc, v) => Math.max(acc, Number(v.capacity || 0)), 0);
+    const performanceOf = (list, ids) => {
+      const out = new Map();
+      list.forEach((p, code) => { if (p) out.set(ids[code], finishPerformance(p)); });
+      return out;
+    };
+    const performance = {
+      periodDays,
+      byClient: performanceOf(clientPerf, clientIds),
+      byVenue: performanceOf(venuePerf, venueIds),
+    };
+    return { byClientVenue, clientVenues, byVenue, byClient, venueMaxAvg, clientMaxAvg, clientVenueMaxAvg, maxCapacity, eventFlagByVenue, performance };
+  }
+
+  return { add, finish };
+}
+
+/**
+ * One pass over `snapshot.shifts` (or an already encoded `snapshot.shiftTable`), plus
+ * `snapshot.events` for event flags.
+ * @param {{ shifts?: object[], shiftTable?: object, venues?: object[], events?: object[] }} snapshot
+ * @param {{ periodDays?: number, now?: number }} options window of the `performance` tables
+ */
+export function computeAggregates(snapshot, options = {}) {
+  const table = snapshot.shiftTable || encodeShifts(snapshot.shifts);
+  const aggregator = createAggregator(table, snapshot, options);
+  aggregator.add(0, table.length);
+  return aggregator.finish();
+}
+
+export function clientPerformance(aggregates, clientId) {
+  return aggregates.performance.byClient.get(clientId) || EMPTY_PERFORMANCE;
+}
+
+export function venuePerformance(aggregates, venueId) {
+  return aggregates.performance.byVenue.get(venueId) || EMPTY_PERFORMANCE;
+}
+
+const lower = value => (value ? String(value).toLowerCase() : '');
+const tagSet = tags => new Set(safeArray(tags).map(t => String(t).toLowerCase()));
+
+function clientFeatures(client, aggregates) {
+  return {
+    bestDay: clientPerformance(aggregates, client.id).bestDay,
+    venues: aggregates.clientVenues.get(client.id) || null,
+    hasTags: safeArray(client.tags).length > 0,
+    tags: tagSet(client.tags),
+    city: lower(client.city || client.location),
+    notes: lower(client.notes),
+  };
+}
+
+function venueFeatures(venue, aggregates) {
+  const v = aggregates.byVenue.get(venue.id) || { total: 0, count: 0 };
+  const avg = v.count ? v.total / v.count : 0;
+  return {
+    avg,
+    avgNorm: normalize(avg, aggregates.venueMaxAvg),
+    bestDay: venuePerformance(aggregates, venue.id).bestDay,
+    hasTags: safeArray(venue.tags).length > 0,
+    tags: tagSet(venue.tags),
+    name: lower(venue.name),
+    loc: lower(venue.location || venue.city),
+    city: lower(venue.city || venue.location),
+    capacityNorm: normalize(Number(venue.capacity || 0), aggregates.maxCapacity || 0),
+    event: aggregates.eventFlagByVenue.get(venue.id) ? 1 : 0,
+  };
+}
+
+function tagScoreOf(c, v) {
+  if (c.hasTags && v.hasTags) {
+    let inter = 0;
+    c.tags.forEach(t => { if (v.tags.has(t)) inter += 1; });
+    return inter / Math.max(1, Math.min(c.tags.size, v.tags.size));
+  }
+  return c.notes && ((v.name && c.notes.includes(v.name)) || (v.loc && c.notes.includes(v.loc))) ? 1 : 0;
+}
+
+function cityScoreOf(c, v) {
+  if (c.city && v.city) return (c.city.includes(v.city) || v.city.includes(c.city)) ? 1 : 0;
+  if (v.city) return c.notes && c.notes.includes(v.city) ? 1 : 0;
+  return 0;
+}
+
+function clientVenueAvgOf(c, venueId) {
+  const cv = c.venues?.get(venueId);
+  return cv && cv.count ? cv.total / cv.count : 0;
+}
+
+// The weighted sum, term by term in a fixed order so every caller gets bit-identical scores
+function pairScore(c, v, venueId, aggregates, w) {
+  return (
+    w.base_client_venue_weight * normalize(clientVenueAvgOf(c, venueId), aggregates.clientVenueMaxAvg) +
+    w.base_venue_avg_weight * v.avgNorm +
+    w.base_dow_weight * adjacentDowScore(c.bestDay, v.bestDay) +
+    w.tag_weight * tagScoreOf(c, v) +
+    w.city_match_weight * cityScoreOf(c, v) +
+    w.capacity_weight * v.capacityNorm +
+    w.event_weight * v.event
+  );
+}
+
+/**
+ * Score matrix to be filled a block of client rows at a time: `scores[i * venues.length + j]`.
+ * @returns {{ matrix: { clients: object[], venues: object[], scores: Float64Array }, scoreRows: (from: number, to: number) => void }}
+ */
+export function createScoreMatrix(clients, venues, aggregates, weights) {
+  const cf = clients.map(c => clientFeatures(c, aggregates));
+  const vf = venues.map(v => venueFeatures(v, aggregates));
+  const width = venues.length;
+  const scores = new Float64Array(clients.length * width);
+  return {
+    matrix: { clients, venues, scores },
+    scoreRows(from, to) {
+      for (let i = from; i < to; i++) {
+        const c = cf[i];
+        const row = i * width;
+        for (let j = 0; j < width; j++) scores[row + j] = pairScore(c, vf[j], venues[j].id, aggregates, weights);
+      }
+    },
+  };
+}
+
+/**
+ * Scores of every client x venue pair: `scores[i * venues.length + j]`.
+ * @returns {{ clients: object[], venues: object[], scores: Float64Array }}
+ */
+export function scoreMatrix(clients, venues, aggregates, weights) {
+  const { matrix, scoreRows } = createScoreMatrix(clients, venues, aggregates, weights);
+  scoreRows(0, clients.length);
+  return matrix;
+}
+
+// Heap order: lower score first; on equal scores the later venue (it loses the tie-break)
+function worse(scores, row, a, b) {
+  const sa = scores[row + a];
+  const sb = scores[row + b];
+  return sa < sb || (sa === sb && a > b);
+}
+
+/**
+ * Indexes of the `n` best venues for client `i`, best first (equal scores keep venue order).
+ * A min-heap of size n: O(V log n) instead of sorting all V scores.
+ */
+export function topVenues(matrix, i, n) {
+  const width = matrix.venues.length;
+  const { scores } = matrix;
+  const row = i * width;
+  const heap = [];
+  const siftDown = k => {
+    for (;;) {
+      const l = 2 * k + 1;
+      const r = l + 1;
+      let m = k;
+      if (l < heap.length && worse(scores, row, heap[l], heap[m])) m = l;
+      if (r < heap.length && worse(scores, row, heap[r], heap[m])) m = r;
+      if (m === k) return;
+      [heap[k], heap[m]] = [heap[m], heap[k]];
+      k = m;
+    }
+  };
+  for (let j = 0; j < width && n > 0; j++) {
+    if (heap.length < n) {
+      heap.push(j);
+      let k = heap.length - 1;
+      while (k > 0) {
+        const p = (k - 1) >> 1;
+        if (!worse(scores, row, heap[k], heap[p])) break;
+        [heap[k], heap[p]] = [heap[p], heap[k]];
+        k = p;
+      }
+    } else if (worse(scores, row, heap[0], j)) {
+      heap[0] = j;
+      siftDown(0);
+    }
+  }
+  return heap.sort((a, b) => (worse(scores, row, a, b) ? 1 : worse(scores, row, b, a) ? -1 : 0));
+}
+
+/**
+ * Full breakdown of one pair, as the AI screens show it.
+ * @returns {{ score: number, rationale: string[], clientVenueAvg: number, venueAvg: number, clientBestDay: number|null, venueBestDay: number|null }}
+ */
+export function explainPair(client, venue, aggregates, weights) {
+  const c = clientFeatures(client, aggregates);
+  const v = venueFeatures(venue, aggregates);
+  const clientVenueAvg = clientVenueAvgOf(c, venue.id);
+  const tagScore = tagScoreOf(c, v);
+  const cityScore = cityScoreOf(c, v);
+  const rationale = [
+    clientVenueAvg ? `Strong personal earnings at ${venue.name}` : null,
+    v.avg ? `Venue averages ${(v.avg).toFixed(0)} per shift` : null,
+    c.bestDay != null && v.bestDay != null ? `Best day alignment: ${toDowLabel(c.bestDay)} vs ${toDowLabel(v.bestDay)}` : null,
+    tagScore ? 'Tag relevance matched' : null,
+    cityScore ? `City proximity: ${venue.city || venue.location || 'local'}` : null,
+    v.capacityNorm ? `Capacity factor considered` : null,
+    v.event ? 'Special event impact detected' : null,
+  ].filter(Boolean);
+  return {
+    score: pairScore(c, v, venue.id, aggregates, weights),
+    rationale,
+    clientVenueAvg,
+    venueAvg: v.avg,
+    clientBestDay: c.bestDay,
+    venueBestDay: v.bestDay,
+  };
+}
+
+/**
+ * Top `n` venues of clients `from`..`to` as { venueIndex, ...explainPair() }, best first. Plain
+ * data (indexes instead of records), so rows can be posted across threads.
+ */
+export function rankedRows(matrix, aggregates, weights, n, from = 0, to = matrix.clients.length) {
+  const { clients, venues } = matrix;
+  const rows = [];
+  for (let i = from; i < to; i++) {
+    rows.push(topVenues(matrix, i, n).map(j => ({ venueIndex: j, ...explainPair(clients[i], venues[j], aggregates, weights) })));
+  }
+  return rows;
+}
+
+/**
+ * Schedule lines from each client's best pick (`best[i]` from rankedRows, or undefined).
+ * @returns {{ clientIndex: number, venueIndex: number, bestDay: number, text: string }[]}
+ */
+export function scheduleEntries(clients, venues, best, weeks) {
+  const entries = [];
+  best.forEach((pick, i) => {
+    if (!pick) return;
+    const client = clients[i];
+    const dow = pick.clientBestDay ?? pick.venueBestDay ?? 5;
+    entries.push({ clientIndex: i, venueIndex: pick.venueIndex, bestDay: dow, text: `Schedule ${client.name} at ${venues[pick.venueIndex].name} on ${toDowLabel(dow)} for the next ${weeks} weeks` });
+  });
+  return entries;
+}
+
+/**
+ * High-value clients with few recent shifts, and strong venues that are rarely booked.
+ * @returns {{ priority: string, title: string, description: string }[]}
+ */
+export function actionItems(clients, venues, aggregates, best) {
+  const items = [];
+  clients.forEach((client, i) => {
+    const shiftsLow = (clientPerformance(aggregates, client.id).shiftCount || 0) < 3;
+    const highValue = Number(client.valueScore || 0) >= 8 || safeArray(client.tags).includes('VIP');
+    if (!highValue || !shiftsLow) return;
+    const pick = best[i];
+    const label = toDowLabel(pick?.clientBestDay ?? pick?.venueBestDay ?? 5);
+    items.push({ priority: 'high', title: `Book ${client.name} on ${label} at ${(pick && venues[pick.venueIndex].name) || 'top venue'}`, description: 'High-value client with low recent shifts. Boost retention and revenue.' });
+  });
+  for (const venue of venues) {
+    const vAgg = aggregates.byVenue.get(venue.id) || { total: 0, count: 0 };
+    const avg = vAgg.count ? vAgg.total / vAgg.count : 0;
+    if (avg > (aggregates.venueMaxAvg * 0.75) && vAgg.count < 3) {
+      items.push({ priority: 'medium', title: `Underutilized high-earning venue: ${venue.name}`, description: 'Increase scheduling at this venue to capitalize on strong averages.' });
+    }
+  }
+  return items;
+}
+
+/**
+ * Top `topN` venues per client, in client order.
+ * @returns {{ client: object, recommendations: object[] }[]} recommendations are
+ *   { client, venue, ...explainPair() }, best first
+ */
+export function rankAssignments(clients, venues, aggregates, weights, topN = 3) {
+  const matrix = scoreMatrix(clients, venues, aggregates, weights);
+  return rankedRows(matrix, aggregates, weights, topN).map((row, i) => ({
+    client: clients[i],
+    recommendations: row.map(({ venueIndex, ...detail }) => ({ client: clients[i], venue: venues[venueIndex], ...detail })),
+  }));
+}
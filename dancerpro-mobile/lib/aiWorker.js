@@ -0,0 +1,36 @@
+// Message loop of public/ai-worker.js, which scripts/build-ai-worker.js generates from this file
+// and its imports. The page side is lib/aiWorkerClient.js.
+//
+// In:  { type: 'run', runId, input }  input as for insightsJob(), shift table buffers transferred
+//      { type: 'cancel', runId }
+// Out: { type: 'ready' } once, then per run any number of { type: 'partial', runId, partial }
+//      followed by { type: 'done', runId, result } (score buffer transferred) or
+//      { type: 'error', runId, message }. A cancelled run posts nothing more.
+import { insightsJob, runJob, isCancelled } from './aiJob.js';
+
+// Long enough that slicing costs next to nothing, short enough that a cancel is seen promptly
+const WORKER_SLICE_MS = 50;
+
+export function serveInsights(scope) {
+  const runs = new Map(); // runId -> AbortController
+  scope.addEventListener('message', ({ data }) => {
+    if (!data) return;
+    if (data.type === 'cancel') {
+      runs.get(data.runId)?.abort();
+      return;
+    }
+    if (data.type !== 'run') return;
+    const { runId, input } = data;
+    const controller = new AbortController();
+    runs.set(runId, controller);
+    runJob(insightsJob(input), {
+      signal: controller.signal,
+      budgetMs: WORKER_SLICE_MS,
+      onPartial: partial => scope.postMessage({ type: 'partial', runId, partial }),
+    }).then(
+      result => scope.postMessage({ type: 'done', runId, result }, [result.scores.buffer]),
+      error => { if (!isCancelled(error)) scope.postMessage({ type: 'error', runId, message: String(error?.message || error) }); },
+    ).finally(() => runs.delete(runId));
+  });
+  scope.postMessage({ type: 'ready' });
+}
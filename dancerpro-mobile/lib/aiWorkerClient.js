@@ -0,0 +1,102 @@
+// Runs insightsJob (lib/aiJob.js) in public/ai-worker.js where Web Workers exist (web), and in
+// time slices on the JS thread otherwise: React Native has no Worker, and the script may be
+// missing (e.g. a dev server without public/). Both paths deliver the same partials and result.
+import { insightsJob, runJob, cancelledError } from './aiJob';
+import { shiftTableBuffers } from './aiScoring';
+
+const WORKER_URL = '/ai-worker.js';
+
+let workerPromise = null; // resolves to a ready Worker, or null when there is none
+let nextRunId = 1;
+
+function getWorker() {
+  if (!workerPromise) {
+    workerPromise = new Promise(resolve => {
+      if (typeof Worker !== 'function') {
+        resolve(null);
+        return;
+      }
+      let worker;
+      try {
+        worker = new Worker(WORKER_URL);
+      } catch {
+        resolve(null);
+        return;
+      }
+      // The worker announces itself once its script ran; a load or parse error comes as 'error'
+      const onError = () => {
+        worker.terminate();
+        resolve(null);
+      };
+      const onReady = ({ data }) => {
+        if (data?.type !== 'ready') return;
+        worker.removeEventListener('message', onReady);
+        worker.removeEventListener('error', onError);
+        resolve(worker);
+      };
+      worker.addEventListener('message', onReady);
+      worker.addEventListener('error', onError);
+    });
+  }
+  return workerPromise;
+}
+
+function runInWorker(worker, input, { onPartial, signal }) {
+  const runId = nextRunId++;
+  return new Promise((resolve, reject) => {
+    const cleanup = () => {
+      worker.removeEventListener('message', onMessage);
+      worker.removeEventListener('error', onError);
+      signal?.removeEventListener('abort', onAbort);
+    };
+    const onMessage = ({ data }) => {
+      if (data?.runId !== runId) return;
+      if (data.type === 'partial') {
+        onPartial?.(data.partial);
+        return;
+      }
+      cleanup();
+      if (data.type === 'done') resolve(data.result);
+      else reject(new Error(data.message || 'AI insights worker failed'));
+    };
+    const onError = event => {
+      cleanup();
+      reject(new Error(event?.message || 'AI insights worker failed'));
+    };
+    const onAbort = () => {
+      worker.postMessage({ type: 'cancel', runId });
+      cleanup();
+      reject(cancelledError());
+    };
+    worker.addEventListener('message', onMessage);
+    worker.addEventListener('error', onError);
+    signal?.addEventListener('abort', onAbort);
+    // Clients/venues/events are structured-cloned; the shift columns are transferred
+    try {
+      worker.postMessage({ type: 'run', runId, input }, shiftTableBuffers(input.shiftTable));
+    } catch (e) {
+      cleanup();
+      reject(e);
+    }
+  });
+}
+
+/**
+ * @param {object} input as for insightsJob(); its shift table is transferred to the worker and
+ *   unusable afterwards
+ * @param {{ onPartial?: (partial: object) => void, signal?: AbortSignal }} options
+ * @returns {Promise<{ aggregates: object, scores: Float64Array }>}
+ */
+export async function runInsightsJob(input, { onPartial, signal } = {}) {
+  const worker = await getWorker();
+  if (signal?.aborted) throw cancelledError();
+  if (worker) {
+    try {
+      return await runInWorker(worker, input, { onPartial, signal });
+    } catch (e) {
+      // Records that cannot be cloned (DataCloneError) are left in place, so slice here instead
+      if (e?.name !== 'DataCloneError') throw e;
+    }
+  }
+  return runJob(insightsJob(input), { onPartial, signal });
+}
@@ -49,4 +49,61 @@ export async function fetchCloudSnapshot() {
   }
 }
 
-export default { fetchCloudSnapshot };
\ No newline at end of file
+/**
+ * Conditional fetch of the cloud snapshot (used by lib/cloudSnapshot.js)
+ * @param {string|null} etag ETag of the copy the caller already has
+ * @returns {Promise<Object>} { notModified: true } when that copy is current, else the snapshot
+ *   response ({ snapshot, metadata, versions }) with its `etag`
+ */
+export async function fetchCloudSnapshotIfChanged(etag) {
+  const authToken = await getAuthToken();
+  if (!authToken) {
+    throw new Error('No authentication token found');
+  }
+  const headers = {
+    'Authorization': `Bearer ${authToken}`,
+    'Content-Type': 'application/json',
+  };
+  if (etag) headers['If-None-Match'] = etag;
+  const response = await fetchWithTimeout(buildApiEndpoint('sync/import'), { method: 'GET', headers }, 15000);
+  if (response.status === 304) {
+    return { notModified: true, etag };
+  }
+  if (response.status === 404) {
+    // No cloud snapshot exists yet - this is normal for new users
+    return { snapshot: {}, metadata: { updatedAt: null, version: 0 }, versions: {}, etag: null };
+  }
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  const data = await response.json();
+  return { ...data, etag: response.headers.get('ETag') };
+}
+
+/**
+ * Fetch aggregates computed by the backend from the stored cloud snapshot
+ * @param {string} path e.g. 'summary', 'kpis', 'outfits/top', 'clients/<id>', 'venues/<id>'
+ * @param {Object} params Extra query parameters (days, count)
+ * @returns {Promise<Object>} Analytics payload with the snapshot `version` it was computed from
+ */
+export async function fetchServerAnalytics(path, params = {}) {
+  const authToken = await getAuthToken();
+  if (!authToken) {
+    throw new Error('No authentication token found');
+  }
+  // Send the device offset so best-day and history labels match on-device results
+  const query = new URLSearchParams({ tzOffset: String(new Date().getTimezoneOffset()), ...params });
+  const response = await fetchWithTimeout(`${buildApiEndpoint(`analytics/${path}`)}?${query}`, {
+    method: 'GET',
+    headers: {
+      'Authorization': `Bearer ${authToken}`,
+      'Content-Type': 'application/json',
+    },
+  }, 15000);
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  return response.json();
+}
+
+export default { fetchCloudSnapshot, fetchCloudSnapshotIfChanged, fetchServerAnalytics };
\ No newline at end of file
@@ -0,0 +1,110 @@
+// Cloud snapshot for lib/aiEngine.js: cached per user across sessions and merged into the local data.
+//
+// The last downloaded snapshot is kept with its ETag and per-collection versions (the `versions`
+// digests of GET /api/sync/import) as a record store document (lib/recordStore.js). Within
+// `maxAgeMs` of the last check it is used as is; after that, and once per session, it is
+// revalidated with If-None-Match, so an unchanged snapshot costs a 304 instead of a download. When
+// the backend cannot be reached the cached copy is used.
+//
+// mergeSnapshot() combines local and cloud collections deterministically: by id, cloud fields over
+// local ones, records without an id kept as they are. Each collection's merge is memoized on (local
+// list, cloud version); recordStore hands out a new list on every write, so only collections that
+// changed on either side are merged again.
+import { getCurrentUserId, readDocument, writeDocument } from './recordStore.js';
+
+const DOCUMENT_KEY = 'cloudSnapshot';
+const MERGED_COLLECTIONS = ['clients', 'venues', 'shifts', 'outfits', 'transactions'];
+
+const safeArray = arr => (Array.isArray(arr) ? arr : []);
+
+function isEntry(value) {
+  return !!value && typeof value === 'object' && !!value.snapshot && typeof value.snapshot === 'object';
+}
+
+/**
+ * @param {{ fetchIfChanged: (etag: string|null) => Promise<object>, maxAgeMs?: number }} options
+ *   fetchIfChanged resolves to { notModified: true } for a 304, else to the sync response
+ *   ({ snapshot, metadata, versions }) plus its `etag`; it rejects when offline.
+ */
+export function createCloudSnapshotCache({ fetchIfChanged, maxAgeMs = 5 * 60 * 1000 }) {
+  let state = { userId: undefined, entry: undefined, checkedAt: 0, pending: null };
+
+  async function revalidate(current, userId) {
+    let response;
+    try {
+      response = await fetchIfChanged(current?.etag || null);
+    } catch {
+      return current;
+    }
+    if (state.userId !== userId) return current;
+    state.checkedAt = Date.now();
+    if (response?.notModified && current) return current;
+    const snapshot = response?.snapshot || {};
+    // Without server digests (older backends) every collection counts as changed
+    const versions = response?.versions || Object.fromEntries(Object.keys(snapshot).map(name => [name, `${response?.etag || state.checkedAt}`]));
+    const entry = { etag: response?.etag || null, versions, snapshot, metadata: response?.metadata || {} };
+    state.entry = entry;
+    await writeDocument(DOCUMENT_KEY, entry);
+    return entry;
+  }
+
+  /**
+   * @returns {Promise<{ etag: string|null, versions: Record<string, string>, snapshot: object, metadata: object }|null>}
+   *   null when there is no cloud data and the backend cannot be reached
+   */
+  async function get() {
+    const userId = getCurrentUserId();
+    if (state.userId !== userId) state = { userId, entry: undefined, checkedAt: 0, pending: null };
+    if (state.entry === undefined) {
+      const stored = await readDocument(DOCUMENT_KEY);
+      if (state.userId !== userId) return get();
+      if (state.entry === undefined) state.entry = isEntry(stored) ? stored : null;
+    }
+    if (state.entry && Date.now() - state.checkedAt < maxAgeMs) return state.entry;
+    if (!state.pending) {
+      const pending = revalidate(state.entry, userId).finally(() => { if (state.pending === pending) state.pending = null; });
+      state.pending = pending;
+    }
+    return state.pending;
+  }
+
+  return {
+    get,
+    // ETag of the snapshot last seen (synchronously), for cache keys of derived results
+    version: () => state.entry?.etag || '',
+    // Forget when it was checked, so the next get() revalidates
+    expire() { state.checkedAt = 0; },
+  };
+}
+
+function mergeLists(localArr, cloudArr, idKey = 'id') {
+  const map = new Map();
+  // A record without an id matches nothing; its own key object keeps it, in place
+  safeArray(localArr).forEach(it => { const k = it?.[idKey] ?? {}; if (!map.has(k)) map.set(k, it); });
+  safeArray(cloudArr).forEach(it => { const k = it?.[idKey] ?? {}; map.set(k, { ...(map.get(k) || {}), ...it }); });
+  return Array.from(map.values());
+}
+
+const merged = new Map(); // collection -> { local, cloudVersion, list }
+
+/**
+ * Local snapshot (lib/db.js getAllDataSnapshot) merged with a cloud entry from the cache above
+ * (or null). Unchanged collections return the same list as the previous call.
+ */
+export function mergeSnapshot(local, cloud) {
+  const out = {};
+  MERGED_COLLECTIONS.forEach(name => {
+    const localList = safeArray(local?.[name]);
+    const cloudVersion = cloud?.versions?.[name] ?? '';
+    const previous = merged.get(name);
+    if (previous && previous.local === localList && previous.cloudVersion === cloudVersion) {
+      out[name] = previous.list;
+      return;
+    }
+    const list = mergeLists(localList, cloud ? cloud.snapshot[name] : null);
+    merged.set(name, { local: localList, cloudVersion, list });
+    out[name] = list;
+  });
+  out.events = safeArray(cloud?.snapshot.events);
+  return out;
+}
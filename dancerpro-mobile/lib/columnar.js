@@ -0,0 +1,151 @@
+// Column-oriented copy of a collection for the money aggregations in lib/db.js, kept current by
+// lib/recordStore.js (see defineView there).
+//
+// A schema maps column names to { kind, get }:
+//   'number' -> Float64Array of get(record)
+//   'dict'   -> Int32Array of dictionary codes; `dictionaries[name].values[code]` is the value,
+//               -1 marks null/undefined/''. Codes are assigned in first-seen order and never reused.
+// Aggregations then run as plain indexed loops over typed arrays instead of property lookups,
+// Number() coercions and string compares on every record. Encoding costs more than one walk over
+// the objects, so tables are built once per collection and then patched per write: add() appends a
+// row (arrays grow by doubling) and remove() moves the last row into the freed slot.
+
+const MIN_CAPACITY = 64;
+
+function grow(column, capacity) {
+  const next = new column.constructor(capacity);
+  next.set(column);
+  return next;
+}
+
+/**
+ * @param {Record<string, { kind: 'number'|'dict', get: (record: object) => any }>} schema
+ */
+export function createColumnarView(schema) {
+  const names = Object.keys(schema);
+  let length = 0;
+  let columns = {};
+  let dictionaries = {};
+  let rows = new Map(); // record -> row
+  let records = [];     // row -> record
+
+  function reset(capacity) {
+    length = 0;
+    columns = {};
+    dictionaries = {};
+    rows = new Map();
+    records = [];
+    names.forEach(name => {
+      if (schema[name].kind === 'dict') {
+        columns[name] = new Int32Array(capacity);
+        dictionaries[name] = { values: [], codes: new Map() };
+      } else {
+        columns[name] = new Float64Array(capacity);
+      }
+    });
+  }
+
+  function encode(name, value) {
+    if (value == null || value === '') return -1;
+    const dict = dictionaries[name];
+    let code = dict.codes.get(value);
+    if (code === undefined) {
+      code = dict.values.length;
+      dict.codes.set(value, code);
+      dict.values.push(value);
+    }
+    return code;
+  }
+
+  function write(row, record) {
+    for (let c = 0; c < names.length; c++) {
+      const name = names[c];
+      const { kind, get } = schema[name];
+      columns[name][row] = kind === 'dict' ? encode(name, get(record)) : get(record);
+    }
+    rows.set(record, row);
+    records[row] = record;
+  }
+
+  function add(record) {
+    if (!record || rows.has(record)) return;
+    const capacity = columns[names[0]].length;
+    if (length === capacity) {
+      const next = Math.max(MIN_CAPACITY, capacity * 2);
+      names.forEach(name => { columns[name] = grow(columns[name], next); });
+    }
+    write(length, record);
+    length += 1;
+  }
+
+  function remove(record) {
+    const row = record ? rows.get(record) : undefined;
+    if (row === undefined) return;
+    rows.delete(record);
+    length -= 1;
+    if (row !== length) {
+      const moved = records[length];
+      names.forEach(name => { columns[name][row] = columns[name][length]; });
+      rows.set(moved, row);
+      records[row] = moved;
+    }
+    records.length = length;
+  }
+
+  reset(MIN_CAPACITY);
+
+  return {
+    build(list) {
+      reset(Math.max(MIN_CAPACITY, list.length));
+      list.forEach(add);
+    },
+    add,
+    remove,
+    // Live columns: valid until the next write to the collection
+    table: () => ({ length, columns, dictionaries }),
+  };
+}
+
+// Dictionary code of `value` in a 'dict' column, or -1 when no row has it
+export function dictCode(table, name, value) {
+  const code = table.dictionaries[name]?.codes.get(value);
+  return code === undefined ? -1 : code;
+}
+
+/**
+ * Income/expense sums over a table with a numeric amount column and a dict type column.
+ * With `groupBy` (a dict column) returns per-code arrays aligned with that column's dictionary;
+ * rows whose group is empty are skipped and codes with no rows left have count 0.
+ */
+export function incomeExpenseTotals(table, { amount = 'amount', type = 'type', groupBy } = {}) {
+  const amounts = table.columns[amount];
+  const types = table.columns[type];
+  // -2 never matches a row (empty types are -1)
+  const income = dictCode(table, type, 'income') >= 0 ? dictCode(table, type, 'income') : -2;
+  const expense = dictCode(table, type, 'expense') >= 0 ? dictCode(table, type, 'expense') : -2;
+
+  if (!groupBy) {
+    let inc = 0; let exp = 0;
+    for (let i = 0; i < table.length; i++) {
+      const code = types[i];
+      if (code === income) inc += amounts[i];
+      else if (code === expense) exp += amounts[i];
+    }
+    return { income: inc, expense: exp };
+  }
+
+  const groups = table.columns[groupBy];
+  const size = table.dictionaries[groupBy].values.length;
+  const inc = new Float64Array(size);
+  const exp = new Float64Array(size);
+  const count = new Int32Array(size);
+  for (let i = 0; i < table.length; i++) {
+    const g = groups[i];
+    if (g < 0) continue;
+    const code = types[i];
+    if (code === income) inc[g] += amounts[i];
+    else if (code === expense) exp[g] += amounts[i];
+    count[g] += 1;
+  }
+  return { values: table.dictionaries[groupBy].values, income: inc, expense: exp, count };
+}
@@ -1,14 +1,94 @@
-// Minimal web-safe DB module to satisfy imports and provide localStorage-backed data.
-// On web, `openDb()` returns null and callers use sample data or localStorage fallbacks.
-// Functions accept a `db` argument for signature compatibility but ignore it on web.
-
-function isWeb() {
-  return typeof window !== 'undefined';
-}
+// Web-safe DB module backed by lib/recordStore.js.
+// On web with IndexedDB, `openDb()` returns a handle and every collection lives in a per-user
+// IndexedDB database (keyed records, batched writes). Elsewhere `openDb()` returns null so screens use
+// their own fallbacks, and this module keeps collections as localStorage arrays as before.
+// Functions accept a `db` argument for signature compatibility but ignore it.
+
+import {
+  getCurrentUserId,
+  hasIndexedDb,
+  loadCollection,
+  prependRecord,
+  updateRecords,
+  removeRecords,
+  replaceCollection,
+  flushRecords,
+  batchRecords,
+  defineView,
+  getView,
+  rebuildViews,
+  dataVersion,
+} from './recordStore.js';
+import { createRecordIndex, parseTime } from './recordIndex.js';
+import { createCountView, createTransactionTotalsView, transactionAmount } from './recordAggregates.js';
+import { createRollupView, bucketStart, DAY_MS } from './recordRollups.js';
+import { createColumnarView, incomeExpenseTotals } from './columnar.js';
+import { createSearchIndex } from './searchIndex.js';
+import { createFacetIndex, andBits, orBitsInto, countBits } from './facetIndex.js';
+
+const transactionTime = t => t.date || t.createdAt || t.timestamp;
+
+// Date-ordered indexes (plus per-client/per-venue posting lists) for the range queries below
+defineView('shifts', 'timeline', () => createRecordIndex({ timeOf: s => s.start || s.end || s.date, fields: ['clientId', 'venueId'] }));
+defineView('transactions', 'timeline', () => createRecordIndex({ timeOf: transactionTime, fields: ['clientId'] }));
+// Amount-ordered index, so amount-sorted pages over the whole history need not sort it
+defineView('transactions', 'byAmount', () => createRecordIndex({ timeOf: transactionAmount }));
+
+// Day/week/month and day-of-week rollups per user, client and venue
+function shiftEarnings(s) {
+  const amt = Number(s?.earnings || 0);
+  return Number.isFinite(amt) ? amt : 0;
+}
+defineView('shifts', 'rollups', () => createRollupView({
+  timeOf: s => s.start || s.end || s.date,
+  fields: ['clientId', 'venueId'],
+  measure: s => ({ earnings: shiftEarnings(s) }),
+}));
+defineView('transactions', 'rollups', () => createRollupView({
+  timeOf: transactionTime,
+  fields: ['clientId', 'venueId'],
+  measure: t => {
+    const amt = transactionAmount(t);
+    return { income: t.type === 'income' ? amt : 0, expense: t.type === 'expense' ? amt : 0 };
+  },
+}));
+
+// Typed-array columns of the transactions for whole-collection money loops (see lib/columnar.js)
+defineView('transactions', 'columns', () => createColumnarView({
+  amount: { kind: 'number', get: t => Number(t.amount || 0) },
+  type: { kind: 'dict', get: t => t.type },
+  shiftId: { kind: 'dict', get: t => t.shiftId },
+}));
+
+// Filter bitmaps per transaction facet, plus the date as a range column (see lib/facetIndex.js)
+defineView('transactions', 'facets', () => createFacetIndex({
+  facets: {
+    type: t => t.type,
+    category: t => (t.category || '').trim(),
+    clientId: t => t.clientId,
+    venueId: t => t.venueId,
+    shiftId: t => t.shiftId,
+    outfitId: t => t.outfitId,
+  },
+  ranges: { time: t => parseTime(transactionTime(t)) },
+}));
+
+// Full-text search (prefix and typo tolerant, ranked; see lib/searchIndex.js). Field -> weight.
+const SEARCH_FIELDS = {
+  clients: { name: 4, contact: 3, phone: 3, email: 2, tags: 2, city: 2, notes: 1 },
+  venues: { name: 4, location: 2, city: 2, address: 1, notes: 1 },
+  transactions: { category: 3, description: 2, note: 2 },
+};
+Object.entries(SEARCH_FIELDS).forEach(([c, fields]) => defineView(c, 'search', () => createSearchIndex({ fields })));
+
+// Materialized KPI aggregates, stored alongside the records
+const COUNTED_COLLECTIONS = ['clients', 'venues', 'outfits', 'shifts'];
+COUNTED_COLLECTIONS.forEach(c => defineView(c, 'count', createCountView, { persist: true }));
+defineView('transactions', 'totals', createTransactionTotalsView, { persist: true });
 
 export function openDb() {
-  // Native apps can wire SQLite; web returns null to trigger fallbacks in screens.
-  return null;
+  // Native apps can wire SQLite; web without IndexedDB returns null to trigger fallbacks in screens.
+  return hasIndexedDb() ? { driver: 'indexeddb' } : null;
 }
 
 export async function initDb(_db) {
@@ -16,53 +96,24 @@ export async function initDb(_db) {
   return;
 }
 
-// Get current user ID for user-specific data storage
-function getCurrentUserId() {
-  if (!isWeb() || !window.localStorage) return null;
-  try {
-    const userData = window.localStorage.getItem('userData');
-    if (userData) {
-      const parsed = JSON.parse(userData);
-      return parsed.id || parsed.email || null;
-    }
-  } catch {}
-  return null;
+// Resolve once every pending write has been persisted (e.g. before export or logout)
+export async function flushDb(_db) {
+  await flushRecords();
 }
 
-// Create user-specific key for data storage
-function getUserKey(baseKey) {
-  const userId = getCurrentUserId();
-  return userId ? `${baseKey}_${userId}` : baseKey;
+// Group writes: `await batch(db, async () => { ...inserts/updates/deletes... })` updates the in-memory
+// collections immediately and persists each touched collection once when `fn` settles
+export async function batch(_db, fn) {
+  return await batchRecords(fn);
 }
 
-// In-memory cache to reduce localStorage parse/serialize overhead
-const memCache = new Map();
-
-function readLocal(key, fallback = []) {
-  if (!isWeb() || !window.localStorage) return Array.isArray(fallback) ? fallback : fallback || [];
-  try {
-    const userKey = getUserKey(key);
-    if (memCache.has(userKey)) {
-      const cached = memCache.get(userKey);
-      return Array.isArray(cached) ? cached : (cached ?? (Array.isArray(fallback) ? fallback : fallback || []));
-    }
-    const raw = window.localStorage.getItem(userKey);
-    const parsed = raw ? JSON.parse(raw) : null;
-    const value = Array.isArray(parsed) ? parsed : (parsed || fallback || []);
-    memCache.set(userKey, value);
-    return value;
-  } catch {
-    return Array.isArray(fallback) ? fallback : fallback || [];
-  }
+// Changes whenever any collection is written (or the user changes): a cache key for derived results
+export function getDataVersion(_db) {
+  return dataVersion();
 }
 
-function writeLocal(key, value) {
-  if (!isWeb() || !window.localStorage) return;
-  try { 
-    const userKey = getUserKey(key);
-    memCache.set(userKey, value);
-    window.localStorage.setItem(userKey, JSON.stringify(value)); 
-  } catch {}
+function readLocal(key) {
+  return loadCollection(key);
 }
 
 function lastNDaysDateRange(days) {
@@ -71,21 +122,88 @@ function lastNDaysDateRange(days) {
   return { start, end: now };
 }
 
+// Index entries ({ t, record }, newest first) of a collection inside the trailing window,
+// optionally restricted to one clientId/venueId
+async function recentEntries(collection, days, field, id) {
+  const { start, end } = lastNDaysDateRange(days);
+  const index = await getView(collection, 'timeline');
+  return field
+    ? index.rangeBy(field, id, start.getTime(), end.getTime())
+    : index.range(start.getTime(), end.getTime());
+}
+
+// Shift totals inside the trailing window for one client/venue. Whole UTC days come from the day
+// rollups; only the partial first and last day are read record-by-record from the index, so the
+// cost is O(days + shifts on the two edge days) and the result equals a full scan.
+async function shiftWindowStats(field, id, days) {
+  const { start, end } = lastNDaysDateRange(days);
+  const startMs = start.getTime();
+  const endMs = end.getTime();
+  const [index, rollups] = await Promise.all([getView('shifts', 'timeline'), getView('shifts', 'rollups')]);
+  const firstFull = startMs === bucketStart(startMs, 'day') ? startMs : bucketStart(startMs, 'day') + DAY_MS;
+  const lastDay = bucketStart(endMs, 'day');
+
+  const stats = { shiftCount: 0, totalEarnings: 0, byDow: new Map(), daily: new Map() };
+  const addDow = (dow, total, count) => {
+    const prev = stats.byDow.get(dow) || { total: 0, count: 0 };
+    stats.byDow.set(dow, { total: prev.total + total, count: prev.count + count });
+  };
+  const addEntries = entries => entries.forEach(({ t, record }) => {
+    const earnings = shiftEarnings(record);
+    const key = new Date(t).toISOString().slice(0, 10);
+    stats.shiftCount += 1;
+    stats.totalEarnings += earnings;
+    addDow(new Date(t).getDay(), earnings, 1);
+    stats.daily.set(key, (stats.daily.get(key) || 0) + earnings);
+  });
+
+  if (firstFull >= lastDay) {
+    addEntries(index.rangeBy(field, id, startMs, endMs));
+  } else {
+    addEntries(index.rangeBy(field, id, startMs, firstFull - 1));
+    const scope = `${field.replace(/Id$/, '')}:${id}`;
+    rollups.range(scope, 'day', firstFull, lastDay - 1, { withDow: true }).forEach(bucket => {
+      stats.shiftCount += bucket.n;
+      stats.totalEarnings += bucket.earnings;
+      bucket.byDow.forEach((split, dow) => addDow(dow, split.earnings, split.n));
+      stats.daily.set(bucket.key, (stats.daily.get(bucket.key) || 0) + bucket.earnings);
+    });
+    addEntries(index.rangeBy(field, id, lastDay, endMs));
+  }
+
+  let bestDay = null; let bestDayAvg = 0;
+  stats.byDow.forEach((v, dow) => {
+    const avg = v.count ? v.total / v.count : 0;
+    if (avg > bestDayAvg) { bestDayAvg = avg; bestDay = dow; }
+  });
+  const dailyEntries = Array.from(stats.daily.entries()).sort((a, b) => (a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0));
+  return {
+    shiftCount: stats.shiftCount,
+    totalEarnings: stats.totalEarnings,
+    avgEarnings: stats.shiftCount ? stats.totalEarnings / stats.shiftCount : 0,
+    bestDay,
+    bestDayAvg,
+    dailyEntries,
+  };
+}
+
 // Initialize user data with sample data if empty
 export async function initializeUserData(_db) {
   const userId = getCurrentUserId();
   if (!userId) return;
 
   // Check if user already has data
-  const existingClients = readLocal('clients');
+  const existingClients = await readLocal('clients');
   if (existingClients.length > 0) return; // User already has data
 
   // Initialize with empty data structures
-  writeLocal('venues', []);
-  writeLocal('shifts', []);
-  writeLocal('clients', []);
-  writeLocal('outfits', []);
-  writeLocal('transactions', []);
+  await batchRecords(async () => {
+    await replaceCollection('venues', []);
+    await replaceCollection('shifts', []);
+    await replaceCollection('clients', []);
+    await replaceCollection('outfits', []);
+    await replaceCollection('transactions', []);
+  });
   
   console.log(`[DB] Initialized empty data structures for user: ${userId}`);
 }
@@ -106,76 +224,298 @@ export function computeTransactionTotals(rows = []) {
 }
 
 export async function getRecentTransactions(_db, days = 30) {
-  const tx = readLocal('transactions');
-  const { start, end } = lastNDaysDateRange(days);
-  return tx.filter(t => {
-    const dStr = t.date || t.createdAt || t.timestamp || null;
-    const d = dStr ? new Date(dStr) : null;
-    if (!d) return false;
-    return d >= start && d <= end;
-  }).sort((a, b) => new Date(b.date || b.createdAt || 0) - new Date(a.date || a.createdAt || 0));
+  const entries = await recentEntries('transactions', days);
+  return entries.map(e => e.record);
+}
+
+// ---- Paginated transaction queries ----
+// queryTransactions() returns one page plus an opaque cursor for the next one. Date-sorted pages
+// (and amount-sorted pages over the whole history) walk an index from the cursor and stop after
+// `limit` matches, so the first page costs the same however long the history is. Amount-sorted
+// pages inside a date window sort that window once per data version and page through the copy.
+
+export const TRANSACTION_PAGE_SIZE = 50;
+let windowSortCache = { key: null, rows: [] };
+
+// { days, from, to } -> epoch ms bounds (null = open). A date-only `to` includes that whole day.
+function transactionDateBounds({ days, from, to } = {}) {
+  let start = null;
+  let end = null;
+  if (days != null) {
+    const range = lastNDaysDateRange(days);
+    start = range.start.getTime();
+    end = range.end.getTime();
+  }
+  const fromMs = from ? parseTime(from) : NaN;
+  if (Number.isFinite(fromMs)) start = start == null ? fromMs : Math.max(start, fromMs);
+  let toMs = to ? parseTime(to) : NaN;
+  if (Number.isFinite(toMs) && /^\d{4}-\d{2}-\d{2}$/.test(String(to))) toMs += DAY_MS - 1;
+  if (Number.isFinite(toMs)) end = end == null ? toMs : Math.min(end, toMs);
+  return { start, end };
+}
+
+// Facets the filter chips count (venue counts include transactions linked through their shift)
+const TRANSACTION_FACETS = ['type', 'category', 'clientId', 'venueId', 'outfitId'];
+
+const asList = value => (Array.isArray(value) ? value : [value]).filter(v => v != null && v !== '');
+
+// Transactions at any of `venueIds`: directly or through a shift at that venue
+async function venueBits(facets, venueIds) {
+  const wanted = new Set(venueIds);
+  const shifts = await readLocal('shifts');
+  const bits = facets.bitsFor('venueId', venueIds);
+  return orBitsInto(bits, facets.bitsFor('shiftId', shifts.filter(s => s && wanted.has(s.venueId)).map(s => s.id)));
+}
+
+/**
+ * One bitmap per active filter; a transaction matches when it is in all of them. Dates always
+ * apply (open bounds still drop undated rows). `type`, `clientId`, `venueId` and `outfitId` take a
+ * value or a list of values (any of them); `category` is a case-insensitive substring; `search` is
+ * a full-text query over category, description and note.
+ */
+async function transactionClauses(facets, filters = {}) {
+  const { start, end } = transactionDateBounds(filters);
+  const clauses = { date: facets.rangeBits('time', start, end) };
+  ['type', 'clientId', 'outfitId'].forEach(facet => {
+    const wanted = asList(filters[facet]);
+    if (wanted.length) clauses[facet] = facets.bitsFor(facet, wanted);
+  });
+  const venues = asList(filters.venueId);
+  if (venues.length) clauses.venueId = await venueBits(facets, venues);
+  if (filters.category) {
+    const needle = String(filters.category).toLowerCase();
+    clauses.category = facets.bitsFor('category', facets.facetValues('category').filter(c => c.toLowerCase().includes(needle)));
+  }
+  if (filters.search && String(filters.search).trim()) {
+    const index = await getView('transactions', 'search');
+    clauses.search = facets.bitsOf(index.search(filters.search, { limit: 0 }).map(hit => hit.record));
+  }
+  return clauses;
+}
+
+// AND of every clause but `except`
+function intersectClauses(facets, clauses, except) {
+  let bits = null;
+  Object.keys(clauses).forEach(name => {
+    if (name === except) return;
+    bits = bits ? andBits(bits, clauses[name]) : clauses[name];
+  });
+  return bits || facets.all();
+}
+
+async function selectTransactions(filters) {
+  const facets = await getView('transactions', 'facets');
+  const bits = intersectClauses(facets, await transactionClauses(facets, filters));
+  return { facets, bits, matches: t => facets.has(bits, t) };
+}
+
+function encodeCursor(value) {
+  return JSON.stringify(value);
+}
+
+function decodeCursor(cursor) {
+  if (!cursor) return null;
+  try { return JSON.parse(cursor); } catch { return null; }
+}
+
+/**
+ * One page of transactions.
+ * @param {{ filters?: { days?: number, from?: string, to?: string, type?: string|string[], clientId?: string|string[], venueId?: string|string[],
+ *   outfitId?: string|string[], category?: string, search?: string },
+ *   sort?: { field?: 'date'|'amount', direction?: 'asc'|'desc' }, cursor?: string|null, limit?: number }} query
+ *   `limit` <= 0 returns every match (e.g. for export)
+ * @returns {Promise<{ items: object[], nextCursor: string|null }>} `nextCursor` is null on the last page
+ */
+export async function queryTransactions(_db, { filters = {}, sort = {}, cursor = null, limit = TRANSACTION_PAGE_SIZE } = {}) {
+  const byAmount = sort.field === 'amount';
+  const descending = sort.direction !== 'asc';
+  const { start, end } = transactionDateBounds(filters);
+  const { facets, bits, matches } = await selectTransactions(filters);
+  const max = limit > 0 ? limit : Infinity;
+  const after = decodeCursor(cursor);
+
+  if (byAmount && (start != null || end != null)) {
+    const key = JSON.stringify([filters, descending, facets.version()]);
+    if (windowSortCache.key !== key) {
+      // Equal amounts newest first
+      const rows = facets.records(bits).map(record => ({ record, amount: transactionAmount(record), t: parseTime(transactionTime(record)) }));
+      rows.sort((a, b) => (descending ? b.amount - a.amount : a.amount - b.amount) || b.t - a.t);
+      windowSortCache = { key, rows: rows.map(row => row.record) };
+    }
+    const { rows } = windowSortCache;
+    const offset = Number(after?.offset) || 0;
+    const items = rows.slice(offset, offset + max);
+    const next = offset + items.length;
+    return { items, nextCursor: next < rows.length ? encodeCursor({ offset: next }) : null };
+  }
+
+  const index = await getView('transactions', byAmount ? 'byAmount' : 'timeline');
+  const walkOptions = { descending };
+  // The per-client posting list only serves a single id; for a list walk the timeline and let the bitmaps filter
+  const clients = asList(filters.clientId);
+  if (!byAmount && clients.length === 1) Object.assign(walkOptions, { field: 'clientId', value: clients[0] });
+  let lo = byAmount ? null : start;
+  let hi = byAmount ? null : end;
+  if (after && Number.isFinite(after.t)) {
+    if (descending) hi = hi == null ? after.t : Math.min(hi, after.t);
+    else lo = lo == null ? after.t : Math.max(lo, after.t);
+  }
+
+  const items = [];
+  let last = null;
+  // Entries tied with the cursor's key up to and including the cursor's record were already returned
+  let skipping = !!after && Number.isFinite(after.t);
+  for (const entry of index.entries(lo, hi, walkOptions)) {
+    if (skipping) {
+      if (entry.t === after.t) {
+        if (entry.record.id === after.id) skipping = false;
+        continue;
+      }
+      skipping = false;
+    }
+    // Date-sorted lists never contain undated rows; keep amount-sorted ones consistent with them
+    if (byAmount && !Number.isFinite(parseTime(transactionTime(entry.record)))) continue;
+    if (!matches(entry.record)) continue;
+    if (items.length === max) return { items, nextCursor: encodeCursor({ t: last.t, id: last.record.id }) };
+    items.push(entry.record);
+    last = entry;
+  }
+  return { items, nextCursor: null };
+}
+
+/**
+ * Totals and per-category breakdown of every transaction matching `filters` (same filters as
+ * queryTransactions). One pass over the records selected by the filter bitmaps, no sorting.
+ */
+export async function summarizeTransactions(_db, filters = {}) {
+  const { facets, bits } = await selectTransactions(filters);
+  let count = 0; let income = 0; let expense = 0;
+  const byCategory = new Map();
+  const categories = new Set();
+  const categoriesByType = { income: new Set(), expense: new Set() };
+  for (const t of facets.records(bits)) {
+    count += 1;
+    const amt = Number(t.amount || 0);
+    const key = (t.category || '—').trim();
+    const prev = byCategory.get(key) || { income: 0, expense: 0 };
+    if (t.type === 'income') { income += amt; prev.income += amt; } else if (t.type === 'expense') { expense += amt; prev.expense += amt; }
+    byCategory.set(key, prev);
+    const cat = (t.category || '').trim();
+    if (cat) {
+      categories.add(cat);
+      categoriesByType[t.type]?.add(cat);
+    }
+  }
+  return {
+    count,
+    totals: { income, expense, net: income - expense },
+    byCategory: Array.from(byCategory.entries())
+      .map(([category, v]) => ({ category, income: v.income, expense: v.expense, net: v.income - v.expense }))
+      .sort((a, b) => Math.abs(b.net) - Math.abs(a.net)),
+    categories: Array.from(categories),
+    categoriesByType: { income: Array.from(categoriesByType.income), expense: Array.from(categoriesByType.expense) },
+  };
+}
+
+/**
+ * Live counts for the filter chips: for each facet, value -> number of transactions matching
+ * `filters` with that facet's own filter left out (so picking a value shows what the others offer).
+ * @returns {Promise<{ total: number, type: Record<string, number>, category: Record<string, number>,
+ *   clientId: Record<string, number>, venueId: Record<string, number>, outfitId: Record<string, number> }>}
+ */
+export async function getTransactionFacetCounts(_db, filters = {}) {
+  const facets = await getView('transactions', 'facets');
+  const clauses = await transactionClauses(facets, filters);
+  const out = { total: countBits(intersectClauses(facets, clauses)) };
+  for (const facet of TRANSACTION_FACETS) {
+    const base = intersectClauses(facets, clauses, facet);
+    if (facet !== 'venueId') {
+      out[facet] = Object.fromEntries(facets.valueCounts(facet, base));
+      continue;
+    }
+    // A transaction counts for its own venue and for its shift's venue (once if they agree)
+    const shifts = await readLocal('shifts');
+    const shiftVenue = new Map(shifts.filter(s => s && s.venueId).map(s => [s.id, s.venueId]));
+    const venueCounts = {};
+    facets.records(base).forEach(t => {
+      const direct = t.venueId || null;
+      const viaShift = t.shiftId ? shiftVenue.get(t.shiftId) || null : null;
+      if (direct) venueCounts[direct] = (venueCounts[direct] || 0) + 1;
+      if (viaShift && viaShift !== direct) venueCounts[viaShift] = (venueCounts[viaShift] || 0) + 1;
+    });
+    out.venueId = venueCounts;
+  }
+  return out;
 }
 
 export async function insertTransaction(_db, payload) {
-  const list = readLocal('transactions');
   const id = payload.id || `tx_${Date.now()}`;
   const row = { id, ...payload };
-  writeLocal('transactions', [row, ...list]);
+  await prependRecord('transactions', row);
   return row;
 }
 
 export async function deleteTransaction(_db, id) {
-  const list = readLocal('transactions');
-  writeLocal('transactions', list.filter(t => t.id !== id));
+  await removeRecords('transactions', id);
   return true;
 }
 
+// Search: records matching every term of `query` (prefixes, small typos), best match first
+async function searchCollection(collection, query, limit) {
+  const index = await getView(collection, 'search');
+  return index.search(query, { limit }).map(hit => hit.record);
+}
+
+export async function searchClients(_db, query, { limit = 50 } = {}) {
+  return await searchCollection('clients', query, limit);
+}
+
+export async function searchVenues(_db, query, { limit = 50 } = {}) {
+  return await searchCollection('venues', query, limit);
+}
+
+export async function searchTransactions(_db, query, { limit = 50 } = {}) {
+  return await searchCollection('transactions', query, limit);
+}
+
 // Clients
-export async function getAllClients(_db) { return readLocal('clients'); }
+export async function getAllClients(_db) { return await readLocal('clients'); }
 export async function insertClient(_db, payload) {
-  const list = readLocal('clients');
   const id = payload.id || `c_${Date.now()}`;
   const row = { id, ...payload };
-  writeLocal('clients', [row, ...list]);
+  await prependRecord('clients', row);
   return row;
 }
 export async function updateClient(_db, payload) {
-  const list = readLocal('clients');
-  const next = list.map(c => c.id === payload.id ? { ...c, ...payload } : c);
-  writeLocal('clients', next);
+  await updateRecords('clients', payload.id, c => ({ ...c, ...payload }));
   return payload;
 }
 export async function deleteClient(_db, id) {
-  const list = readLocal('clients');
-  writeLocal('clients', list.filter(c => c.id !== id));
+  await removeRecords('clients', id);
   return true;
 }
 
 // Venues
-export async function getAllVenues(_db) { return readLocal('venues'); }
+export async function getAllVenues(_db) { return await readLocal('venues'); }
 export async function insertVenue(_db, payload) {
-  const list = readLocal('venues');
   const id = payload.id || `v_${Date.now()}`;
   const row = { id, ...payload };
-  writeLocal('venues', [row, ...list]);
+  await prependRecord('venues', row);
   return row;
 }
 export async function updateVenue(_db, payload) {
-  const list = readLocal('venues');
-  const next = list.map(v => v.id === payload.id ? { ...v, ...payload } : v);
-  writeLocal('venues', next);
+  await updateRecords('venues', payload.id, v => ({ ...v, ...payload }));
   return payload;
 }
 export async function deleteVenue(_db, id) {
-  const list = readLocal('venues');
-  writeLocal('venues', list.filter(v => v.id !== id));
+  await removeRecords('venues', id);
   return true;
 }
 
 // Shifts
 export async function getShiftsWithVenues(_db) {
-  const shifts = readLocal('shifts');
-  const venues = readLocal('venues');
+  const shifts = await readLocal('shifts');
+  const venues = await readLocal('venues');
   const byId = new Map(venues.map(v => [v.id, v]));
   return shifts.map(s => ({
     ...s,
@@ -184,48 +524,33 @@ export async function getShiftsWithVenues(_db) {
 }
 
 export async function getShiftTransactionTotals(_db) {
-  const tx = readLocal('transactions');
+  const columns = await getView('transactions', 'columns');
+  const { values, income, expense, count } = incomeExpenseTotals(columns.table(), { groupBy: 'shiftId' });
   const map = new Map();
-  tx.forEach(t => {
-    const id = t.shiftId || null;
-    if (!id) return;
-    const prev = map.get(id) || { income: 0, expense: 0, net: 0 };
-    const amt = Number(t.amount || 0);
-    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
-    prev.net = (prev.income || 0) - (prev.expense || 0);
-    map.set(id, prev);
+  values.forEach((id, code) => {
+    if (count[code]) map.set(id, { income: income[code], expense: expense[code], net: income[code] - expense[code] });
   });
   return map;
 }
 
 export async function insertShift(_db, payload) {
-  const list = readLocal('shifts');
   const id = payload.id || `s_${Date.now()}`;
   const row = { id, ...payload };
-  writeLocal('shifts', [row, ...list]);
+  await prependRecord('shifts', row);
   return row;
 }
 export async function updateShift(_db, payload) {
-  const list = readLocal('shifts');
-  const next = list.map(s => s.id === payload.id ? { ...s, ...payload } : s);
-  writeLocal('shifts', next);
+  await updateRecords('shifts', payload.id, s => ({ ...s, ...payload }));
   return payload;
 }
 export async function deleteShift(_db, id) {
-  const list = readLocal('shifts');
-  writeLocal('shifts', list.filter(s => s.id !== id));
+  await removeRecords('shifts', id);
   return true;
 }
 
 export async function getRecentShifts(_db, days = 7) {
-  const shifts = readLocal('shifts');
-  const { start, end } = lastNDaysDateRange(days);
-  return shifts.filter(s => {
-    const dStr = s.start || s.end || s.date || null;
-    const d = dStr ? new Date(dStr) : null;
-    if (!d) return false;
-    return d >= start && d <= end;
-  }).sort((a, b) => new Date(b.start || b.date || 0) - new Date(a.start || a.date || 0));
+  const entries = await recentEntries('shifts', days);
+  return entries.map(e => e.record);
 }
 
 export async function getTopVenue(_db, days = 7) {
@@ -238,30 +563,17 @@ export async function getTopVenue(_db, days = 7) {
   let best = null; let bestTotal = 0;
   totals.forEach((t, k) => { if (t > bestTotal) { bestTotal = t; best = k; } });
   if (!best) return null;
-  const bestVenueName = readLocal('venues').find(v => v.id === best)?.name || (typeof best === 'string' ? best : '—');
+  const bestVenueName = (await readLocal('venues')).find(v => v.id === best)?.name || (typeof best === 'string' ? best : '—');
   return { venue: bestVenueName, total: bestTotal };
 }
 
 // Outfits
-export async function getAllOutfits(_db) { return readLocal('outfits'); }
+export async function getAllOutfits(_db) { return await readLocal('outfits'); }
 
 export async function getAllOutfitsWithEarnings(_db) {
-  const outfits = readLocal('outfits');
-  const tx = readLocal('transactions');
-  const byOutfit = new Map();
-  tx.forEach(t => {
-    const id = t.outfitId || null;
-    if (!id) return;
-    const prev = byOutfit.get(id) || { income: 0, expense: 0 };
-    const amt = Number(t.amount || 0);
-    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
-    byOutfit.set(id, prev);
-  });
-  return outfits.map(o => {
-    const totals = byOutfit.get(o.id) || { income: 0, expense: 0 };
-    const net = (totals.income || 0) - (totals.expense || 0);
-    return { ...o, net };
-  });
+  const outfits = await readLocal('outfits');
+  const totals = await getView('transactions', 'totals');
+  return outfits.map(o => ({ ...o, net: totals.outfitNet(o.id) }));
 }
 
 export async function getTopEarningOutfits(_db, count = 5) {
@@ -270,210 +582,233 @@ export async function getTopEarningOutfits(_db, count = 5) {
 }
 
 export async function insertOutfit(_db, payload) {
-  const list = readLocal('outfits');
   const id = payload.id || `o_${Date.now()}`;
   const row = { id, ...payload };
-  writeLocal('outfits', [row, ...list]);
+  await prependRecord('outfits', row);
   return row;
 }
 export async function updateOutfit(_db, payload) {
-  const list = readLocal('outfits');
-  const next = list.map(o => o.id === payload.id ? { ...o, ...payload } : o);
-  writeLocal('outfits', next);
+  await updateRecords('outfits', payload.id, o => ({ ...o, ...payload }));
   return payload;
 }
 export async function deleteOutfit(_db, id) {
-  const list = readLocal('outfits');
-  writeLocal('outfits', list.filter(o => o.id !== id));
+  await removeRecords('outfits', id);
   return true;
 }
 export async function incrementWearCount(_db, id) {
-  const list = readLocal('outfits');
-  const next = list.map(o => o.id === id ? { ...o, wearCount: Number(o.wearCount || 0) + 1 } : o);
-  writeLocal('outfits', next);
-  return next.find(o => o.id === id);
+  const updated = await updateRecords('outfits', id, o => ({ ...o, wearCount: Number(o.wearCount || 0) + 1 }));
+  return updated || undefined;
 }
 
 // Performance helpers
 export async function getClientShifts(_db, clientId, days = 120, limit = 10) {
-  const shifts = readLocal('shifts');
-  const { start, end } = lastNDaysDateRange(days);
-  return shifts.filter(s => {
-    const dStr = s.start || s.end || s.date || null;
-    const d = dStr ? new Date(dStr) : null;
-    if (!d) return false;
-    const within = d >= start && d <= end;
-    return within && (s.clientId === clientId);
-  }).sort((a, b) => new Date(b.start || b.date || 0) - new Date(a.start || a.date || 0)).slice(0, limit);
+  const entries = await recentEntries('shifts', days, 'clientId', clientId);
+  return entries.slice(0, limit).map(e => e.record);
 }
 
 export async function getClientPerformance(_db, clientId, days = 120) {
   // Compute performance based on shifts tied to this client within the range
-  const shifts = readLocal('shifts');
-  const { start, end } = lastNDaysDateRange(days);
-  const clientShifts = shifts.filter(s => {
-    const dStr = s.start || s.end || s.date || null;
-    const d = dStr ? new Date(dStr) : null;
-    if (!d) return false;
-    const within = d >= start && d <= end;
-    return within && (s.clientId === clientId);
-  });
-
-  const shiftCount = clientShifts.length;
-  const totalEarnings = clientShifts.reduce((acc, s) => acc + Number(s.earnings || 0), 0);
-  const avgEarnings = shiftCount ? totalEarnings / shiftCount : 0;
-
-  // Best day-of-week by average earnings
-  const byDow = new Map();
-  clientShifts.forEach(s => {
-    const d = new Date(s.start || s.date || Date.now());
-    const dow = d.getDay();
-    const list = byDow.get(dow) || [];
-    list.push(Number(s.earnings || 0));
-    byDow.set(dow, list);
-  });
-  let bestDay = null; let bestDayAvg = 0;
-  byDow.forEach((list, dow) => {
-    const avg = list.length ? list.reduce((a, b) => a + b, 0) / list.length : 0;
-    if (avg > bestDayAvg) { bestDayAvg = avg; bestDay = dow; }
+  const { dailyEntries, ...stats } = await shiftWindowStats('clientId', clientId, days);
+  // Simple earnings history by day for small chart in UI
+  const earningsHistory = dailyEntries.map(([date, value]) => {
+    const d = new Date(date);
+    const label = `${String(d.getMonth() + 1).padStart(2, '0')}/${String(d.getDate()).padStart(2, '0')}`;
+    return { label, value };
   });
-
-  // Build simple earnings history by day for small chart in UI
-  const daily = new Map();
-  clientShifts.forEach(s => {
-    const d = new Date(s.start || s.date || Date.now());
-    const key = d.toISOString().slice(0, 10);
-    daily.set(key, (daily.get(key) || 0) + Number(s.earnings || 0));
-  });
-  const earningsHistory = Array.from(daily.entries())
-    .sort((a, b) => new Date(a[0]) - new Date(b[0]))
-    .map(([date, value]) => {
-      const d = new Date(date);
-      const label = `${String(d.getMonth() + 1).padStart(2, '0')}/${String(d.getDate()).padStart(2, '0')}`;
-      return { label, value };
-    });
-
-  return { clientId, days, shiftCount, totalEarnings, avgEarnings, bestDay, bestDayAvg, earningsHistory };
+  return { clientId, days, ...stats, earningsHistory };
 }
 
 export async function getClientTransactions(_db, clientId, days = 30) {
-  const tx = readLocal('transactions');
-  const { start, end } = lastNDaysDateRange(days);
-  return tx.filter(t => {
-    const dStr = t.date || t.createdAt || null;
-    const d = dStr ? new Date(dStr) : null;
-    if (!d) return false;
-    const within = d >= start && d <= end;
-    return within && (t.clientId === clientId);
-  }).sort((a, b) => new Date(b.date || b.createdAt || 0) - new Date(a.date || a.createdAt || 0));
+  const entries = await recentEntries('transactions', days, 'clientId', clientId);
+  return entries.map(e => e.record);
 }
 
 export async function getVenueShifts(_db, venueId, days = 120, limit = 10) {
-  const shifts = readLocal('shifts');
-  const { start, end } = lastNDaysDateRange(days);
-  return shifts.filter(s => {
-    const dStr = s.start || s.end || s.date || null;
-    const d = dStr ? new Date(dStr) : null;
-    if (!d) return false;
-    const within = d >= start && d <= end;
-    return within && (s.venueId === venueId);
-  }).sort((a, b) => new Date(b.start || b.date || 0) - new Date(a.start || a.date || 0)).slice(0, limit);
+  const entries = await recentEntries('shifts', days, 'venueId', venueId);
+  return entries.slice(0, limit).map(e => e.record);
 }
 
 export async function getVenuePerformance(_db, venueId, days = 120) {
-  const shifts = await getVenueShifts(_db, venueId, days, 100000);
-  const totalEarnings = shifts.reduce((acc, s) => acc + Number(s.earnings || 0), 0);
-  const avgEarnings = shifts.length ? totalEarnings / shifts.length : 0;
-  const byDow = new Map();
-  const daily = new Map();
-  shifts.forEach(s => {
-    const d = new Date(s.start || s.date || Date.now());
-    const dow = d.getDay();
-    const key = d.toISOString().slice(0,10);
-    const list = byDow.get(dow) || [];
-    list.push(Number(s.earnings || 0));
-    byDow.set(dow, list);
-    daily.set(key, (daily.get(key) || 0) + Number(s.earnings || 0));
+  const { dailyEntries, ...stats } = await shiftWindowStats('venueId', venueId, days);
+  const earningsHistory = dailyEntries.map(([date, earnings]) => ({ date, earnings }));
+  return { venueId, days, ...stats, earningsHistory };
+}
+
+/**
+ * Earnings, shift counts and transaction totals bucketed by 'day' | 'week' | 'month' (UTC, weeks
+ * start Monday) or 'dow' (local day of week), for the user or one client/venue. Read from the
+ * rollups, so a year at day granularity touches at most 366 buckets.
+ * @param {{ granularity?: string, days?: number, start?: Date|string|number, end?: Date|string|number,
+ *           clientId?: string, venueId?: string, fill?: boolean }} options
+ *   Range is `start`..`end` or the trailing `days` (default 30); `fill` includes empty buckets.
+ *   For 'dow', `days: null` without start/end returns all-time totals.
+ */
+export async function getEarningsRollup(_db, { granularity = 'day', days = 30, start, end, clientId, venueId, fill = false } = {}) {
+  const endMs = end != null ? new Date(end).getTime() : Date.now();
+  const startMs = start != null ? new Date(start).getTime() : endMs - Number(days || 0) * DAY_MS;
+  const scope = clientId ? `client:${clientId}` : venueId ? `venue:${venueId}` : 'all';
+  const [shiftRollups, txRollups] = await Promise.all([getView('shifts', 'rollups'), getView('transactions', 'rollups')]);
+  const row = (key, extra, shifts, tx) => ({
+    key,
+    ...extra,
+    earnings: shifts?.earnings || 0,
+    shifts: shifts?.n || 0,
+    income: tx?.income || 0,
+    expense: tx?.expense || 0,
+    net: (tx?.income || 0) - (tx?.expense || 0),
+    transactions: tx?.n || 0,
   });
-  let bestDay = null; let bestDayAvg = 0;
-  byDow.forEach((list, dow) => {
-    const avg = list.length ? list.reduce((a,b)=>a+b,0)/list.length : 0;
-    if (avg > bestDayAvg) { bestDayAvg = avg; bestDay = dow; }
+
+  if (granularity === 'dow') {
+    // Windowed: sum the per-day local day-of-week splits; unbounded: the all-time buckets
+    const sums = Array.from({ length: 7 }, () => ({ shifts: { n: 0, earnings: 0 }, tx: { n: 0, income: 0, expense: 0 } }));
+    if (start == null && end == null && days == null) {
+      shiftRollups.dayOfWeek(scope).forEach(b => { sums[b.dow].shifts = b; });
+      txRollups.dayOfWeek(scope).forEach(b => { sums[b.dow].tx = b; });
+    } else {
+      const addSplit = (target, split) => Object.keys(split).forEach(k => { target[k] = (target[k] || 0) + split[k]; });
+      shiftRollups.range(scope, 'day', startMs, endMs, { withDow: true })
+        .forEach(b => b.byDow.forEach((split, dow) => addSplit(sums[dow].shifts, split)));
+      txRollups.range(scope, 'day', startMs, endMs, { withDow: true })
+        .forEach(b => b.byDow.forEach((split, dow) => addSplit(sums[dow].tx, split)));
+    }
+    return sums.map((s, dow) => row(String(dow), { dow }, s.shifts, s.tx));
+  }
+
+  const byStart = new Map();
+  shiftRollups.range(scope, granularity, startMs, endMs, { fill }).forEach(b => byStart.set(b.start, { b, shifts: b }));
+  txRollups.range(scope, granularity, startMs, endMs, { fill }).forEach(b => {
+    const prev = byStart.get(b.start) || { b };
+    byStart.set(b.start, { ...prev, tx: b });
   });
-  const earningsHistory = Array.from(daily.entries()).map(([date, earnings]) => ({ date, earnings }))
-    .sort((a,b)=> new Date(a.date) - new Date(b.date));
-  return { venueId, days, shiftCount: shifts.length, totalEarnings, avgEarnings, bestDay, bestDayAvg, earningsHistory };
+  return Array.from(byStart.values())
+    .sort((x, y) => x.b.start - y.b.start)
+    .map(({ b, shifts, tx }) => row(b.key, { start: new Date(b.start).toISOString() }, shifts, tx));
 }
 
 // KPI snapshot & backup
+// Served from the materialized aggregates: cost depends on the number of clients, not on history size
 export async function getKpiSnapshot(_db) {
-  const clients = readLocal('clients');
-  const venues = readLocal('venues');
-  const outfits = readLocal('outfits');
-  const shifts = readLocal('shifts');
-  const tx = readLocal('transactions');
-  const totals = computeTransactionTotals(tx);
-  const byClientMap = new Map();
-  tx.forEach(t => {
-    const id = t.clientId || null;
-    if (!id) return;
-    const prev = byClientMap.get(id) || { income: 0, expense: 0, net: 0 };
-    const amt = Number(t.amount || 0);
-    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
-    prev.net = (prev.income || 0) - (prev.expense || 0);
-    byClientMap.set(id, prev);
-  });
-  const byClient = Array.from(byClientMap.entries()).map(([clientId, totals]) => ({ clientId, net: (totals.income || 0) - (totals.expense || 0) }))
+  const [totalsView, ...countViews] = await Promise.all([
+    getView('transactions', 'totals'),
+    ...COUNTED_COLLECTIONS.map(c => getView(c, 'count')),
+  ]);
+  const counts = {};
+  COUNTED_COLLECTIONS.forEach((c, i) => { counts[c] = countViews[i].count(); });
+  counts.transactions = totalsView.count();
+  const byClient = totalsView.byClient()
+    .map(({ id, net }) => ({ clientId: id, net }))
     .sort((a, b) => (b.net || 0) - (a.net || 0));
-  const topClient = byClient[0] || null;
   return {
-    totals: { income: totals.income, expense: totals.expense, net: totals.net },
-    counts: { clients: clients.length, venues: venues.length, outfits: outfits.length, shifts: shifts.length, transactions: tx.length },
+    totals: totalsView.totals(),
+    counts,
     byClient,
-    topClient,
+    topClient: byClient[0] || null,
   };
 }
 
+// Full recompute of the KPI aggregates from the records
+function computeKpiFromRecords(collections) {
+  const tx = collections.transactions;
+  const totals = { income: 0, expense: 0 };
+  const byClient = new Map();
+  const byOutfit = new Map();
+  const add = (map, id, t, amt) => {
+    if (!id) return;
+    const prev = map.get(id) || { income: 0, expense: 0 };
+    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
+    map.set(id, prev);
+  };
+  tx.forEach(t => {
+    if (!t) return;
+    const amt = transactionAmount(t);
+    if (t.type === 'income') totals.income += amt; else if (t.type === 'expense') totals.expense += amt;
+    add(byClient, t.clientId || null, t, amt);
+    add(byOutfit, t.outfitId || null, t, amt);
+  });
+  const counts = { transactions: tx.length };
+  COUNTED_COLLECTIONS.forEach(c => { counts[c] = collections[c].length; });
+  const nets = map => new Map(Array.from(map.entries()).map(([id, v]) => [id, v.income - v.expense]));
+  return { totals: { ...totals, net: totals.income - totals.expense }, counts, byClient: nets(byClient), byOutfit: nets(byOutfit) };
+}
+
+/**
+ * Compare the materialized KPI aggregates with a full recompute from the records.
+ * Returns { ok, mismatches }; with `repair` the aggregates are rebuilt when they disagree.
+ */
+export async function checkKpiAggregates(_db, { repair = false, tolerance = 1e-6 } = {}) {
+  const collections = {};
+  for (const c of [...COUNTED_COLLECTIONS, 'transactions']) collections[c] = await readLocal(c);
+  const expected = computeKpiFromRecords(collections);
+  const totalsView = await getView('transactions', 'totals');
+  const mismatches = [];
+  const close = (a, b) => Math.abs(a - b) <= tolerance * Math.max(1, Math.abs(a), Math.abs(b));
+
+  for (const c of COUNTED_COLLECTIONS) {
+    const actual = (await getView(c, 'count')).count();
+    if (actual !== expected.counts[c]) mismatches.push({ field: `counts.${c}`, expected: expected.counts[c], actual });
+  }
+  if (totalsView.count() !== expected.counts.transactions) {
+    mismatches.push({ field: 'counts.transactions', expected: expected.counts.transactions, actual: totalsView.count() });
+  }
+  const totals = totalsView.totals();
+  ['income', 'expense', 'net'].forEach(k => {
+    if (!close(totals[k], expected.totals[k])) mismatches.push({ field: `totals.${k}`, expected: expected.totals[k], actual: totals[k] });
+  });
+  [['byClient', totalsView.byClient()], ['byOutfit', totalsView.byOutfit()]].forEach(([field, rows]) => {
+    const want = expected[field];
+    const seen = new Set();
+    rows.forEach(({ id, net }) => {
+      seen.add(id);
+      if (!want.has(id) || !close(net, want.get(id))) mismatches.push({ field: `${field}.${id}`, expected: want.get(id) ?? null, actual: net });
+    });
+    want.forEach((net, id) => { if (!seen.has(id)) mismatches.push({ field: `${field}.${id}`, expected: net, actual: null }); });
+  });
+
+  if (mismatches.length && repair) {
+    for (const c of [...COUNTED_COLLECTIONS, 'transactions']) await rebuildViews(c);
+  }
+  return { ok: mismatches.length === 0, mismatches };
+}
+
 export async function getAllDataSnapshot(_db) {
   return {
-    venues: readLocal('venues'),
-    shifts: readLocal('shifts'),
-    transactions: readLocal('transactions'),
-    clients: readLocal('clients'),
-    outfits: readLocal('outfits'),
-    events: readLocal('events'),
+    venues: await readLocal('venues'),
+    shifts: await readLocal('shifts'),
+    transactions: await readLocal('transactions'),
+    clients: await readLocal('clients'),
+    outfits: await readLocal('outfits'),
+    events: await readLocal('events'),
   };
 }
 
 export async function importAllDataSnapshot(_db, snapshot) {
   const safe = snapshot || {};
-  writeLocal('venues', Array.isArray(safe.venues) ? safe.venues : []);
-  writeLocal('shifts', Array.isArray(safe.shifts) ? safe.shifts : []);
-  writeLocal('transactions', Array.isArray(safe.transactions) ? safe.transactions : []);
-  writeLocal('clients', Array.isArray(safe.clients) ? safe.clients : []);
-  writeLocal('outfits', Array.isArray(safe.outfits) ? safe.outfits : []);
-  writeLocal('events', Array.isArray(safe.events) ? safe.events : []);
+  await batchRecords(async () => {
+    await replaceCollection('venues', Array.isArray(safe.venues) ? safe.venues : []);
+    await replaceCollection('shifts', Array.isArray(safe.shifts) ? safe.shifts : []);
+    await replaceCollection('transactions', Array.isArray(safe.transactions) ? safe.transactions : []);
+    await replaceCollection('clients', Array.isArray(safe.clients) ? safe.clients : []);
+    await replaceCollection('outfits', Array.isArray(safe.outfits) ? safe.outfits : []);
+    await replaceCollection('events', Array.isArray(safe.events) ? safe.events : []);
+  });
   return true;
 }
 // Update an existing transaction by id
 export async function updateTransaction(_db, payload) {
-  const list = readLocal('transactions');
   if (!payload || !payload.id) return null;
-  const next = list.map(t => t.id === payload.id ? { ...t, ...payload } : t);
-  writeLocal('transactions', next);
-  return next.find(t => t.id === payload.id) || null;
+  return await updateRecords('transactions', payload.id, t => ({ ...t, ...payload }));
 }
 
 // AI Reports
 // Get all AI reports, sorted by most recent first
 export async function getAiReports(_db) {
-  const reports = readLocal('aiReports');
-  return reports.sort((a, b) => new Date(b.createdAt || 0) - new Date(a.createdAt || 0));
+  const reports = await readLocal('aiReports');
+  return reports.slice().sort((a, b) => new Date(b.createdAt || 0) - new Date(a.createdAt || 0));
 }
 
 // Insert a new AI report
 export async function insertAiReport(_db, payload) {
-  const list = readLocal('aiReports');
   const id = payload.id || `air_${Date.now()}`;
   const row = { 
     id, 
@@ -481,31 +816,27 @@ export async function insertAiReport(_db, payload) {
     updatedAt: new Date().toISOString(),
     ...payload 
   };
-  writeLocal('aiReports', [row, ...list]);
+  await prependRecord('aiReports', row);
   return row;
 }
 
 // Update an existing AI report
 export async function updateAiReport(_db, payload) {
-  const list = readLocal('aiReports');
-  const next = list.map(r => r.id === payload.id ? { 
-    ...r, 
+  return await updateRecords('aiReports', payload.id, r => ({
+    ...r,
     ...payload,
     updatedAt: new Date().toISOString()
-  } : r);
-  writeLocal('aiReports', next);
-  return next.find(r => r.id === payload.id) || null;
+  }));
 }
 
 // Delete an AI report by id
 export async function deleteAiReport(_db, id) {
-  const list = readLocal('aiReports');
-  writeLocal('aiReports', list.filter(r => r.id !== id));
+  await removeRecords('aiReports', id);
   return true;
 }
 
 // Get a specific AI report by id
 export async function getAiReportById(_db, id) {
-  const list = readLocal('aiReports');
+  const list = await readLocal('aiReports');
   return list.find(r => r.id === id) || null;
 }
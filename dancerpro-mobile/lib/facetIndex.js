@@ -0,0 +1,288 @@
+// Bitmap facet index over one collection, kept current by lib/recordStore.js (see defineView there).
+//
+// Every record gets a row number (slots of removed records are reused). For each facet value there
+// is a bitmap (Uint32Array, bit `row` set when the record has that value), and each range column is
+// a Float64Array of row -> number. A filter combination is then a few word-wise ANDs/ORs of
+// bitmaps instead of one pass over the records per predicate, and a facet chip's count is the
+// popcount of (other filters AND value bitmap).
+//
+// Each facet also keeps row -> value code (Int32Array), so counts over a small selection can tally
+// its rows instead of intersecting every value's bitmap; valueCounts() picks the cheaper way.
+//
+// Bitmaps are plain Uint32Arrays sized for the current capacity; the helpers below combine them.
+// They stay valid until the next write to the collection.
+
+const MIN_WORDS = 4;
+
+export function andBits(a, b) {
+  const out = new Uint32Array(a.length);
+  for (let i = 0; i < a.length; i++) out[i] = a[i] & b[i];
+  return out;
+}
+
+// `into |= b`, in place
+export function orBitsInto(into, b) {
+  for (let i = 0; i < into.length; i++) into[i] |= b[i];
+  return into;
+}
+
+function popcount32(v) {
+  v -= (v >>> 1) & 0x55555555;
+  v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+  return (((v + (v >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+export function countBits(bits) {
+  let n = 0;
+  for (let i = 0; i < bits.length; i++) if (bits[i]) n += popcount32(bits[i]);
+  return n;
+}
+
+// popcount(a & b) without allocating the intersection
+export function countAnd(a, b) {
+  let n = 0;
+  for (let i = 0; i < a.length; i++) {
+    const w = a[i] & b[i];
+    if (w) n += popcount32(w);
+  }
+  return n;
+}
+
+/**
+ * @param {{ facets: Record<string, (record: object) => any>, ranges?: Record<string, (record: object) => number> }} spec
+ *   facet getters may return an array (the record then has each value); null/undefined/'' is no value.
+ *   Range getters return a number, or NaN when the record has none (it never matches a range).
+ */
+export function createFacetIndex({ facets, ranges = {} }) {
+  const facetNames = Object.keys(facets);
+  const rangeNames = Object.keys(ranges);
+  let words = MIN_WORDS;
+  let rowOf = new Map();     // record -> row
+  let records = [];          // row -> record (undefined for free rows)
+  let freeRows = [];
+  let live = new Uint32Array(words);
+  let values = {};           // facet -> Map<value, Uint32Array>
+  let sizes = {};            // facet -> Map<value, rows>; a value's bitmap is dropped at 0
+  let columns = {};          // range -> Float64Array
+  let codes = {};            // facet -> Int32Array row -> value code (-1 none)
+  let dictionaries = {};     // facet -> { values: [], codes: Map<value, code> }
+  let multiValued = {};      // facet -> some record has several values (codes then hold only one)
+  let version = 0;
+
+  function reset(capacityRows) {
+    words = Math.max(MIN_WORDS, Math.ceil(capacityRows / 32));
+    rowOf = new Map();
+    records = [];
+    freeRows = [];
+    live = new Uint32Array(words);
+    values = {};
+    sizes = {};
+    columns = {};
+    codes = {};
+    dictionaries = {};
+    multiValued = {};
+    version += 1;
+    facetNames.forEach(name => {
+      values[name] = new Map();
+      sizes[name] = new Map();
+      codes[name] = new Int32Array(words * 32).fill(-1);
+      dictionaries[name] = { values: [], codes: new Map() };
+      multiValued[name] = false;
+    });
+    rangeNames.forEach(name => { columns[name] = new Float64Array(words * 32).fill(NaN); });
+  }
+
+  function grow() {
+    const nextWords = words * 2;
+    const widen = bits => {
+      const next = new Uint32Array(nextWords);
+      next.set(bits);
+      return next;
+    };
+    live = widen(live);
+    facetNames.forEach(name => {
+      values[name].forEach((bits, value) => values[name].set(value, widen(bits)));
+      const next = new Int32Array(nextWords * 32).fill(-1);
+      next.set(codes[name]);
+      codes[name] = next;
+    });
+    rangeNames.forEach(name => {
+      const next = new Float64Array(nextWords * 32).fill(NaN);
+      next.set(columns[name]);
+      columns[name] = next;
+    });
+    words = nextWords;
+  }
+
+  function valuesOf(name, record) {
+    const raw = facets[name](record);
+    if (!Array.isArray(raw)) return raw == null || raw === '' ? [] : [raw];
+    return Array.from(new Set(raw.filter(v => v != null && v !== '')));
+  }
+
+  function encode(name, value) {
+    const dict = dictionaries[name];
+    let code = dict.codes.get(value);
+    if (code === undefined) {
+      code = dict.values.length;
+      dict.codes.set(value, code);
+      dict.values.push(value);
+    }
+    return code;
+  }
+
+  function add(record) {
+    if (!record || rowOf.has(record)) return;
+    let row = freeRows.pop();
+    if (row === undefined) {
+      row = records.length;
+      if (row >= words * 32) grow();
+    }
+    const word = row >>> 5;
+    const bit = 1 << (row & 31);
+    rowOf.set(record, row);
+    records[row] = record;
+    live[word] |= bit;
+    version += 1;
+    facetNames.forEach(name => {
+      const list = valuesOf(name, record);
+      if (list.length > 1) multiValued[name] = true;
+      codes[name][row] = list.length ? encode(name, list[0]) : -1;
+      list.forEach(value => {
+        let bits = values[name].get(value);
+        if (!bits) {
+          bits = new Uint32Array(words);
+          values[name].set(value, bits);
+        }
+        bits[word] |= bit;
+        sizes[name].set(value, (sizes[name].get(value) || 0) + 1);
+      });
+    });
+    rangeNames.forEach(name => {
+      const v = Number(ranges[name](record));
+      columns[name][row] = Number.isFinite(v) ? v : NaN;
+    });
+  }
+
+  function remove(record) {
+    const row = record ? rowOf.get(record) : undefined;
+    if (row === undefined) return;
+    const word = row >>> 5;
+    const mask = ~(1 << (row & 31));
+    rowOf.delete(record);
+    records[row] = undefined;
+    freeRows.push(row);
+    live[word] &= mask;
+    version += 1;
+    facetNames.forEach(name => {
+      valuesOf(name, record).forEach(value => {
+        const bits = values[name].get(value);
+        if (!bits) return;
+        const left = sizes[name].get(value) - 1;
+        if (left > 0) {
+          bits[word] &= mask;
+          sizes[name].set(value, left);
+        } else {
+          values[name].delete(value);
+          sizes[name].delete(value);
+        }
+      });
+    });
+    rangeNames.forEach(name => { columns[name][row] = NaN; });
+    facetNames.forEach(name => { codes[name][row] = -1; });
+  }
+
+  function forEachRow(bits, fn) {
+    for (let w = 0; w < bits.length; w++) {
+      let word = bits[w];
+      while (word) {
+        const low = word & -word;
+        fn((w << 5) + 31 - Math.clz32(low));
+        word ^= low;
+      }
+    }
+  }
+
+  reset(0);
+
+  return {
+    build(list) {
+      reset(list.length);
+      list.forEach(add);
+    },
+    add,
+    remove,
+    // Changes on every write; bitmaps from an older version must not be combined with newer ones
+    version: () => version,
+    // Every live row
+    all: () => live.slice(),
+    none: () => new Uint32Array(words),
+    // Rows having any of `wanted` for `facet`
+    bitsFor(facet, wanted) {
+      const out = new Uint32Array(words);
+      (Array.isArray(wanted) ? wanted : [wanted]).forEach(value => {
+        const bits = values[facet]?.get(value);
+        if (bits) orBitsInto(out, bits);
+      });
+      return out;
+    },
+    // Rows whose range column is within [lo, hi] (null = open end)
+    rangeBits(name, lo, hi) {
+      const column = columns[name];
+      const min = lo == null ? -Infinity : lo;
+      const max = hi == null ? Infinity : hi;
+      const out = new Uint32Array(words);
+      for (let w = 0; w < words; w++) {
+        const base = w << 5;
+        let acc = 0;
+        for (let b = 0; b < 32; b++) {
+          const v = column[base + b];
+          if (v >= min && v <= max) acc |= 1 << b;
+        }
+        out[w] = acc;
+      }
+      return out;
+    },
+    // Rows of the given records (e.g. full-text search hits)
+    bitsOf(list) {
+      const out = new Uint32Array(words);
+      for (const record of list) {
+        const row = rowOf.get(record);
+        if (row !== undefined) out[row >>> 5] |= 1 << (row & 31);
+      }
+      return out;
+    },
+    has(bits, record) {
+      const row = rowOf.get(record);
+      return row !== undefined && (bits[row >>> 5] & (1 << (row & 31))) !== 0;
+    },
+    // Records of the set bits, in row order
+    records(bits) {
+      const out = [];
+      forEachRow(bits, row => out.push(records[row]));
+      return out;
+    },
+    // value -> number of rows in `within` having it, for every value of `facet` present there
+    valueCounts(facet, within) {
+      const out = new Map();
+      if (!values[facet]) return out;
+      // Tallying rows costs ~1 step per selected row; intersecting costs words per value
+      if (!multiValued[facet] && countBits(within) < values[facet].size * words) {
+        const column = codes[facet];
+        const tally = new Int32Array(dictionaries[facet].values.length);
+        forEachRow(within, row => {
+          const code = column[row];
+          if (code >= 0) tally[code] += 1;
+        });
+        tally.forEach((n, code) => { if (n) out.set(dictionaries[facet].values[code], n); });
+        return out;
+      }
+      values[facet].forEach((bits, value) => {
+        const n = countAnd(bits, within);
+        if (n) out.set(value, n);
+      });
+      return out;
+    },
+    facetValues: facet => Array.from(values[facet]?.keys() || []),
+  };
+}
@@ -0,0 +1,83 @@
+// Materialized aggregates kept current by lib/recordStore.js (see defineView there).
+// Each view is updated in O(1) per written record and serializes to a small JSON document, so the
+// Dashboard KPIs can be read without loading the underlying collections.
+
+// Amount of a transaction as the KPI math counts it (unparseable amounts count as 0)
+export function transactionAmount(t) {
+  const amt = Number(t?.amount || 0);
+  return Number.isFinite(amt) ? amt : 0;
+}
+
+// Number of records in a collection
+export function createCountView() {
+  let count = 0;
+  return {
+    build(records) { count = records.length; },
+    add() { count += 1; },
+    remove() { count = Math.max(0, count - 1); },
+    serialize() { return { count }; },
+    restore(data) { count = Number(data?.count || 0); },
+    count: () => count,
+  };
+}
+
+function bump(map, id, type, amt, sign) {
+  if (!id) return;
+  const prev = map.get(id) || { income: 0, expense: 0, count: 0 };
+  if (type === 'income') prev.income += sign * amt;
+  else if (type === 'expense') prev.expense += sign * amt;
+  prev.count += sign;
+  // Drop entries whose last transaction is gone (also discards float residue from add/remove)
+  if (prev.count <= 0) map.delete(id);
+  else map.set(id, prev);
+}
+
+// Transaction totals: overall income/expense plus per-client and per-outfit breakdowns
+export function createTransactionTotalsView() {
+  let count = 0;
+  let income = 0;
+  let expense = 0;
+  let byClient = new Map();
+  let byOutfit = new Map();
+
+  function apply(t, sign) {
+    if (!t) return;
+    const amt = transactionAmount(t);
+    count += sign;
+    if (t.type === 'income') income += sign * amt;
+    else if (t.type === 'expense') expense += sign * amt;
+    bump(byClient, t.clientId || null, t.type, amt, sign);
+    bump(byOutfit, t.outfitId || null, t.type, amt, sign);
+    if (count <= 0) { count = 0; income = 0; expense = 0; }
+  }
+
+  return {
+    build(records) {
+      count = 0; income = 0; expense = 0;
+      byClient = new Map();
+      byOutfit = new Map();
+      records.forEach(t => apply(t, 1));
+    },
+    add(t) { apply(t, 1); },
+    remove(t) { apply(t, -1); },
+    serialize() {
+      return { count, income, expense, byClient: Array.from(byClient.entries()), byOutfit: Array.from(byOutfit.entries()) };
+    },
+    restore(data) {
+      count = Number(data?.count || 0);
+      income = Number(data?.income || 0);
+      expense = Number(data?.expense || 0);
+      byClient = new Map(Array.isArray(data?.byClient) ? data.byClient : []);
+      byOutfit = new Map(Array.isArray(data?.byOutfit) ? data.byOutfit : []);
+    },
+    count: () => count,
+    totals: () => ({ income, expense, net: income - expense }),
+    // [{ id, income, expense, net }] in first-seen order
+    byClient: () => Array.from(byClient.entries()).map(([id, t]) => ({ id, income: t.income, expense: t.expense, net: t.income - t.expense })),
+    byOutfit: () => Array.from(byOutfit.entries()).map(([id, t]) => ({ id, income: t.income, expense: t.expense, net: t.income - t.expense })),
+    outfitNet: id => {
+      const t = byOutfit.get(id);
+      return t ? t.income - t.expense : 0;
+    },
+  };
+}
@@ -0,0 +1,142 @@
+// Secondary indexes over one collection, kept up to date by lib/recordStore.js.
+//
+// Every indexed record is held as an entry { t, record } with its timestamp parsed once (epoch ms).
+// `all` keeps every entry sorted by t; each indexed field (clientId, venueId, ...) keeps a posting
+// list per value, also sorted by t. Range queries binary-search the bounds and return entries
+// newest-first, so a client/venue query costs O(log n + k) instead of a scan of the collection.
+// Records without a parseable timestamp are not indexed (date-range queries never matched them).
+//
+// Ties on t are returned in collection order: entries are inserted after their equals, and the
+// collection is built back-to-front, so reversing gives newest-prepended first.
+//
+// `t` does not have to be a time: any numeric sort key works (e.g. a transaction amount), which is
+// how paginated queries walk a collection in amount order.
+
+export function parseTime(value) {
+  if (value == null || value === '') return NaN;
+  if (typeof value === 'number') return value;
+  return new Date(value).getTime();
+}
+
+// Index of the first entry with t > time (upperBound) or t >= time (lowerBound)
+function bound(entries, time, upper) {
+  let lo = 0;
+  let hi = entries.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    const t = entries[mid].t;
+    if (t < time || (upper && t === time)) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function insertSorted(entries, entry) {
+  const at = bound(entries, entry.t, true);
+  if (at === entries.length) entries.push(entry);
+  else entries.splice(at, 0, entry);
+}
+
+function removeSorted(entries, record, t) {
+  for (let i = bound(entries, t, false); i < entries.length && entries[i].t === t; i++) {
+    if (entries[i].record === record) {
+      entries.splice(i, 1);
+      return true;
+    }
+  }
+  return false;
+}
+
+function* walk(entries, start, end, descending) {
+  const from = start == null ? 0 : bound(entries, start, false);
+  const to = end == null ? entries.length : bound(entries, end, true);
+  if (descending) {
+    for (let i = to - 1; i >= from; i--) yield entries[i];
+  } else {
+    for (let i = from; i < to; i++) yield entries[i];
+  }
+}
+
+function sliceNewestFirst(entries, start, end) {
+  const from = start == null ? 0 : bound(entries, start, false);
+  const to = end == null ? entries.length : bound(entries, end, true);
+  const out = [];
+  for (let i = to - 1; i >= from; i--) out.push(entries[i]);
+  return out;
+}
+
+/**
+ * @param {{ timeOf: (record: object) => any, fields?: string[] }} spec
+ */
+export function createRecordIndex({ timeOf, fields = [] }) {
+  let all = [];
+  let version = 0;
+  const postings = new Map(fields.map(f => [f, new Map()]));
+
+  function entryTime(record) {
+    return record ? parseTime(timeOf(record)) : NaN;
+  }
+
+  function add(record) {
+    const t = entryTime(record);
+    if (!Number.isFinite(t)) return;
+    const entry = { t, record };
+    version += 1;
+    insertSorted(all, entry);
+    postings.forEach((byValue, field) => {
+      const value = record[field];
+      if (value == null || value === '') return;
+      if (!byValue.has(value)) byValue.set(value, []);
+      insertSorted(byValue.get(value), entry);
+    });
+  }
+
+  function remove(record) {
+    const t = entryTime(record);
+    if (!Number.isFinite(t)) return;
+    version += 1;
+    removeSorted(all, record, t);
+    postings.forEach((byValue, field) => {
+      const list = byValue.get(record[field]);
+      if (!list) return;
+      removeSorted(list, record, t);
+      if (!list.length) byValue.delete(record[field]);
+    });
+  }
+
+  function build(records) {
+    version += 1;
+    all = [];
+    postings.forEach(byValue => byValue.clear());
+    for (let i = records.length - 1; i >= 0; i--) add(records[i]);
+  }
+
+  // Entries with start <= t <= end (either bound optional), newest first
+  function range(start, end) {
+    return sliceNewestFirst(all, start, end);
+  }
+
+  function rangeBy(field, value, start, end) {
+    const list = postings.get(field)?.get(value);
+    return list ? sliceNewestFirst(list, start, end) : [];
+  }
+
+  // Lazy walk over [start, end] (of one field value's posting list when `field` is given), newest
+  // first unless `descending` is false. Stop consuming it before the next write to the collection.
+  function entries(start, end, { field, value, descending = true } = {}) {
+    const list = field ? postings.get(field)?.get(value) : all;
+    return walk(list || [], start, end, descending);
+  }
+
+  return {
+    add,
+    remove,
+    build,
+    range,
+    rangeBy,
+    entries,
+    size: () => all.length,
+    // Changes on every add/remove/build; lets callers cache results derived from the index
+    version: () => version,
+  };
+}
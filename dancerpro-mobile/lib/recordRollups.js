@@ -0,0 +1,155 @@
+// Time-bucketed rollups kept current by lib/recordStore.js (see defineView there).
+//
+// For every scope ('all', `client:<id>`, `venue:<id>`) a record is added to its day, week and month
+// bucket and to an all-time day-of-week bucket. Buckets hold a record count `n` plus the summed
+// fields returned by `measure(record)` (e.g. { earnings } for shifts).
+//
+// Day/week/month buckets are UTC (the same calendar days as the `earningsHistory` keys built from
+// toISOString()); weeks start on Monday. Day-of-week uses the device's local day, like the bestDay
+// logic, so every day bucket also keeps a split by local day-of-week (a UTC day spans at most two).
+
+import { parseTime } from './recordIndex.js';
+
+export const DAY_MS = 24 * 60 * 60 * 1000;
+export const GRANULARITIES = ['day', 'week', 'month'];
+
+export function bucketStart(t, granularity) {
+  const day = Math.floor(t / DAY_MS) * DAY_MS;
+  if (granularity === 'day') return day;
+  if (granularity === 'week') return day - ((new Date(day).getUTCDay() + 6) % 7) * DAY_MS;
+  const d = new Date(t);
+  return Date.UTC(d.getUTCFullYear(), d.getUTCMonth(), 1);
+}
+
+function nextBucket(start, granularity) {
+  if (granularity === 'day') return start + DAY_MS;
+  if (granularity === 'week') return start + 7 * DAY_MS;
+  const d = new Date(start);
+  return Date.UTC(d.getUTCFullYear(), d.getUTCMonth() + 1, 1);
+}
+
+export function bucketKey(start, granularity) {
+  const iso = new Date(start).toISOString();
+  return granularity === 'month' ? iso.slice(0, 7) : iso.slice(0, 10);
+}
+
+function emptyBucket() {
+  return { n: 0 };
+}
+
+function addTo(bucket, values, sign) {
+  bucket.n += sign;
+  Object.keys(values).forEach(k => { bucket[k] = (bucket[k] || 0) + sign * values[k]; });
+  // Reset once empty so add/remove round-off never lingers
+  if (bucket.n <= 0) Object.keys(bucket).forEach(k => { if (typeof bucket[k] === 'number') bucket[k] = 0; });
+}
+
+function copyBucket(bucket) {
+  const { byDow, ...rest } = bucket;
+  return { ...rest };
+}
+
+/**
+ * @param {{ timeOf: (record: object) => any, fields?: string[], measure: (record: object) => object }} spec
+ *   `fields` name the record properties that define extra scopes (clientId -> `client:<id>`, ...)
+ */
+export function createRollupView({ timeOf, fields = [], measure }) {
+  let scopes = new Map();
+
+  function scopesOf(record) {
+    const out = ['all'];
+    fields.forEach(field => {
+      const value = record[field];
+      if (value != null && value !== '') out.push(`${field.replace(/Id$/, '')}:${value}`);
+    });
+    return out;
+  }
+
+  function getScope(name) {
+    if (!scopes.has(name)) {
+      scopes.set(name, {
+        total: emptyBucket(),
+        dow: Array.from({ length: 7 }, emptyBucket),
+        day: new Map(),
+        week: new Map(),
+        month: new Map(),
+      });
+    }
+    return scopes.get(name);
+  }
+
+  function apply(record, sign) {
+    if (!record) return;
+    const t = parseTime(timeOf(record));
+    if (!Number.isFinite(t)) return;
+    const values = measure(record);
+    const dow = new Date(t).getDay();
+    scopesOf(record).forEach(name => {
+      const scope = getScope(name);
+      addTo(scope.total, values, sign);
+      addTo(scope.dow[dow], values, sign);
+      GRANULARITIES.forEach(g => {
+        const start = bucketStart(t, g);
+        const bucket = scope[g].get(start) || (g === 'day' ? { n: 0, byDow: new Map() } : emptyBucket());
+        addTo(bucket, values, sign);
+        if (g === 'day') {
+          const split = bucket.byDow.get(dow) || emptyBucket();
+          addTo(split, values, sign);
+          if (split.n > 0) bucket.byDow.set(dow, split); else bucket.byDow.delete(dow);
+        }
+        if (bucket.n > 0) scope[g].set(start, bucket); else scope[g].delete(start);
+      });
+      if (scope.total.n <= 0) scopes.delete(name);
+    });
+  }
+
+  /**
+   * Buckets of one scope whose start lies in [bucketStart(start), bucketStart(end)], oldest first.
+   * Touches one map entry per bucket in the range, independent of how many records it holds.
+   * @returns {{ start: number, key: string, n: number, byDow?: Map }[]}
+   */
+  function range(scopeName, granularity, start, end, { fill = false, withDow = false } = {}) {
+    const scope = scopes.get(scopeName);
+    if (!GRANULARITIES.includes(granularity)) throw new Error(`Unknown granularity: ${granularity}`);
+    const out = [];
+    if (!scope && !fill) return out;
+    const last = bucketStart(end, granularity);
+    for (let at = bucketStart(start, granularity); at <= last; at = nextBucket(at, granularity)) {
+      const bucket = scope?.[granularity].get(at);
+      if (!bucket && !fill) continue;
+      const row = { start: at, key: bucketKey(at, granularity), ...(bucket ? copyBucket(bucket) : emptyBucket()) };
+      if (withDow && bucket?.byDow) row.byDow = bucket.byDow;
+      out.push(row);
+    }
+    return out;
+  }
+
+  // All-time totals per local day-of-week (0 = Sunday)
+  function dayOfWeek(scopeName) {
+    const scope = scopes.get(scopeName);
+    return Array.from({ length: 7 }, (_, dow) => ({ dow, ...(scope ? copyBucket(scope.dow[dow]) : emptyBucket()) }));
+  }
+
+  function total(scopeName) {
+    const scope = scopes.get(scopeName);
+    return scope ? copyBucket(scope.total) : emptyBucket();
+  }
+
+  // Scope names with at least one record, optionally restricted to a prefix such as 'venue:'
+  function scopeNames(prefix = '') {
+    return Array.from(scopes.keys()).filter(name => name.startsWith(prefix));
+  }
+
+  return {
+    build(records) {
+      scopes = new Map();
+      records.forEach(r => apply(r, 1));
+    },
+    add(record) { apply(record, 1); },
+    remove(record) { apply(record, -1); },
+    range,
+    dayOfWeek,
+    total,
+    scopeNames,
+  };
+}
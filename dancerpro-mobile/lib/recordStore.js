@@ -0,0 +1,620 @@
+// Keyed record store behind lib/db.js.
+//
+// Web: one IndexedDB database per user (`dancerpro_<userId>`) with one object store per collection.
+// Records are stored under a numeric position key ("seq"): collections keep their existing order
+// (new rows are prepended with seq = first - 1) and an insert/update/delete touches one record
+// instead of re-serializing the whole array. Reads are served from an in-memory list hydrated once
+// per collection; writes update that list and queue per-record ops, which are flushed together in a
+// single readwrite transaction once the browser is idle (and at the latest when the page is hidden or
+// unloaded). batchRecords() holds the flush back until a group of writes is done.
+//
+// Without IndexedDB (native fallback, Node tests, blocked storage) collections are persisted as whole
+// arrays in localStorage under `${collection}_${userId}`, exactly as before.
+//
+// Derived views (indexes, aggregates) registered with defineView() are built on first use, updated
+// record-by-record by every write below and rebuilt when a collection is replaced. Views marked
+// `persist` are saved in the meta store in the same transaction as the records they describe, so
+// they can be served on the next start without loading the collection.
+
+export const COLLECTIONS = ['venues', 'shifts', 'transactions', 'clients', 'outfits', 'events', 'aiReports'];
+
+const DB_VERSION = 1;
+const META_STORE = 'meta';
+const MIGRATION_FLAG = 'migratedFromLocalStorage';
+
+function getLocalStorage() {
+  return typeof window !== 'undefined' && window.localStorage ? window.localStorage : null;
+}
+
+function getIndexedDb() {
+  if (typeof window !== 'undefined' && window.indexedDB) return window.indexedDB;
+  return typeof indexedDB !== 'undefined' ? indexedDB : null;
+}
+
+let indexedDbFailed = false;
+
+export function hasIndexedDb() {
+  return !indexedDbFailed && !!getIndexedDb();
+}
+
+export function getCurrentUserId() {
+  const ls = getLocalStorage();
+  if (!ls) return null;
+  try {
+    const userData = ls.getItem('userData');
+    if (userData) {
+      const parsed = JSON.parse(userData);
+      return parsed.id || parsed.email || null;
+    }
+  } catch {}
+  return null;
+}
+
+function legacyKey(collection, userId) {
+  return userId ? `${collection}_${userId}` : collection;
+}
+
+function databaseName(userId) {
+  return `dancerpro_${userId || 'anonymous'}`;
+}
+
+function promisify(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function transactionDone(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error || new Error('IndexedDB transaction aborted'));
+  });
+}
+
+// ---- IndexedDB connections (one per user) ----
+
+const connections = new Map();
+
+// Copy the user's legacy localStorage arrays into the object stores once, then drop the old keys
+async function migrateFromLocalStorage(db, userId) {
+  const flag = await promisify(db.transaction(META_STORE).objectStore(META_STORE).get(MIGRATION_FLAG));
+  if (flag) return;
+  const ls = getLocalStorage();
+  const tx = db.transaction([...COLLECTIONS, META_STORE], 'readwrite');
+  const migrated = [];
+  COLLECTIONS.forEach(collection => {
+    const key = legacyKey(collection, userId);
+    let rows = null;
+    try {
+      const raw = ls ? ls.getItem(key) : null;
+      rows = raw ? JSON.parse(raw) : null;
+    } catch {}
+    if (!Array.isArray(rows)) return;
+    const store = tx.objectStore(collection);
+    rows.forEach((row, seq) => store.put(row, seq));
+    migrated.push({ key, count: rows.length });
+  });
+  tx.objectStore(META_STORE).put({ at: new Date().toISOString(), collections: migrated }, MIGRATION_FLAG);
+  await transactionDone(tx);
+  migrated.forEach(({ key }) => { try { ls.removeItem(key); } catch {} });
+  if (migrated.length) {
+    console.log(`[DB] Migrated ${migrated.length} collections from localStorage to IndexedDB for user: ${userId}`);
+  }
+}
+
+function openUserDb(userId) {
+  const name = databaseName(userId);
+  if (connections.has(name)) return connections.get(name);
+  const opening = (async () => {
+    const request = getIndexedDb().open(name, DB_VERSION);
+    request.onupgradeneeded = () => {
+      const db = request.result;
+      [...COLLECTIONS, META_STORE].forEach(store => {
+        if (!db.objectStoreNames.contains(store)) db.createObjectStore(store);
+      });
+    };
+    const db = await promisify(request);
+    db.onversionchange = () => { db.close(); connections.delete(name); };
+    await migrateFromLocalStorage(db, userId);
+    return db;
+  })();
+  connections.set(name, opening);
+  opening.catch(() => connections.delete(name));
+  return opening;
+}
+
+// ---- In-memory collection state ----
+// state: { list, seqs } with seqs[i] the store key of list[i]; both are replaced (never mutated) on
+// write so arrays already handed to callers keep their contents.
+
+const states = new Map();
+const loading = new Map();
+
+function scopeKey(collection, userId, driver) {
+  return `${driver}:${legacyKey(collection, userId)}`;
+}
+
+function currentDriver() {
+  return hasIndexedDb() ? 'idb' : 'local';
+}
+
+async function loadFromIndexedDb(collection, userId) {
+  const db = await openUserDb(userId);
+  const store = db.transaction(collection).objectStore(collection);
+  const [list, seqs] = await Promise.all([promisify(store.getAll()), promisify(store.getAllKeys())]);
+  return { list, seqs };
+}
+
+function loadFromLocalStorage(collection, userId) {
+  const ls = getLocalStorage();
+  let list = [];
+  try {
+    const raw = ls ? ls.getItem(legacyKey(collection, userId)) : null;
+    const parsed = raw ? JSON.parse(raw) : null;
+    if (Array.isArray(parsed)) list = parsed;
+  } catch {}
+  return { list, seqs: list.map((_, i) => i) };
+}
+
+async function getState(collection) {
+  const userId = getCurrentUserId();
+  if (hasIndexedDb()) {
+    const key = scopeKey(collection, userId, 'idb');
+    if (states.has(key)) return { key, userId, driver: 'idb', state: states.get(key) };
+    try {
+      if (!loading.has(key)) loading.set(key, loadFromIndexedDb(collection, userId).finally(() => loading.delete(key)));
+      const loaded = await loading.get(key);
+      // A replaceCollection() that ran while we were loading wins over what was on disk
+      if (!states.has(key)) states.set(key, loaded);
+      return { key, userId, driver: 'idb', state: states.get(key) };
+    } catch (e) {
+      console.warn('[DB] IndexedDB unavailable, falling back to localStorage', e);
+      indexedDbFailed = true;
+    }
+  }
+  const key = scopeKey(collection, userId, 'local');
+  if (!states.has(key)) states.set(key, loadFromLocalStorage(collection, userId));
+  return { key, userId, driver: 'local', state: states.get(key) };
+}
+
+// ---- Derived views ----
+// A view is any object with build(records), add(record) and remove(record). Persisted views also
+// implement serialize() -> JSON-able data and restore(data).
+
+const viewSpecs = new Map();
+const views = new Map();
+const viewLoading = new Map();
+
+function viewMetaKey(collection, name) {
+  return `view:${collection}:${name}`;
+}
+
+function viewsFor(key) {
+  if (!views.has(key)) views.set(key, new Map());
+  return views.get(key);
+}
+
+/**
+ * Register a derived view of a collection.
+ * @param {string} collection
+ * @param {string} name
+ * @param {() => object} create Factory for an empty view
+ * @param {{ persist?: boolean, version?: number }} [options] `version` invalidates stored copies
+ */
+export function defineView(collection, name, create, { persist = false, version = 1 } = {}) {
+  if (!viewSpecs.has(collection)) viewSpecs.set(collection, new Map());
+  viewSpecs.get(collection).set(name, { create, persist, version });
+}
+
+async function readStoredView(userId, collection, name) {
+  const db = await openUserDb(userId);
+  return promisify(db.transaction(META_STORE).objectStore(META_STORE).get(viewMetaKey(collection, name)));
+}
+
+async function loadView(collection, name, spec) {
+  const userId = getCurrentUserId();
+  const driver = currentDriver();
+  const key = scopeKey(collection, userId, driver);
+  if (spec.persist && driver === 'idb' && !states.has(key)) {
+    try {
+      const stored = await readStoredView(userId, collection, name);
+      if (stored && stored.version === spec.version && !viewsFor(key).has(name)) {
+        const view = spec.create();
+        view.restore(stored.data);
+        viewsFor(key).set(name, view);
+      }
+    } catch {}
+  }
+  const existing = viewsFor(key).get(name);
+  if (existing) return existing;
+  const { key: stateKey, userId: owner, driver: stateDriver, state } = await getState(collection);
+  const built = viewsFor(stateKey);
+  if (!built.has(name)) {
+    const view = spec.create();
+    view.build(state.list);
+    built.set(name, view);
+    // Save the freshly built copy so the next start can skip the rebuild
+    if (spec.persist && stateDriver === 'idb') queueOps(collection, owner, stateDriver, () => {});
+  }
+  return built.get(name);
+}
+
+/**
+ * The named view of a collection for the current user. Built from the records (or restored from
+ * its stored copy) on first use, then kept current by every write.
+ */
+export async function getView(collection, name) {
+  const spec = viewSpecs.get(collection)?.get(name);
+  if (!spec) throw new Error(`No view ${name} defined for ${collection}`);
+  const key = scopeKey(collection, getCurrentUserId(), currentDriver());
+  const existing = views.get(key)?.get(name);
+  if (existing) return existing;
+  const loadKey = `${key}|${name}`;
+  if (!viewLoading.has(loadKey)) {
+    viewLoading.set(loadKey, loadView(collection, name, spec).finally(() => viewLoading.delete(loadKey)));
+  }
+  return viewLoading.get(loadKey);
+}
+
+// Writes to a collection run one at a time: each reads the state (and the next seq) only after the
+// previous write has applied, so concurrent inserts can't overwrite one another
+const writeChains = new Map();
+
+function serializeWrite(collection, fn) {
+  const chainKey = legacyKey(collection, getCurrentUserId());
+  const run = (writeChains.get(chainKey) || Promise.resolve()).then(fn);
+  const tail = run.catch(() => {});
+  writeChains.set(chainKey, tail);
+  tail.then(() => { if (writeChains.get(chainKey) === tail) writeChains.delete(chainKey); });
+  return run;
+}
+
+// Persisted views must exist before a write so their stored copy never falls behind the records
+async function prepareWrite(collection) {
+  const specs = viewSpecs.get(collection);
+  if (specs) {
+    for (const [name, spec] of specs) if (spec.persist) await getView(collection, name);
+  }
+  return getState(collection);
+}
+
+function applyToViews(key, fn) {
+  const byName = views.get(key);
+  if (byName) byName.forEach(view => fn(view));
+}
+
+/**
+ * Throw away and rebuild a collection's views from its records (e.g. after a consistency check).
+ */
+export async function rebuildViews(collection) {
+  const { key, userId, driver, state } = await getState(collection);
+  const specs = viewSpecs.get(collection) || new Map();
+  const byName = viewsFor(key);
+  specs.forEach((spec, name) => {
+    const view = spec.create();
+    view.build(state.list);
+    byName.set(name, view);
+  });
+  queueOps(collection, userId, driver, () => {});
+}
+
+// ---- Write queue ----
+// pending: dbName -> { userId, stores: Map<collection, { clear: boolean, ops: Map<seq, record|null> }> }
+
+const pending = new Map();
+const pendingLocal = new Map();
+let flushTimer = null;
+let flushing = null;
+
+// Writes made inside batchRecords() share one flush. While a batch is open, collections it has
+// already copied are mutated in place (see writableState), so N inserts cost N cheap unshifts
+// instead of N full copies of the list.
+let batchDepth = 0;
+const ownedByBatch = new Set();
+
+function writableState(key, state) {
+  if (batchDepth > 0 && ownedByBatch.has(key)) return state;
+  const copy = { list: state.list.slice(), seqs: state.seqs.slice() };
+  states.set(key, copy);
+  if (batchDepth > 0) ownedByBatch.add(key);
+  return copy;
+}
+
+/**
+ * Run `fn` with the write flush deferred until it settles, so every collection it touches is
+ * persisted once (one transaction / one serialization) however many records it writes.
+ * Batches nest; the outermost one schedules the flush. Writes made before a throw are kept.
+ */
+export async function batchRecords(fn) {
+  batchDepth += 1;
+  try {
+    return await fn();
+  } finally {
+    batchDepth -= 1;
+    if (batchDepth === 0) {
+      ownedByBatch.clear();
+      if (pending.size || pendingLocal.size) scheduleFlush();
+    }
+  }
+}
+
+function queueOps(collection, userId, driver, fn) {
+  if (driver === 'local') {
+    pendingLocal.set(legacyKey(collection, userId), scopeKey(collection, userId, 'local'));
+  } else {
+    const name = databaseName(userId);
+    if (!pending.has(name)) pending.set(name, { userId, stores: new Map() });
+    const stores = pending.get(name).stores;
+    if (!stores.has(collection)) stores.set(collection, { clear: false, ops: new Map() });
+    fn(stores.get(collection));
+  }
+  scheduleFlush();
+}
+
+// Longest a flush waits for the browser to go idle
+const IDLE_FLUSH_TIMEOUT_MS = 1000;
+let lifecycleHooked = false;
+
+function runScheduledFlush() {
+  flushTimer = null;
+  flushRecords().catch(e => console.warn('[DB] Flush failed', e));
+}
+
+// Persist right away when the page is hidden or unloaded; idle callbacks may never run after that
+function hookPageLifecycle() {
+  if (lifecycleHooked || typeof window === 'undefined' || typeof window.addEventListener !== 'function') return;
+  lifecycleHooked = true;
+  const flushNow = () => {
+    if (pending.size || pendingLocal.size) flushRecords().catch(e => console.warn('[DB] Flush failed', e));
+  };
+  window.addEventListener('pagehide', flushNow);
+  if (typeof document !== 'undefined' && typeof document.addEventListener === 'function') {
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'hidden') flushNow();
+    });
+  }
+}
+
+function cancelScheduledFlush() {
+  if (!flushTimer) return;
+  if (flushTimer.idle) window.cancelIdleCallback(flushTimer.id);
+  else clearTimeout(flushTimer.id);
+  flushTimer = null;
+}
+
+function scheduleFlush() {
+  hookPageLifecycle();
+  if (flushTimer || batchDepth > 0) return;
+  if (typeof window !== 'undefined' && typeof window.requestIdleCallback === 'function') {
+    flushTimer = { idle: true, id: window.requestIdleCallback(runScheduledFlush, { timeout: IDLE_FLUSH_TIMEOUT_MS }) };
+  } else {
+    flushTimer = { idle: false, id: setTimeout(runScheduledFlush, 0) };
+  }
+}
+
+// Serialized copies of the persisted views touched by a batch, taken synchronously when the flush
+// starts so they describe exactly the records queued in that batch
+function captureViews({ userId, stores }) {
+  const docs = [];
+  stores.forEach((_, collection) => {
+    const specs = viewSpecs.get(collection);
+    const byName = views.get(scopeKey(collection, userId, 'idb'));
+    if (!specs || !byName) return;
+    specs.forEach((spec, name) => {
+      const view = byName.get(name);
+      if (spec.persist && view) docs.push([viewMetaKey(collection, name), { version: spec.version, data: view.serialize() }]);
+    });
+  });
+  return docs;
+}
+
+async function flushIndexedDb({ userId, stores }, viewDocs) {
+  const db = await openUserDb(userId);
+  const tx = db.transaction([...stores.keys(), META_STORE], 'readwrite');
+  stores.forEach(({ clear, ops }, collection) => {
+    const store = tx.objectStore(collection);
+    if (clear) store.clear();
+    ops.forEach((record, seq) => {
+      if (record === null) store.delete(seq);
+      else store.put(record, seq);
+    });
+  });
+  const meta = tx.objectStore(META_STORE);
+  viewDocs.forEach(([key, doc]) => meta.put(doc, key));
+  await transactionDone(tx);
+}
+
+function flushLocalStorage(entries) {
+  const ls = getLocalStorage();
+  if (!ls) return;
+  entries.forEach((stateKey, storageKey) => {
+    const state = states.get(stateKey);
+    if (!state) return;
+    try { ls.setItem(storageKey, JSON.stringify(state.list)); } catch {}
+  });
+}
+
+/**
+ * Persist every queued write. Resolves once the data is durable (IndexedDB transaction complete).
+ */
+export async function flushRecords() {
+  cancelScheduledFlush();
+  if (flushing) await flushing.catch(() => {});
+  if (!pending.size && !pendingLocal.size) return;
+  const batches = Array.from(pending.values()).map(batch => [batch, captureViews(batch)]);
+  const local = new Map(pendingLocal);
+  pending.clear();
+  pendingLocal.clear();
+  flushing = (async () => {
+    flushLocalStorage(local);
+    for (const [batch, viewDocs] of batches) await flushIndexedDb(batch, viewDocs);
+  })();
+  try {
+    await flushing;
+  } finally {
+    flushing = null;
+  }
+}
+
+// ---- Per-user documents ----
+// Keyed values kept next to the collections (e.g. the cloud snapshot cache of lib/cloudSnapshot.js):
+// in the meta store on web, as JSON under `${key}_${userId}` in localStorage otherwise. Written
+// directly, not through the flush queue; both calls are best-effort and never throw.
+
+function documentKey(key) {
+  return `doc:${key}`;
+}
+
+export async function readDocument(key) {
+  const userId = getCurrentUserId();
+  if (hasIndexedDb()) {
+    try {
+      const db = await openUserDb(userId);
+      const value = await promisify(db.transaction(META_STORE).objectStore(META_STORE).get(documentKey(key)));
+      return value ?? null;
+    } catch {
+      return null;
+    }
+  }
+  try {
+    const raw = getLocalStorage()?.getItem(legacyKey(documentKey(key), userId));
+    return raw ? JSON.parse(raw) : null;
+  } catch {
+    return null;
+  }
+}
+
+export async function writeDocument(key, value) {
+  const userId = getCurrentUserId();
+  if (hasIndexedDb()) {
+    try {
+      const db = await openUserDb(userId);
+      const tx = db.transaction(META_STORE, 'readwrite');
+      tx.objectStore(META_STORE).put(value, documentKey(key));
+      await transactionDone(tx);
+      return true;
+    } catch {
+      return false;
+    }
+  }
+  try {
+    const ls = getLocalStorage();
+    if (!ls) return false;
+    ls.setItem(legacyKey(documentKey(key), userId), JSON.stringify(value));
+    return true;
+  } catch {
+    // e.g. quota exceeded: the document is simply not cached
+    return false;
+  }
+}
+
+// ---- Collection API used by lib/db.js ----
+
+// Bumped by every write below; with the user id it identifies the data a derived result saw
+let writeCount = 0;
+
+export function dataVersion() {
+  return `${getCurrentUserId() ?? ''}:${writeCount}`;
+}
+
+export async function loadCollection(collection) {
+  const { key, state } = await getState(collection);
+  // The caller may keep this list; later writes in the current batch must copy it again
+  ownedByBatch.delete(key);
+  return state.list;
+}
+
+export function prependRecord(collection, row) {
+  return serializeWrite(collection, () => prependNow(collection, row));
+}
+
+async function prependNow(collection, row) {
+  const { key, userId, driver, state: current } = await prepareWrite(collection);
+  const state = writableState(key, current);
+  const seq = state.seqs.length ? state.seqs[0] - 1 : 0;
+  state.list.unshift(row);
+  state.seqs.unshift(seq);
+  writeCount += 1;
+  applyToViews(key, view => view.add(row));
+  queueOps(collection, userId, driver, entry => entry.ops.set(seq, row));
+  return row;
+}
+
+/**
+ * Apply `updater(record)` to every record with the given id. Returns the first updated record or null.
+ */
+export function updateRecords(collection, id, updater) {
+  return serializeWrite(collection, () => updateNow(collection, id, updater));
+}
+
+async function updateNow(collection, id, updater) {
+  const { key, userId, driver, state } = await prepareWrite(collection);
+  const changed = [];
+  const list = state.list.map((record, i) => {
+    if (!record || record.id !== id) return record;
+    const next = updater(record);
+    changed.push([state.seqs[i], next, record]);
+    return next;
+  });
+  if (!changed.length) return null;
+  states.set(key, { list, seqs: state.seqs });
+  writeCount += 1;
+  changed.forEach(([, next, prev]) => applyToViews(key, view => { view.remove(prev); view.add(next); }));
+  queueOps(collection, userId, driver, entry => changed.forEach(([seq, record]) => entry.ops.set(seq, record)));
+  return changed[0][1];
+}
+
+export function removeRecords(collection, id) {
+  return serializeWrite(collection, () => removeNow(collection, id));
+}
+
+async function removeNow(collection, id) {
+  const { key, userId, driver, state } = await prepareWrite(collection);
+  const list = [];
+  const seqs = [];
+  const removed = [];
+  state.list.forEach((record, i) => {
+    if (record && record.id === id) {
+      removed.push(state.seqs[i]);
+      applyToViews(key, view => view.remove(record));
+    } else {
+      list.push(record);
+      seqs.push(state.seqs[i]);
+    }
+  });
+  if (!removed.length) return 0;
+  states.set(key, { list, seqs });
+  writeCount += 1;
+  queueOps(collection, userId, driver, entry => removed.forEach(seq => entry.ops.set(seq, null)));
+  return removed.length;
+}
+
+// Full rebuild path: the records are replaced and every view of the collection is rebuilt from them
+export function replaceCollection(collection, rows) {
+  return serializeWrite(collection, () => replaceNow(collection, rows));
+}
+
+function replaceNow(collection, rows) {
+  const userId = getCurrentUserId();
+  const list = Array.isArray(rows) ? rows : [];
+  const seqs = list.map((_, i) => i);
+  const driver = currentDriver();
+  const key = scopeKey(collection, userId, driver);
+  states.set(key, { list, seqs });
+  ownedByBatch.delete(key);
+  writeCount += 1;
+  const byName = viewsFor(key);
+  (viewSpecs.get(collection) || new Map()).forEach((spec, name) => {
+    if (!spec.persist && !byName.has(name)) return;
+    const view = spec.create();
+    view.build(list);
+    byName.set(name, view);
+  });
+  queueOps(collection, userId, driver, entry => {
+    entry.clear = true;
+    entry.ops = new Map(seqs.map(seq => [seq, list[seq]]));
+  });
+  return list;
+}
@@ -0,0 +1,221 @@
+// Full-text search over one collection, kept current by lib/recordStore.js (see defineView there).
+//
+// Field values are split into lowercase, accent-folded terms (phone-like values also yield their
+// digits as one term). Terms live in a trie; each term has a posting list record -> weight, where
+// the weight is that of the best field the term occurs in. A query term matches every indexed term
+// it is a prefix of, allowing up to 1 edit for query terms of 4+ characters and 2 for 8+ (edits
+// are insertions, deletions, substitutions and adjacent swaps). Matching walks the trie with one
+// edit-distance row per node and prunes branches that can no longer match, so typing a character
+// costs time proportional to the matching part of the vocabulary, not to the number of records.
+//
+// Ranking: every query term must match; a record scores the sum over query terms of
+// field weight x match quality (exact term > prefix > each edit).
+
+const EXACT = 1;
+const PREFIX = 0.75;
+const PER_EDIT = 0.45;
+
+const NON_ASCII = /[^\x00-\x7f]/;
+
+function foldText(value) {
+  const text = String(value).toLowerCase();
+  // Plain ASCII has nothing to fold; skip the (comparatively slow) normalization
+  return NON_ASCII.test(text) ? text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '') : text;
+}
+
+/**
+ * Split text into search terms.
+ */
+export function tokenize(value) {
+  if (value == null || value === '') return [];
+  const text = foldText(value);
+  const terms = (NON_ASCII.test(text) ? text.split(/[^\p{L}\p{N}]+/u) : text.split(/[^a-z0-9]+/)).filter(Boolean);
+  const digits = text.replace(/\D/g, '');
+  // Phone numbers: "+1 (555) 010-2233" is also searchable as 15550102233 / 555010...
+  if (digits.length >= 5 && !terms.includes(digits)) terms.push(digits);
+  return terms;
+}
+
+function maxEdits(term) {
+  if (term.length >= 8) return 2;
+  if (term.length >= 4) return 1;
+  return 0;
+}
+
+function createNode() {
+  return { children: new Map(), term: null };
+}
+
+/**
+ * @param {{ fields: Record<string, number> }} spec field name -> weight; array values are indexed
+ *   element by element (e.g. tags)
+ */
+export function createSearchIndex({ fields }) {
+  const fieldNames = Object.keys(fields);
+  let root = createNode();
+  let postings = new Map();   // term -> Map<record, weight>
+  let termsOf = new Map();    // record -> terms
+
+  function termsWithWeights(record) {
+    const out = new Map();
+    fieldNames.forEach(field => {
+      const raw = record[field];
+      const values = Array.isArray(raw) ? raw : [raw];
+      values.forEach(value => {
+        tokenize(value).forEach(term => {
+          if ((out.get(term) || 0) < fields[field]) out.set(term, fields[field]);
+        });
+      });
+    });
+    return out;
+  }
+
+  function insertTerm(term) {
+    let node = root;
+    for (const ch of term) {
+      let next = node.children.get(ch);
+      if (!next) {
+        next = createNode();
+        node.children.set(ch, next);
+      }
+      node = next;
+    }
+    node.term = term;
+  }
+
+  function deleteTerm(term) {
+    const path = [root];
+    for (const ch of term) {
+      const next = path[path.length - 1].children.get(ch);
+      if (!next) return;
+      path.push(next);
+    }
+    path[path.length - 1].term = null;
+    const chars = Array.from(term);
+    for (let i = path.length - 1; i > 0; i--) {
+      const node = path[i];
+      if (node.term || node.children.size) break;
+      path[i - 1].children.delete(chars[i - 1]);
+    }
+  }
+
+  function add(record) {
+    if (!record || termsOf.has(record)) return;
+    const weights = termsWithWeights(record);
+    weights.forEach((weight, term) => {
+      let list = postings.get(term);
+      if (!list) {
+        list = new Map();
+        postings.set(term, list);
+        insertTerm(term);
+      }
+      list.set(record, weight);
+    });
+    termsOf.set(record, Array.from(weights.keys()));
+  }
+
+  function remove(record) {
+    const terms = record ? termsOf.get(record) : null;
+    if (!terms) return;
+    termsOf.delete(record);
+    terms.forEach(term => {
+      const list = postings.get(term);
+      if (!list) return;
+      list.delete(record);
+      if (!list.size) {
+        postings.delete(term);
+        deleteTerm(term);
+      }
+    });
+  }
+
+  // Every indexed term that extends a prefix within `k` edits of `query`, with its edit count
+  function matchTerms(query, k) {
+    const q = Array.from(query);
+    const n = q.length;
+    const found = new Map();
+    const emit = (term, edits) => {
+      if (!found.has(term) || found.get(term) > edits) found.set(term, edits);
+    };
+    const emitSubtree = (node, edits) => {
+      const stack = [node];
+      while (stack.length) {
+        const current = stack.pop();
+        if (current.term) emit(current.term, edits);
+        current.children.forEach(child => stack.push(child));
+      }
+    };
+    // rows[d] = edit distances between q[0..j] and the trie path of length d
+    const first = Array.from({ length: n + 1 }, (_, j) => j);
+    const walk = (node, path, rows, best) => {
+      node.children.forEach((child, ch) => {
+        const prev = rows[rows.length - 1];
+        const prevPrev = rows.length > 1 ? rows[rows.length - 2] : null;
+        const row = new Array(n + 1);
+        row[0] = prev[0] + 1;
+        let rowMin = row[0];
+        for (let j = 1; j <= n; j++) {
+          const cost = q[j - 1] === ch ? 0 : 1;
+          let v = Math.min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost);
+          if (prevPrev && j > 1 && q[j - 1] === path[path.length - 1] && q[j - 2] === ch) v = Math.min(v, prevPrev[j - 2] + 1);
+          row[j] = v;
+          if (v < rowMin) rowMin = v;
+        }
+        const childBest = Math.min(best, row[n]);
+        if (rowMin > k) {
+          // No deeper prefix can get closer; the subtree matches only via a prefix already seen
+          if (childBest <= k) emitSubtree(child, childBest);
+          return;
+        }
+        if (child.term && childBest <= k) emit(child.term, childBest);
+        path.push(ch);
+        rows.push(row);
+        walk(child, path, rows, childBest);
+        rows.pop();
+        path.pop();
+      });
+    };
+    walk(root, [], [first], Infinity);
+    return found;
+  }
+
+  /**
+   * Ranked records matching every term of `query`.
+   * @returns {{ record: object, score: number }[]}
+   */
+  function search(query, { limit = 50 } = {}) {
+    const queryTerms = Array.from(new Set(tokenize(query)));
+    if (!queryTerms.length) return [];
+    let scores = null;
+    for (const qt of queryTerms) {
+      const tokenScores = new Map();
+      matchTerms(qt, maxEdits(qt)).forEach((edits, term) => {
+        const quality = edits ? PREFIX * Math.pow(PER_EDIT, edits) : (term === qt ? EXACT : PREFIX);
+        postings.get(term)?.forEach((weight, record) => {
+          if (scores && !scores.has(record)) return;
+          const s = weight * quality;
+          if ((tokenScores.get(record) || 0) < s) tokenScores.set(record, s);
+        });
+      });
+      if (scores) tokenScores.forEach((s, record) => tokenScores.set(record, s + scores.get(record)));
+      scores = tokenScores;
+      if (!scores.size) return [];
+    }
+    const ranked = Array.from(scores, ([record, score]) => ({ record, score }));
+    ranked.sort((a, b) => b.score - a.score);
+    return limit > 0 ? ranked.slice(0, limit) : ranked;
+  }
+
+  return {
+    build(records) {
+      root = createNode();
+      postings = new Map();
+      termsOf = new Map();
+      records.forEach(add);
+    },
+    add,
+    remove,
+    search,
+    terms: () => postings.size,
+  };
+}
@@ -2,6 +2,7 @@ const fs = require('fs');
 const path = require('path');
 const bcrypt = require('bcryptjs');
 const jwt = require('jsonwebtoken');
+const { createStore, ensureDir, findUserByExactEmail } = require('../../../backend/storage');
 
 const JWT_SECRET = process.env.JWT_SECRET || 'fallback_secret_key';
 
@@ -9,98 +10,34 @@ const JWT_SECRET = process.env.JWT_SECRET || 'fallback_secret_key';
 const LOCAL_USERS_FILE = path.join(__dirname, '../users.json');
 const USERS_FILE = fs.existsSync(LOCAL_USERS_FILE) ? LOCAL_USERS_FILE : '/tmp/users.json';
 const SNAPSHOT_DIR = '/tmp/snapshots';
+const SQLITE_FILE = '/tmp/dancerpro.sqlite';
 
-function ensureDir(dirPath) {
-  try {
-    if (!fs.existsSync(dirPath)) {
-      fs.mkdirSync(dirPath, { recursive: true });
-    }
-    return true;
-  } catch (e) {
-    console.error('Failed to ensure directory:', dirPath, e);
-    return false;
-  }
-}
+const store = createStore({ usersFile: USERS_FILE, snapshotDir: SNAPSHOT_DIR, sqliteFile: SQLITE_FILE });
 
 function getSnapshotFile(userId) {
   return path.join(SNAPSHOT_DIR, `${userId}.json`);
 }
 
 function readUserSnapshot(userId) {
-  try {
-    ensureDir(SNAPSHOT_DIR);
-    const file = getSnapshotFile(userId);
-    if (!fs.existsSync(file)) return null;
-    const raw = fs.readFileSync(file, 'utf8');
-    return JSON.parse(raw);
-  } catch (e) {
-    console.error('Error reading snapshot for user:', userId, e);
-    return null;
-  }
+  return store.readUserSnapshot(userId);
 }
 
 function writeUserSnapshot(userId, snapshot, meta = {}) {
-  try {
-    ensureDir(SNAPSHOT_DIR);
-    const file = getSnapshotFile(userId);
-    const payload = {
-      snapshot: snapshot || {},
-      metadata: {
-        updatedAt: new Date().toISOString(),
-        version: 1,
-        ...meta,
-      },
-    };
-    fs.writeFileSync(file, JSON.stringify(payload, null, 2), 'utf8');
-    return payload;
-  } catch (e) {
-    console.error('Error writing snapshot for user:', userId, e);
-    return null;
-  }
+  return store.writeUserSnapshot(userId, snapshot, meta);
 }
 
-const readUsers = () => {
-  try {
-    if (!fs.existsSync(USERS_FILE)) {
-      return [];
-    }
-    const data = fs.readFileSync(USERS_FILE, 'utf8');
-    return JSON.parse(data);
-  } catch (error) {
-    console.error('Error reading users file:', error);
-    return [];
-  }
-};
+const readUsers = () => store.readUsers();
 
-const writeUsers = (users) => {
-  try {
-    fs.writeFileSync(USERS_FILE, JSON.stringify(users, null, 2));
-    return true;
-  } catch (error) {
-    console.error('Error writing users file:', error);
-    return false;
-  }
-};
+const writeUsers = (users) => store.writeUsers(users);
 
-const findUserByEmail = (email) => {
-  const users = readUsers();
-  return users.find(user => user.email === email);
-};
+// Exact match, as these functions always did (the store's own lookup ignores case)
+const findUserByEmail = (email) => findUserByExactEmail(store, email);
 
-const findUserById = (id) => {
-  const users = readUsers();
-  return users.find(user => user.id === id);
-};
+const findUserById = (id) => store.findUserById(id);
 
 function upsertUser(updatedUser) {
-  const users = readUsers();
-  const index = users.findIndex(u => u.id === updatedUser.id);
-  if (index >= 0) {
-    users[index] = { ...users[index], ...updatedUser };
-  } else {
-    users.push(updatedUser);
-  }
-  writeUsers(users);
+  const existing = store.findUserById(updatedUser.id);
+  store.upsertUser(existing ? { ...existing, ...updatedUser } : updatedUser);
   return updatedUser;
 }
 
@@ -152,6 +89,7 @@ function createResponse(statusCode, body, additionalHeaders = {}) {
 }
 
 module.exports = {
+  store,
   ensureDir,
   getSnapshotFile,
   readUserSnapshot,
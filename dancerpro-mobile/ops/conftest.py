@@ -0,0 +1,10 @@
+import os
+
+import pytest
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "tests", "fixtures")
+
+
+@pytest.fixture
+def fixtures_dir():
+    return FIXTURES
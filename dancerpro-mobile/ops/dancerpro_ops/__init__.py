@@ -0,0 +1 @@
+"""Offline operations tooling for the DancerPro backend (batch analytics over stored snapshots)."""
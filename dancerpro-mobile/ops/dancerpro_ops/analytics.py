@@ -0,0 +1,476 @@
+"""Nightly per-user KPIs and venue recommendations over every stored snapshot.
+
+The metrics are the ones the app computes on device, vectorized with NumPy:
+
+* transaction totals, record counts and net per client, as ``kpiSnapshot`` in
+  ``backend/lib/analytics.js`` (``getKpiSnapshot`` in ``lib/db.js``);
+* all-time shift earnings per client and venue, and per-client / per-venue performance in the
+  trailing ``period_days`` window (shift count, earnings, average, best day of week), as
+  ``computeAggregates`` in ``lib/aiScoring.js``;
+* the client x venue compatibility score with the app's default weights, and each client's
+  top venues, as ``scoreMatrix`` / ``rankAssignments`` in ``lib/aiScoring.js``.
+
+Sums are accumulated in record order (``np.bincount``) and the score terms are added in the app's
+order, so the numbers are bit-identical to the JavaScript ones; ``tests/test_analytics.py`` checks
+them against fixtures produced by the JavaScript code.
+
+Each user's shifts are encoded once into columns (time, earnings, client code, venue code, event
+flag); aggregates are ``bincount`` calls over those codes and the scores one ``(clients, venues)``
+array. Users are processed in chunks on a process pool::
+
+    python -m dancerpro_ops.analytics --snapshots ../backend/snapshots --out analytics-out
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .snapshots import (
+    DEFAULT_SNAPSHOT_DIR,
+    iter_snapshot_paths,
+    js_lower,
+    js_number,
+    js_string,
+    load_snapshot,
+    record_time,
+    safe_list,
+)
+
+DAY_MS = 24 * 60 * 60 * 1000
+
+# Same defaults as lib/aiEngine.js, in the order the score adds them
+DEFAULT_WEIGHTS = {
+    "base_client_venue_weight": 0.35,
+    "base_venue_avg_weight": 0.20,
+    "base_dow_weight": 0.15,
+    "tag_weight": 0.15,
+    "city_match_weight": 0.10,
+    "capacity_weight": 0.10,
+    "event_weight": 0.15,
+}
+
+TABLES = ("users", "clients", "venues", "recommendations")
+
+
+def _codes(values):
+    """First-seen codes for truthy ids (``-1`` for missing ones) and the ids by code."""
+    index = {}
+    ids = []
+    codes = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        if not value:
+            codes[i] = -1
+            continue
+        code = index.get(value)
+        if code is None:
+            code = len(ids)
+            index[value] = code
+            ids.append(value)
+        codes[i] = code
+    return codes, ids, index
+
+
+def _sum_by(codes, weights, size):
+    """Per-code sums, added in record order like the app's loops."""
+    if size == 0:
+        return np.zeros(0)
+    return np.bincount(codes, weights=weights, minlength=size)[:size]
+
+
+def _count_by(codes, size):
+    if size == 0:
+        return np.zeros(0, dtype=np.int64)
+    return np.bincount(codes, minlength=size)[:size]
+
+
+def _normalize(value, maximum):
+    """``normalize`` in lib/aiScoring.js, elementwise."""
+    if not maximum > 0:
+        return np.zeros_like(np.asarray(value, dtype=float))
+    return np.minimum(1.0, np.maximum(0.0, value) / maximum)
+
+
+def _nan_max(values):
+    """``Math.max(0, ...values)``: NaN as soon as one value is NaN."""
+    return float(np.max(np.concatenate(([0.0], values)))) if len(values) else 0.0
+
+
+def encode_shifts(shifts, tz_offset=0):
+    """Columns of the shift fields the metrics read."""
+    rows = [s for s in shifts if isinstance(s, dict)]
+    client, client_ids, client_index = _codes([s.get("clientId") for s in rows])
+    venue, venue_ids, venue_index = _codes([s.get("venueId") for s in rows])
+    return {
+        "length": len(rows),
+        "time": np.fromiter((record_time(s, tz_offset) for s in rows), dtype=float, count=len(rows)),
+        "earnings": np.fromiter((js_number(s.get("earnings")) for s in rows), dtype=float, count=len(rows)),
+        "event": np.fromiter(("event" in js_lower(s.get("notes")) for s in rows), dtype=bool, count=len(rows)),
+        "client": client,
+        "venue": venue,
+        "client_ids": client_ids,
+        "venue_ids": venue_ids,
+        "client_index": client_index,
+        "venue_index": venue_index,
+    }
+
+
+def _performance(codes, size, earnings, dow):
+    """Shift count, earnings and best day of week per code (``finishPerformance``)."""
+    count = _count_by(codes, size)
+    total = _sum_by(codes, earnings, size)
+    dow_total = _sum_by(codes * 7 + dow, earnings, size * 7).reshape(size, 7)
+    dow_count = _count_by(codes * 7 + dow, size * 7).reshape(size, 7)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dow_avg = np.where(dow_count > 0, dow_total / np.maximum(dow_count, 1), 0.0)
+        avg = np.where(count > 0, total / np.maximum(count, 1), 0.0)
+    # Strictly greater wins, Sunday first: the first maximum, if it is above zero
+    best = np.argmax(dow_avg, axis=1) if size else np.zeros(0, dtype=np.int64)
+    best_avg = dow_avg[np.arange(size), best] if size else np.zeros(0)
+    best = np.where(best_avg > 0, best, -1)
+    return {"shifts": count, "earnings": total, "avg": avg, "best_day": best, "best_day_avg": np.where(best >= 0, best_avg, 0.0)}
+
+
+def compute_aggregates(snapshot, period_days=120, now_ms=None, tz_offset=0, table=None):
+    """``computeAggregates`` of lib/aiScoring.js, per client/venue code of the shift table."""
+    table = table or encode_shifts(snapshot["shifts"], tz_offset)
+    now_ms = time.time() * 1000 if now_ms is None else now_ms
+    client, venue, earnings = table["client"], table["venue"], table["earnings"]
+    n_clients, n_venues = len(table["client_ids"]), len(table["venue_ids"])
+
+    placed = venue >= 0
+    venue_total = _sum_by(venue[placed], earnings[placed], n_venues)
+    venue_count = _count_by(venue[placed], n_venues)
+    venue_event = np.zeros(n_venues, dtype=bool)
+    venue_event[venue[placed & table["event"]]] = True
+    # Client totals and client x venue cells only count shifts placed at a venue
+    paired = placed & (client >= 0)
+    client_total = _sum_by(client[paired], earnings[paired], n_clients)
+    client_count = _count_by(client[paired], n_clients)
+    cell_codes = client[paired] * n_venues + venue[paired]
+    cell_total = _sum_by(cell_codes, earnings[paired], n_clients * n_venues).reshape(n_clients, n_venues)
+    cell_count = _count_by(cell_codes, n_clients * n_venues).reshape(n_clients, n_venues)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        venue_avg = np.where(venue_count > 0, venue_total / np.maximum(venue_count, 1), 0.0)
+        cell_avg = np.where(cell_count > 0, cell_total / np.maximum(cell_count, 1), 0.0)
+
+    # Performance window: [now - period_days, now], weekday at the client's offset
+    t = table["time"]
+    in_window = (t >= now_ms - float(period_days or 0) * DAY_MS) & (t <= now_ms)
+    perf_earnings = np.where(np.isfinite(earnings), earnings, 0.0)
+    dow = np.zeros(len(t), dtype=np.int64)
+    dow[in_window] = (np.floor((t[in_window] - tz_offset * 60000) / DAY_MS).astype(np.int64) + 4) % 7
+    client_window = in_window & (client >= 0)
+    venue_window = in_window & (venue >= 0)
+
+    # Venues with an explicit event record (ids compared as stored, like a JS Map key)
+    events = {e.get("venueId") or e.get("venue") for e in snapshot["events"]
+              if isinstance(e, dict) and isinstance(e.get("venueId") or e.get("venue"), (str, int, float))}
+    return {
+        "table": table,
+        "venue_total": venue_total,
+        "venue_count": venue_count,
+        "venue_avg": venue_avg,
+        "venue_event": venue_event,
+        "event_venue_ids": events,
+        "client_total": client_total,
+        "client_count": client_count,
+        "cell_avg": cell_avg,
+        "cell_count": cell_count,
+        "venue_max_avg": _nan_max(venue_avg[venue_count > 0]),
+        "client_venue_max_avg": _nan_max(cell_avg[cell_count > 0]),
+        "max_capacity": _max_capacity(snapshot["venues"]),
+        "client_performance": _performance(client[client_window], n_clients, perf_earnings[client_window], dow[client_window]),
+        "venue_performance": _performance(venue[venue_window], n_venues, perf_earnings[venue_window], dow[venue_window]),
+    }
+
+
+def _max_capacity(venues):
+    maximum = 0.0
+    for venue in venues:
+        if isinstance(venue, dict):
+            capacity = js_number(venue.get("capacity"))
+            # Math.max: NaN sticks
+            maximum = capacity if math.isnan(capacity) or math.isnan(maximum) else max(maximum, capacity)
+    return maximum
+
+
+def _entity_codes(entities, index):
+    return np.fromiter((index.get(e.get("id"), -1) if e.get("id") else -1 for e in entities), dtype=np.int64, count=len(entities))
+
+
+def _take(values, codes, missing):
+    """``values[code]`` per entity, ``missing`` where the entity has no shifts."""
+    if not len(codes):
+        return np.zeros(0, dtype=np.asarray(values).dtype)
+    out = np.full(len(codes), missing, dtype=np.asarray(values).dtype)
+    known = codes >= 0
+    out[known] = values[codes[known]]
+    return out
+
+
+def _tag_sets(entities):
+    return [({js_string(t).lower() for t in safe_list(e.get("tags"))}, len(safe_list(e.get("tags"))) > 0) for e in entities]
+
+
+def _factorize(values):
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values), dtype=np.int64, count=len(values))
+    return list(index), codes
+
+
+def _pairwise(left, right, fn):
+    """``fn(a, b)`` for every pair, evaluated once per distinct (a, b)."""
+    left_keys, left_codes = _factorize(left)
+    right_keys, right_codes = _factorize(right)
+    small = np.array([[fn(a, b) for b in right_keys] for a in left_keys], dtype=float).reshape(len(left_keys), len(right_keys))
+    return small[np.ix_(left_codes, right_codes)]
+
+
+def score_matrix(clients, venues, aggregates, weights=DEFAULT_WEIGHTS):
+    """Compatibility of every client x venue pair, ``scoreMatrix`` of lib/aiScoring.js."""
+    table = aggregates["table"]
+    client_codes = _entity_codes(clients, table["client_index"])
+    venue_codes = _entity_codes(venues, table["venue_index"])
+    n_c, n_v = len(clients), len(venues)
+    if not n_c or not n_v:
+        return np.zeros((n_c, n_v))
+
+    # Client features
+    client_best = _take(aggregates["client_performance"]["best_day"], client_codes, -1)
+    client_tags = _tag_sets(clients)
+    client_city = [js_lower(c.get("city") or c.get("location")) for c in clients]
+    client_notes = [js_lower(c.get("notes")) for c in clients]
+    # Venue features
+    venue_avg = _take(aggregates["venue_avg"], venue_codes, 0.0)
+    venue_best = _take(aggregates["venue_performance"]["best_day"], venue_codes, -1)
+    venue_tags = _tag_sets(venues)
+    venue_name = [js_lower(v.get("name")) for v in venues]
+    venue_loc = [js_lower(v.get("location") or v.get("city")) for v in venues]
+    venue_city = [js_lower(v.get("city") or v.get("location")) for v in venues]
+    capacity = np.array([js_number(v.get("capacity")) for v in venues], dtype=float)
+    event = _take(aggregates["venue_event"], venue_codes, False) | np.array(
+        [isinstance(v.get("id"), (str, int, float)) and v.get("id") in aggregates["event_venue_ids"] for v in venues], dtype=bool)
+
+    # Personal average at the venue
+    cell = np.zeros((n_c, n_v))
+    known_c, known_v = client_codes >= 0, venue_codes >= 0
+    if known_c.any() and known_v.any():
+        cell[np.ix_(known_c, known_v)] = aggregates["cell_avg"][np.ix_(client_codes[known_c], venue_codes[known_v])]
+
+    # Best-day alignment: same day 1, adjacent 0.6, otherwise 0.25; 0 without a best day
+    diff = np.abs(client_best[:, None] - venue_best[None, :])
+    dow = np.where(diff == 0, 1.0, np.where((diff == 1) | (diff == 6), 0.6, 0.25))
+    dow[(client_best[:, None] < 0) | (venue_best[None, :] < 0)] = 0.0
+
+    # Tags: overlap over the smaller set when both have tags, else a venue name/location in the notes
+    vocabulary = {}
+    for tags, _ in client_tags + venue_tags:
+        for tag in tags:
+            vocabulary.setdefault(tag, len(vocabulary))
+    incidence = lambda sets: np.array([[tag in tags for tag in vocabulary] for tags, _ in sets], dtype=float).reshape(len(sets), len(vocabulary))
+    overlap = incidence(client_tags) @ incidence(venue_tags).T
+    c_size = np.array([len(tags) for tags, _ in client_tags], dtype=float)
+    v_size = np.array([len(tags) for tags, _ in venue_tags], dtype=float)
+    both = np.array([has for _, has in client_tags])[:, None] & np.array([has for _, has in venue_tags])[None, :]
+    by_tags = overlap / np.maximum(1.0, np.minimum(c_size[:, None], v_size[None, :]))
+    def notes_match(notes, key):
+        name, loc = key
+        return 1.0 if notes and ((name and name in notes) or (loc and loc in notes)) else 0.0
+
+    tag = np.where(both, by_tags, _pairwise(client_notes, list(zip(venue_name, venue_loc)), notes_match))
+
+    # City: either contains the other; without a client city, the venue city in the notes
+    def city_match(place, v_city):
+        c_city, notes = place
+        if c_city and v_city:
+            return 1.0 if c_city in v_city or v_city in c_city else 0.0
+        if v_city:
+            return 1.0 if notes and v_city in notes else 0.0
+        return 0.0
+
+    city = _pairwise(list(zip(client_city, client_notes)), venue_city, city_match)
+
+    w = weights
+    return (
+        w["base_client_venue_weight"] * _normalize(cell, aggregates["client_venue_max_avg"])
+        + w["base_venue_avg_weight"] * _normalize(venue_avg, aggregates["venue_max_avg"])[None, :]
+        + w["base_dow_weight"] * dow
+        + w["tag_weight"] * tag
+        + w["city_match_weight"] * city
+        + w["capacity_weight"] * _normalize(capacity, aggregates["max_capacity"])[None, :]
+        + w["event_weight"] * event.astype(float)[None, :]
+    )
+
+
+def top_venues(scores, n=3):
+    """Indexes of each client's ``n`` best venues, best first; ties keep venue order."""
+    return np.argsort(-scores, axis=1, kind="stable")[:, :n]
+
+
+def kpi_snapshot(snapshot):
+    """``kpiSnapshot`` of backend/lib/analytics.js: totals, counts and net per client."""
+    rows = [t for t in snapshot["transactions"] if isinstance(t, dict)]
+    amount = np.fromiter((js_number(t.get("amount")) for t in rows), dtype=float, count=len(rows))
+    kind = np.fromiter((0 if t.get("type") == "income" else 1 if t.get("type") == "expense" else 2 for t in rows), dtype=np.int64, count=len(rows))
+    income, expense = _sum_by(kind, amount, 3)[:2]
+    client, client_ids, _ = _codes([t.get("clientId") for t in rows])
+    linked = client >= 0
+    by_type = _sum_by(client[linked] * 3 + kind[linked], amount[linked], len(client_ids) * 3).reshape(len(client_ids), 3)
+    net = by_type[:, 0] - by_type[:, 1]
+    order = np.argsort(-np.where(np.isnan(net), 0.0, net), kind="stable")
+    return {
+        "totals": {"income": float(income), "expense": float(expense), "net": float(income - expense)},
+        "counts": {name: len(snapshot[name]) for name in ("clients", "venues", "outfits", "shifts", "transactions")},
+        "by_client": [(client_ids[i], float(net[i])) for i in order],
+    }
+
+
+def analyze_snapshot(snapshot, period_days=120, now_ms=None, tz_offset=0, weights=DEFAULT_WEIGHTS, top_n=3):
+    """All metrics of one user as plain columns: ``{"users": row, "clients"/"venues"/"recommendations": {column: list}}``."""
+    now_ms = time.time() * 1000 if now_ms is None else now_ms
+    clients = [c for c in snapshot["clients"] if isinstance(c, dict)]
+    venues = [v for v in snapshot["venues"] if isinstance(v, dict)]
+    aggregates = compute_aggregates(snapshot, period_days, now_ms, tz_offset)
+    table = aggregates["table"]
+    kpis = kpi_snapshot(snapshot)
+    net_by_client = dict(kpis["by_client"])
+
+    def entity_columns(entities, codes, total, count, performance):
+        columns = {
+            "shifts": _take(count, codes, 0),
+            "earnings": _take(total, codes, 0.0),
+            "period_shifts": _take(performance["shifts"], codes, 0),
+            "period_earnings": _take(performance["earnings"], codes, 0.0),
+            "period_avg": _take(performance["avg"], codes, 0.0),
+            "best_day": _take(performance["best_day"], codes, -1),
+            "best_day_avg": _take(performance["best_day_avg"], codes, 0.0),
+        }
+        with np.errstate(invalid="ignore", divide="ignore"):
+            columns["avg_earnings"] = np.where(columns["shifts"] > 0, columns["earnings"] / np.maximum(columns["shifts"], 1), 0.0)
+        return {"id": [e.get("id") for e in entities], **{k: v.tolist() for k, v in columns.items()}}
+
+    client_codes = _entity_codes(clients, table["client_index"])
+    venue_codes = _entity_codes(venues, table["venue_index"])
+    client_rows = entity_columns(clients, client_codes, aggregates["client_total"], aggregates["client_count"], aggregates["client_performance"])
+    client_rows["net"] = [net_by_client.get(c.get("id"), 0.0) for c in clients]
+    venue_rows = entity_columns(venues, venue_codes, aggregates["venue_total"], aggregates["venue_count"], aggregates["venue_performance"])
+
+    scores = score_matrix(clients, venues, aggregates, weights)
+    picks = top_venues(scores, top_n)
+    recommendations = {
+        "client_id": [clients[i].get("id") for i in range(len(clients)) for _ in picks[i]],
+        "rank": [rank + 1 for i in range(len(clients)) for rank in range(len(picks[i]))],
+        "venue_id": [venues[j].get("id") for i in range(len(clients)) for j in picks[i]],
+        "score": [float(scores[i, j]) for i in range(len(clients)) for j in picks[i]],
+    }
+    top_client = kpis["by_client"][0] if kpis["by_client"] else (None, math.nan)
+    user = {
+        **kpis["totals"],
+        **kpis["counts"],
+        "top_client_id": top_client[0],
+        "top_client_net": top_client[1],
+        "venue_max_avg": aggregates["venue_max_avg"],
+    }
+    return {"users": user, "clients": client_rows, "venues": venue_rows, "recommendations": recommendations}
+
+
+def _append(columns, part):
+    for key, values in part.items():
+        columns.setdefault(key, []).extend(values)
+
+
+def _analyze_columns(paths, options):
+    """Per-table columns (plain lists) of the users stored in ``paths``."""
+    columns = {name: {} for name in TABLES}
+    for path in paths:
+        user_id, snapshot, metadata = load_snapshot(path)
+        result = analyze_snapshot(snapshot, **options)
+        _append(columns["users"], {"user_id": [user_id], "updated_at": [metadata.get("updatedAt")],
+                                   **{key: [value] for key, value in result["users"].items()}})
+        for name in TABLES[1:]:
+            rows = len(result[name]["client_id" if name == "recommendations" else "id"])
+            _append(columns[name], {"user_id": [user_id] * rows, **result[name]})
+    return columns
+
+
+def _pin_now(options):
+    """``options`` with ``now_ms`` resolved once, so every user of a run shares the window end."""
+    if options.get("now_ms") is None:
+        options = {**options, "now_ms": time.time() * 1000}
+    return options
+
+
+def analyze_paths(paths, **options):
+    """Metrics of the users stored in ``paths`` as one DataFrame per table (``TABLES``)."""
+    return {name: pd.DataFrame(table) for name, table in _analyze_columns(paths, _pin_now(options)).items()}
+
+
+def _analyze_chunk(args):
+    paths, options = args
+    return _analyze_columns(paths, options)
+
+
+def analyze_users(paths, workers=None, chunk_size=64, **options):
+    """``analyze_paths`` fanned out over a process pool, ``chunk_size`` users per task."""
+    paths = list(paths)
+    options = _pin_now(options)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        results = [_analyze_columns(chunk, options) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_analyze_chunk, [(chunk, options) for chunk in chunks]))
+    columns = {name: {} for name in TABLES}
+    for result in results:
+        for name in TABLES:
+            _append(columns[name], result[name])
+    return {name: pd.DataFrame(table) for name, table in columns.items()}
+
+
+def _parse_now(value):
+    """``--now``: epoch milliseconds or an ISO time (UTC unless it has an offset)."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        stamp = pd.Timestamp(value)
+        return (stamp if stamp.tzinfo else stamp.tz_localize("UTC")).timestamp() * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.analytics", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_DIR, help="directory of <userId>.json snapshots")
+    parser.add_argument("--out", default="analytics-out", help="directory for users/clients/venues/recommendations.csv")
+    parser.add_argument("--days", type=int, default=120, help="performance window in days (default 120)")
+    parser.add_argument("--top", type=int, default=3, help="venues recommended per client (default 3)")
+    parser.add_argument("--now", default=None, help="end of the window: epoch ms or ISO time (default: now)")
+    parser.add_argument("--tz-offset", type=int, default=0, help="client UTC offset in minutes, as Date#getTimezoneOffset")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="users per worker task")
+    args = parser.parse_args(argv)
+
+    paths = iter_snapshot_paths(args.snapshots)
+    started = time.perf_counter()
+    frames = analyze_users(paths, workers=args.workers, chunk_size=args.chunk_size, period_days=args.days,
+                           now_ms=_parse_now(args.now), tz_offset=args.tz_offset, top_n=args.top)
+    elapsed = time.perf_counter() - started
+    os.makedirs(args.out, exist_ok=True)
+    for name, frame in frames.items():
+        frame.to_csv(os.path.join(args.out, f"{name}.csv"), index=False)
+    shifts = int(frames["users"]["shifts"].sum()) if not frames["users"].empty else 0
+    rate = len(paths) / elapsed if elapsed > 0 else float("inf")
+    print(f"Analyzed {len(paths)} users ({shifts} shifts) in {elapsed:.1f}s ({rate:.0f} users/s) -> {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+"""Offline migration and compaction of the stored snapshots.
+
+The backend rewrites ``backend/snapshots/<userId>.json`` whole, pretty-printed. This tool streams
+each file record by record (``dancerpro_ops.jsonstream``), passes every record through a chain
+of migration steps and writes the result as compact JSON to a temporary file that replaces the
+original atomically. A file the server rewrote while it was being processed is left alone.
+
+Steps (``--steps``, in this order; the default chain leaves out ``drop-orphans``):
+
+* ``drop-invalid``: drop entries that are not objects, and repeated ids within a collection
+  (the first one is kept);
+* ``numeric-amounts``: numeric strings in amount fields (``amount``, ``earnings``, ``cost``,
+  ``capacity``, ...) become numbers, read the way the app reads them (``Number(x)``);
+* ``epoch-times``: timestamps get an epoch-milliseconds twin (``start`` -> ``startMs``);
+* ``drop-orphans``: drop shifts and transactions that point at a client, venue, outfit or shift
+  no longer in the snapshot (needs a first pass that collects ids).
+
+Files are processed in parallel worker processes; ``--dry-run`` reads and migrates without
+writing and reports the same statistics::
+
+    python -m dancerpro_ops.compact --snapshots ../backend/snapshots --dry-run
+
+Stop the backend first, or restart it afterwards: it keeps recently read snapshots in memory
+(``SNAPSHOT_CACHE_MAX_BYTES``) and serves the pre-migration document from there until that
+user's next write.
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+from .jsonstream import CompactSnapshotWriter, SnapshotStreamError, iter_snapshot
+from .snapshots import DEFAULT_SNAPSHOT_DIR, iter_snapshot_paths, js_number, js_time, user_id_of
+
+NUMERIC_FIELDS = {
+    "transactions": ("amount",),
+    "shifts": ("earnings",),
+    "outfits": ("cost", "wearCount"),
+    "venues": ("capacity",),
+    "clients": ("valueScore",),
+}
+
+# As read by lib/db.js: shifts by start || end || date, transactions by date || createdAt || timestamp
+TIME_FIELDS = {
+    "shifts": ("start", "end", "date"),
+    "transactions": ("date", "createdAt", "timestamp"),
+    "events": ("date", "start", "end"),
+}
+
+REFERENCES = {
+    "shifts": (("clientId", "clients"), ("venueId", "venues")),
+    "transactions": (("clientId", "clients"), ("venueId", "venues"), ("outfitId", "outfits"), ("shiftId", "shifts")),
+}
+
+
+class Step(ABC):
+    """One migration: ``apply`` returns the record to keep (possibly changed) or None to drop it."""
+
+    name = ""
+    needs_ids = False
+
+    @abstractmethod
+    def apply(self, collection, record, context, counts):
+        """Migrate one ``record`` of ``collection``; ``counts`` collects this step's statistics."""
+
+
+class DropInvalid(Step):
+    name = "drop-invalid"
+
+    def apply(self, collection, record, context, counts):
+        if not isinstance(record, dict):
+            counts["not_objects"] += 1
+            return None
+        record_id = record.get("id")
+        if isinstance(record_id, (str, int, float)) and record_id != "":
+            seen = context.setdefault(("seen", collection), set())
+            if record_id in seen:
+                counts["duplicates"] += 1
+                return None
+            seen.add(record_id)
+        return record
+
+
+class NumericAmounts(Step):
+    name = "numeric-amounts"
+
+    def apply(self, collection, record, context, counts):
+        if not isinstance(record, dict):
+            return record
+        for field in NUMERIC_FIELDS.get(collection, ()):
+            value = record.get(field)
+            if not isinstance(value, str):
+                continue
+            number = js_number(value)
+            if not math.isfinite(number):
+                counts["unparseable"] += 1
+                continue
+            record[field] = int(number) if number.is_integer() and abs(number) < 2 ** 53 else number
+            counts["converted"] += 1
+        return record
+
+
+class EpochTimes(Step):
+    name = "epoch-times"
+
+    def apply(self, collection, record, context, counts):
+        if not isinstance(record, dict):
+            return record
+        for field in TIME_FIELDS.get(collection, ()):
+            value = record.get(field)
+            if not value or isinstance(value, (int, float)):
+                continue
+            ms = js_time(value)
+            if math.isnan(ms):
+                counts["unparseable"] += 1
+                continue
+            if record.get(f"{field}Ms") != int(ms):
+                record[f"{field}Ms"] = int(ms)
+                counts["added"] += 1
+        return record
+
+
+class DropOrphans(Step):
+    name = "drop-orphans"
+    needs_ids = True
+
+    def apply(self, collection, record, context, counts):
+        if not isinstance(record, dict):
+            return record
+        ids = context["ids"]
+        for field, target in REFERENCES.get(collection, ()):
+            value = record.get(field)
+            if value and isinstance(value, (str, int, float)) and value not in ids.get(target, ()):
+                counts[f"{collection}_without_{target}"] += 1
+                return None
+        return record
+
+
+STEPS = {step.name: step for step in (DropInvalid(), NumericAmounts(), EpochTimes(), DropOrphans())}
+DEFAULT_STEPS = ("drop-invalid", "numeric-amounts", "epoch-times")
+
+
+def collect_ids(path):
+    """Ids per collection, in one streaming pass."""
+    ids = {}
+    with open(path, "r", encoding="utf-8") as handle:
+        for kind, name, value in iter_snapshot(handle):
+            if kind == "record" and isinstance(value, dict) and isinstance(value.get("id"), (str, int, float)):
+                ids.setdefault(name, set()).add(value["id"])
+    return ids
+
+
+class _CountingSink:
+    """Stands in for the output file on a dry run: counts the bytes that would be written."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode("utf-8"))
+
+
+def compact_file(path, step_names=DEFAULT_STEPS, dry_run=False):
+    """Migrate and compact one snapshot file; returns its statistics."""
+    steps = [STEPS[name] for name in step_names]
+    stats = {"user_id": user_id_of(path), "status": "dry-run" if dry_run else "written", "records_in": 0,
+             "records_out": 0, "bytes_in": 0, "bytes_out": 0, "steps": {step.name: Counter() for step in steps}}
+    before = os.stat(path)
+    stats["bytes_in"] = before.st_size
+    tmp_path = os.path.join(os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    try:
+        context = {"ids": collect_ids(path) if any(step.needs_ids for step in steps) else {}}
+        output = nullcontext(_CountingSink()) if dry_run else open(tmp_path, "w", encoding="utf-8")
+        with open(path, "r", encoding="utf-8") as source, output as target:
+            writer = CompactSnapshotWriter(target)
+            for kind, name, value in iter_snapshot(source):
+                if kind == "collection":
+                    writer.start_collection(name)
+                elif kind == "record":
+                    stats["records_in"] += 1
+                    for step in steps:
+                        value = step.apply(name, value, context, stats["steps"][step.name])
+                        if value is None:
+                            break
+                    else:
+                        writer.record(value)
+                        stats["records_out"] += 1
+                elif kind == "field":
+                    writer.field(name, value)
+                elif name == "metadata" and isinstance(value, dict):
+                    applied = [n for n in value.get("migrations", []) if n not in step_names] + list(step_names)
+                    writer.meta_value(name, {**value, "migrations": applied,
+                                             "compactedAt": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")})
+                else:
+                    writer.meta_value(name, value)
+            writer.close()
+            if dry_run:
+                stats["bytes_out"] = target.bytes
+                return stats
+            target.flush()
+            os.fsync(target.fileno())
+            stats["bytes_out"] = os.fstat(target.fileno()).st_size
+        # The server may have rewritten the file meanwhile: keep its version
+        after = os.stat(path)
+        if (after.st_mtime_ns, after.st_size) != (before.st_mtime_ns, before.st_size):
+            os.unlink(tmp_path)
+            stats["status"] = "changed"
+            return stats
+        os.replace(tmp_path, path)
+        return stats
+    except (SnapshotStreamError, OSError, UnicodeDecodeError, ValueError) as error:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        stats["status"] = "error"
+        stats["error"] = str(error)
+        return stats
+
+
+def _compact_task(args):
+    return compact_file(*args)
+
+
+def compact_all(paths, step_names=DEFAULT_STEPS, dry_run=False, workers=None):
+    """``compact_file`` for every path on a process pool; per-file statistics in path order."""
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, tuple(step_names), dry_run) for path in paths]
+    if workers <= 1 or len(paths) <= 1:
+        return [compact_file(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_compact_task, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+
+
+def summarize(results, seconds):
+    """Totals over ``compact_all`` results, with throughput."""
+    steps = {}
+    for result in results:
+        for name, counts in result["steps"].items():
+            steps.setdefault(name, Counter()).update(counts)
+    total = lambda key: sum(r[key] for r in results)
+    return {
+        "files": len(results),
+        "status": dict(Counter(r["status"] for r in results)),
+        "errors": {r["user_id"]: r["error"] for r in results if r["status"] == "error"},
+        "records_in": total("records_in"),
+        "records_out": total("records_out"),
+        "bytes_in": total("bytes_in"),
+        "bytes_out": total("bytes_out"),
+        "steps": {name: dict(counts) for name, counts in steps.items()},
+        "seconds": round(seconds, 3),
+        "files_per_second": round(len(results) / seconds, 1) if seconds > 0 else None,
+        "mb_per_second": round(total("bytes_in") / 1e6 / seconds, 2) if seconds > 0 else None,
+        "records_per_second": round(total("records_in") / seconds) if seconds > 0 else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.compact", description=__doc__.split("\n\n")[0],
+                                     epilog="Stop or restart the backend around a real run: its snapshot cache keeps "
+                                            "serving the pre-migration documents until the next write.")
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOT_DIR, help="directory of <userId>.json snapshots")
+    parser.add_argument("--steps", default=",".join(DEFAULT_STEPS),
+                        help=f"comma-separated migration steps, from: {', '.join(STEPS)} (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="migrate in memory and report, without writing")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    step_names = [name.strip() for name in args.steps.split(",") if name.strip()]
+    unknown = [name for name in step_names if name not in STEPS]
+    if unknown:
+        parser.error(f"unknown step(s): {', '.join(unknown)}")
+    # Always in chain order, whatever order they were given in
+    step_names = [name for name in STEPS if name in step_names]
+
+    paths = iter_snapshot_paths(args.snapshots)
+    started = time.perf_counter()
+    results = compact_all(paths, step_names, dry_run=args.dry_run, workers=args.workers)
+    summary = summarize(results, time.perf_counter() - started)
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    print(f"{'Checked' if args.dry_run else 'Compacted'} {summary['files']} snapshots, {summary['records_in']} records "
+          f"({summary['bytes_in'] / 1e6:.1f} MB -> {summary['bytes_out'] / 1e6:.1f} MB) in {summary['seconds']:.1f}s: "
+          f"{summary['mb_per_second']} MB/s, {summary['records_per_second']} records/s", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
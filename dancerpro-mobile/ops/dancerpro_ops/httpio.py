@@ -0,0 +1,254 @@
+"""Minimal HTTP/1.1 on asyncio streams, for the load and fault-injection tools.
+
+The tools here only talk to the local backend and to each other over plain HTTP, so a small
+server (``serve``) and a keep-alive client (``HttpClient``) cover it without an HTTP library.
+Bodies are read whole; requests are not pipelined.
+"""
+
+import asyncio
+import json
+import logging
+import math
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+log = logging.getLogger(__name__)
+
+MAX_HEAD_BYTES = 64 * 1024
+
+
+class HttpProtocolError(ValueError):
+    """The peer sent something that is not HTTP/1.x."""
+
+
+def _parse_head(head):
+    lines = head.decode("latin-1").split("\r\n")
+    start = lines[0].split(" ", 2)
+    if len(start) < 3:
+        raise HttpProtocolError(f"bad start line: {lines[0]!r}")
+    headers = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HttpProtocolError(f"bad header line: {line!r}")
+        headers[name.strip().lower()] = value.strip()
+    return start, headers
+
+
+async def _read_head(reader):
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HttpProtocolError("header section too large") from None
+
+
+async def _read_body(reader, headers):
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                # Trailers, if any, end with an empty line
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    length = int(headers.get("content-length") or 0)
+    return await reader.readexactly(length) if length else b""
+
+
+def _keep_alive(version, headers):
+    connection = headers.get("connection", "").lower()
+    return connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+
+class Request:
+    """An incoming request: ``query`` keeps the last value of each parameter."""
+
+    def __init__(self, method, target, headers, body):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path
+        self.query = {key: values[-1] for key, values in parse_qs(url.query, keep_blank_values=True).items()}
+        self.headers = headers
+        self.body = body
+
+    def form(self):
+        """Form fields as lists (Twilio repeats parameters such as ``StatusCallbackEvent``)."""
+        return parse_qs(self.body.decode("utf-8"), keep_blank_values=True)
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+
+class Response:
+    def __init__(self, status=200, body=b"", content_type="text/plain; charset=utf-8", headers=None):
+        self.status = status
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.headers = {"Content-Type": content_type, **(headers or {})}
+
+    def encode(self, keep_alive):
+        reason = HTTPStatus(self.status).phrase if self.status in HTTPStatus._value2member_map_ else ""
+        lines = [f"HTTP/1.1 {self.status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in self.headers.items()]
+        lines += [f"Content-Length: {len(self.body)}", f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + self.body
+
+
+def json_response(payload, status=200, headers=None):
+    return Response(status, json.dumps(payload, separators=(",", ":")), "application/json", headers)
+
+
+async def serve(handler, host="127.0.0.1", port=0):
+    """Start serving ``await handler(request) -> Response``; returns the ``asyncio.Server``.
+
+    With ``port=0`` the system picks a free port: see ``bound_port``.
+    """
+
+    async def on_connection(reader, writer):
+        try:
+            while True:
+                try:
+                    head = await _read_head(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                (method, target, version), headers = _parse_head(head)
+                body = await _read_body(reader, headers)
+                try:
+                    response = await handler(Request(method, target, headers, body))
+                except Exception:
+                    log.exception("handler failed for %s %s", method, target)
+                    response = Response(500, "Internal Server Error")
+                keep_alive = _keep_alive(version, headers)
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (HttpProtocolError, ValueError, asyncio.IncompleteReadError, ConnectionError) as error:
+            log.debug("dropping connection: %s", error)
+        except asyncio.CancelledError:
+            pass  # server shutting down
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_connection, host, port, limit=MAX_HEAD_BYTES)
+
+
+def bound_port(server):
+    return server.sockets[0].getsockname()[1]
+
+
+class HttpResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+    def text(self):
+        return self.body.decode("utf-8", "replace")
+
+
+def split_url(url):
+    """``("http://host:port", "/path?query")`` for an absolute http URL."""
+    parts = urlsplit(url)
+    if parts.scheme != "http" or not parts.hostname:
+        raise ValueError(f"only plain http URLs are supported: {url!r}")
+    path = parts.path or "/"
+    return f"http://{parts.netloc}", f"{path}?{parts.query}" if parts.query else path
+
+
+class HttpClient:
+    """Keep-alive connections to one ``http://host:port`` origin.
+
+    At most ``connections`` requests are in flight; idle connections are reused, and a request
+    that fails on a reused connection before any response arrived is retried once on a new one.
+    """
+
+    def __init__(self, origin, connections=16, timeout=30.0):
+        parts = urlsplit(origin)
+        if parts.scheme != "http" or not parts.hostname:
+            raise ValueError(f"only plain http origins are supported: {origin!r}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(connections)
+        self._idle = []
+
+    async def request(self, method, path, *, body=b"", headers=None, json_body=None, form=None):
+        headers = dict(headers or {})
+        if json_body is not None:
+            body = json.dumps(json_body).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif form is not None:
+            body = urlencode(form, doseq=True).encode("utf-8")
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        head = [f"{method} {path} HTTP/1.1", f"Host: {self.netloc}", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                reader, writer = self._idle.pop() if reused else await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port, limit=MAX_HEAD_BYTES), self.timeout)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    response, keep_alive = await asyncio.wait_for(self._read_response(reader, method), self.timeout)
+                except (asyncio.IncompleteReadError, ConnectionError) as error:
+                    writer.close()
+                    if reused and not getattr(error, "partial", b""):
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    async def _read_response(self, reader, method):
+        (version, status, _), headers = _parse_head(await _read_head(reader))
+        status = int(status)
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await _read_body(reader, headers)
+        else:
+            # No framing: the body runs to the end of the connection
+            return HttpResponse(status, headers, await reader.read()), False
+        return HttpResponse(status, headers, body), _keep_alive(version, headers)
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def latency_summary(samples_ms):
+    """Count, mean and nearest-rank percentiles of latencies in milliseconds."""
+    values = sorted(samples_ms)
+    if not values:
+        return {"count": 0}
+    rank = lambda q: values[max(0, math.ceil(q * len(values)) - 1)]
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(rank(0.50), 3),
+        "p90": round(rank(0.90), 3),
+        "p95": round(rank(0.95), 3),
+        "p99": round(rank(0.99), 3),
+        "max": round(values[-1], 3),
+    }
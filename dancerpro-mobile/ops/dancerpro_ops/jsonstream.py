@@ -0,0 +1,171 @@
+"""Snapshot files read and written one record at a time.
+
+``iter_snapshot`` walks ``{"snapshot": {<name>: [records...], ...}, <key>: value, ...}`` and
+decodes a single array element at a time, so memory stays bounded by the largest record instead
+of the file. ``CompactSnapshotWriter`` writes the same layout back without indentation.
+"""
+
+import json
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+_NUMBER_TAIL = "0123456789+-.eE"
+
+
+class SnapshotStreamError(ValueError):
+    """The file is not a snapshot object (or not valid JSON)."""
+
+
+class _Reader:
+    def __init__(self, handle, chunk_size):
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of buf
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self, size=None):
+        """Append the next chunk, dropping what was consumed; False at end of file."""
+        if self.eof:
+            return False
+        chunk = self.handle.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos:
+            self.offset += self.pos
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        self.buf += chunk
+        return True
+
+    def peek(self):
+        """Next non-whitespace character, '' at end of file."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise SnapshotStreamError(f"expected {' or '.join(repr(c) for c in chars)} at character {self.offset + self.pos}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as error:
+                # Most likely cut off by the end of the buffer: read more (doubling) and retry
+                if self.fill(max(self.chunk_size, len(self.buf))):
+                    continue
+                raise SnapshotStreamError(f"{error.msg} at character {self.offset + error.pos}") from None
+            # A number running up to the end of the buffer ("12", "-6.5e") may continue in the next chunk
+            if not self.buf[end:].strip(_NUMBER_TAIL) and isinstance(value, (int, float)) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _keys(reader):
+    """Keys of the object whose '{' was just read; the caller reads each value before resuming."""
+    if reader.peek() == "}":
+        reader.expect("}")
+        return
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise SnapshotStreamError(f"expected an object key at character {reader.offset + reader.pos}")
+        reader.expect(":")
+        yield key
+        if reader.expect(",}") == "}":
+            return
+
+
+def iter_snapshot(handle, chunk_size=CHUNK_SIZE):
+    """Events of a snapshot file, in file order.
+
+    ``("collection", name, None)`` starts an array under ``"snapshot"``, followed by one
+    ``("record", name, record)`` per element; other keys of ``"snapshot"`` come as
+    ``("field", name, value)`` and top-level keys besides ``"snapshot"`` as ``("meta", key, value)``.
+    """
+    reader = _Reader(handle, chunk_size)
+    reader.expect("{")
+    for key in _keys(reader):
+        if key != "snapshot" or reader.peek() != "{":
+            yield "meta", key, reader.value()
+            continue
+        reader.expect("{")
+        for name in _keys(reader):
+            if reader.peek() != "[":
+                yield "field", name, reader.value()
+                continue
+            reader.expect("[")
+            yield "collection", name, None
+            if reader.peek() == "]":
+                reader.expect("]")
+                continue
+            while True:
+                yield "record", name, reader.value()
+                if reader.expect(",]") == "]":
+                    break
+    if reader.peek():
+        raise SnapshotStreamError(f"unexpected data after the snapshot at character {reader.offset + reader.pos}")
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+
+
+class CompactSnapshotWriter:
+    """Writes ``iter_snapshot`` events back as compact JSON; top-level values go after the snapshot."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.meta = {}
+        self.collection = None
+        self.first_key = True
+        self.first_record = True
+        handle.write('{"snapshot":{')
+
+    def _key(self, name):
+        self._close_collection()
+        self.handle.write(("" if self.first_key else ",") + _dumps(name) + ":")
+        self.first_key = False
+
+    def _close_collection(self):
+        if self.collection is not None:
+            self.handle.write("]")
+            self.collection = None
+
+    def start_collection(self, name):
+        self._key(name)
+        self.handle.write("[")
+        self.collection = name
+        self.first_record = True
+
+    def record(self, record):
+        self.handle.write(("" if self.first_record else ",") + _dumps(record))
+        self.first_record = False
+
+    def field(self, name, value):
+        self._key(name)
+        self.handle.write(_dumps(value))
+
+    def meta_value(self, key, value):
+        self.meta[key] = value
+
+    def close(self):
+        self._close_collection()
+        self.handle.write("}")
+        for key, value in self.meta.items():
+            self.handle.write("," + _dumps(key) + ":" + _dumps(value))
+        self.handle.write("}")
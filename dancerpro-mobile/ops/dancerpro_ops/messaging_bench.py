@@ -0,0 +1,121 @@
+"""SMS send throughput and history endpoint latency of a running backend.
+
+Meant for a backend pointed at the Twilio stand-in (``dancerpro_ops.twilio_standin``), whose
+history was seeded for the numbers used here (``--seed-numbers``)::
+
+    python -m dancerpro_ops.messaging_bench --backend http://127.0.0.1:3001 --standin http://127.0.0.1:4010 \\
+        --sends 2000 --history 500 --concurrency 32 --numbers 50
+
+Logs in as the seed test user, sends ``--sends`` SMS through ``POST /api/send-sms``, then reads
+``GET /api/conversations/:phoneNumber`` and ``GET /api/calls/history/:phoneNumber`` ``--history``
+times each. The report (JSON on stdout) has throughput, status codes and latency percentiles per
+phase, and the stand-in's counters when ``--standin`` is given.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter
+from urllib.parse import quote
+
+from .httpio import HttpClient, latency_summary
+
+SEED_EMAIL = "testuser@example.com"
+SEED_PASSWORD = "StrongPassword123!"
+
+
+def bench_numbers(count):
+    """The numbers the stand-in seeds history for."""
+    return [f"+1555{2000000 + i:07d}" for i in range(count)]
+
+
+async def run_phase(client, requests, concurrency, headers=None):
+    """Issue ``(method, path, json_body)`` requests ``concurrency`` at a time; returns the phase report."""
+    latencies, statuses = [], Counter()
+    pending = iter(requests)
+
+    async def worker():
+        for method, path, body in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json_body=body, headers=headers)
+                statuses[str(response.status)] += 1
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+                statuses[type(error).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": sum(statuses.values()),
+        "statuses": dict(statuses),
+        "seconds": round(seconds, 3),
+        "ok_per_second": round(ok / seconds, 1) if seconds > 0 else None,
+        "latency_ms": latency_summary(latencies),
+    }
+
+
+async def login(client, email, password):
+    response = await client.request("POST", "/api/auth/login", json_body={"email": email, "password": password})
+    token = response.json().get("token") if response.ok else None
+    if not token:
+        raise SystemExit(f"login as {email} failed: {response.status} {response.text()[:200]}")
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def benchmark(args):
+    client = HttpClient(args.backend, connections=args.concurrency, timeout=args.timeout)
+    try:
+        auth = await login(client, args.email, args.password)
+        numbers = bench_numbers(args.numbers)
+        report = {"backend": args.backend, "concurrency": args.concurrency}
+        sends = [("POST", "/api/send-sms", {"to": numbers[i % len(numbers)], "body": f"Benchmark message {i}"})
+                 for i in range(args.sends)]
+        report["send_sms"] = await run_phase(client, sends, args.concurrency, auth)
+        for name, route in (("conversations", "/api/conversations"), ("call_history", "/api/calls/history")):
+            reads = [("GET", f"{route}/{quote(numbers[i % len(numbers)], safe='')}?limit={args.limit}", None)
+                     for i in range(args.history)]
+            report[name] = await run_phase(client, reads, args.concurrency, auth)
+    finally:
+        await client.close()
+
+    if args.standin:
+        standin = HttpClient(args.standin)
+        try:
+            report["standin"] = (await standin.request("GET", "/stand-in/stats")).json()
+        finally:
+            await standin.close()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.messaging_bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", default="http://127.0.0.1:3001")
+    parser.add_argument("--standin", default=None, help="Twilio stand-in URL, to include its counters")
+    parser.add_argument("--email", default=SEED_EMAIL)
+    parser.add_argument("--password", default=SEED_PASSWORD)
+    parser.add_argument("--sends", type=int, default=1000, help="SMS to send")
+    parser.add_argument("--history", type=int, default=200, help="reads of each history endpoint")
+    parser.add_argument("--limit", type=int, default=50, help="history page size")
+    parser.add_argument("--numbers", type=int, default=50, help="distinct recipient numbers")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(benchmark(args))
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    for phase in ("send_sms", "conversations", "call_history"):
+        result, latency = report[phase], report[phase]["latency_ms"]
+        print(f"{phase}: {result['requests']} requests, {result['ok_per_second']} ok/s, "
+              f"p50 {latency.get('p50')} ms, p99 {latency.get('p99')} ms, statuses {result['statuses']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
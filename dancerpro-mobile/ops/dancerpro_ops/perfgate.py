@@ -0,0 +1,510 @@
+"""Keep versioned performance baselines and gate new runs against them.
+
+Record the timings of a few runs as a baseline, then compare later runs with it::
+
+    python -m dancerpro_ops.perfgate record --baselines perf-baselines --version v1.4.0 \\
+        runs/*/results.json runs/*/messaging_bench.json runs/*/boot.log
+    python -m dancerpro_ops.perfgate compare --baselines perf-baselines --against latest \\
+        --report perf-regression-report.md new/*/results.json new/*/messaging_bench.json new/*/boot.log
+    python -m dancerpro_ops.perfgate list --baselines perf-baselines
+
+Inputs are recognized by their content:
+
+- the Playwright JSON reporter's ``test-results/results.json``: the duration of every passed
+  result of every test (``--repeat-each`` and retries give several) and of the steps in it;
+- reports of the ops benchmarks (``messaging_bench``, ``webhook_flood``, ``soak``): p50, p95 and
+  p99 of every latency summary in them, one sample per report;
+- backend logs with the boot profile line (``Time to listening: ...``): total and per phase;
+- JSON lines of ``{"metric": ..., "value": ..., "unit": "ms", "better": "lower"}`` written by any
+  other harness (bundle load times, TestSprite step timings).
+
+Each metric is compared with a one-sided Mann-Whitney U test (is the new run slower?), with Holm's
+correction across metrics, and Cliff's delta as the effect size. A metric regressed when the
+difference is significant, the effect is at least ``--min-effect`` and the median moved by at
+least ``--min-change``; a single slow sample cannot do that. The Markdown report follows the
+layout of ``testsprite_tests/testsprite-mcp-test-report.md``; the exit status is 1 on any
+regression.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+SUMMARY_PERCENTILES = ("p50", "p95", "p99")
+EXACT_MAX_SIZE = 30
+_BOOT_LINE = re.compile(r"Time to listening: ([\d.]+)ms \(([^)]*)\)")
+_BOOT_PHASE = re.compile(r"([\w.-]+)=([\d.]+)ms")
+_VERSION = re.compile(r"^[\w.+-]+$")
+
+
+# ---- Collecting samples ----
+
+class Samples:
+    """Samples per metric, with each metric's unit and direction ('lower' or 'higher' is better)."""
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics or {}
+
+    def add(self, name, value, unit="ms", better="lower"):
+        metric = self.metrics.setdefault(name, {"unit": unit, "better": better, "samples": []})
+        metric["samples"].append(float(value))
+
+    def merge(self, other):
+        for name, metric in other.metrics.items():
+            for value in metric["samples"]:
+                self.add(name, value, metric["unit"], metric["better"])
+
+
+def _playwright_steps(samples, prefix, steps):
+    for step in steps or ():
+        name = f"{prefix} > {step['title']}"
+        if "duration" in step and not step.get("error"):
+            samples.add(name, step["duration"])
+        _playwright_steps(samples, name, step.get("steps"))
+
+
+def _playwright_suite(samples, suite, titles):
+    titles = titles + [suite["title"]] if suite.get("title") else titles
+    for spec in suite.get("specs", ()):
+        for test in spec.get("tests", ()):
+            name = "playwright/{}/{}".format(test.get("projectName") or "default", " > ".join(titles + [spec["title"]]))
+            for result in test.get("results", ()):
+                if result.get("status") == "passed":
+                    samples.add(name, result["duration"])
+                    _playwright_steps(samples, name, result.get("steps"))
+    for child in suite.get("suites", ()):
+        _playwright_suite(samples, child, titles)
+
+
+def _latency_summaries(samples, prefix, node):
+    if isinstance(node, dict):
+        if "count" in node and all(key in node for key in SUMMARY_PERCENTILES):
+            if node["count"]:
+                for key in SUMMARY_PERCENTILES:
+                    samples.add(f"{prefix}/{key}", node[key])
+            return
+        for key, value in node.items():
+            _latency_summaries(samples, f"{prefix}/{key}", value)
+
+
+def collect(path):
+    """The samples in one input file (see the module docstring for the formats)."""
+    samples = Samples()
+    with open(path, "r", encoding="utf-8") as handle:
+        text = handle.read()
+    try:
+        document = json.loads(text)
+    except ValueError:
+        document = None
+    if isinstance(document, dict) and "suites" in document and "config" in document:
+        for suite in document["suites"]:
+            _playwright_suite(samples, suite, [])
+    elif isinstance(document, dict):
+        tool = os.path.splitext(os.path.basename(path))[0]
+        _latency_summaries(samples, re.sub(r"[-_.]?\d+$", "", tool) or tool, document)
+    else:
+        for line in text.splitlines():
+            boot = _BOOT_LINE.search(line)
+            if boot:
+                samples.add("backend/boot/total", boot.group(1))
+                for phase, ms in _BOOT_PHASE.findall(boot.group(2)):
+                    samples.add(f"backend/boot/{phase}", ms)
+            elif line.lstrip().startswith("{"):
+                record = json.loads(line)
+                if "metric" in record and "value" in record:
+                    samples.add(record["metric"], record["value"], record.get("unit", "ms"), record.get("better", "lower"))
+    return samples
+
+
+def collect_all(paths):
+    samples = Samples()
+    for path in paths:
+        found = collect(path)
+        if not found.metrics:
+            print(f"{path}: no timings found", file=sys.stderr)
+        samples.merge(found)
+    return samples
+
+
+# ---- Statistics ----
+
+def _rank(values):
+    """Ranks starting at 1, ties get their average rank."""
+    order = np.argsort(values, kind="mergesort")
+    ranks = np.empty(len(values))
+    ordered = values[order]
+    start = 0
+    while start < len(ordered):
+        end = start
+        while end + 1 < len(ordered) and ordered[end + 1] == ordered[start]:
+            end += 1
+        ranks[order[start:end + 1]] = (start + end) / 2 + 1
+        start = end + 1
+    return ranks
+
+
+def _exact_upper_tail(u, m, n):
+    """P(U >= u) under the null for sample sizes m and n without ties."""
+    # row[j]: how many orderings of j candidate and i baseline values give each U. The largest
+    # value is either a candidate one (it beats all i baseline values) or a baseline one.
+    size = m * n + 1
+    row = [np.zeros(size) for _ in range(m + 1)]
+    for j in range(m + 1):
+        row[j][0] = 1
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            with_candidate_last = np.zeros(size)
+            with_candidate_last[i:] = row[j - 1][:size - i]
+            row[j] = with_candidate_last + row[j]
+    return float(row[m][max(0, math.ceil(u - 1e-9)):].sum() / math.comb(m + n, m))
+
+
+def mann_whitney_greater(candidate, baseline):
+    """One-sided Mann-Whitney U test that ``candidate`` tends to be larger than ``baseline``.
+
+    Returns (U, p): U counts the pairs where the candidate value is larger (ties count half). The
+    p-value is exact for small samples without ties, else from the normal approximation with tie
+    and continuity corrections.
+    """
+    x = np.asarray(candidate, dtype=float)
+    y = np.asarray(baseline, dtype=float)
+    m, n = len(x), len(y)
+    pooled = np.concatenate([x, y])
+    ranks = _rank(pooled)
+    u = float(ranks[:m].sum() - m * (m + 1) / 2)
+    if m <= EXACT_MAX_SIZE and n <= EXACT_MAX_SIZE and len(np.unique(pooled)) == m + n:
+        return u, _exact_upper_tail(u, m, n)
+    _, ties = np.unique(pooled, return_counts=True)
+    variance = m * n / 12 * ((m + n + 1) - float((ties ** 3 - ties).sum()) / ((m + n) * (m + n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (u - m * n / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def cliffs_delta(u, m, n):
+    """Cliff's delta from U: P(candidate > baseline) - P(candidate < baseline), in [-1, 1]."""
+    return 2 * u / (m * n) - 1
+
+
+def effect_label(delta):
+    """Romano et al.'s thresholds for |delta|."""
+    size = abs(delta)
+    return "negligible" if size < 0.147 else "small" if size < 0.33 else "medium" if size < 0.474 else "large"
+
+
+def holm(p_values):
+    """Holm-Bonferroni adjusted p-values, in the input order."""
+    order = sorted(range(len(p_values)), key=lambda i: p_values[i])
+    adjusted, running = [1.0] * len(p_values), 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def compare_metric(baseline, candidate, better="lower", min_samples=5):
+    """Test statistics of one metric; ``delta`` and the p-values are oriented so positive means worse."""
+    result = {
+        "baseline_n": len(baseline), "candidate_n": len(candidate),
+        "baseline_median": float(np.median(baseline)) if baseline else None,
+        "candidate_median": float(np.median(candidate)) if candidate else None,
+    }
+    if result["baseline_median"] and result["candidate_median"] is not None:
+        result["change"] = result["candidate_median"] / result["baseline_median"] - 1
+    if len(baseline) < min_samples or len(candidate) < min_samples:
+        result["status"] = "insufficient"
+        return result
+    sign = 1 if better == "lower" else -1
+    worse, base = [sign * value for value in candidate], [sign * value for value in baseline]
+    u, p_worse = mann_whitney_greater(worse, base)
+    result.update(u=u, p_worse=p_worse, p_better=mann_whitney_greater(base, worse)[1],
+                  delta=cliffs_delta(u, len(worse), len(base)))
+    return result
+
+
+def compare(baseline, candidate, alpha=0.05, min_effect=0.33, min_change=0.05, min_samples=5, correction="holm"):
+    """Compares every metric of the candidate samples with the baseline's; returns results by metric."""
+    results = {}
+    for name in sorted(set(baseline) | set(candidate)):
+        if name not in baseline:
+            results[name] = {"status": "new", "candidate_n": len(candidate[name]["samples"])}
+        elif name not in candidate:
+            results[name] = {"status": "missing", "baseline_n": len(baseline[name]["samples"])}
+        else:
+            better = baseline[name].get("better", "lower")
+            results[name] = compare_metric(baseline[name]["samples"], candidate[name]["samples"], better, min_samples)
+            results[name].update(unit=baseline[name].get("unit", "ms"), better=better)
+
+    tested = [name for name, result in results.items() if "u" in result]
+    for direction in ("worse", "better"):
+        raw = [results[name][f"p_{direction}"] for name in tested]
+        adjusted = holm(raw) if correction == "holm" else raw
+        for name, p in zip(tested, adjusted):
+            results[name][f"p_{direction}_adjusted"] = p
+    for name in tested:
+        result = results[name]
+        worse_change = result.get("change", 0.0) * (1 if result["better"] == "lower" else -1)
+        if result["p_worse_adjusted"] < alpha and result["delta"] >= min_effect and worse_change >= min_change:
+            result["status"] = "regressed"
+        elif result["p_better_adjusted"] < alpha and -result["delta"] >= min_effect and -worse_change >= min_change:
+            result["status"] = "improved"
+        else:
+            result["status"] = "unchanged"
+    return results
+
+
+# ---- Baselines ----
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def baseline_path(directory, version):
+    if not _VERSION.match(version):
+        raise ValueError(f"bad baseline version {version!r} (letters, digits, '.', '_', '+', '-')")
+    return os.path.join(directory, f"{version}.json")
+
+
+def load_baseline(directory, version):
+    """A stored baseline by version, ``latest`` (most recently recorded) or path to a baseline file."""
+    if version == "latest":
+        stored = list_baselines(directory)
+        if not stored:
+            raise ValueError(f"no baselines in {directory}")
+        version = stored[-1]["version"]
+    path = version if version.endswith(".json") and os.path.exists(version) else baseline_path(directory, version)
+    if not os.path.exists(path):
+        raise ValueError(f"no baseline {version!r} in {directory}")
+    with open(path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def list_baselines(directory):
+    """Stored baselines, oldest first."""
+    found = []
+    for entry in sorted(os.listdir(directory)) if os.path.isdir(directory) else ():
+        if entry.endswith(".json"):
+            with open(os.path.join(directory, entry), "r", encoding="utf-8") as handle:
+                baseline = json.load(handle)
+            found.append({"version": baseline["version"], "recorded": baseline["recorded"],
+                          "revision": baseline.get("revision"), "metrics": len(baseline["metrics"]),
+                          "samples": sum(len(metric["samples"]) for metric in baseline["metrics"].values())})
+    return sorted(found, key=lambda item: item["recorded"])
+
+
+def record(directory, version, samples, sources, revision=None, append=False):
+    """Stores ``samples`` as baseline ``version``; with ``append``, adds them to an existing one."""
+    path = baseline_path(directory, version)
+    if os.path.exists(path) and not append:
+        raise ValueError(f"baseline {version!r} exists (use --append to add runs to it)")
+    if os.path.exists(path):
+        stored = load_baseline(directory, version)
+        merged = Samples(stored["metrics"])
+        merged.merge(samples)
+        stored.update(metrics=merged.metrics, sources=stored["sources"] + sources)
+    else:
+        stored = {"version": version, "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  "revision": revision, "sources": sources, "metrics": samples.metrics}
+    os.makedirs(directory, exist_ok=True)
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        json.dump(stored, handle, indent=1, sort_keys=True)
+    os.replace(temporary, path)
+    return stored
+
+
+# ---- Report ----
+
+STATUS_ICONS = {"regressed": "❌", "improved": "🚀", "unchanged": "✅", "insufficient": "⚪", "new": "⚪",
+                "missing": "⚪"}
+GROUP_LABELS = {"playwright": "🎭 Playwright Tests", "backend": "⚙️ Backend", "messaging_bench": "📨 Messaging Benchmark",
+                "webhook_flood": "🪝 Webhook Ingestion", "soak": "🧪 Soak Test", "bundle": "📦 Bundle Loading",
+                "testsprite": "🤖 TestSprite Steps"}
+
+
+def _group(name):
+    return name.split("/", 1)[0]
+
+
+def _number(value, unit):
+    return "n/a" if value is None else f"{value:,.1f} {unit}".rstrip()
+
+
+def impact(result):
+    change = abs(result.get("change") or 0)
+    return "HIGH" if change >= 0.25 else "MEDIUM" if change >= 0.10 else "LOW"
+
+
+def render_report(results, baseline, candidate_sources, settings, when=None):
+    """The comparison as Markdown, laid out like the TestSprite reports."""
+    when = when or datetime.now(timezone.utc)
+    counts = {status: sum(1 for result in results.values() if result["status"] == status) for status in STATUS_ICONS}
+    compared = counts["regressed"] + counts["improved"] + counts["unchanged"]
+    lines = [
+        "# Performance Regression Report - DancerPro Mobile App", "", "---", "",
+        "## 1️⃣ Document Metadata",
+        "- **Project Name:** DancerPro Mobile App",
+        f"- **Report Date:** {when:%B} {when.day}, {when:%Y}",
+        f"- **Baseline:** {baseline['version']} (recorded {baseline['recorded']}"
+        + (f", revision {baseline['revision']})" if baseline.get("revision") else ")"),
+        f"- **Candidate Runs:** {', '.join(f'`{source}`' for source in candidate_sources)}",
+        f"- **Metrics Compared:** {compared} of {len(results)}",
+        f"- **Method:** one-sided Mann-Whitney U, alpha {settings['alpha']}"
+        + (" (Holm-corrected)" if settings["correction"] == "holm" else "")
+        + f", Cliff's delta ≥ {settings['min_effect']}, median change ≥ {settings['min_change']:.0%}",
+        "", "---", "",
+        "## 2️⃣ Executive Summary", "",
+    ]
+    if counts["regressed"]:
+        lines.append(f"The candidate runs are significantly slower than baseline {baseline['version']} on "
+                     f"{counts['regressed']} of {compared} compared metrics.")
+    else:
+        lines.append(f"No metric is significantly slower than baseline {baseline['version']}.")
+    lines += [
+        "", "**Key Findings:**",
+        f"- **{counts['regressed']} regressed ({counts['regressed'] / compared:.0%})**" if compared else
+        f"- **{counts['regressed']} regressed**",
+        f"- **{counts['improved']} improved**",
+        f"- **{counts['unchanged']} unchanged**",
+        f"- **{counts['insufficient'] + counts['new'] + counts['missing']} not compared** - {counts['insufficient']} "
+        f"with fewer than {settings['min_samples']} samples, {counts['new']} new, {counts['missing']} missing from the runs",
+        "", "---", "",
+        "## 3️⃣ Results by Metric Group", "",
+    ]
+    groups = {}
+    for name, result in results.items():
+        groups.setdefault(_group(name), []).append((name, result))
+    for group, members in groups.items():
+        lines += [f"### {GROUP_LABELS.get(group, '⏱️ ' + group)} ({len(members)} metrics)", ""]
+        for name, result in members:
+            lines.append(f"#### {STATUS_ICONS[result['status']]} {name}")
+            lines.append(f"- **Status:** {result['status'].upper()}")
+            if result["status"] == "new":
+                lines.append(f"- **Samples:** {result['candidate_n']} in the candidate runs, none in the baseline")
+            elif result["status"] == "missing":
+                lines.append(f"- **Samples:** {result['baseline_n']} in the baseline, none in the candidate runs")
+            else:
+                unit = result["unit"]
+                change = f" ({result['change']:+.1%})" if "change" in result else ""
+                lines.append(f"- **Median:** {_number(result['baseline_median'], unit)} → "
+                             f"{_number(result['candidate_median'], unit)}{change}")
+                if "u" in result:
+                    lines.append(f"- **Mann-Whitney U:** U={result['u']:g}, p={result['p_worse']:.4g}"
+                                 f" (adjusted {result['p_worse_adjusted']:.4g})")
+                    lines.append(f"- **Effect Size:** Cliff's delta {result['delta']:+.2f} ({effect_label(result['delta'])})")
+                lines.append(f"- **Samples:** {result['baseline_n']} baseline, {result['candidate_n']} candidate")
+                if result["status"] == "regressed":
+                    lines.append(f"- **Impact:** {impact(result)}")
+            lines.append("")
+    lines += [
+        "---", "",
+        "## 4️⃣ Coverage & Matching Metrics", "",
+        f"**Overall:** {counts['regressed']} regressed of {compared} compared metrics", "",
+        "| Metric Group | Total Metrics | ✅ Unchanged | 🚀 Improved | ❌ Regressed | ⚪ Not Compared |",
+        "|--------------|---------------|--------------|-------------|--------------|-----------------|",
+    ]
+    for group, members in groups.items():
+        statuses = [result["status"] for _, result in members]
+        not_compared = sum(status in ("insufficient", "new", "missing") for status in statuses)
+        lines.append(f"| {GROUP_LABELS.get(group, group).split(' ', 1)[-1]} | {len(members)} | "
+                     f"{statuses.count('unchanged')} | {statuses.count('improved')} | {statuses.count('regressed')} | "
+                     f"{not_compared} |")
+    lines += ["", "---", "", "## 5️⃣ Regressions & Recommendations", ""]
+    regressions = sorted(((name, result) for name, result in results.items() if result["status"] == "regressed"),
+                         key=lambda item: -abs(item[1].get("change") or 0))
+    if regressions:
+        lines += ["### 🚨 Significant Slowdowns", ""]
+        for number, (name, result) in enumerate(regressions, 1):
+            lines += [
+                f"{number}. **{name}**",
+                f"   - **Change:** median {_number(result['baseline_median'], result['unit'])} → "
+                f"{_number(result['candidate_median'], result['unit'])} ({result['change']:+.1%}), "
+                f"Cliff's delta {result['delta']:+.2f}",
+                f"   - **Impact:** {impact(result)}",
+                "   - **Recommendation:** Profile the change against the baseline revision before merging, or record "
+                "a new baseline if the slowdown is intended",
+                "",
+            ]
+    else:
+        lines += ["No significant slowdowns.", ""]
+    if counts["insufficient"]:
+        lines += [f"⚠️ {counts['insufficient']} metrics had too few samples to test. Record more runs "
+                  "(`--repeat-each` for Playwright, repeated benchmark runs) to cover them.", ""]
+    return "\n".join(lines)
+
+
+# ---- Command line ----
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.perfgate", description=__doc__.split("\n\n")[0])
+    store = argparse.ArgumentParser(add_help=False)
+    store.add_argument("--baselines", default="perf-baselines", help="directory of stored baselines")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_command = commands.add_parser("record", parents=[store], help="store the timings of runs as a baseline")
+    record_command.add_argument("--version", required=True, help="baseline name, e.g. a release tag")
+    record_command.add_argument("--revision", default=None, help="source revision (default: git HEAD)")
+    record_command.add_argument("--append", action="store_true", help="add the runs to an existing baseline")
+    record_command.add_argument("inputs", nargs="+")
+    compare_command = commands.add_parser("compare", parents=[store], help="compare runs with a baseline")
+    compare_command.add_argument("--against", default="latest", help="baseline version, 'latest' or a file")
+    compare_command.add_argument("--report", default=None, help="write the Markdown report here")
+    compare_command.add_argument("--alpha", type=float, default=0.05)
+    compare_command.add_argument("--min-effect", type=float, default=0.33, help="smallest Cliff's delta to flag")
+    compare_command.add_argument("--min-change", type=float, default=0.05, help="smallest relative median change to flag")
+    compare_command.add_argument("--min-samples", type=int, default=5, help="fewer samples on either side: not tested")
+    compare_command.add_argument("--correction", choices=("holm", "none"), default="holm")
+    compare_command.add_argument("inputs", nargs="+")
+    commands.add_parser("list", parents=[store], help="list stored baselines")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "list":
+            json.dump(list_baselines(args.baselines), sys.stdout, indent=2)
+            sys.stdout.write("\n")
+            return 0
+        samples = collect_all(args.inputs)
+        if not samples.metrics:
+            parser.error("no timings found in the inputs")
+        if args.command == "record":
+            stored = record(args.baselines, args.version, samples, args.inputs, args.revision or _git_revision(),
+                            args.append)
+            print(f"baseline {stored['version']}: {len(stored['metrics'])} metrics, "
+                  f"{sum(len(metric['samples']) for metric in stored['metrics'].values())} samples", file=sys.stderr)
+            return 0
+        baseline = load_baseline(args.baselines, args.against)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+
+    settings = {"alpha": args.alpha, "min_effect": args.min_effect, "min_change": args.min_change,
+                "min_samples": args.min_samples, "correction": args.correction}
+    results = compare(baseline["metrics"], samples.metrics, **settings)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as handle:
+            handle.write(render_report(results, baseline, args.inputs, settings) + "\n")
+    regressed = [name for name, result in results.items() if result["status"] == "regressed"]
+    json.dump({"baseline": baseline["version"], "settings": settings, "regressed": regressed, "metrics": results},
+              sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    counts = {status: sum(1 for result in results.values() if result["status"] == status) for status in STATUS_ICONS}
+    print(f"against {baseline['version']}: {counts['regressed']} regressed, {counts['improved']} improved, "
+          f"{counts['unchanged']} unchanged, {counts['insufficient'] + counts['new'] + counts['missing']} not compared",
+          file=sys.stderr)
+    for name in regressed:
+        print(f"  slower: {name} ({results[name]['change']:+.1%})", file=sys.stderr)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
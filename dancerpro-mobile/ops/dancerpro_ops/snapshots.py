@@ -0,0 +1,133 @@
+"""Reading the per-user sync snapshots the backend stores in ``backend/snapshots/<userId>.json``.
+
+Each file holds ``{"snapshot": {clients, venues, shifts, transactions, outfits, events},
+"metadata": {...}}`` as written by ``backend/storage/fileStore.js``. The helpers here also
+reproduce the JavaScript coercions the app applies to record fields (``Number(x || 0)``,
+``new Date(x).getTime()``, ``String(x)``) so Python results match the app's.
+"""
+
+import json
+import math
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+SNAPSHOT_COLLECTIONS = ("clients", "venues", "shifts", "transactions", "outfits", "events")
+
+DEFAULT_SNAPSHOT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "backend", "snapshots")
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MS = timedelta(milliseconds=1)
+
+_JS_DECIMAL = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)(e[+-]?\d+)?$", re.IGNORECASE)
+_JS_RADIX = {"0x": 16, "0o": 8, "0b": 2}
+
+
+def js_number(value):
+    """``Number(value || 0)``: 0 for falsy values, NaN where JavaScript gives NaN."""
+    if value is None or value is False or value == "" or value == 0:
+        return 0.0
+    if value is True:
+        return 1.0
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return 0.0
+        if _JS_DECIMAL.match(text):
+            return float(text)
+        if text in ("Infinity", "+Infinity", "-Infinity"):
+            return -math.inf if text[0] == "-" else math.inf
+        radix = _JS_RADIX.get(text[:2].lower())
+        if radix:
+            try:
+                return float(int(text[2:], radix))
+            except ValueError:
+                return math.nan
+        return math.nan
+    if isinstance(value, list):
+        # [] -> 0, [x] -> Number(String(x)), longer arrays -> NaN
+        if not value:
+            return 0.0
+        return js_number(js_string(value[0])) if len(value) == 1 else math.nan
+    return math.nan
+
+
+def js_string(value):
+    """``String(value)`` for the scalar values found in records."""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        if math.isnan(value):
+            return "NaN"
+    return str(value)
+
+
+def js_lower(value):
+    """``value ? String(value).toLowerCase() : ''``"""
+    return js_string(value).lower() if value else ""
+
+
+def js_time(value, tz_offset=0):
+    """Epoch milliseconds of a record timestamp, as ``new Date(value).getTime()``; NaN when invalid.
+
+    ISO strings without an offset are local time in JavaScript; here local time is the client
+    offset ``tz_offset`` (minutes, same sign as ``Date#getTimezoneOffset``). Date-only strings
+    are UTC midnight, as in JavaScript.
+    """
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, bool):
+        return math.nan
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return math.nan
+    if parsed.tzinfo is None:
+        # Date-only strings are UTC; date-times without an offset are local time
+        offset = 0 if len(text) <= 10 else tz_offset
+        parsed = parsed.replace(tzinfo=timezone.utc) + timedelta(minutes=offset)
+    # Whole milliseconds, like Date (sub-millisecond digits are dropped)
+    return float((parsed - _EPOCH) // _MS)
+
+
+def record_time(record, tz_offset=0):
+    """Timestamp of a shift: ``start || end || date``, as lib/aiScoring.js reads it."""
+    return js_time(record.get("start") or record.get("end") or record.get("date"), tz_offset)
+
+
+def safe_list(value):
+    return value if isinstance(value, list) else []
+
+
+def iter_snapshot_paths(snapshot_dir=DEFAULT_SNAPSHOT_DIR):
+    """``<userId>.json`` files in ``snapshot_dir``, sorted by user id."""
+    names = sorted(name for name in os.listdir(snapshot_dir) if name.endswith(".json"))
+    return [os.path.join(snapshot_dir, name) for name in names]
+
+
+def user_id_of(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def load_snapshot(path):
+    """``(user_id, snapshot, metadata)`` for one stored file; collections are always lists."""
+    with open(path, "r", encoding="utf-8") as handle:
+        data = json.load(handle)
+    snapshot = data.get("snapshot") if isinstance(data, dict) else None
+    snapshot = snapshot if isinstance(snapshot, dict) else {}
+    metadata = data.get("metadata") if isinstance(data, dict) else None
+    normalized = {name: safe_list(snapshot.get(name)) for name in SNAPSHOT_COLLECTIONS}
+    return user_id_of(path), normalized, metadata if isinstance(metadata, dict) else {}
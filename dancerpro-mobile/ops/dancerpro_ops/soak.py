@@ -0,0 +1,445 @@
+"""Soak the backend with a mixed workload and flag memory growth and growing state.
+
+Runs registrations, logins, logouts, socket.io sessions and WebAuthn ceremonies that are started
+but never finished, for hours, while sampling the backend's ``/api/debug/runtime``::
+
+    python -m dancerpro_ops.soak --backend http://127.0.0.1:3001 --duration 6h --rate 20 \\
+        --sample-interval 30s --warmup 10m --max-rss-mb-per-hour 8
+
+Operations are issued open loop at ``--rate`` per second, drawn from ``--mix`` (weights per
+operation). Each sample has RSS, heap, event loop delay and the sizes of the backend's in-memory
+structures (``blacklistedTokens``, ``loginAttempts``, ``userSessions``, pending WebAuthn
+challenges, ...). After the run, growth per hour is fitted with the Theil-Sen estimator (the median
+of pairwise slopes, so GC sawtooth and single spikes do not tilt it) over the samples after
+``--warmup``. The exit status is 1 when RSS or heap grew faster than allowed, 2 when there were too
+few samples to tell, 0 otherwise. Structures growing by more than ``--max-entries-per-hour`` are
+listed as suspects, largest first, with the heap growth per entry they would account for.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+from .httpio import HttpClient, latency_summary, split_url
+
+DEFAULT_MIX = "register=2,login=4,logout=3,socket=4,webauthn_register=1,webauthn_login=1"
+OPERATIONS = ("register", "login", "logout", "socket", "webauthn_register", "webauthn_login")
+SOAK_PASSWORD = "SoakPass123!"
+MIN_SAMPLES = 5
+MAX_FIT_POINTS = 1000
+RECORD_SEPARATOR = "\x1e"
+_DURATION = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*$")
+_UNIT_SECONDS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+MB = 1024 * 1024
+
+
+def parse_duration(text):
+    """Seconds in ``"90"``, ``"90s"``, ``"30m"``, ``"6h"`` or ``"2d"``."""
+    match = _DURATION.match(str(text))
+    if not match:
+        raise ValueError(f"not a duration: {text!r}")
+    return float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+
+def parse_mix(text):
+    """``"login=4,logout=3"`` as ``{"login": 4.0, "logout": 3.0}``; unknown operations are errors."""
+    mix = {}
+    for part in filter(None, (item.strip() for item in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"unknown operation {name!r} (expected one of {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+        if mix[name] < 0:
+            raise ValueError(f"negative weight for {name}")
+    if not any(mix.values()):
+        raise ValueError("the mix has no operations")
+    return mix
+
+
+# ---- Trend fitting ----
+
+def theil_sen(times, values):
+    """Median slope over all pairs of points (value units per time unit); None with < 2 distinct times."""
+    x = np.asarray(times, dtype=float)
+    y = np.asarray(values, dtype=float)
+    if len(x) > MAX_FIT_POINTS:
+        keep = np.linspace(0, len(x) - 1, MAX_FIT_POINTS).round().astype(int)
+        x, y = x[keep], y[keep]
+    i, j = np.triu_indices(len(x), k=1)
+    dx = x[j] - x[i]
+    valid = dx > 0
+    if not valid.any():
+        return None
+    return float(np.median((y[j] - y[i])[valid] / dx[valid]))
+
+
+def runtime_sample(t, runtime):
+    """Flattens one ``/api/debug/runtime`` response into a sample row."""
+    memory, loop = runtime.get("memory", {}), runtime.get("eventLoop", {})
+    delay = loop.get("delayMs", {})
+    return {
+        "t": round(t, 3),
+        "rss_mb": memory.get("rssBytes", 0) / MB,
+        "heap_mb": memory.get("heapUsedBytes", 0) / MB,
+        "external_mb": memory.get("externalBytes", 0) / MB,
+        "loop_p99_ms": delay.get("p99"),
+        "loop_max_ms": delay.get("max"),
+        "loop_utilization": loop.get("utilization"),
+        "state": {name: size for name, size in runtime.get("state", {}).items() if isinstance(size, (int, float))},
+    }
+
+
+def analyze(samples, warmup=0.0, max_rss_mb_per_hour=10.0, max_heap_mb_per_hour=5.0, max_entries_per_hour=100.0):
+    """Growth per hour of memory and of every state structure, over the samples after ``warmup`` seconds."""
+    fitted = [sample for sample in samples if sample["t"] >= warmup]
+    result = {"samples": len(samples), "fitted_samples": len(fitted), "warmup_seconds": warmup}
+    if len(fitted) < MIN_SAMPLES or fitted[-1]["t"] - fitted[0]["t"] <= 0:
+        result.update(verdict="insufficient", reasons=[f"need at least {MIN_SAMPLES} samples after the warmup"])
+        return result
+
+    hours = [sample["t"] / 3600 for sample in fitted]
+    per_hour = lambda key: theil_sen(hours, [sample[key] for sample in fitted])
+    memory = {
+        "rss_mb_per_hour": round(per_hour("rss_mb"), 3),
+        "heap_mb_per_hour": round(per_hour("heap_mb"), 3),
+        "external_mb_per_hour": round(per_hour("external_mb"), 3),
+        "rss_mb": {"first": round(fitted[0]["rss_mb"], 1), "last": round(fitted[-1]["rss_mb"], 1),
+                   "max": round(max(sample["rss_mb"] for sample in fitted), 1)},
+        "heap_mb": {"first": round(fitted[0]["heap_mb"], 1), "last": round(fitted[-1]["heap_mb"], 1),
+                    "max": round(max(sample["heap_mb"] for sample in fitted), 1)},
+    }
+    loop = [(hour, sample["loop_p99_ms"]) for hour, sample in zip(hours, fitted) if sample["loop_p99_ms"] is not None]
+    if loop:
+        delays = [delay for _, delay in loop]
+        memory["loop_p99_ms"] = {"median": round(float(np.median(delays)), 2), "max": round(max(delays), 2),
+                                 "per_hour": round(theil_sen(*zip(*loop)) or 0.0, 3)}
+
+    structures = {}
+    for name in sorted({name for sample in fitted for name in sample["state"]}):
+        points = [(hour, sample["state"][name]) for hour, sample in zip(hours, fitted) if name in sample["state"]]
+        if len(points) < 2:
+            continue
+        slope = theil_sen(*zip(*points))
+        structures[name] = {"first": points[0][1], "last": points[-1][1],
+                            "entries_per_hour": round(slope, 2) if slope is not None else None}
+
+    heap_bytes_per_hour = memory["heap_mb_per_hour"] * MB
+    suspects = []
+    for name, trend in sorted(structures.items(), key=lambda item: -(item[1]["entries_per_hour"] or 0)):
+        rate = trend["entries_per_hour"] or 0
+        if rate > max_entries_per_hour:
+            suspect = {"structure": name, "entries_per_hour": rate}
+            if heap_bytes_per_hour > 0:
+                suspect["heap_bytes_per_entry"] = round(heap_bytes_per_hour / rate)
+            suspects.append(suspect)
+
+    reasons = []
+    if memory["rss_mb_per_hour"] > max_rss_mb_per_hour:
+        reasons.append(f"RSS grows {memory['rss_mb_per_hour']} MB/h (limit {max_rss_mb_per_hour})")
+    if memory["heap_mb_per_hour"] > max_heap_mb_per_hour:
+        reasons.append(f"heap grows {memory['heap_mb_per_hour']} MB/h (limit {max_heap_mb_per_hour})")
+    result.update(
+        verdict="fail" if reasons else "pass",
+        reasons=reasons,
+        span_hours=round(hours[-1] - hours[0], 3),
+        memory=memory,
+        structures=structures,
+        suspects=suspects,
+    )
+    return result
+
+
+# ---- socket.io over Engine.IO v4 long polling ----
+
+def decode_payload(text):
+    """Engine.IO v4 polling payload: packets separated by the record separator."""
+    return [packet for packet in text.split(RECORD_SEPARATOR) if packet]
+
+
+class SocketSession:
+    """A socket.io client session over HTTP long polling, enough to connect, emit and hang up.
+
+    Polling keeps the harness on plain HTTP; the backend's connection bookkeeping
+    (``activeConnections``, ``userSessions``) is the same as for a WebSocket client.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.sid = None
+
+    def _path(self):
+        return f"/socket.io/?EIO=4&transport=polling&sid={self.sid}&t={time.time_ns():x}"
+
+    async def _poll(self):
+        response = await self.client.request("GET", self._path())
+        if not response.ok:
+            raise ConnectionError(f"poll failed: {response.status}")
+        return decode_payload(response.text())
+
+    async def _send(self, *packets):
+        response = await self.client.request("POST", self._path(), body=RECORD_SEPARATOR.join(packets).encode("utf-8"),
+                                             headers={"Content-Type": "text/plain;charset=UTF-8"})
+        if not response.ok:
+            raise ConnectionError(f"send failed: {response.status}")
+
+    async def _expect(self, prefix):
+        for _ in range(3):
+            for packet in await self._poll():
+                if packet.startswith(prefix):
+                    return packet
+        raise ConnectionError(f"no {prefix!r} packet")
+
+    async def connect(self):
+        response = await self.client.request("GET", f"/socket.io/?EIO=4&transport=polling&t={time.time_ns():x}")
+        packets = decode_payload(response.text()) if response.ok else []
+        if not packets or not packets[0].startswith("0"):
+            raise ConnectionError(f"handshake failed: {response.status}")
+        self.sid = json.loads(packets[0][1:])["sid"]
+        await self._send("40")
+        await self._expect("40")
+
+    async def emit(self, event, data, reply=None):
+        await self._send("42" + json.dumps([event, data]))
+        if reply:
+            await self._expect(f'42["{reply}"')
+
+    async def close(self):
+        await self._send("1")
+
+
+# ---- Workload ----
+
+class Workload:
+    """Issues the soak operations and keeps the accounts and tokens they need."""
+
+    def __init__(self, client, sockets, rng, abandon_share=0.0, rp_ids=8):
+        self.client, self.sockets, self.rng = client, sockets, rng
+        self.abandon_share, self.rp_ids = abandon_share, rp_ids
+        self.run_id = "%08x" % rng.getrandbits(32)
+        self.serial = 0
+        self.accounts, self.tokens = [], []
+        self.statuses = {name: Counter() for name in OPERATIONS}
+        self.latencies = {name: [] for name in OPERATIONS}
+        self.abandoned = 0
+
+    def _email(self, kind):
+        self.serial += 1
+        return f"soak-{kind}-{self.run_id}-{self.serial}@example.com"
+
+    async def _post(self, path, body, headers=None):
+        response = await self.client.request("POST", path, json_body=body, headers=headers)
+        return str(response.status), response
+
+    async def register(self):
+        email = self._email("user")
+        status, response = await self._post("/api/auth/register", {
+            "email": email, "password": SOAK_PASSWORD, "firstName": "Soak", "lastName": "Test"})
+        if response.ok:
+            self.accounts.append(email)
+            self.tokens.append(response.json().get("token"))
+        return status
+
+    async def login(self):
+        if not self.accounts:
+            return await self.register()
+        status, response = await self._post("/api/auth/login", {
+            "email": self.rng.choice(self.accounts), "password": SOAK_PASSWORD})
+        if response.ok:
+            self.tokens.append(response.json().get("token"))
+        return status
+
+    async def logout(self):
+        if not self.tokens:
+            return await self.login()
+        token = self.tokens.pop(self.rng.randrange(len(self.tokens)))
+        status, _ = await self._post("/api/auth/logout", {}, {"Authorization": f"Bearer {token}"})
+        return status
+
+    async def socket(self):
+        session = SocketSession(self.sockets)
+        await session.connect()
+        user = self.rng.choice(self.accounts) if self.accounts else self._email("socket")
+        await session.emit("register", {"clientId": f"soak-{session.sid}", "userId": user}, reply="registered")
+        if self.rng.random() < self.abandon_share:
+            # Left for the server's ping timeout to clean up
+            self.abandoned += 1
+        else:
+            await session.close()
+        return "ok"
+
+    async def webauthn_register(self):
+        status, _ = await self._post("/api/webauthn/register/start", {"email": self._email("passkey")})
+        return status
+
+    async def webauthn_login(self):
+        rp_id = f"soak{self.rng.randrange(self.rp_ids)}.localhost"
+        status, _ = await self._post("/api/webauthn/login/start/usernameless", {"rpID": rp_id})
+        return status
+
+    async def run_operation(self, name):
+        started = time.perf_counter()
+        try:
+            status = await getattr(self, name)()
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            status = type(error).__name__
+        self.statuses[name][status] += 1
+        self.latencies[name].append((time.perf_counter() - started) * 1000)
+
+    def report(self):
+        report = {}
+        for name in OPERATIONS:
+            if self.statuses[name]:
+                report[name] = {"count": sum(self.statuses[name].values()), "statuses": dict(self.statuses[name]),
+                                "latency_ms": latency_summary(self.latencies[name])}
+        return report
+
+
+async def fetch_runtime(client, gc=False):
+    response = await client.request("GET", "/api/debug/runtime?reset=true" + ("&gc=true" if gc else ""))
+    if response.status in (403, 404):
+        raise SystemExit(f"/api/debug/runtime answered {response.status}; set METRICS_ENABLED=true "
+                         "in production or update the backend")
+    return response.json() if response.ok else None
+
+
+async def soak(args, mix):
+    origin, _ = split_url(args.backend.rstrip("/") + "/")
+    client = HttpClient(origin, connections=args.connections, timeout=args.timeout)
+    sockets = HttpClient(origin, connections=args.connections, timeout=args.timeout)
+    probe = HttpClient(origin, connections=1, timeout=args.timeout)
+    workload = Workload(client, sockets, random.Random(args.seed), args.abandon_share, args.rp_ids)
+    names, weights = zip(*mix.items())
+    samples, in_flight, shed = [], set(), 0
+    started = time.perf_counter()
+    deadline = started + args.duration
+
+    async def sampler():
+        while True:
+            runtime = await fetch_runtime(probe, args.gc)
+            if runtime is not None:
+                samples.append(runtime_sample(time.perf_counter() - started, runtime))
+                if args.verbose:
+                    print(f"[{samples[-1]['t']:.0f}s] rss {samples[-1]['rss_mb']:.1f} MB, heap "
+                          f"{samples[-1]['heap_mb']:.1f} MB, state {samples[-1]['state']}", file=sys.stderr)
+            if time.perf_counter() >= deadline:
+                return
+            await asyncio.sleep(max(0.0, min(args.sample_interval, deadline - time.perf_counter())))
+
+    sampling = asyncio.ensure_future(sampler())
+    try:
+        index = 0
+        while True:
+            due = started + index / args.rate
+            if due >= deadline:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            index += 1
+            if sampling.done():
+                break
+            if len(in_flight) >= args.max_in_flight:
+                shed += 1
+                continue
+            task = asyncio.ensure_future(workload.run_operation(workload.rng.choices(names, weights)[0]))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.wait(set(in_flight), timeout=args.timeout)
+        await sampling
+    finally:
+        sampling.cancel()
+        for task in list(in_flight):
+            task.cancel()
+        for http in (client, sockets, probe):
+            await http.close()
+
+    return {
+        "backend": args.backend,
+        "duration_seconds": round(time.perf_counter() - started, 1),
+        "rate": args.rate,
+        "mix": mix,
+        "issued": index - shed,
+        "shed": shed,
+        "abandoned_sockets": workload.abandoned,
+        "operations": workload.report(),
+    }, samples
+
+
+def write_samples(path, samples):
+    names = sorted({name for sample in samples for name in sample["state"]})
+    columns = ["t", "rss_mb", "heap_mb", "external_mb", "loop_p99_ms", "loop_max_ms", "loop_utilization"]
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(columns + names)
+        for sample in samples:
+            writer.writerow([sample[column] for column in columns] + [sample["state"].get(name, "") for name in names])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.soak", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", default="http://127.0.0.1:3001")
+    parser.add_argument("--duration", default="1h", help="how long to run, e.g. 90s, 30m, 6h")
+    parser.add_argument("--rate", type=float, default=20.0, help="operations per second")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="operation weights")
+    parser.add_argument("--abandon-share", type=float, default=0.1,
+                        help="share of socket sessions dropped without closing")
+    parser.add_argument("--rp-ids", type=int, default=8, help="distinct rpIDs for usernameless WebAuthn starts")
+    parser.add_argument("--sample-interval", default="30s", help="time between runtime samples")
+    parser.add_argument("--warmup", default="5m", help="samples before this are left out of the trend fit")
+    parser.add_argument("--gc", action="store_true", help="collect garbage before each sample (node --expose-gc)")
+    parser.add_argument("--max-rss-mb-per-hour", type=float, default=10.0)
+    parser.add_argument("--max-heap-mb-per-hour", type=float, default=5.0)
+    parser.add_argument("--max-entries-per-hour", type=float, default=100.0,
+                        help="structures growing faster are reported as suspects")
+    parser.add_argument("--samples-out", default=None, help="write the samples as CSV")
+    parser.add_argument("--connections", type=int, default=32, help="concurrent connections")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="operations beyond this are shed")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="print every sample to stderr")
+    args = parser.parse_args(argv)
+    try:
+        mix = parse_mix(args.mix)
+        args.duration = parse_duration(args.duration)
+        args.sample_interval = parse_duration(args.sample_interval)
+        warmup = parse_duration(args.warmup)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.rate <= 0 or args.sample_interval <= 0:
+        parser.error("--rate and --sample-interval must be positive")
+
+    report, samples = asyncio.run(soak(args, mix))
+    report["analysis"] = analyze(samples, warmup, args.max_rss_mb_per_hour, args.max_heap_mb_per_hour,
+                                 args.max_entries_per_hour)
+    if args.samples_out:
+        write_samples(args.samples_out, samples)
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+    analysis = report["analysis"]
+    if analysis["verdict"] == "insufficient":
+        print(f"{analysis['fitted_samples']} samples after warmup: not enough to fit trends", file=sys.stderr)
+        return 2
+    memory = analysis["memory"]
+    print(f"{analysis['verdict'].upper()} after {report['duration_seconds']}s: RSS {memory['rss_mb_per_hour']} MB/h, "
+          f"heap {memory['heap_mb_per_hour']} MB/h", file=sys.stderr)
+    for reason in analysis["reasons"]:
+        print(f"  {reason}", file=sys.stderr)
+    for suspect in analysis["suspects"]:
+        per_entry = suspect.get("heap_bytes_per_entry")
+        print(f"  growing: {suspect['structure']} +{suspect['entries_per_hour']}/h"
+              + (f" (~{per_entry} heap bytes per entry)" if per_entry else ""), file=sys.stderr)
+    return 1 if analysis["verdict"] == "fail" else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
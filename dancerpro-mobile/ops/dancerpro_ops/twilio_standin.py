@@ -0,0 +1,549 @@
+"""A local stand-in for the part of the Twilio REST API the backend uses.
+
+``backend/server.js`` creates and lists messages (``/api/send-sms``, ``/api/conversations``) and
+calls (``/api/calls/start``, ``/api/calls/history``) through the Twilio SDK. Started with
+``TWILIO_API_BASE_URL`` pointing here, the backend talks to this server instead, so the
+messaging paths can be load-tested and benchmarked offline::
+
+    python -m dancerpro_ops.twilio_standin --port 4010 --latency lognormal:120,0.4 --error-rate 0.01
+
+    TWILIO_API_BASE_URL=http://127.0.0.1:4010 TWILIO_MOCK=false TWILIO_ACCOUNT_SID=AC00000000000000000000000000000000 \\
+    TWILIO_AUTH_TOKEN=local TWILIO_PHONE_NUMBER=+15550001000 npm start      (in backend/)
+
+Responses take a delay drawn from a configurable distribution, fail at a configurable rate
+(500) and are rate limited per account (429, Twilio error 20429). Created messages and calls
+move through their statuses in the background and post Twilio's status webhooks to the
+``StatusCallback`` URL given at creation (signed with ``--auth-token``, if given); answered calls
+fetch their TwiML ``Url``.
+
+Extra endpoints: ``GET /stand-in/stats`` (request, fault and webhook counters with latency
+percentiles), ``POST /stand-in/reset`` (clears the counters) and ``POST /stand-in/inbound``
+(``From``, ``To``, ``Body``, ``Url``: stores an inbound message and posts it to ``Url``, e.g.
+the backend's ``/api/webhook/incoming``).
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import math
+import random
+import re
+import signal
+import sys
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import quote, urlencode
+
+from .httpio import HttpClient, bound_port, json_response, latency_summary, serve, split_url
+
+API_VERSION = "2010-04-01"
+_COLLECTION = re.compile(rf"^/{API_VERSION}/Accounts/(?P<account>AC\w+)/(?P<resource>Messages|Calls)\.json$")
+
+# What Twilio reports for a call when StatusCallbackEvent is not given
+DEFAULT_CALL_EVENTS = ("completed",)
+_LATENCY_SAMPLES = 100_000
+
+
+class Latency:
+    """Delays drawn from a distribution spec, in milliseconds.
+
+    ``fixed:MS``, ``uniform:LO,HI``, ``normal:MEAN,SD``, ``lognormal:MEDIAN,SIGMA`` or
+    ``exp:MEAN``; negative draws count as 0.
+    """
+
+    KINDS = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exp": 1}
+
+    def __init__(self, spec):
+        kind, _, args = spec.partition(":")
+        try:
+            params = [float(arg) for arg in args.split(",")] if args else []
+        except ValueError:
+            raise ValueError(f"bad latency {spec!r}: parameters must be numbers") from None
+        if self.KINDS.get(kind) != len(params) or any(not math.isfinite(p) or p < 0 for p in params):
+            raise ValueError(f"bad latency {spec!r}: expected one of fixed:MS, uniform:LO,HI, normal:MEAN,SD, "
+                             "lognormal:MEDIAN,SIGMA, exp:MEAN with non-negative numbers")
+        self.spec = spec
+        self.kind = kind
+        self.params = params
+
+    def sample_ms(self, rng):
+        kind, p = self.kind, self.params
+        if kind == "fixed":
+            value = p[0]
+        elif kind == "uniform":
+            value = rng.uniform(p[0], p[1])
+        elif kind == "normal":
+            value = rng.gauss(p[0], p[1])
+        elif kind == "lognormal":
+            value = p[0] * math.exp(rng.gauss(0.0, p[1])) if p[0] > 0 else 0.0
+        else:
+            value = rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+        return max(0.0, value)
+
+    def __repr__(self):
+        return f"Latency({self.spec!r})"
+
+
+class TokenBucket:
+    """``rate`` requests per second on average, ``burst`` at once; rate 0 means unlimited."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def take(self):
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+def twilio_signature(auth_token, url, params):
+    """``X-Twilio-Signature`` of a webhook: HMAC-SHA1 of the URL and the sorted parameters."""
+    data = url + "".join(name + (value if isinstance(value, str) else "".join(value))
+                         for name, value in sorted(params.items()))
+    return base64.b64encode(hmac.new(auth_token.encode("utf-8"), data.encode("utf-8"), hashlib.sha1).digest()).decode()
+
+
+def _twilio_date(moment):
+    return format_datetime(moment)  # RFC 2822, as Twilio's date_created
+
+
+def _twilio_error(status, code, message):
+    return json_response({"code": code, "message": message, "more_info": f"https://www.twilio.com/docs/errors/{code}",
+                          "status": status}, status)
+
+
+def _first(form, name, default=""):
+    values = form.get(name)
+    return values[0] if values else default
+
+
+class TwilioStandIn:
+    def __init__(self, *, latency="fixed:0", list_latency=None, error_rate=0.0, rate_limit=0.0, burst=None,
+                 status_latency="fixed:0", failure_rate=0.0, no_answer_rate=0.0, call_duration="fixed:0",
+                 webhook_connections=32, webhook_timeout=10.0, auth_token=None, seed=None):
+        self.latency = Latency(latency)
+        self.list_latency = Latency(list_latency) if list_latency else self.latency
+        self.status_latency = Latency(status_latency)
+        self.call_duration = Latency(call_duration)
+        self.error_rate = error_rate
+        self.failure_rate = failure_rate
+        self.no_answer_rate = no_answer_rate
+        self.rate_limit = rate_limit
+        self.burst = burst if burst is not None else max(1.0, rate_limit)
+        self.webhook_connections = webhook_connections
+        self.webhook_timeout = webhook_timeout
+        self.auth_token = auth_token
+        self.rng = random.Random(seed)
+        # Per resource, every record in creation order, and indexes by To and From number
+        self.records = {"Messages": [], "Calls": []}
+        self.index = {}
+        self.buckets = {}
+        self.clients = {}
+        self.tasks = set()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.started = time.monotonic()
+        self.requests = Counter()
+        self.responses = Counter()
+        self.faults = Counter()
+        self.webhooks = Counter()
+        self.latencies = {}
+        self.webhook_latencies = deque(maxlen=_LATENCY_SAMPLES)
+
+    # ---- records ----
+
+    def add(self, resource, record):
+        self.records[resource].append(record)
+        for field in ("to", "from"):
+            self.index.setdefault((resource, field, record[field]), []).append(record)
+        return record
+
+    def new_message(self, account, to, from_, body, status="queued", direction="outbound-api", created=None):
+        sid = "SM" + uuid.uuid4().hex
+        created = created or datetime.now(timezone.utc)
+        return {
+            "sid": sid, "account_sid": account, "api_version": API_VERSION, "messaging_service_sid": None,
+            "to": to, "from": from_, "body": body, "status": status, "direction": direction,
+            "num_segments": str(max(1, math.ceil(len(body) / 160))), "num_media": "0",
+            "price": None, "price_unit": "USD", "error_code": None, "error_message": None,
+            "date_created": _twilio_date(created), "date_updated": _twilio_date(created),
+            "date_sent": _twilio_date(created) if status in ("delivered", "received") else None,
+            "uri": f"/{API_VERSION}/Accounts/{account}/Messages/{sid}.json",
+        }
+
+    def new_call(self, account, to, from_, status="queued", direction="outbound-api", created=None, duration=None):
+        sid = "CA" + uuid.uuid4().hex
+        created = created or datetime.now(timezone.utc)
+        ended = created + timedelta(seconds=duration) if duration is not None else None
+        return {
+            "sid": sid, "account_sid": account, "api_version": API_VERSION, "parent_call_sid": None,
+            "to": to, "from": from_, "status": status, "direction": direction,
+            "start_time": _twilio_date(created) if duration is not None else None,
+            "end_time": _twilio_date(ended) if ended else None,
+            "duration": str(duration) if duration is not None else None,
+            "price": None, "price_unit": "USD", "answered_by": None,
+            "date_created": _twilio_date(created), "date_updated": _twilio_date(ended or created),
+            "uri": f"/{API_VERSION}/Accounts/{account}/Calls/{sid}.json",
+        }
+
+    def seed_history(self, account, own_number, numbers, messages, calls, days=30):
+        """``messages`` and ``calls`` per number, alternating direction, spread over ``days``."""
+        now = datetime.now(timezone.utc)
+        for i in range(numbers):
+            number = f"+1555{2000000 + i:07d}"
+            for resource, count in (("Messages", messages), ("Calls", calls)):
+                for j in range(count):
+                    created = now - timedelta(days=days) * (1 - j / max(1, count))
+                    outbound = j % 2 == 0
+                    to, from_ = (number, own_number) if outbound else (own_number, number)
+                    if resource == "Messages":
+                        record = self.new_message(account, to, from_, f"Seeded message {j}",
+                                                  "delivered" if outbound else "received",
+                                                  "outbound-api" if outbound else "inbound", created)
+                    else:
+                        record = self.new_call(account, to, from_, "completed",
+                                               "outbound-api" if outbound else "inbound", created,
+                                               duration=30 + j % 300)
+                    self.add(resource, record)
+
+    # ---- HTTP ----
+
+    async def handle(self, request):
+        started = time.perf_counter()
+        match = _COLLECTION.match(request.path)
+        if request.path.startswith("/stand-in/"):
+            route = f"{request.method} {request.path}"
+        elif match:
+            route = f"{request.method} {match['resource']}"
+        else:
+            route = "other"
+        self.requests[route] += 1
+        response = await self._dispatch(request, match, route)
+        self.responses[response.status] += 1
+        if match:
+            samples = self.latencies.setdefault(route, deque(maxlen=_LATENCY_SAMPLES))
+            samples.append((time.perf_counter() - started) * 1000)
+        return response
+
+    async def _dispatch(self, request, match, route):
+        if request.path == "/stand-in/stats" and request.method == "GET":
+            return json_response(self.stats())
+        if request.path == "/stand-in/reset" and request.method == "POST":
+            self.reset_stats()
+            return json_response({"reset": True})
+        if request.path == "/stand-in/inbound" and request.method == "POST":
+            return await self._inbound(request)
+        if not match or request.method not in ("GET", "POST"):
+            return _twilio_error(404, 20404, "The requested resource was not found")
+        if not request.headers.get("authorization", "").startswith("Basic "):
+            return _twilio_error(401, 20003, "Authenticate")
+
+        account = match["account"]
+        bucket = self.buckets.setdefault(account, TokenBucket(self.rate_limit, self.burst))
+        if not bucket.take():
+            self.faults["rate_limited"] += 1
+            return _twilio_error(429, 20429, "Too Many Requests")
+        latency = self.list_latency if request.method == "GET" else self.latency
+        await asyncio.sleep(latency.sample_ms(self.rng) / 1000)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.faults["injected_errors"] += 1
+            return _twilio_error(500, 20500, "An internal server error has occurred")
+
+        resource = match["resource"]
+        if request.method == "GET":
+            return self._list(account, resource, request)
+        form = request.form()
+        return self._create_message(account, form) if resource == "Messages" else self._create_call(account, form)
+
+    def _list(self, account, resource, request):
+        query = request.query
+        try:
+            page_size = min(1000, max(1, int(query.get("PageSize", 50))))
+            page = max(0, int(query.get("Page", 0)))
+        except ValueError:
+            return _twilio_error(400, 20001, "Invalid PageSize or Page")
+        to, from_ = query.get("To"), query.get("From")
+        if to is not None:
+            candidates = self.index.get((resource, "to", to), [])
+        elif from_ is not None:
+            candidates = self.index.get((resource, "from", from_), [])
+        else:
+            candidates = self.records[resource]
+        # Newest first, as Twilio lists them
+        matching = [r for r in reversed(candidates) if r["account_sid"] == account
+                    and (from_ is None or r["from"] == from_)]
+        start = page * page_size
+        rows = matching[start:start + page_size]
+        base = f"/{API_VERSION}/Accounts/{account}/{resource}.json"
+        filters = "".join(f"&{name}={quote(value, safe='')}" for name, value in (("To", to), ("From", from_))
+                          if value is not None)
+        next_page = f"{base}?PageSize={page_size}&Page={page + 1}{filters}" if start + page_size < len(matching) else None
+        return json_response({
+            resource.lower(): rows,
+            "page": page, "page_size": page_size, "start": start, "end": start + max(0, len(rows) - 1),
+            "uri": f"{base}?PageSize={page_size}&Page={page}{filters}",
+            "first_page_uri": f"{base}?PageSize={page_size}&Page=0{filters}",
+            "previous_page_uri": f"{base}?PageSize={page_size}&Page={page - 1}{filters}" if page else None,
+            "next_page_uri": next_page,
+        })
+
+    def _create_message(self, account, form):
+        to, from_, body = _first(form, "To"), _first(form, "From"), _first(form, "Body")
+        if not to:
+            return _twilio_error(400, 21604, "A 'To' phone number is required.")
+        if not from_:
+            return _twilio_error(400, 21603, "A 'From' phone number is required.")
+        if not body:
+            return _twilio_error(400, 21602, "Message body is required.")
+        message = self.add("Messages", self.new_message(account, to, from_, body))
+        self._spawn(self._message_lifecycle(message, _first(form, "StatusCallback")))
+        return json_response(message, 201)
+
+    def _create_call(self, account, form):
+        to, from_ = _first(form, "To"), _first(form, "From")
+        url = _first(form, "Url")
+        if not to:
+            return _twilio_error(400, 21201, "No 'To' number is specified")
+        if not from_:
+            return _twilio_error(400, 21213, "No 'From' number is specified")
+        if not url and not _first(form, "Twiml"):
+            return _twilio_error(400, 21205, "Url parameter is required.")
+        call = self.add("Calls", self.new_call(account, to, from_))
+        events = [event.lower() for event in form.get("StatusCallbackEvent", [])] or list(DEFAULT_CALL_EVENTS)
+        self._spawn(self._call_lifecycle(call, url, _first(form, "Method", "POST").upper(),
+                                         _first(form, "StatusCallback"), set(events)))
+        return json_response(call, 201)
+
+    async def _inbound(self, request):
+        try:
+            fields = request.json() if "json" in request.headers.get("content-type", "") else \
+                {name: values[0] for name, values in request.form().items()}
+        except ValueError:
+            return json_response({"error": "Expected JSON or form fields"}, 400)
+        if not isinstance(fields, dict) or not all(fields.get(name) for name in ("From", "To", "Body", "Url")):
+            return json_response({"error": "From, To, Body and Url are required"}, 400)
+        account = fields.get("AccountSid") or "AC" + "0" * 32
+        message = self.add("Messages", self.new_message(account, fields["To"], fields["From"], fields["Body"],
+                                                        "received", "inbound"))
+        status = await self._post(fields["Url"], {
+            "AccountSid": account, "ApiVersion": API_VERSION, "MessageSid": message["sid"], "SmsSid": message["sid"],
+            "SmsMessageSid": message["sid"], "From": message["from"], "To": message["to"], "Body": message["body"],
+            "NumMedia": "0", "NumSegments": message["num_segments"], "SmsStatus": "received",
+        }, "incoming")
+        return json_response({"sid": message["sid"], "webhook_status": status}, 201 if status else 502)
+
+    # ---- background status changes ----
+
+    def _spawn(self, coroutine):
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _pause(self, latency):
+        await asyncio.sleep(latency.sample_ms(self.rng) / 1000)
+
+    def _touch(self, record, status):
+        record["status"] = status
+        record["date_updated"] = _twilio_date(datetime.now(timezone.utc))
+
+    async def _message_lifecycle(self, message, callback):
+        failed = self.failure_rate and self.rng.random() < self.failure_rate
+        for status in ("sent", "undelivered" if failed else "delivered"):
+            await self._pause(self.status_latency)
+            self._touch(message, status)
+            if status == "sent":
+                message["date_sent"] = message["date_updated"]
+            if failed and status == "undelivered":
+                message["error_code"], message["error_message"] = 30003, "Unreachable destination handset"
+            if callback:
+                fields = {"AccountSid": message["account_sid"], "ApiVersion": API_VERSION,
+                          "MessageSid": message["sid"], "SmsSid": message["sid"], "MessageStatus": status,
+                          "SmsStatus": status, "From": message["from"], "To": message["to"]}
+                if message["error_code"]:
+                    fields["ErrorCode"] = str(message["error_code"])
+                await self._post(callback, fields, "status")
+
+    async def _call_lifecycle(self, call, url, method, callback, events):
+        sequence = 0
+        answered = not (self.no_answer_rate and self.rng.random() < self.no_answer_rate)
+
+        async def report(event, status, **extra):
+            nonlocal sequence
+            self._touch(call, status)
+            if callback and event in events:
+                fields = {"AccountSid": call["account_sid"], "ApiVersion": API_VERSION, "CallSid": call["sid"],
+                          "CallStatus": status, "From": call["from"], "To": call["to"], "Caller": call["from"],
+                          "Called": call["to"], "Direction": call["direction"], "SequenceNumber": str(sequence),
+                          "CallbackSource": "call-progress-events",
+                          "Timestamp": _twilio_date(datetime.now(timezone.utc)), **extra}
+                sequence += 1
+                await self._post(callback, fields, "call_status")
+
+        await self._pause(self.status_latency)
+        await report("initiated", "initiated")
+        await self._pause(self.status_latency)
+        await report("ringing", "ringing")
+        await self._pause(self.status_latency)
+        if not answered:
+            await report("completed", "no-answer", CallDuration="0")
+            return
+        started = datetime.now(timezone.utc)
+        call["start_time"] = _twilio_date(started)
+        await report("answered", "in-progress")
+        if url:
+            fields = {"AccountSid": call["account_sid"], "CallSid": call["sid"], "CallStatus": "in-progress",
+                      "From": call["from"], "To": call["to"], "Direction": call["direction"],
+                      "ApiVersion": API_VERSION}
+            await self._fetch_twiml(url, method, fields)
+        await self._pause(self.call_duration)
+        ended = datetime.now(timezone.utc)
+        duration = str(int((ended - started).total_seconds()))
+        call["end_time"], call["duration"] = _twilio_date(ended), duration
+        await report("completed", "completed", CallDuration=duration)
+
+    def _client(self, origin):
+        client = self.clients.get(origin)
+        if client is None:
+            client = self.clients[origin] = HttpClient(origin, self.webhook_connections, self.webhook_timeout)
+        return client
+
+    async def _post(self, url, fields, kind):
+        """Post a webhook; returns the HTTP status, or None when it could not be delivered."""
+        started = time.perf_counter()
+        try:
+            origin, path = split_url(url)
+            headers = {"X-Twilio-Signature": twilio_signature(self.auth_token, url, fields)} if self.auth_token else None
+            response = await self._client(origin).request("POST", path, form=fields, headers=headers)
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            self.webhooks[f"{kind}_errors"] += 1
+            self.webhooks[f"{kind}_error:{type(error).__name__}"] += 1
+            return None
+        self.webhook_latencies.append((time.perf_counter() - started) * 1000)
+        self.webhooks[f"{kind}_sent"] += 1
+        if not response.ok:
+            self.webhooks[f"{kind}_http_{response.status}"] += 1
+        return response.status
+
+    async def _fetch_twiml(self, url, method, fields):
+        try:
+            origin, path = split_url(url)
+            client = self._client(origin)
+            if method == "GET":
+                separator = "&" if "?" in path else "?"
+                response = await client.request("GET", path + separator + urlencode(fields))
+            else:
+                response = await client.request("POST", path, form=fields)
+        except (OSError, ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+            self.webhooks["twiml_errors"] += 1
+            return
+        self.webhooks["twiml_fetched" if response.ok else f"twiml_http_{response.status}"] += 1
+
+    # ---- reporting ----
+
+    def stats(self):
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 3),
+            "records": {resource: len(rows) for resource, rows in self.records.items()},
+            "requests": dict(self.requests),
+            "responses": {str(status): count for status, count in sorted(self.responses.items())},
+            "faults": dict(self.faults),
+            "latency_ms": {route: latency_summary(samples) for route, samples in sorted(self.latencies.items())},
+            "webhooks": dict(sorted(self.webhooks.items())),
+            "webhook_latency_ms": latency_summary(self.webhook_latencies),
+            "pending_status_updates": len(self.tasks),
+        }
+
+    async def close(self):
+        for task in list(self.tasks):
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        for client in self.clients.values():
+            await client.close()
+
+
+def _latency_arg(spec):
+    try:
+        return Latency(spec).spec
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+
+
+def _rate_arg(text):
+    value = float(text)
+    if not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError("must be between 0 and 1")
+    return value
+
+
+async def _run(args):
+    standin = TwilioStandIn(latency=args.latency, list_latency=args.list_latency, error_rate=args.error_rate,
+                            rate_limit=args.rate_limit, burst=args.burst, status_latency=args.status_latency,
+                            failure_rate=args.failure_rate, no_answer_rate=args.no_answer_rate,
+                            call_duration=args.call_duration, auth_token=args.auth_token, seed=args.seed)
+    if args.seed_numbers:
+        standin.seed_history(args.account_sid, args.phone_number, args.seed_numbers, args.seed_messages,
+                             args.seed_calls)
+    server = await serve(standin.handle, args.host, args.port)
+    print(f"Twilio stand-in on http://{args.host}:{bound_port(server)} "
+          f"(latency {args.latency}, errors {args.error_rate:.1%}, rate limit {args.rate_limit or 'none'})",
+          file=sys.stderr, flush=True)
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        json.dump(standin.stats(), sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        await standin.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.twilio_standin", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4010)
+    parser.add_argument("--latency", type=_latency_arg, default="lognormal:120,0.4",
+                        help="response delay of API calls in ms (default: %(default)s)")
+    parser.add_argument("--list-latency", type=_latency_arg, default=None,
+                        help="response delay of list calls, if different from --latency")
+    parser.add_argument("--error-rate", type=_rate_arg, default=0.0, help="share of API calls failing with 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="API calls per second per account (0: unlimited)")
+    parser.add_argument("--burst", type=float, default=None, help="rate limit bucket size (default: one second's worth)")
+    parser.add_argument("--status-latency", type=_latency_arg, default="lognormal:400,0.5",
+                        help="delay between status changes of messages and calls (default: %(default)s)")
+    parser.add_argument("--failure-rate", type=_rate_arg, default=0.0, help="share of messages ending undelivered")
+    parser.add_argument("--no-answer-rate", type=_rate_arg, default=0.0, help="share of calls never answered")
+    parser.add_argument("--call-duration", type=_latency_arg, default="fixed:5000", help="answered call length in ms")
+    parser.add_argument("--seed-numbers", type=int, default=0,
+                        help="pre-populate history for N numbers, +15552000000 upwards")
+    parser.add_argument("--seed-messages", type=int, default=100, help="seeded messages per number")
+    parser.add_argument("--seed-calls", type=int, default=20, help="seeded calls per number")
+    parser.add_argument("--account-sid", default="AC" + "0" * 32, help="account of the seeded history")
+    parser.add_argument("--phone-number", default="+15550001000", help="the backend's TWILIO_PHONE_NUMBER, for seeding")
+    parser.add_argument("--auth-token", default=None,
+                        help="sign webhooks with this auth token (for TWILIO_VALIDATE_WEBHOOKS=true)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for latencies and faults")
+    args = parser.parse_args(argv)
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Flood the backend's Twilio webhooks and measure how ingestion keeps up.
+
+Replays signed status and incoming-message callbacks at a fixed rate, as after a bulk SMS send::
+
+    python -m dancerpro_ops.webhook_flood --backend http://127.0.0.1:3001 --auth-token local \\
+        --messages 5000 --rate 2000 --incoming-share 0.05
+
+Requests are sent open loop: event ``i`` is due at ``i / rate`` seconds whether or not earlier
+ones were acknowledged, and ack latency is measured from that due time, so a stalled server
+shows up as latency instead of a slower send rate. ``--replay FILE`` sends recorded events
+(JSON lines ``{"path": ..., "params": {...}}``) instead of synthetic ones.
+
+The report has ack latency percentiles, status codes, and from the backend's
+``/api/debug/metrics`` the queue's processing lag, coalesced and dropped events, and how long it
+took to drain after the last ack.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+from .httpio import HttpClient, latency_summary, split_url
+from .twilio_standin import API_VERSION, twilio_signature
+
+STATUS_PATH = "/api/webhook/status"
+INCOMING_PATH = "/api/webhook/incoming"
+DEFAULT_STATUSES = ("sent", "delivered")
+
+
+def synthetic_events(messages, statuses=DEFAULT_STATUSES, incoming_share=0.0, reorder=0.5, seed=0,
+                     account="AC" + "0" * 32, own_number="+15550001000"):
+    """Status callbacks for ``messages`` SIDs, stage by stage, plus interleaved incoming messages.
+
+    ``reorder`` (in stages) jitters each callback's position, so some arrive before an earlier
+    status of the same message, as Twilio callbacks can.
+    """
+    rng = random.Random(seed)
+    timed = []
+    for i in range(messages):
+        sid = "SM%032x" % rng.getrandbits(128)
+        to = f"+1555{2000000 + i % 10000:07d}"
+        for stage, status in enumerate(statuses):
+            timed.append((stage + rng.random() * reorder, STATUS_PATH, {
+                "AccountSid": account, "ApiVersion": API_VERSION, "MessageSid": sid, "SmsSid": sid,
+                "MessageStatus": status, "SmsStatus": status, "From": own_number, "To": to}))
+    span = len(statuses) + reorder
+    for i in range(round(len(timed) * incoming_share)):
+        sid = "SM%032x" % rng.getrandbits(128)
+        timed.append((rng.random() * span, INCOMING_PATH, {
+            "AccountSid": account, "ApiVersion": API_VERSION, "MessageSid": sid, "SmsSid": sid,
+            "SmsMessageSid": sid, "From": f"+1555{2000000 + rng.randrange(10000):07d}", "To": own_number,
+            "Body": f"Reply {i}", "NumMedia": "0", "NumSegments": "1", "SmsStatus": "received"}))
+    timed.sort(key=lambda item: item[0])
+    return [(path, params) for _, path, params in timed]
+
+
+def load_events(path):
+    with open(path, "r", encoding="utf-8") as handle:
+        events = [json.loads(line) for line in handle if line.strip()]
+    return [(event["path"], {name: str(value) for name, value in event["params"].items()}) for event in events]
+
+
+async def queue_metrics(client):
+    """The backend's webhook queue counters, or None when /api/debug/metrics is not available."""
+    try:
+        response = await client.request("GET", "/api/debug/metrics")
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+        return None
+    return response.json().get("webhookQueue") if response.ok else None
+
+
+async def flood(client, events, rate, signing_base=None, auth_token=None):
+    """Send ``events`` open loop at ``rate`` per second; returns (ack latencies ms, statuses, seconds)."""
+    acks, statuses = [], Counter()
+    started = time.perf_counter()
+
+    async def send(index, path, params):
+        due = started + index / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        headers = {}
+        if auth_token:
+            headers["X-Twilio-Signature"] = twilio_signature(auth_token, signing_base + path, params)
+        try:
+            response = await client.request("POST", path, form=params, headers=headers)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as error:
+            statuses[type(error).__name__] += 1
+            return
+        statuses[str(response.status)] += 1
+        acks.append((time.perf_counter() - due) * 1000)
+
+    await asyncio.gather(*(send(i, path, params) for i, (path, params) in enumerate(events)))
+    return acks, statuses, time.perf_counter() - started
+
+
+async def run(args):
+    events = load_events(args.replay) if args.replay else synthetic_events(
+        args.messages, tuple(args.statuses.split(",")), args.incoming_share, args.reorder, args.seed)
+    origin, _ = split_url(args.backend.rstrip("/") + "/")
+    client = HttpClient(origin, connections=args.connections, timeout=args.timeout)
+    try:
+        before = await queue_metrics(client)
+        acks, statuses, seconds = await flood(client, events, args.rate, (args.signing_base or origin).rstrip("/"),
+                                              args.auth_token)
+        acked = time.perf_counter()
+        after = await queue_metrics(client)
+        while after and after.get("size") and time.perf_counter() - acked < args.drain_timeout:
+            await asyncio.sleep(0.05)
+            after = await queue_metrics(client)
+        drained = time.perf_counter() - acked
+    finally:
+        await client.close()
+
+    report = {
+        "events": len(events),
+        "target_rate": args.rate,
+        "achieved_rate": round(len(events) / seconds, 1) if seconds > 0 else None,
+        "seconds": round(seconds, 3),
+        "statuses": dict(statuses),
+        "ack_ms": latency_summary(acks),
+        "rejected": sum(count for status, count in statuses.items() if not status.startswith("2")),
+    }
+    if before is not None and after is not None:
+        delta = lambda key: after.get(key, 0) - before.get(key, 0)
+        report["queue"] = {
+            "received": delta("received"),
+            "processed": delta("processed"),
+            "coalesced": delta("coalesced"),
+            "dropped": delta("dropped"),
+            "failures": delta("failures"),
+            "signature_failures": delta("signatureFailures"),
+            "max_depth": after.get("maxDepth"),
+            "pending": after.get("size"),
+            "lag_ms": after.get("lagMs"),
+            "drain_seconds": round(drained, 3),
+        }
+    else:
+        report["queue"] = None
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m dancerpro_ops.webhook_flood", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backend", default="http://127.0.0.1:3001")
+    parser.add_argument("--auth-token", default=None,
+                        help="sign with this Twilio auth token (needed when TWILIO_VALIDATE_WEBHOOKS=true)")
+    parser.add_argument("--signing-base", default=None,
+                        help="the backend's BASE_URL, if it differs from --backend (signatures cover the URL)")
+    parser.add_argument("--rate", type=float, default=1000.0, help="events per second")
+    parser.add_argument("--messages", type=int, default=2000, help="message SIDs to send status callbacks for")
+    parser.add_argument("--statuses", default=",".join(DEFAULT_STATUSES), help="callbacks per message, in order")
+    parser.add_argument("--incoming-share", type=float, default=0.0, help="incoming messages per status callback")
+    parser.add_argument("--reorder", type=float, default=0.5, help="position jitter of callbacks, in stages")
+    parser.add_argument("--replay", default=None, help="JSON lines of recorded events to send instead")
+    parser.add_argument("--connections", type=int, default=64, help="concurrent connections")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="how long to wait for the queue to drain")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    report = asyncio.run(run(args))
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    ack, queue = report["ack_ms"], report["queue"]
+    print(f"{report['events']} events at {report['achieved_rate']}/s: ack p50 {ack.get('p50')} ms, "
+          f"p99 {ack.get('p99')} ms, {report['rejected']} rejected", file=sys.stderr)
+    if queue:
+        print(f"queue: {queue['processed']} processed, {queue['coalesced']} coalesced, {queue['dropped']} dropped, "
+              f"lag {queue['lag_ms']}, drained in {queue['drain_seconds']}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+// Regenerates the parity fixtures for tests/test_analytics.py from the app's own JavaScript:
+// seeded snapshots in snapshots/<userId>.json and what lib/aiScoring.js and
+// backend/lib/analytics.js compute from them in expected.json.
+//
+//   TZ=UTC node tests/fixtures/generate.mjs      (from dancerpro-mobile/ops)
+import fs from 'fs';
+import path from 'path';
+import { createRequire } from 'module';
+import { fileURLToPath } from 'url';
+import { computeAggregates, rankAssignments, clientPerformance, venuePerformance } from '../../../lib/aiScoring.js';
+
+const require = createRequire(import.meta.url);
+const { kpiSnapshot } = require('../../../backend/lib/analytics.js');
+
+if (new Date().getTimezoneOffset() !== 0) {
+  console.error('Run with TZ=UTC: the app takes the weekday in local time, the fixtures in UTC');
+  process.exit(1);
+}
+
+const here = path.dirname(fileURLToPath(import.meta.url));
+const DAY_MS = 24 * 60 * 60 * 1000;
+const NOW = Date.UTC(2025, 9, 14, 12);
+const PERIOD_DAYS = 120;
+const WEIGHTS = {
+  base_client_venue_weight: 0.35,
+  base_venue_avg_weight: 0.20,
+  base_dow_weight: 0.15,
+  tag_weight: 0.15,
+  city_match_weight: 0.10,
+  capacity_weight: 0.10,
+  event_weight: 0.15,
+};
+
+function seeded(seed) {
+  let s = seed;
+  return () => { s = (s * 16807) % 2147483647; return s / 2147483647; };
+}
+
+function generated(seed, { clients: nClients, venues: nVenues, shifts: nShifts }) {
+  const rand = seeded(seed);
+  const pick = list => list[Math.floor(rand() * list.length)];
+  const cities = ['Miami', 'Tampa', 'Orlando', ''];
+  const tags = ['VIP', 'vip', 'Regular', 'Big Spender', 'Late'];
+  const venues = Array.from({ length: nVenues }, (_, i) => ({
+    id: `v${i}`,
+    name: `Club ${i}`,
+    city: pick(cities),
+    location: rand() < 0.3 ? `Downtown ${pick(cities)}` : undefined,
+    capacity: rand() < 0.8 ? Math.floor(rand() * 400) : String(Math.floor(rand() * 400)),
+    tags: rand() < 0.5 ? [pick(tags), pick(tags)] : [],
+  }));
+  const clients = Array.from({ length: nClients }, (_, i) => ({
+    id: `c${i}`,
+    name: `Client ${i}`,
+    valueScore: Math.floor(rand() * 10),
+    city: rand() < 0.6 ? pick(cities) : undefined,
+    notes: rand() < 0.3 ? `likes club ${Math.floor(rand() * nVenues)} in ${pick(cities)}` : '',
+    tags: rand() < 0.5 ? [pick(tags)] : [],
+  }));
+  const shifts = Array.from({ length: nShifts }, (_, i) => ({
+    id: `s${i}`,
+    clientId: rand() < 0.9 ? `c${Math.floor(rand() * nClients)}` : null,
+    venueId: rand() < 0.9 ? `v${Math.floor(rand() * nVenues)}` : '',
+    // Whole dollars and cents: sums must come out bit-identical either way
+    earnings: rand() < 0.5 ? Math.round(rand() * 900) : Math.round(rand() * 90000) / 100,
+    notes: rand() < 0.03 ? 'Special EVENT night' : '',
+    start: new Date(NOW - Math.floor(rand() * 200 * DAY_MS)).toISOString(),
+  }));
+  const transactions = Array.from({ length: nShifts >> 1 }, (_, i) => ({
+    id: `t${i}`,
+    type: rand() < 0.7 ? 'income' : rand() < 0.9 ? 'expense' : 'transfer',
+    amount: Math.round(rand() * 50000) / 100,
+    clientId: rand() < 0.8 ? `c${Math.floor(rand() * nClients)}` : null,
+  }));
+  return { clients, venues, shifts, transactions, outfits: [], events: [{ venueId: 'v1' }] };
+}
+
+const users = {
+  'u-basic': generated(7, { clients: 40, venues: 15, shifts: 600 }),
+  'u-wide': generated(11, { clients: 80, venues: 30, shifts: 800 }),
+  'u-empty': { clients: [], venues: [], shifts: [], transactions: [], outfits: [], events: [] },
+  // Coercions and edge cases: numeric strings, blanks, epoch and date-only times, ties
+  'u-odd': {
+    clients: [
+      { id: 'a', name: 'A', city: 'Miami Beach', tags: ['x'] },
+      { id: 'b', name: 'B', notes: 'Works at The Room in Tampa' },
+      { id: 'c', name: 'C' },
+      { id: 'ghost', name: 'No shifts' },
+    ],
+    venues: [
+      { id: 'r', name: 'The Room', city: 'Tampa', capacity: '150', tags: ['X', 'y'] },
+      { id: 'm', name: 'Miami', city: 'miami', capacity: 300 },
+      { id: 'e', name: 'Empty', venue: 'nowhere' },
+    ],
+    shifts: [
+      { clientId: 'a', venueId: 'r', earnings: '200', start: NOW - 2 * DAY_MS },
+      { clientId: 'a', venueId: 'm', earnings: 200, start: new Date(NOW - 9 * DAY_MS).toISOString().slice(0, 10) },
+      { clientId: 'b', venueId: 'r', earnings: '', start: new Date(NOW - 3 * DAY_MS).toISOString() },
+      { clientId: 'b', venueId: 'm', earnings: null, date: new Date(NOW - 4 * DAY_MS).toISOString(), notes: 'event' },
+      { clientId: 'c', venueId: 'm', earnings: ' 75.5 ', end: new Date(NOW - 5 * DAY_MS).toISOString() },
+      { clientId: 'c', venueId: null, earnings: 40, start: new Date(NOW - 6 * DAY_MS).toISOString() },
+      { clientId: null, venueId: 'r', earnings: 60, start: new Date(NOW + DAY_MS).toISOString() },
+      { clientId: 'c', venueId: 'r', earnings: 10, start: 'not a date' },
+      null,
+    ],
+    transactions: [
+      { type: 'income', amount: '100.10', clientId: 'a' },
+      { type: 'income', amount: 100.2, clientId: 'b' },
+      { type: 'expense', amount: 0.3, clientId: 'a' },
+      { type: 'income', amount: 50 },
+    ],
+    outfits: [],
+    events: [{ venue: 'e' }],
+  },
+};
+
+const expected = { now: NOW, periodDays: PERIOD_DAYS, users: {} };
+fs.mkdirSync(path.join(here, 'snapshots'), { recursive: true });
+for (const [userId, snapshot] of Object.entries(users)) {
+  const file = { snapshot, metadata: { updatedAt: new Date(NOW).toISOString(), version: 1 } };
+  fs.writeFileSync(path.join(here, 'snapshots', `${userId}.json`), JSON.stringify(file, null, 2));
+  // As stored and read back, so undefined fields are gone on both sides
+  const stored = JSON.parse(JSON.stringify(snapshot));
+  const aggregates = computeAggregates(stored, { periodDays: PERIOD_DAYS, now: NOW });
+  const perf = p => ({ shiftCount: p.shiftCount, totalEarnings: p.totalEarnings, avgEarnings: p.avgEarnings, bestDay: p.bestDay, bestDayAvg: p.bestDayAvg });
+  const kpis = kpiSnapshot(stored);
+  expected.users[userId] = {
+    totals: kpis.totals,
+    counts: kpis.counts,
+    byClient: kpis.byClient,
+    venueMaxAvg: aggregates.venueMaxAvg,
+    clients: stored.clients.map(c => ({ id: c.id, all: aggregates.byClient.get(c.id) || { total: 0, count: 0 }, period: perf(clientPerformance(aggregates, c.id)) })),
+    venues: stored.venues.map(v => ({ id: v.id, all: aggregates.byVenue.get(v.id) || { total: 0, count: 0 }, period: perf(venuePerformance(aggregates, v.id)) })),
+    recommendations: rankAssignments(stored.clients, stored.venues, aggregates, WEIGHTS, 3)
+      .map(row => row.recommendations.map(r => ({ venueId: r.venue.id, score: r.score }))),
+  };
+}
+fs.writeFileSync(path.join(here, 'expected.json'), `${JSON.stringify(expected, null, 1)}\n`);
+console.log(`Wrote ${Object.keys(users).length} snapshots and expected.json`);
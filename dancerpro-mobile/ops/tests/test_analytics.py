@@ -0,0 +1,110 @@
+import json
+import math
+import os
+
+import pandas as pd
+import pytest
+
+from dancerpro_ops.analytics import analyze_paths, analyze_snapshot, analyze_users, main
+from dancerpro_ops.snapshots import iter_snapshot_paths, js_number, js_time, load_snapshot
+
+# Parity with the app: tests/fixtures/expected.json is what lib/aiScoring.js and
+# backend/lib/analytics.js compute for the snapshots next to it (see tests/fixtures/generate.mjs).
+
+
+@pytest.fixture(scope="module")
+def expected():
+    with open(os.path.join(os.path.dirname(__file__), "fixtures", "expected.json"), encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def same(actual, wanted):
+    """Bit-identical floats; JSON has null where JavaScript had NaN."""
+    if wanted is None:
+        return actual is None or (isinstance(actual, float) and math.isnan(actual))
+    return actual == wanted
+
+
+def test_js_coercions():
+    assert js_number(" 75.5 ") == 75.5
+    assert js_number("") == 0 and js_number(None) == 0 and js_number([]) == 0
+    assert js_number("0x10") == 16
+    assert math.isnan(js_number("12abc"))
+    assert js_time("2025-10-14") == 1760400000000
+    assert js_time("2025-10-14T00:00:00", tz_offset=-120) == 1760400000000 - 2 * 3600 * 1000
+    assert math.isnan(js_time("not a date"))
+
+
+@pytest.mark.parametrize("user_id", ["u-basic", "u-wide", "u-empty", "u-odd"])
+def test_metrics_match_the_app(fixtures_dir, expected, user_id):
+    want = expected["users"][user_id]
+    _, snapshot, _ = load_snapshot(os.path.join(fixtures_dir, "snapshots", f"{user_id}.json"))
+    result = analyze_snapshot(snapshot, period_days=expected["periodDays"], now_ms=expected["now"])
+
+    user = result["users"]
+    for key, value in want["totals"].items():
+        assert same(user[key], value), key
+    for key, value in want["counts"].items():
+        assert user[key] == value, key
+    assert same(user["venue_max_avg"], want["venueMaxAvg"])
+    top = want["byClient"][0] if want["byClient"] else {"clientId": None, "net": None}
+    assert user["top_client_id"] == top["clientId"] and same(user["top_client_net"], top["net"])
+
+    by_client = dict(zip(result["clients"]["id"], result["clients"]["net"]))
+    for row in want["byClient"]:
+        assert same(by_client.get(row["clientId"], 0.0), row["net"])
+
+    for table, rows in (("clients", want["clients"]), ("venues", want["venues"])):
+        got = result[table]
+        assert got["id"] == [row["id"] for row in rows]
+        for i, row in enumerate(rows):
+            assert got["shifts"][i] == row["all"]["count"]
+            assert same(got["earnings"][i], row["all"]["total"])
+            period = row["period"]
+            assert got["period_shifts"][i] == period["shiftCount"]
+            assert same(got["period_earnings"][i], period["totalEarnings"])
+            assert same(got["period_avg"][i], period["avgEarnings"])
+            assert got["best_day"][i] == (-1 if period["bestDay"] is None else period["bestDay"])
+            assert same(got["best_day_avg"][i], period["bestDayAvg"])
+
+    recommendations = result["recommendations"]
+    flat = [r for row in want["recommendations"] for r in row]
+    assert recommendations["venue_id"] == [r["venueId"] for r in flat]
+    assert recommendations["score"] == [r["score"] for r in flat]
+    assert recommendations["client_id"] == [c["id"] for c, row in zip(want["clients"], want["recommendations"]) for _ in row]
+
+
+def test_process_pool_matches_a_single_pass(fixtures_dir, expected):
+    paths = iter_snapshot_paths(os.path.join(fixtures_dir, "snapshots"))
+    options = {"period_days": expected["periodDays"], "now_ms": expected["now"]}
+    serial = analyze_paths(paths, **options)
+    pooled = analyze_users(paths, workers=2, chunk_size=1, **options)
+    for name, frame in serial.items():
+        pd.testing.assert_frame_equal(pooled[name], frame)
+    assert list(pooled["users"]["user_id"]) == ["u-basic", "u-empty", "u-odd", "u-wide"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_default_now_is_shared_by_all_chunks(fixtures_dir, expected, monkeypatch, workers):
+    paths = iter_snapshot_paths(os.path.join(fixtures_dir, "snapshots"))
+    pinned = analyze_paths(paths, period_days=expected["periodDays"], now_ms=expected["now"])
+    calls = []
+
+    def drifting_clock():
+        # Every call is 200 days later than the one before
+        calls.append(None)
+        return expected["now"] / 1000 + (len(calls) - 1) * 200 * 86400
+
+    monkeypatch.setattr("dancerpro_ops.analytics.time.time", drifting_clock)
+    defaulted = analyze_users(paths, workers=workers, chunk_size=1, period_days=expected["periodDays"])
+    for name, frame in pinned.items():
+        pd.testing.assert_frame_equal(defaulted[name], frame)
+
+
+def test_cli_writes_one_csv_per_table(fixtures_dir, expected, tmp_path, capsys):
+    out = tmp_path / "out"
+    code = main(["--snapshots", os.path.join(fixtures_dir, "snapshots"), "--out", str(out),
+                 "--now", str(expected["now"]), "--workers", "1"])
+    assert code == 0
+    assert sorted(os.listdir(out)) == ["clients.csv", "recommendations.csv", "users.csv", "venues.csv"]
+    assert "Analyzed 4 users" in capsys.readouterr().err
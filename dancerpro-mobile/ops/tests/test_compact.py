@@ -0,0 +1,133 @@
+import io
+import json
+import os
+import shutil
+
+import pytest
+
+from dancerpro_ops.analytics import analyze_snapshot
+from dancerpro_ops.compact import DEFAULT_STEPS, compact_all, compact_file, main
+from dancerpro_ops.jsonstream import CompactSnapshotWriter, SnapshotStreamError, iter_snapshot
+from dancerpro_ops.snapshots import iter_snapshot_paths, load_snapshot
+
+
+@pytest.fixture
+def snapshots(fixtures_dir, tmp_path):
+    """A writable copy of the fixture snapshots."""
+    target = tmp_path / "snapshots"
+    shutil.copytree(os.path.join(fixtures_dir, "snapshots"), target)
+    return target
+
+
+def rewrite(text, chunk_size):
+    out = io.StringIO()
+    writer = CompactSnapshotWriter(out)
+    for kind, name, value in iter_snapshot(io.StringIO(text), chunk_size=chunk_size):
+        if kind == "collection":
+            writer.start_collection(name)
+        elif kind == "record":
+            writer.record(value)
+        elif kind == "field":
+            writer.field(name, value)
+        else:
+            writer.meta_value(name, value)
+    writer.close()
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_stream_round_trip_matches_json_load(snapshots, chunk_size):
+    for path in iter_snapshot_paths(snapshots):
+        with open(path, encoding="utf-8") as handle:
+            text = handle.read()
+        assert json.loads(rewrite(text, chunk_size)) == json.loads(text)
+    # Numbers cut by a chunk boundary, non-object fields, unicode
+    text = '{"metadata": {"v": 1}, "snapshot": {"shifts": [12345, -6.5e3, "é", {}], "clients": [], "note": "x"}}'
+    assert json.loads(rewrite(text, 3)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ['{"snapshot": {"shifts": [1, 2}}', '{"snapshot": {}} trailing', '[1]', ''])
+def test_stream_rejects_malformed_files(text):
+    with pytest.raises(SnapshotStreamError):
+        list(iter_snapshot(io.StringIO(text), chunk_size=4))
+
+
+def test_migrations(snapshots):
+    path = str(snapshots / "u-odd.json")
+    stats = compact_file(path, DEFAULT_STEPS + ("drop-orphans",))
+    assert stats["status"] == "written"
+    with open(path, encoding="utf-8") as handle:
+        text = handle.read()
+    assert "\n" not in text
+    data = json.loads(text)
+    shifts = data["snapshot"]["shifts"]
+    # Only the null entry goes: every reference in this file resolves
+    assert len(shifts) == 8 and stats["steps"]["drop-invalid"]["not_objects"] == 1
+    assert shifts[0]["earnings"] == 200 and shifts[4]["earnings"] == 75.5 and shifts[2]["earnings"] == 0
+    assert shifts[2]["startMs"] == 1760184000000 and shifts[3]["dateMs"] == 1760097600000
+    assert "startMs" not in shifts[0]  # already epoch milliseconds
+    assert "startMs" not in shifts[7] and stats["steps"]["epoch-times"]["unparseable"] == 1
+    assert data["snapshot"]["venues"][0]["capacity"] == 150
+    assert data["snapshot"]["transactions"][0]["amount"] == 100.1
+    assert data["metadata"]["version"] == 1
+    assert data["metadata"]["migrations"] == list(DEFAULT_STEPS) + ["drop-orphans"]
+
+
+def test_duplicates_and_orphans(tmp_path):
+    path = tmp_path / "u-dup.json"
+    path.write_text(json.dumps({"snapshot": {
+        "clients": [{"id": "a"}, {"id": "a", "name": "again"}],
+        "venues": [{"id": "v"}],
+        "shifts": [{"id": "s1", "clientId": "a", "venueId": "v"}, {"id": "s2", "clientId": "gone"}],
+        "transactions": [{"id": "t1", "shiftId": "s2"}, {"id": "t2", "clientId": "a"}],
+    }}), encoding="utf-8")
+
+    kept = compact_file(str(path), DEFAULT_STEPS, dry_run=True)
+    assert kept["records_out"] == 6 and kept["steps"]["drop-invalid"]["duplicates"] == 1
+
+    stats = compact_file(str(path), DEFAULT_STEPS + ("drop-orphans",))
+    snapshot = json.loads(path.read_text(encoding="utf-8"))["snapshot"]
+    assert snapshot["clients"] == [{"id": "a"}]
+    assert [s["id"] for s in snapshot["shifts"]] == ["s1"]
+    # Orphans are judged against the ids in the file as it was, not after the drops
+    assert [t["id"] for t in snapshot["transactions"]] == ["t1", "t2"]
+    assert stats["steps"]["drop-orphans"] == {"shifts_without_clients": 1}
+
+
+def test_dry_run_leaves_files_alone(snapshots):
+    before = {path: open(path, "rb").read() for path in iter_snapshot_paths(snapshots)}
+    results = compact_all(before, dry_run=True, workers=2)
+    assert {path: open(path, "rb").read() for path in before} == before
+    assert [r["status"] for r in results] == ["dry-run"] * 4
+    assert sum(r["bytes_out"] for r in results) < sum(r["bytes_in"] for r in results)
+    assert [r["records_out"] for r in results] == [956, 0, 20, 1311]
+    assert sorted(os.listdir(snapshots)) == sorted(os.path.basename(p) for p in before)
+
+
+def test_compacted_snapshots_analyze_the_same(snapshots):
+    paths = iter_snapshot_paths(snapshots)
+    originals = [analyze_snapshot(load_snapshot(path)[1], now_ms=1760443200000) for path in paths]
+    results = compact_all(paths, workers=1)
+    assert [r["status"] for r in results] == ["written"] * 4
+    for path, original in zip(paths, originals):
+        compacted = analyze_snapshot(load_snapshot(path)[1], now_ms=1760443200000)
+        for table in ("clients", "venues", "recommendations"):
+            assert compacted[table] == original[table]
+    # Running it again only refreshes the metadata
+    again = compact_all(paths, workers=1)
+    assert [r["records_out"] for r in again] == [r["records_out"] for r in results]
+    assert sorted(os.listdir(snapshots)) == ["u-basic.json", "u-empty.json", "u-odd.json", "u-wide.json"]
+
+
+def test_cli_reports_errors_and_keeps_bad_files(snapshots, capsys):
+    broken = snapshots / "u-broken.json"
+    broken.write_text('{"snapshot": {"shifts": [{"id": 1},', encoding="utf-8")
+    code = main(["--snapshots", str(snapshots), "--workers", "1", "--steps", "epoch-times,drop-invalid"])
+    captured = capsys.readouterr()
+    summary = json.loads(captured.out)
+    assert code == 1
+    assert summary["status"] == {"written": 4, "error": 1} and list(summary["errors"]) == ["u-broken"]
+    assert list(summary["steps"]) == ["drop-invalid", "epoch-times"]
+    assert "Compacted 5 snapshots" in captured.err
+    assert broken.read_text(encoding="utf-8") == '{"snapshot": {"shifts": [{"id": 1},'
+    assert not [name for name in os.listdir(snapshots) if name.endswith(".tmp")]
@@ -0,0 +1,126 @@
+import json
+import math
+
+import numpy as np
+import pytest
+
+from dancerpro_ops.perfgate import (_exact_upper_tail, cliffs_delta, collect, compare, holm, main,
+                                    mann_whitney_greater)
+
+
+def test_mann_whitney_exact_and_approximate():
+    assert mann_whitney_greater([6, 7, 8, 9, 10], [1, 2, 3, 4, 5]) == (25.0, pytest.approx(1 / 252))
+    assert mann_whitney_greater([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]) == (0.0, 1.0)
+    # One of the 20 orderings of 3 vs 3 has U == 9, three have U >= 8
+    assert _exact_upper_tail(8, 3, 3) == pytest.approx(2 / 20)
+    rng = np.random.default_rng(7)
+    slow, base = rng.normal(10.4, 1, 30), rng.normal(10, 1, 30)
+    u, exact = mann_whitney_greater(slow, base)
+    variance = 30 * 30 * 61 / 12
+    approximate = 0.5 * math.erfc((u - 450 - 0.5) / math.sqrt(variance) / math.sqrt(2))
+    assert exact == pytest.approx(approximate, abs=0.01)
+    # Ties: normal approximation with the tie correction
+    u, p = mann_whitney_greater([2, 2, 3, 3, 3], [1, 1, 2, 2, 2])
+    assert u == 22 and 0 < p < 0.05
+    assert cliffs_delta(25, 5, 5) == 1 and cliffs_delta(12.5, 5, 5) == 0
+
+
+def test_holm():
+    assert holm([0.01, 0.04, 0.03]) == pytest.approx([0.03, 0.06, 0.06])
+
+
+def metrics(**series):
+    return {name: {"unit": "ms", "better": "lower", "samples": list(values)} for name, values in series.items()}
+
+
+def test_compare_needs_significance_effect_and_change():
+    rng = np.random.default_rng(3)
+    base = rng.lognormal(math.log(100), 0.1, 20)
+    steady = 100 + np.arange(20) * 0.05
+    baseline = metrics(slower=base, same=base, outlier=base, tiny=steady, faster=base, few=base[:3], gone=base)
+    spike = list(rng.lognormal(math.log(100), 0.1, 20))
+    spike[0] = 5000
+    candidate = metrics(slower=rng.lognormal(math.log(130), 0.1, 20), same=rng.lognormal(math.log(100), 0.1, 20),
+                        outlier=spike, tiny=steady + 2, faster=rng.lognormal(math.log(70), 0.1, 20),
+                        few=base[:3] * 2, fresh=[1, 2, 3])
+    results = compare(baseline, candidate)
+    assert {name: result["status"] for name, result in results.items()} == {
+        "slower": "regressed", "same": "unchanged", "outlier": "unchanged", "tiny": "unchanged",
+        "faster": "improved", "few": "insufficient", "gone": "missing", "fresh": "new"}
+    assert results["slower"]["change"] == pytest.approx(0.3, abs=0.1) and results["slower"]["delta"] > 0.8
+    # 2% slower every time is significant and large, but below --min-change
+    assert results["tiny"]["p_worse_adjusted"] < 0.05 and results["tiny"]["delta"] == 1
+
+    throughput = {"ops": {"unit": "/s", "better": "higher", "samples": list(base)}}
+    dropped = {"ops": {"unit": "/s", "better": "higher", "samples": list(base * 0.7)}}
+    assert compare(throughput, dropped)["ops"]["status"] == "regressed"
+    assert compare(dropped, throughput)["ops"]["status"] == "improved"
+
+
+def playwright_results(durations, step_ms):
+    results = [{"status": "passed", "duration": ms, "steps": [{"title": "open dashboard", "duration": step_ms}]}
+               for ms in durations]
+    results.append({"status": "failed", "duration": 99999, "steps": []})
+    return {"config": {}, "suites": [{"title": "dashboard.spec.js", "specs": [], "suites": [
+        {"title": "Dashboard", "specs": [{"title": "shows KPIs", "tests": [{"projectName": "chromium", "results": results}]}]}]}]}
+
+
+def test_collect_formats(tmp_path):
+    (tmp_path / "results.json").write_text(json.dumps(playwright_results([900, 950], 300)))
+    found = collect(tmp_path / "results.json").metrics
+    assert found["playwright/chromium/dashboard.spec.js > Dashboard > shows KPIs"]["samples"] == [900, 950]
+    assert found["playwright/chromium/dashboard.spec.js > Dashboard > shows KPIs > open dashboard"]["samples"] == [300, 300]
+
+    bench = {"send_sms": {"requests": 10, "latency_ms": {"count": 10, "mean": 5, "p50": 4, "p90": 6, "p95": 7, "p99": 9,
+                                                         "max": 9}},
+             "conversations": {"latency_ms": {"count": 0}}}
+    (tmp_path / "messaging_bench-3.json").write_text(json.dumps(bench))
+    assert collect(tmp_path / "messaging_bench-3.json").metrics == {
+        f"messaging_bench/send_sms/latency_ms/{key}": {"unit": "ms", "better": "lower", "samples": [value]}
+        for key, value in (("p50", 4), ("p95", 7), ("p99", 9))}
+
+    (tmp_path / "boot.log").write_text("🚀 Server running\n⏱️  Time to listening: 812.4ms (require=300.1ms store=12ms)\n"
+                                       '{"metric": "bundle/web/load", "value": 1450, "unit": "ms"}\n'
+                                       '{"metric": "bundle/web/requests", "value": 31, "unit": "count"}\n')
+    found = collect(tmp_path / "boot.log").metrics
+    assert {name: metric["samples"] for name, metric in found.items()} == {
+        "backend/boot/total": [812.4], "backend/boot/require": [300.1], "backend/boot/store": [12.0],
+        "bundle/web/load": [1450.0], "bundle/web/requests": [31.0]}
+
+
+def test_record_compare_cli(tmp_path, capsys):
+    rng = np.random.default_rng(11)
+    baselines = str(tmp_path / "baselines")
+
+    def run(name, scale):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(playwright_results(list(rng.normal(1000 * scale, 20, 8)), 200 * scale)))
+        return str(path)
+
+    assert main(["record", "--baselines", baselines, "--version", "v1", "--revision", "abc123", run("base1", 1)]) == 0
+    assert main(["record", "--baselines", baselines, "--version", "v1", "--append", run("base2", 1)]) == 0
+    with pytest.raises(SystemExit) as error:
+        main(["record", "--baselines", baselines, "--version", "v1", run("base3", 1)])
+    assert error.value.code == 2
+    capsys.readouterr()
+    assert main(["list", "--baselines", baselines]) == 0
+    [listed] = json.loads(capsys.readouterr().out)
+    assert listed["version"] == "v1" and listed["revision"] == "abc123" and listed["samples"] == 32
+
+    assert main(["compare", "--baselines", baselines, run("same", 1)]) == 0
+    capsys.readouterr()
+    report = tmp_path / "report.md"
+    assert main(["compare", "--baselines", baselines, "--against", "v1", "--report", str(report), run("slow", 1.2)]) == 1
+    captured = capsys.readouterr()
+    output = json.loads(captured.out)
+    test = "playwright/chromium/dashboard.spec.js > Dashboard > shows KPIs"
+    assert output["regressed"] == [test, test + " > open dashboard"]
+    assert "slower: " + test in captured.err
+    text = report.read_text()
+    for heading in ("# Performance Regression Report - DancerPro Mobile App", "## 1️⃣ Document Metadata",
+                    "## 2️⃣ Executive Summary", "## 3️⃣ Results by Metric Group", "## 4️⃣ Coverage & Matching Metrics",
+                    "## 5️⃣ Regressions & Recommendations"):
+        assert heading in text
+    assert f"#### ❌ {test}\n- **Status:** REGRESSED" in text
+    assert "| Playwright Tests | 2 | 0 | 0 | 2 | 0 |" in text
+    assert "revision abc123" in text
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+from collections import Counter
+
+import pytest
+
+from dancerpro_ops.httpio import Response, bound_port, json_response, serve
+from dancerpro_ops.soak import (MB, RECORD_SEPARATOR, analyze, decode_payload, main, parse_duration, parse_mix,
+                                theil_sen)
+
+
+def test_parse_duration_and_mix():
+    assert [parse_duration(text) for text in ("90", "90s", "1.5m", "6h", "2d")] == [90, 90, 90, 21600, 172800]
+    with pytest.raises(ValueError):
+        parse_duration("6 hours")
+    assert parse_mix("login=4, logout") == {"login": 4.0, "logout": 1.0}
+    for text in ("login=1,fly=2", "login=0", "login=-1"):
+        with pytest.raises(ValueError):
+            parse_mix(text)
+
+
+def test_theil_sen_ignores_outliers():
+    times = list(range(20))
+    values = [3 * t + 7 for t in times]
+    values[5], values[12] = 500, -400
+    assert theil_sen(times, values) == pytest.approx(3)
+    assert theil_sen([1, 1], [0, 5]) is None
+
+
+def samples(hours, rss_per_hour, tokens_per_hour, every_minutes=10):
+    rows = []
+    for i in range(int(hours * 60 / every_minutes) + 1):
+        t = i * every_minutes * 60
+        sawtooth = 4 * (i % 3)  # GC cycles
+        rows.append({"t": t, "rss_mb": 120 + rss_per_hour * t / 3600 + sawtooth,
+                     "heap_mb": 40 + rss_per_hour * t / 3600 / 2 + sawtooth, "external_mb": 2.0,
+                     "loop_p99_ms": 12.0, "loop_max_ms": 30.0, "loop_utilization": 0.1,
+                     "state": {"blacklistedTokens": int(tokens_per_hour * t / 3600), "loginAttempts": 1,
+                               "userSessions": i % 4}})
+    return rows
+
+
+def test_analyze_flags_growth_and_names_the_structure():
+    result = analyze(samples(6, rss_per_hour=30, tokens_per_hour=3600), warmup=1800)
+    assert result["verdict"] == "fail" and result["fitted_samples"] == 34
+    assert result["memory"]["rss_mb_per_hour"] == pytest.approx(30, abs=1)
+    assert len(result["reasons"]) == 2
+    assert [suspect["structure"] for suspect in result["suspects"]] == ["blacklistedTokens"]
+    # 15 MB/h of heap over 3600 tokens/h
+    assert result["suspects"][0]["heap_bytes_per_entry"] == pytest.approx(15 * MB / 3600, rel=0.05)
+    assert result["structures"]["userSessions"]["entries_per_hour"] == pytest.approx(0, abs=10)
+
+    flat = analyze(samples(6, rss_per_hour=0, tokens_per_hour=0), warmup=1800)
+    assert flat["verdict"] == "pass" and flat["suspects"] == []
+    assert analyze(samples(0.5, 0, 0), warmup=1800)["verdict"] == "insufficient"
+
+
+def test_decode_payload():
+    assert decode_payload('0{"sid":"a"}') == ['0{"sid":"a"}']
+    assert decode_payload(RECORD_SEPARATOR.join(["40", '42["registered",{}]'])) == ["40", '42["registered",{}]']
+
+
+class FakeBackend:
+    """The routes the soak uses, with a logout that leaks: every blacklisted token costs 64 KB of 'RSS'."""
+
+    def __init__(self):
+        self.users, self.blacklist, self.sockets, self.registered = set(), set(), {}, {}
+        self.calls = Counter()
+
+    async def handle(self, request):
+        path = request.path
+        self.calls[path] += 1
+        if path == "/api/debug/runtime":
+            leaked = len(self.blacklist) * 65536
+            return json_response({"memory": {"rssBytes": 100 * MB + leaked, "heapUsedBytes": 30 * MB + leaked,
+                                             "externalBytes": MB},
+                                  "eventLoop": {"delayMs": {"p99": 10.0, "max": 20.0}, "utilization": 0.2},
+                                  "state": {"blacklistedTokens": len(self.blacklist), "users": len(self.users),
+                                            "activeConnections": len(self.registered), "pending": None}})
+        if path == "/api/auth/register":
+            email = request.json()["email"]
+            self.users.add(email)
+            return json_response({"token": f"t-{email}-{self.calls[path]}"}, status=201)
+        if path == "/api/auth/login":
+            return json_response({"token": f"t-{request.json()['email']}-{self.calls[path]}-login"})
+        if path == "/api/auth/logout":
+            self.blacklist.add(request.headers["authorization"])
+            return json_response({"success": True})
+        if path.startswith("/api/webauthn/"):
+            return json_response({"success": True, "options": {}})
+        if path == "/socket.io/":
+            return self.socket_io(request)
+        return Response(404, "Not found")
+
+    def socket_io(self, request):
+        sid = request.query.get("sid")
+        if sid is None:
+            sid = f"s{len(self.sockets)}"
+            self.sockets[sid] = []
+            return Response(200, "0" + json.dumps({"sid": sid, "upgrades": [], "pingInterval": 25000}))
+        if request.method == "GET":
+            packets, self.sockets[sid] = self.sockets[sid], []
+            return Response(200, RECORD_SEPARATOR.join(packets) or "6")
+        for packet in request.body.decode().split(RECORD_SEPARATOR):
+            if packet == "40":
+                self.sockets[sid].append("40" + json.dumps({"sid": "io" + sid}))
+            elif packet.startswith('42["register"'):
+                self.registered[sid] = json.loads(packet[2:])[1]["userId"]
+                self.sockets[sid].append('42["registered",{"success":true}]')
+            elif packet == "1":
+                self.registered.pop(sid, None)
+        return Response(200, "ok")
+
+
+def test_soak_run_fails_on_a_leaky_logout(tmp_path, capsys):
+    ready, stop = threading.Event(), threading.Event()
+    state = {}
+
+    def serve_backend():
+        async def main_loop():
+            backend = state["backend"] = FakeBackend()
+            server = await serve(backend.handle)
+            state["port"] = bound_port(server)
+            ready.set()
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+            server.close()
+
+        asyncio.run(main_loop())
+
+    thread = threading.Thread(target=serve_backend)
+    thread.start()
+    ready.wait(5)
+    out = tmp_path / "samples.csv"
+    try:
+        code = main(["--backend", f"http://127.0.0.1:{state['port']}", "--duration", "1.5", "--rate", "200",
+                     "--sample-interval", "0.1", "--warmup", "0.2", "--abandon-share", "0.5",
+                     "--max-entries-per-hour", "1000", "--samples-out", str(out), "--seed", "3"])
+    finally:
+        stop.set()
+        thread.join()
+    captured = capsys.readouterr()
+    report = json.loads(captured.out)
+    assert code == 1 and report["analysis"]["verdict"] == "fail"
+    assert report["analysis"]["suspects"][0]["structure"] == "blacklistedTokens"
+    assert "pending" not in report["analysis"]["structures"]
+    operations = report["operations"]
+    assert set(operations) == {"register", "login", "logout", "socket", "webauthn_register", "webauthn_login"}
+    assert sum(operation["count"] for operation in operations.values()) == report["issued"]
+    assert operations["socket"]["statuses"] == {"ok": operations["socket"]["count"]}
+    assert 0 < report["abandoned_sockets"] < operations["socket"]["count"]
+    assert len(state["backend"].registered) == report["abandoned_sockets"]
+    assert out.read_text().splitlines()[0].startswith("t,rss_mb,heap_mb")
+    assert "growing: blacklistedTokens" in captured.err
@@ -0,0 +1,145 @@
+import asyncio
+import random
+
+import pytest
+
+from dancerpro_ops.httpio import HttpClient, Response, bound_port, latency_summary, serve
+from dancerpro_ops.twilio_standin import Latency, TwilioStandIn, main
+
+ACCOUNT = "AC" + "1" * 32
+BASE = f"/2010-04-01/Accounts/{ACCOUNT}"
+AUTH = {"Authorization": "Basic QUMxOmxvY2Fs"}
+
+
+def run(scenario, **options):
+    """Run ``scenario(api, standin, hooks, hook_url)`` against a stand-in and a webhook receiver."""
+
+    async def main():
+        hooks = []
+
+        async def receive(request):
+            hooks.append((request.path, {name: values[0] for name, values in request.form().items()}))
+            return Response(200, "<Response/>", "text/xml")
+
+        standin = TwilioStandIn(seed=1, **options)
+        server, receiver = await serve(standin.handle), await serve(receive)
+        api = HttpClient(f"http://127.0.0.1:{bound_port(server)}")
+        try:
+            return await scenario(api, standin, hooks, f"http://127.0.0.1:{bound_port(receiver)}")
+        finally:
+            await api.close()
+            await standin.close()
+            server.close()
+            receiver.close()
+
+    return asyncio.run(main())
+
+
+async def settle(standin):
+    while standin.tasks:
+        await asyncio.sleep(0.005)
+
+
+def test_latency_specs():
+    rng = random.Random(3)
+    assert Latency("fixed:25").sample_ms(rng) == 25
+    assert all(10 <= Latency("uniform:10,20").sample_ms(rng) <= 20 for _ in range(100))
+    samples = sorted(Latency("lognormal:100,0.5").sample_ms(rng) for _ in range(2001))
+    assert 90 < samples[1000] < 110
+    assert Latency("normal:0,50").sample_ms(rng) >= 0
+    for spec in ("fixed", "uniform:1", "gamma:1,2", "fixed:-1", "exp:x"):
+        with pytest.raises(ValueError):
+            Latency(spec)
+    assert latency_summary([3, 1, 2, 4])["p50"] == 2 and latency_summary([])["count"] == 0
+
+
+def test_messages_create_list_and_status_webhooks():
+    async def scenario(api, standin, hooks, hook_url):
+        created = []
+        for i in range(3):
+            response = await api.request("POST", f"{BASE}/Messages.json", headers=AUTH, form={
+                "To": "+15552000001", "From": "+15550001000", "Body": f"hi {i}",
+                "StatusCallback": f"{hook_url}/api/webhook/status"})
+            assert response.status == 201
+            created.append(response.json())
+        assert created[0]["sid"].startswith("SM") and created[0]["status"] == "queued"
+
+        page = (await api.request("GET", f"{BASE}/Messages.json?To=%2B15552000001&PageSize=2", headers=AUTH)).json()
+        assert [m["body"] for m in page["messages"]] == ["hi 2", "hi 1"]
+        assert page["next_page_uri"].endswith("Page=1&To=%2B15552000001")
+        rest = (await api.request("GET", page["next_page_uri"], headers=AUTH)).json()
+        assert [m["body"] for m in rest["messages"]] == ["hi 0"] and rest["next_page_uri"] is None
+        mine = (await api.request("GET", f"{BASE}/Messages.json?From=%2B15552000001", headers=AUTH)).json()
+        assert mine["messages"] == []
+
+        await settle(standin)
+        statuses = [(fields["MessageSid"], fields["MessageStatus"]) for _, fields in hooks]
+        assert sorted(statuses) == sorted((m["sid"], s) for m in created for s in ("sent", "delivered"))
+        assert {path for path, _ in hooks} == {"/api/webhook/status"}
+        assert standin.records["Messages"][0]["status"] == "delivered"
+        return standin.stats()
+
+    stats = run(scenario)
+    assert stats["requests"] == {"POST Messages": 3, "GET Messages": 3}
+    assert stats["webhooks"]["status_sent"] == 6 and stats["latency_ms"]["POST Messages"]["count"] == 3
+
+
+def test_faults_rate_limits_and_validation():
+    async def scenario(api, standin, hooks, hook_url):
+        form = {"To": "+1", "From": "+2", "Body": "x"}
+        codes = [(await api.request("POST", f"{BASE}/Messages.json", headers=AUTH, form=form)).status
+                 for _ in range(3)]
+        unauthorized = await api.request("GET", f"{BASE}/Messages.json")
+        return codes, unauthorized
+
+    codes, unauthorized = run(scenario, rate_limit=0.001, burst=2)
+    assert codes == [201, 201, 429] and unauthorized.json()["code"] == 20003
+
+    async def failing(api, standin, hooks, hook_url):
+        response = await api.request("POST", f"{BASE}/Messages.json", headers=AUTH, form={"To": "+1", "From": "+2", "Body": "x"})
+        missing = await api.request("POST", f"{BASE}/Calls.json", headers=AUTH, form={"To": "+1", "From": "+2"})
+        return response, missing, standin.stats()
+
+    response, missing, stats = run(failing, error_rate=1.0)
+    assert response.status == 500 and response.json()["code"] == 20500
+    assert stats["faults"]["injected_errors"] == 2 and stats["records"]["Messages"] == 0
+    assert missing.status == 500
+
+    async def invalid(api, standin, hooks, hook_url):
+        return (await api.request("POST", f"{BASE}/Calls.json", headers=AUTH, form={"To": "+1", "From": "+2"})).json()
+
+    assert run(invalid)["code"] == 21205
+
+
+def test_calls_report_requested_events_and_fetch_twiml():
+    async def scenario(api, standin, hooks, hook_url):
+        response = await api.request("POST", f"{BASE}/Calls.json", headers=AUTH, form={
+            "To": "+15552000001", "From": "+15550001000", "Url": f"{hook_url}/api/voice/bridge?clientPhone=%2B1",
+            "StatusCallback": f"{hook_url}/api/voice/status",
+            "StatusCallbackEvent": ["initiated", "answered", "completed"]})
+        await settle(standin)
+        listed = (await api.request("GET", f"{BASE}/Calls.json?From=%2B15550001000", headers=AUTH)).json()
+        return response.json(), listed["calls"], standin.stats()
+
+    call, listed, stats = run(scenario)
+    assert call["sid"].startswith("CA") and listed[0]["status"] == "completed" and listed[0]["duration"] == "0"
+    assert stats["webhooks"]["twiml_fetched"] == 1 and stats["webhooks"]["call_status_sent"] == 3
+
+
+def test_seeded_history_and_inbound_messages():
+    async def scenario(api, standin, hooks, hook_url):
+        standin.seed_history(ACCOUNT, "+15550001000", numbers=2, messages=4, calls=2)
+        to = (await api.request("GET", f"{BASE}/Messages.json?To=%2B15552000001", headers=AUTH)).json()["messages"]
+        inbound = await api.request("POST", "/stand-in/inbound", json_body={
+            "From": "+15552000001", "To": "+15550001000", "Body": "hello", "Url": f"{hook_url}/api/webhook/incoming"})
+        return to, inbound.json()
+
+    to, inbound = run(scenario)
+    assert [m["direction"] for m in to] == ["outbound-api", "outbound-api"] and to[0]["status"] == "delivered"
+    assert inbound["sid"].startswith("SM") and inbound["webhook_status"] == 200
+
+
+def test_cli_rejects_bad_latency(capsys):
+    with pytest.raises(SystemExit):
+        main(["--latency", "gamma:1"])
+    assert "bad latency" in capsys.readouterr().err
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import threading
+from collections import Counter
+
+from dancerpro_ops.httpio import Response, bound_port, json_response, serve
+from dancerpro_ops.twilio_standin import twilio_signature
+from dancerpro_ops.webhook_flood import INCOMING_PATH, STATUS_PATH, main, synthetic_events
+
+
+def test_signature_matches_twilio_documentation():
+    params = {"CallSid": "CA1234567890ABCDE", "Caller": "+12349013030", "Digits": "1234",
+              "From": "+12349013030", "To": "+18005551212"}
+    assert twilio_signature("12345", "https://mycompany.com/myapp.php?foo=1&bar=2", params) == "0/KCTR6DLpKmkAf8muzZqo1nDgQ="
+
+
+def test_synthetic_events():
+    events = synthetic_events(100, incoming_share=0.1, reorder=0.0, seed=4)
+    paths = Counter(path for path, _ in events)
+    assert paths == {STATUS_PATH: 200, INCOMING_PATH: 20}
+    statuses = [params["MessageStatus"] for path, params in events if path == STATUS_PATH]
+    assert statuses == ["sent"] * 100 + ["delivered"] * 100
+    assert len({params["MessageSid"] for _, params in events}) == 120
+    jittered = synthetic_events(100, reorder=1.5, seed=4)
+    first_seen = {}
+    for _, params in jittered:
+        first_seen.setdefault(params["MessageSid"], params["MessageStatus"])
+    assert "delivered" in first_seen.values() and synthetic_events(100, reorder=1.5, seed=4) == jittered
+
+
+class FakeBackend:
+    """Validates signatures, acknowledges, and 'processes' on a timer, with the backend's metrics shape."""
+
+    def __init__(self, token, base, max_size):
+        self.token, self.base, self.max_size = token, base, max_size
+        self.pending, self.stats = {}, Counter()
+
+    async def handle(self, request):
+        if request.path == "/api/debug/metrics":
+            return json_response({"webhookQueue": {**self.stats, "size": len(self.pending), "lagMs": {"p50": 1}}})
+        params = {name: values[0] for name, values in request.form().items()}
+        if request.headers.get("x-twilio-signature") != twilio_signature(self.token, self.base + request.path, params):
+            self.stats["signatureFailures"] += 1
+            return Response(403, "Invalid signature")
+        self.stats["received"] += 1
+        if params["MessageSid"] in self.pending:
+            self.stats["coalesced"] += 1
+        elif len(self.pending) >= self.max_size:
+            self.stats["dropped"] += 1
+            return Response(503, "Busy")
+        else:
+            self.pending[params["MessageSid"]] = params
+            asyncio.get_running_loop().call_later(0.02, self.process, params["MessageSid"])
+        return Response(200, "OK")
+
+    def process(self, sid):
+        self.pending.pop(sid, None)
+        self.stats["processed"] += 1
+
+
+def test_flood_reports_acks_and_queue_counters(capsys):
+    ready, stop = threading.Event(), threading.Event()
+    state = {}
+
+    def serve_backend():
+        async def main_loop():
+            backend = FakeBackend("local", "http://example.test", max_size=30)
+            server = await serve(backend.handle)
+            state["port"] = bound_port(server)
+            ready.set()
+            while not stop.is_set():
+                await asyncio.sleep(0.01)
+            server.close()
+
+        asyncio.run(main_loop())
+
+    thread = threading.Thread(target=serve_backend)
+    thread.start()
+    ready.wait(5)
+    try:
+        code = main(["--backend", f"http://127.0.0.1:{state['port']}", "--auth-token", "local",
+                     "--signing-base", "http://example.test", "--messages", "40", "--rate", "2000",
+                     "--incoming-share", "0.1", "--connections", "8", "--drain-timeout", "5"])
+    finally:
+        stop.set()
+        thread.join()
+    captured = capsys.readouterr()
+    report = json.loads(captured.out)
+    assert code == 0 and report["events"] == 88
+    assert sum(report["statuses"].values()) == 88 and report["ack_ms"]["count"] == 88
+    queue = report["queue"]
+    assert queue["signature_failures"] == 0 and queue["pending"] == 0
+    assert queue["received"] == 88 and queue["dropped"] == report["rejected"] == report["statuses"].get("503", 0)
+    assert queue["processed"] + queue["coalesced"] + queue["dropped"] == 88
+    assert "events at" in captured.err
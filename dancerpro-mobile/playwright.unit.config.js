@@ -0,0 +1,15 @@
+// @ts-check
+const { defineConfig } = require('@playwright/test');
+
+/**
+ * Unit specs in tests/unit: they load lib/ and backend/ modules straight into Node and open no page,
+ * so there are no browser projects and no baseURL. Run with `npm run test:unit`.
+ * @see https://playwright.dev/docs/test-configuration
+ */
+module.exports = defineConfig({
+  testDir: './tests/unit',
+  /* Tests in a file share the lib/ module state they set up, so they run in order */
+  fullyParallel: false,
+  forbidOnly: !!process.env.CI,
+  reporter: process.env.CI ? [['list'], ['junit', { outputFile: 'test-results/unit-results.xml' }]] : 'list',
+});
@@ -0,0 +1,790 @@
+// Generated by scripts/build-ai-worker.js from lib/aiWorker.js and its imports. Do not edit.
+'use strict';
+
+// ---- lib/recordIndex.js ----
+const __recordIndex = (() => {
+// Secondary indexes over one collection, kept up to date by lib/recordStore.js.
+//
+// Every indexed record is held as an entry { t, record } with its timestamp parsed once (epoch ms).
+// `all` keeps every entry sorted by t; each indexed field (clientId, venueId, ...) keeps a posting
+// list per value, also sorted by t. Range queries binary-search the bounds and return entries
+// newest-first, so a client/venue query costs O(log n + k) instead of a scan of the collection.
+// Records without a parseable timestamp are not indexed (date-range queries never matched them).
+//
+// Ties on t are returned in collection order: entries are inserted after their equals, and the
+// collection is built back-to-front, so reversing gives newest-prepended first.
+//
+// `t` does not have to be a time: any numeric sort key works (e.g. a transaction amount), which is
+// how paginated queries walk a collection in amount order.
+
+function parseTime(value) {
+  if (value == null || value === '') return NaN;
+  if (typeof value === 'number') return value;
+  return new Date(value).getTime();
+}
+
+// Index of the first entry with t > time (upperBound) or t >= time (lowerBound)
+function bound(entries, time, upper) {
+  let lo = 0;
+  let hi = entries.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    const t = entries[mid].t;
+    if (t < time || (upper && t === time)) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+function insertSorted(entries, entry) {
+  const at = bound(entries, entry.t, true);
+  if (at === entries.length) entries.push(entry);
+  else entries.splice(at, 0, entry);
+}
+
+function removeSorted(entries, record, t) {
+  for (let i = bound(entries, t, false); i < entries.length && entries[i].t === t; i++) {
+    if (entries[i].record === record) {
+      entries.splice(i, 1);
+      return true;
+    }
+  }
+  return false;
+}
+
+function* walk(entries, start, end, descending) {
+  const from = start == null ? 0 : bound(entries, start, false);
+  const to = end == null ? entries.length : bound(entries, end, true);
+  if (descending) {
+    for (let i = to - 1; i >= from; i--) yield entries[i];
+  } else {
+    for (let i = from; i < to; i++) yield entries[i];
+  }
+}
+
+function sliceNewestFirst(entries, start, end) {
+  const from = start == null ? 0 : bound(entries, start, false);
+  const to = end == null ? entries.length : bound(entries, end, true);
+  const out = [];
+  for (let i = to - 1; i >= from; i--) out.push(entries[i]);
+  return out;
+}
+
+/**
+ * @param {{ timeOf: (record: object) => any, fields?: string[] }} spec
+ */
+function createRecordIndex({ timeOf, fields = [] }) {
+  let all = [];
+  let version = 0;
+  const postings = new Map(fields.map(f => [f, new Map()]));
+
+  function entryTime(record) {
+    return record ? parseTime(timeOf(record)) : NaN;
+  }
+
+  function add(record) {
+    const t = entryTime(record);
+    if (!Number.isFinite(t)) return;
+    const entry = { t, record };
+    version += 1;
+    insertSorted(all, entry);
+    postings.forEach((byValue, field) => {
+      const value = record[field];
+      if (value == null || value === '') return;
+      if (!byValue.has(value)) byValue.set(value, []);
+      insertSorted(byValue.get(value), entry);
+    });
+  }
+
+  function remove(record) {
+    const t = entryTime(record);
+    if (!Number.isFinite(t)) return;
+    version += 1;
+    removeSorted(all, record, t);
+    postings.forEach((byValue, field) => {
+      const list = byValue.get(record[field]);
+      if (!list) return;
+      removeSorted(list, record, t);
+      if (!list.length) byValue.delete(record[field]);
+    });
+  }
+
+  function build(records) {
+    version += 1;
+    all = [];
+    postings.forEach(byValue => byValue.clear());
+    for (let i = records.length - 1; i >= 0; i--) add(records[i]);
+  }
+
+  // Entries with start <= t <= end (either bound optional), newest first
+  function range(start, end) {
+    return sliceNewestFirst(all, start, end);
+  }
+
+  function rangeBy(field, value, start, end) {
+    const list = postings.get(field)?.get(value);
+    return list ? sliceNewestFirst(list, start, end) : [];
+  }
+
+  // Lazy walk over [start, end] (of one field value's posting list when `field` is given), newest
+  // first unless `descending` is false. Stop consuming it before the next write to the collection.
+  function entries(start, end, { field, value, descending = true } = {}) {
+    const list = field ? postings.get(field)?.get(value) : all;
+    return walk(list || [], start, end, descending);
+  }
+
+  return {
+    add,
+    remove,
+    build,
+    range,
+    rangeBy,
+    entries,
+    size: () => all.length,
+    // Changes on every add/remove/build; lets callers cache results derived from the index
+    version: () => version,
+  };
+}
+
+return { parseTime, createRecordIndex };
+})();
+
+// ---- lib/aiScoring.js ----
+const __aiScoring = (() => {
+// Client x venue compatibility scoring for lib/aiEngine.js.
+//
+// computeAggregates() makes one pass over the shifts and precomputes everything a score needs:
+// all-time earnings per client, venue and client+venue, and per-client/per-venue performance
+// inside the trailing `periodDays` window (shift count, earnings, average, best day of week).
+// scoreMatrix() then scores every pair into one Float64Array from per-client and per-venue
+// features prepared once (lowercased strings, tag sets, normalized averages), and topVenues()
+// keeps the best N per client with a bounded heap instead of sorting every row. Rationale text
+// is built only for the pairs that are returned (explainPair).
+//
+// Shifts are aggregated from a columnar table (createShiftEncoder) and the matrix can be filled a
+// block of rows at a time (createScoreMatrix), so lib/aiJob.js can spread a run over short slices
+// or hand it to a Web Worker.
+const { parseTime } = __recordIndex;
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function safeArray(arr) { return Array.isArray(arr) ? arr : []; }
+function normalize(value, max) { const m = Number(max || 0); const v = Math.max(0, Number(value || 0)); return m > 0 ? Math.min(1, v / m) : 0; }
+function toDowLabel(dow) { const labels = ['Sun','Mon','Tue','Wed','Thu','Fri','Sat']; return labels[(Number(dow) || 0) % 7]; }
+function adjacentDowScore(a, b) { if (a == null || b == null) return 0; const diff = Math.abs(Number(a) - Number(b)); if (diff === 0) return 1; if (diff === 1 || diff === 6) return 0.6; return 0.25; }
+function stringIncludes(haystack, needle) { if (!haystack || !needle) return false; return String(haystack).toLowerCase().includes(String(needle).toLowerCase()); }
+
+function createPerformance() {
+  return { shiftCount: 0, totalEarnings: 0, dowTotal: new Float64Array(7), dowCount: new Int32Array(7) };
+}
+
+// Same shape and best-day rule as getClientPerformance/getVenuePerformance in lib/db.js
+function finishPerformance(p) {
+  let bestDay = null; let bestDayAvg = 0;
+  for (let dow = 0; dow < 7; dow++) {
+    const avg = p.dowCount[dow] ? p.dowTotal[dow] / p.dowCount[dow] : 0;
+    if (avg > bestDayAvg) { bestDayAvg = avg; bestDay = dow; }
+  }
+  return {
+    shiftCount: p.shiftCount,
+    totalEarnings: p.totalEarnings,
+    avgEarnings: p.shiftCount ? p.totalEarnings / p.shiftCount : 0,
+    bestDay,
+    bestDayAvg,
+  };
+}
+
+const EMPTY_PERFORMANCE = Object.freeze(finishPerformance(createPerformance()));
+
+/**
+ * Columnar copy of the shift fields scoring reads: start time, earnings, client/venue codes and
+ * the "event" note flag. Encoding can be spread over several slices (push a chunk at a time), and
+ * the typed columns are cheap to aggregate and to hand to a Web Worker (see shiftTableBuffers).
+ * @param {number} capacity upper bound on the number of shifts pushed
+ */
+function createShiftEncoder(capacity) {
+  const time = new Float64Array(capacity);
+  const earnings = new Float64Array(capacity);
+  const client = new Int32Array(capacity);
+  const venue = new Int32Array(capacity);
+  const event = new Uint8Array(capacity);
+  const clientIds = [];
+  const venueIds = [];
+  const clientCodes = new Map();
+  const venueCodes = new Map();
+  let length = 0;
+  const codeOf = (codes, ids, id) => {
+    if (!id) return -1;
+    let code = codes.get(id);
+    if (code === undefined) {
+      code = ids.length;
+      codes.set(id, code);
+      ids.push(id);
+    }
+    return code;
+  };
+  return {
+    push(s) {
+      if (!s) return;
+      const i = length++;
+      time[i] = parseTime(s.start || s.end || s.date);
+      earnings[i] = Number(s.earnings || 0);
+      client[i] = codeOf(clientCodes, clientIds, s.clientId);
+      venue[i] = codeOf(venueCodes, venueIds, s.venueId);
+      event[i] = stringIncludes(s.notes, 'event') ? 1 : 0;
+    },
+    finish: () => ({ length, time, earnings, client, venue, event, clientIds, venueIds }),
+  };
+}
+
+function encodeShifts(shifts) {
+  const list = safeArray(shifts);
+  const encoder = createShiftEncoder(list.length);
+  list.forEach(encoder.push);
+  return encoder.finish();
+}
+
+// Transfer list for postMessage: the columns move to the worker instead of being copied
+function shiftTableBuffers(table) {
+  return [table.time.buffer, table.earnings.buffer, table.client.buffer, table.venue.buffer, table.event.buffer];
+}
+
+/**
+ * Aggregation over a shift table, fed in row ranges so a caller can yield between them.
+ * @param {object} table from createShiftEncoder().finish()
+ * @param {{ venues?: object[], events?: object[] }} snapshot capacities and event flags
+ * @param {{ periodDays?: number, now?: number }} options window of the `performance` tables
+ */
+function createAggregator(table, snapshot, { periodDays = 120, now = Date.now() } = {}) {
+  const clientCount = table.clientIds.length;
+  const venueCount = table.venueIds.length;
+  const windowStart = now - Number(periodDays || 0) * DAY_MS;
+  // Running totals per code: no per-shift allocations
+  const venueTotal = new Float64Array(venueCount);
+  const venueShifts = new Int32Array(venueCount);
+  const venueEvent = new Uint8Array(venueCount);
+  const clientTotal = new Float64Array(clientCount);
+  const clientShifts = new Int32Array(clientCount);
+  const cells = [];                 // client code -> Map<venue code, { total, count }>
+  const cellOrder = [];             // [client code, venue code, cell] in first-seen order
+  const clientPerf = Array.from({ length: clientCount }, () => null);
+  const venuePerf = Array.from({ length: venueCount }, () => null);
+  const addPerformance = (list, code, earnings, dow) => {
+    let p = list[code];
+    if (!p) { p = createPerformance(); list[code] = p; }
+    p.shiftCount += 1;
+    p.totalEarnings += earnings;
+    p.dowTotal[dow] += earnings;
+    p.dowCount[dow] += 1;
+  };
+
+  function add(from, to) {
+    const { time, earnings: earningsColumn, client, venue, event } = table;
+    for (let i = from; i < to; i++) {
+      const earnings = earningsColumn[i];
+      const v = venue[i];
+      const c = client[i];
+      const t = time[i];
+      if (t >= windowStart && t <= now) {
+        const perfEarnings = Number.isFinite(earnings) ? earnings : 0;
+        const dow = new Date(t).getDay();
+        if (c >= 0) addPerformance(clientPerf, c, perfEarnings, dow);
+        if (v >= 0) addPerformance(venuePerf, v, perfEarnings, dow);
+      }
+      if (v < 0) continue;
+      venueTotal[v] += earnings;
+      venueShifts[v] += 1;
+      if (event[i]) venueEvent[v] = 1;
+      if (c < 0) continue;
+      clientTotal[c] += earnings;
+      clientShifts[c] += 1;
+      let venuesOfClient = cells[c];
+      if (!venuesOfClient) { venuesOfClient = new Map(); cells[c] = venuesOfClient; }
+      const cell = venuesOfClient.get(v);
+      if (cell) { cell.total += earnings; cell.count += 1; } else {
+        const fresh = { total: earnings, count: 1 };
+        venuesOfClient.set(v, fresh);
+        cellOrder.push([c, v, fresh]);
+      }
+    }
+  }
+
+  function finish() {
+    const { clientIds, venueIds } = table;
+    const byVenue = new Map();
+    const byClient = new Map();
+    const byClientVenue = new Map();
+    const clientVenues = new Map(); // clientId -> Map<venueId, { total, count }>
+    const eventFlagByVenue = new Map();
+    const avgOf = (total, count) => (count ? total / count : 0);
+    let venueMaxAvg = 0; let clientMaxAvg = 0; let clientVenueMaxAvg = 0;
+    for (let v = 0; v < venueCount; v++) {
+      if (!venueShifts[v]) continue;
+      byVenue.set(venueIds[v], { total: venueTotal[v], count: venueShifts[v] });
+      venueMaxAvg = Math.max(venueMaxAvg, avgOf(venueTotal[v], venueShifts[v]));
+      if (venueEvent[v]) eventFlagByVenue.set(venueIds[v], true);
+    }
+    for (let c = 0; c < clientCount; c++) {
+      if (!clientShifts[c]) continue;
+      byClient.set(clientIds[c], { total: clientTotal[c], count: clientShifts[c] });
+      clientMaxAvg = Math.max(clientMaxAvg, avgOf(clientTotal[c], clientShifts[c]));
+    }
+    cellOrder.forEach(([c, v, cell]) => {
+      byClientVenue.set(`${clientIds[c]}|${venueIds[v]}`, cell);
+      let venuesOfClient = clientVenues.get(clientIds[c]);
+      if (!venuesOfClient) { venuesOfClient = new Map(); clientVenues.set(clientIds[c], venuesOfClient); }
+      venuesOfClient.set(venueIds[v], cell);
+      clientVenueMaxAvg = Math.max(clientVenueMaxAvg, avgOf(cell.total, cell.count));
+    });
+    // Merge any explicit upcoming events if present
+    safeArray(snapshot.events).forEach(e => {
+      const vid = e.venueId || e.venue || null;
+      if (vid) eventFlagByVenue.set(vid, true);
+    });
+    const maxCapacity = safeArray(snapshot.venues).reduce((acc, v) => Math.max(acc, Number(v.capacity || 0)), 0);
+    const performanceOf = (list, ids) => {
+      const out = new Map();
+      list.forEach((p, code) => { if (p) out.set(ids[code], finishPerformance(p)); });
+      return out;
+    };
+    const performance = {
+      periodDays,
+      byClient: performanceOf(clientPerf, clientIds),
+      byVenue: performanceOf(venuePerf, venueIds),
+    };
+    return { byClientVenue, clientVenues, byVenue, byClient, venueMaxAvg, clientMaxAvg, clientVenueMaxAvg, maxCapacity, eventFlagByVenue, performance };
+  }
+
+  return { add, finish };
+}
+
+/**
+ * One pass over `snapshot.shifts` (or an already encoded `snapshot.shiftTable`), plus
+ * `snapshot.events` for event flags.
+ * @param {{ shifts?: object[], shiftTable?: object, venues?: object[], events?: object[] }} snapshot
+ * @param {{ periodDays?: number, now?: number }} options window of the `performance` tables
+ */
+function computeAggregates(snapshot, options = {}) {
+  const table = snapshot.shiftTable || encodeShifts(snapshot.shifts);
+  const aggregator = createAggregator(table, snapshot, options);
+  aggregator.add(0, table.length);
+  return aggregator.finish();
+}
+
+function clientPerformance(aggregates, clientId) {
+  return aggregates.performance.byClient.get(clientId) || EMPTY_PERFORMANCE;
+}
+
+function venuePerformance(aggregates, venueId) {
+  return aggregates.performance.byVenue.get(venueId) || EMPTY_PERFORMANCE;
+}
+
+const lower = value => (value ? String(value).toLowerCase() : '');
+const tagSet = tags => new Set(safeArray(tags).map(t => String(t).toLowerCase()));
+
+function clientFeatures(client, aggregates) {
+  return {
+    bestDay: clientPerformance(aggregates, client.id).bestDay,
+    venues: aggregates.clientVenues.get(client.id) || null,
+    hasTags: safeArray(client.tags).length > 0,
+    tags: tagSet(client.tags),
+    city: lower(client.city || client.location),
+    notes: lower(client.notes),
+  };
+}
+
+function venueFeatures(venue, aggregates) {
+  const v = aggregates.byVenue.get(venue.id) || { total: 0, count: 0 };
+  const avg = v.count ? v.total / v.count : 0;
+  return {
+    avg,
+    avgNorm: normalize(avg, aggregates.venueMaxAvg),
+    bestDay: venuePerformance(aggregates, venue.id).bestDay,
+    hasTags: safeArray(venue.tags).length > 0,
+    tags: tagSet(venue.tags),
+    name: lower(venue.name),
+    loc: lower(venue.location || venue.city),
+    city: lower(venue.city || venue.location),
+    capacityNorm: normalize(Number(venue.capacity || 0), aggregates.maxCapacity || 0),
+    event: aggregates.eventFlagByVenue.get(venue.id) ? 1 : 0,
+  };
+}
+
+function tagScoreOf(c, v) {
+  if (c.hasTags && v.hasTags) {
+    let inter = 0;
+    c.tags.forEach(t => { if (v.tags.has(t)) inter += 1; });
+    return inter / Math.max(1, Math.min(c.tags.size, v.tags.size));
+  }
+  return c.notes && ((v.name && c.notes.includes(v.name)) || (v.loc && c.notes.includes(v.loc))) ? 1 : 0;
+}
+
+function cityScoreOf(c, v) {
+  if (c.city && v.city) return (c.city.includes(v.city) || v.city.includes(c.city)) ? 1 : 0;
+  if (v.city) return c.notes && c.notes.includes(v.city) ? 1 : 0;
+  return 0;
+}
+
+function clientVenueAvgOf(c, venueId) {
+  const cv = c.venues?.get(venueId);
+  return cv && cv.count ? cv.total / cv.count : 0;
+}
+
+// The weighted sum, term by term in a fixed order so every caller gets bit-identical scores
+function pairScore(c, v, venueId, aggregates, w) {
+  return (
+    w.base_client_venue_weight * normalize(clientVenueAvgOf(c, venueId), aggregates.clientVenueMaxAvg) +
+    w.base_venue_avg_weight * v.avgNorm +
+    w.base_dow_weight * adjacentDowScore(c.bestDay, v.bestDay) +
+    w.tag_weight * tagScoreOf(c, v) +
+    w.city_match_weight * cityScoreOf(c, v) +
+    w.capacity_weight * v.capacityNorm +
+    w.event_weight * v.event
+  );
+}
+
+/**
+ * Score matrix to be filled a block of client rows at a time: `scores[i * venues.length + j]`.
+ * @returns {{ matrix: { clients: object[], venues: object[], scores: Float64Array }, scoreRows: (from: number, to: number) => void }}
+ */
+function createScoreMatrix(clients, venues, aggregates, weights) {
+  const cf = clients.map(c => clientFeatures(c, aggregates));
+  const vf = venues.map(v => venueFeatures(v, aggregates));
+  const width = venues.length;
+  const scores = new Float64Array(clients.length * width);
+  return {
+    matrix: { clients, venues, scores },
+    scoreRows(from, to) {
+      for (let i = from; i < to; i++) {
+        const c = cf[i];
+        const row = i * width;
+        for (let j = 0; j < width; j++) scores[row + j] = pairScore(c, vf[j], venues[j].id, aggregates, weights);
+      }
+    },
+  };
+}
+
+/**
+ * Scores of every client x venue pair: `scores[i * venues.length + j]`.
+ * @returns {{ clients: object[], venues: object[], scores: Float64Array }}
+ */
+function scoreMatrix(clients, venues, aggregates, weights) {
+  const { matrix, scoreRows } = createScoreMatrix(clients, venues, aggregates, weights);
+  scoreRows(0, clients.length);
+  return matrix;
+}
+
+// Heap order: lower score first; on equal scores the later venue (it loses the tie-break)
+function worse(scores, row, a, b) {
+  const sa = scores[row + a];
+  const sb = scores[row + b];
+  return sa < sb || (sa === sb && a > b);
+}
+
+/**
+ * Indexes of the `n` best venues for client `i`, best first (equal scores keep venue order).
+ * A min-heap of size n: O(V log n) instead of sorting all V scores.
+ */
+function topVenues(matrix, i, n) {
+  const width = matrix.venues.length;
+  const { scores } = matrix;
+  const row = i * width;
+  const heap = [];
+  const siftDown = k => {
+    for (;;) {
+      const l = 2 * k + 1;
+      const r = l + 1;
+      let m = k;
+      if (l < heap.length && worse(scores, row, heap[l], heap[m])) m = l;
+      if (r < heap.length && worse(scores, row, heap[r], heap[m])) m = r;
+      if (m === k) return;
+      [heap[k], heap[m]] = [heap[m], heap[k]];
+      k = m;
+    }
+  };
+  for (let j = 0; j < width && n > 0; j++) {
+    if (heap.length < n) {
+      heap.push(j);
+      let k = heap.length - 1;
+      while (k > 0) {
+        const p = (k - 1) >> 1;
+        if (!worse(scores, row, heap[k], heap[p])) break;
+        [heap[k], heap[p]] = [heap[p], heap[k]];
+        k = p;
+      }
+    } else if (worse(scores, row, heap[0], j)) {
+      heap[0] = j;
+      siftDown(0);
+    }
+  }
+  return heap.sort((a, b) => (worse(scores, row, a, b) ? 1 : worse(scores, row, b, a) ? -1 : 0));
+}
+
+/**
+ * Full breakdown of one pair, as the AI screens show it.
+ * @returns {{ score: number, rationale: string[], clientVenueAvg: number, venueAvg: number, clientBestDay: number|null, venueBestDay: number|null }}
+ */
+function explainPair(client, venue, aggregates, weights) {
+  const c = clientFeatures(client, aggregates);
+  const v = venueFeatures(venue, aggregates);
+  const clientVenueAvg = clientVenueAvgOf(c, venue.id);
+  const tagScore = tagScoreOf(c, v);
+  const cityScore = cityScoreOf(c, v);
+  const rationale = [
+    clientVenueAvg ? `Strong personal earnings at ${venue.name}` : null,
+    v.avg ? `Venue averages ${(v.avg).toFixed(0)} per shift` : null,
+    c.bestDay != null && v.bestDay != null ? `Best day alignment: ${toDowLabel(c.bestDay)} vs ${toDowLabel(v.bestDay)}` : null,
+    tagScore ? 'Tag relevance matched' : null,
+    cityScore ? `City proximity: ${venue.city || venue.location || 'local'}` : null,
+    v.capacityNorm ? `Capacity factor considered` : null,
+    v.event ? 'Special event impact detected' : null,
+  ].filter(Boolean);
+  return {
+    score: pairScore(c, v, venue.id, aggregates, weights),
+    rationale,
+    clientVenueAvg,
+    venueAvg: v.avg,
+    clientBestDay: c.bestDay,
+    venueBestDay: v.bestDay,
+  };
+}
+
+/**
+ * Top `n` venues of clients `from`..`to` as { venueIndex, ...explainPair() }, best first. Plain
+ * data (indexes instead of records), so rows can be posted across threads.
+ */
+function rankedRows(matrix, aggregates, weights, n, from = 0, to = matrix.clients.length) {
+  const { clients, venues } = matrix;
+  const rows = [];
+  for (let i = from; i < to; i++) {
+    rows.push(topVenues(matrix, i, n).map(j => ({ venueIndex: j, ...explainPair(clients[i], venues[j], aggregates, weights) })));
+  }
+  return rows;
+}
+
+/**
+ * Schedule lines from each client's best pick (`best[i]` from rankedRows, or undefined).
+ * @returns {{ clientIndex: number, venueIndex: number, bestDay: number, text: string }[]}
+ */
+function scheduleEntries(clients, venues, best, weeks) {
+  const entries = [];
+  best.forEach((pick, i) => {
+    if (!pick) return;
+    const client = clients[i];
+    const dow = pick.clientBestDay ?? pick.venueBestDay ?? 5;
+    entries.push({ clientIndex: i, venueIndex: pick.venueIndex, bestDay: dow, text: `Schedule ${client.name} at ${venues[pick.venueIndex].name} on ${toDowLabel(dow)} for the next ${weeks} weeks` });
+  });
+  return entries;
+}
+
+/**
+ * High-value clients with few recent shifts, and strong venues that are rarely booked.
+ * @returns {{ priority: string, title: string, description: string }[]}
+ */
+function actionItems(clients, venues, aggregates, best) {
+  const items = [];
+  clients.forEach((client, i) => {
+    const shiftsLow = (clientPerformance(aggregates, client.id).shiftCount || 0) < 3;
+    const highValue = Number(client.valueScore || 0) >= 8 || safeArray(client.tags).includes('VIP');
+    if (!highValue || !shiftsLow) return;
+    const pick = best[i];
+    const label = toDowLabel(pick?.clientBestDay ?? pick?.venueBestDay ?? 5);
+    items.push({ priority: 'high', title: `Book ${client.name} on ${label} at ${(pick && venues[pick.venueIndex].name) || 'top venue'}`, description: 'High-value client with low recent shifts. Boost retention and revenue.' });
+  });
+  for (const venue of venues) {
+    const vAgg = aggregates.byVenue.get(venue.id) || { total: 0, count: 0 };
+    const avg = vAgg.count ? vAgg.total / vAgg.count : 0;
+    if (avg > (aggregates.venueMaxAvg * 0.75) && vAgg.count < 3) {
+      items.push({ priority: 'medium', title: `Underutilized high-earning venue: ${venue.name}`, description: 'Increase scheduling at this venue to capitalize on strong averages.' });
+    }
+  }
+  return items;
+}
+
+/**
+ * Top `topN` venues per client, in client order.
+ * @returns {{ client: object, recommendations: object[] }[]} recommendations are
+ *   { client, venue, ...explainPair() }, best first
+ */
+function rankAssignments(clients, venues, aggregates, weights, topN = 3) {
+  const matrix = scoreMatrix(clients, venues, aggregates, weights);
+  return rankedRows(matrix, aggregates, weights, topN).map((row, i) => ({
+    client: clients[i],
+    recommendations: row.map(({ venueIndex, ...detail }) => ({ client: clients[i], venue: venues[venueIndex], ...detail })),
+  }));
+}
+
+return { safeArray, normalize, toDowLabel, adjacentDowScore, stringIncludes, createShiftEncoder, encodeShifts, shiftTableBuffers, createAggregator, computeAggregates, clientPerformance, venuePerformance, createScoreMatrix, scoreMatrix, topVenues, explainPair, rankedRows, scheduleEntries, actionItems, rankAssignments };
+})();
+
+// ---- lib/aiJob.js ----
+const __aiJob = (() => {
+// AI insights as a resumable job (a generator), so a run never holds the JS thread for long.
+//
+// insightsJob() does the work of lib/aiEngine.js's pipeline in small steps: aggregate the shift
+// table a chunk of rows at a time, score a block of client rows per step, rank, then build the
+// schedule and action items. It yields `undefined` between steps and a partial result when a stage
+// is ready ({ stage: 'pairs' | 'schedule' | 'actions', ... }), and returns the aggregates and the
+// score matrix. Partials and the result refer to clients and venues by index and hold only plain
+// data and typed arrays, so they can be posted from public/ai-worker.js as they are.
+//
+// runJob() drives a job: on the UI thread in slices of a few ms, yielding to the event loop in
+// between so scrolling and typing keep up; in the worker with longer slices, only so that cancel
+// messages get through.
+const { createShiftEncoder, createAggregator, createScoreMatrix, rankedRows, scheduleEntries, actionItems } = __aiScoring;
+const SHIFT_ROWS_PER_STEP = 1024;
+const PAIRS_PER_STEP = 2048;
+const RANKED_CLIENTS_PER_STEP = 16;
+const TOP_N = 3;
+const SCHEDULE_WEEKS = 4;
+
+function cancelledError() {
+  const error = new Error('AI insights run cancelled');
+  error.name = 'AbortError';
+  return error;
+}
+
+function isCancelled(error) {
+  return error?.name === 'AbortError';
+}
+
+/**
+ * Encode shifts into a shift table (see createShiftEncoder) a chunk at a time.
+ */
+function* encodeShiftsJob(shifts) {
+  const encoder = createShiftEncoder(shifts.length);
+  for (let i = 0; i < shifts.length; i++) {
+    encoder.push(shifts[i]);
+    if (i % SHIFT_ROWS_PER_STEP === SHIFT_ROWS_PER_STEP - 1) yield;
+  }
+  return encoder.finish();
+}
+
+/**
+ * @param {{ clients: object[], venues: object[], events?: object[], shiftTable: object, periodDays: number, weights: object, now?: number }} input
+ * @returns {Generator<undefined | object, { aggregates: object, scores: Float64Array }>}
+ */
+function* insightsJob({ clients, venues, events, shiftTable, periodDays, weights, now = Date.now() }) {
+  const aggregator = createAggregator(shiftTable, { venues, events }, { periodDays, now });
+  for (let from = 0; from < shiftTable.length; from += SHIFT_ROWS_PER_STEP) {
+    aggregator.add(from, Math.min(shiftTable.length, from + SHIFT_ROWS_PER_STEP));
+    yield;
+  }
+  const aggregates = aggregator.finish();
+  yield;
+
+  const { matrix, scoreRows } = createScoreMatrix(clients, venues, aggregates, weights);
+  const rowsPerStep = Math.max(1, Math.floor(PAIRS_PER_STEP / Math.max(1, venues.length)));
+  for (let from = 0; from < clients.length; from += rowsPerStep) {
+    scoreRows(from, Math.min(clients.length, from + rowsPerStep));
+    yield;
+  }
+
+  const ranked = [];
+  for (let from = 0; from < clients.length; from += RANKED_CLIENTS_PER_STEP) {
+    ranked.push(...rankedRows(matrix, aggregates, weights, TOP_N, from, Math.min(clients.length, from + RANKED_CLIENTS_PER_STEP)));
+    yield;
+  }
+  yield { stage: 'pairs', ranked };
+
+  const best = ranked.map(row => row[0]);
+  yield { stage: 'schedule', schedule: scheduleEntries(clients, venues, best, SCHEDULE_WEEKS) };
+  yield { stage: 'actions', actions: actionItems(clients, venues, aggregates, best) };
+  return { aggregates, scores: matrix.scores };
+}
+
+const clock = typeof performance !== 'undefined' && performance.now ? () => performance.now() : () => Date.now();
+
+// Next macrotask without the 4ms clamp nested setTimeouts get in browsers
+function makeScheduler() {
+  if (typeof setImmediate === 'function') return fn => setImmediate(fn);
+  if (typeof MessageChannel === 'function') {
+    const channel = new MessageChannel();
+    const queue = [];
+    channel.port1.onmessage = () => queue.shift()?.();
+    return fn => { queue.push(fn); channel.port2.postMessage(null); };
+  }
+  return fn => setTimeout(fn, 0);
+}
+
+let schedule = null;
+
+/**
+ * Run `job` to completion in slices of about `budgetMs`.
+ * @param {{ onPartial?: (partial: object) => void, signal?: AbortSignal, budgetMs?: number }} options
+ * @returns {Promise<any>} the job's return value; rejects with cancelledError() once `signal` aborts
+ */
+function runJob(job, { onPartial, signal, budgetMs = 8 } = {}) {
+  if (!schedule) schedule = makeScheduler();
+  return new Promise((resolve, reject) => {
+    const slice = () => {
+      const start = clock();
+      try {
+        for (;;) {
+          if (signal?.aborted) {
+            job.return();
+            reject(cancelledError());
+            return;
+          }
+          const { value, done } = job.next();
+          if (done) {
+            resolve(value);
+            return;
+          }
+          if (value) onPartial?.(value);
+          if (clock() - start >= budgetMs) break;
+        }
+      } catch (e) {
+        reject(e);
+        return;
+      }
+      schedule(slice);
+    };
+    schedule(slice);
+  });
+}
+
+return { TOP_N, SCHEDULE_WEEKS, cancelledError, isCancelled, encodeShiftsJob, insightsJob, runJob };
+})();
+
+// ---- lib/aiWorker.js ----
+const __aiWorker = (() => {
+// Message loop of public/ai-worker.js, which scripts/build-ai-worker.js generates from this file
+// and its imports. The page side is lib/aiWorkerClient.js.
+//
+// In:  { type: 'run', runId, input }  input as for insightsJob(), shift table buffers transferred
+//      { type: 'cancel', runId }
+// Out: { type: 'ready' } once, then per run any number of { type: 'partial', runId, partial }
+//      followed by { type: 'done', runId, result } (score buffer transferred) or
+//      { type: 'error', runId, message }. A cancelled run posts nothing more.
+const { insightsJob, runJob, isCancelled } = __aiJob;
+// Long enough that slicing costs next to nothing, short enough that a cancel is seen promptly
+const WORKER_SLICE_MS = 50;
+
+function serveInsights(scope) {
+  const runs = new Map(); // runId -> AbortController
+  scope.addEventListener('message', ({ data }) => {
+    if (!data) return;
+    if (data.type === 'cancel') {
+      runs.get(data.runId)?.abort();
+      return;
+    }
+    if (data.type !== 'run') return;
+    const { runId, input } = data;
+    const controller = new AbortController();
+    runs.set(runId, controller);
+    runJob(insightsJob(input), {
+      signal: controller.signal,
+      budgetMs: WORKER_SLICE_MS,
+      onPartial: partial => scope.postMessage({ type: 'partial', runId, partial }),
+    }).then(
+      result => scope.postMessage({ type: 'done', runId, result }, [result.scores.buffer]),
+      error => { if (!isCancelled(error)) scope.postMessage({ type: 'error', runId, message: String(error?.message || error) }); },
+    ).finally(() => runs.delete(runId));
+  });
+  scope.postMessage({ type: 'ready' });
+}
+
+return { serveInsights };
+})();
+
+__aiWorker.serveInsights(self);
@@ -7,10 +7,10 @@ import BarChart from '../components/UI/BarChart';
 import DonutChart from '../components/UI/DonutChart';
 import { Colors } from '../constants/Colors';
 import { formatCurrency, formatPercentage, formatNumber } from '../utils/formatters';
-import aiEngine, { buildAiInsights, answerQuery } from '../lib/aiEngine';
+import aiEngine, { streamAiInsights, answerQuery } from '../lib/aiEngine';
 import { getIntegrationStatuses } from '../lib/aiStatus';
 import WebSocketService from '../services/WebSocketService';
-import { getAllClients, getAllVenues, getRecentShifts, getRecentTransactions, computeTransactionTotals, getAiReports, insertAiReport, deleteAiReport } from '../lib/db';
+import { getAllClients, getAllVenues, getRecentShifts, getRecentTransactions, computeTransactionTotals, getAiReports, insertAiReport, deleteAiReport, getEarningsRollup } from '../lib/db';
 
 export default function AIInsights() {
   const [selectedPeriod, setSelectedPeriod] = useState('7d');
@@ -18,7 +18,10 @@ export default function AIInsights() {
 
   // Dynamic AI data
   const [loading, setLoading] = useState(false);
-  // Removed legacy assignments/matches data in favor of analytics dashboard
+  // Bumped by the refresh button; engine results are otherwise memoized until data changes
+  const [refreshCount, setRefreshCount] = useState(0);
+  // Engine results arrive stage by stage: top pairs, then schedule, then actions
+  const [compatibilityTop, setCompatibilityTop] = useState([]);
   const [schedule, setSchedule] = useState([]);
   const [actions, setActions] = useState([]);
   const [clients, setClients] = useState([]);
@@ -345,20 +348,30 @@ export default function AIInsights() {
   }, []);
 
   useEffect(() => {
-    const load = async () => {
-      setLoading(true);
-      try {
-        const data = await buildAiInsights(periodDays);
-        setSchedule(data.schedule || []);
-        setActions(data.actions || []);
-      } catch (e) {
-        // Swallow, UI still works
-      } finally {
-        setLoading(false);
-      }
+    let active = true;
+    setLoading(true);
+    setCompatibilityTop([]);
+    setSchedule([]);
+    setActions([]);
+    // The engine runs off the UI thread and reports each stage as it finishes; a period change or
+    // leaving the screen cancels the stale run
+    const run = streamAiInsights(periodDays, data => {
+      setCompatibilityTop(data.compatibilityTop || []);
+      setSchedule(data.schedule || []);
+      setActions(data.actions || []);
+    });
+    run.promise
+      .catch(() => {
+        // Swallow (including cancellation), UI still works
+      })
+      .finally(() => {
+        if (active) setLoading(false);
+      });
+    return () => {
+      active = false;
+      run.cancel();
     };
-    load();
-  }, [periodDays]);
+  }, [periodDays, refreshCount]);
 
   const trendSeries = useMemo(() => {
     // Build daily earnings from shifts within periodDays, filtered by client/venue selections
@@ -388,6 +401,13 @@ export default function AIInsights() {
     let mounted = true;
     const run = async () => {
       const arr = await (async () => {
+        const clientId = clientIdx < 0 ? null : clients[clientIdx]?.id;
+        const venueId = venueIdx < 0 ? null : venues[venueIdx]?.id;
+        if (!(clientId && venueId)) {
+          // Single (or no) filter: read the precomputed daily rollup
+          const rows = await getEarningsRollup(null, { granularity: 'day', days: periodDays, clientId, venueId });
+          return rows.filter(r => r.shifts > 0).map(r => ({ x: r.key, y: r.earnings }));
+        }
         const shifts = await getRecentShifts(null, periodDays);
         const filtered = shifts.filter(s => {
           const cOk = clientIdx < 0 ? true : (s.clientId === clients[clientIdx]?.id);
@@ -433,7 +453,8 @@ export default function AIInsights() {
             </View>
           </View>
           <TouchableOpacity style={styles.refreshButton} onPress={() => {
-            setSelectedPeriod(selectedPeriod); // trigger no-op
+            aiEngine.invalidateAiInsights();
+            setRefreshCount(n => n + 1);
           }}>
             <Ionicons name="refresh-outline" size={20} color="white" />
           </TouchableOpacity>
@@ -701,7 +722,47 @@ export default function AIInsights() {
         ))}
       </View>
 
-      {/* Recommendations removed for streamlined UI */}
+      {/* AI Recommendations (filled in as the engine streams its stages) */}
+      <View style={styles.section}>
+        <View style={styles.sectionHeader}>
+          <Text style={styles.sectionTitle}>AI Recommendations</Text>
+          {loading ? <Text style={styles.viewAllText}>Analyzing…</Text> : null}
+        </View>
+        {compatibilityTop.slice(0, 5).map((pair, idx) => (
+          <GradientCard key={`pair-${idx}`} variant="minimal" padding="medium" style={styles.recommendationCard}>
+            <View style={styles.recommendationHeader}>
+              <View style={styles.recommendationContent}>
+                <Text style={styles.recommendationTitle}>{pair.client?.name} → {pair.venue?.name}</Text>
+                <Text style={styles.recommendationDescription}>{(pair.rationale || []).slice(0, 2).join(' · ') || 'Compatibility match'}</Text>
+              </View>
+              <View style={styles.pill}>
+                <Text style={styles.pillText}>{Number(pair.score || 0).toFixed(2)}</Text>
+              </View>
+            </View>
+          </GradientCard>
+        ))}
+        {schedule.slice(0, 5).map((item, idx) => (
+          <GradientCard key={`schedule-${idx}`} variant="minimal" padding="medium" style={styles.recommendationCard}>
+            <Text style={styles.recommendationDescription}>{item.text}</Text>
+          </GradientCard>
+        ))}
+        {actions.slice(0, 5).map((item, idx) => (
+          <GradientCard key={`action-${idx}`} variant="minimal" padding="medium" style={styles.recommendationCard}>
+            <View style={styles.recommendationHeader}>
+              <View style={styles.recommendationContent}>
+                <Text style={styles.recommendationTitle}>{item.title}</Text>
+                <Text style={styles.recommendationDescription}>{item.description}</Text>
+              </View>
+              <View style={[styles.priorityBadge, item.priority === 'high' ? styles.priorityHigh : styles.priorityMedium]}>
+                <Text style={styles.priorityText}>{String(item.priority || '').toUpperCase()}</Text>
+              </View>
+            </View>
+          </GradientCard>
+        ))}
+        {!loading && !compatibilityTop.length && !schedule.length && !actions.length ? (
+          <Text style={styles.insightText}>Add clients, venues and shifts to get recommendations.</Text>
+        ) : null}
+      </View>
 
       {/* Performance Trend (Line) */}
       <View style={styles.section}>
@@ -1,26 +1,59 @@
-import React from 'react';
+import React, { useCallback, useEffect, useState } from 'react';
 import { View, Text, StyleSheet, ScrollView, TouchableOpacity } from 'react-native';
 import { LinearGradient } from 'expo-linear-gradient';
 import { Ionicons } from '@expo/vector-icons';
 import { GradientCard, GradientButton } from '../components/UI';
 import { Colors } from '../constants/Colors';
 import { formatCurrency } from '../utils/formatters';
+import { openDb, getEarningsRollup, getAllVenues, getTopEarningOutfits } from '../lib/db';
+
+const DAY_NAMES = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'];
+const TREND_WEEKS = 8;
 
 export default function AnalyticsScreen() {
-  const sampleKPIs = {
-    totalEarnings: 48250,
-    totalShifts: 128,
-    avgPerShift: 377.34,
-    bestDay: 'Sat',
-  };
-
-  const sampleTrends = [
-    { label: 'W1', value: 3200 },
-    { label: 'W2', value: 4100 },
-    { label: 'W3', value: 2800 },
-    { label: 'W4', value: 5200 },
-    { label: 'W5', value: 4500 },
-  ];
+  const [kpis, setKpis] = useState({ totalEarnings: 0, totalShifts: 0, avgPerShift: 0, bestDay: '—' });
+  const [trends, setTrends] = useState([]);
+  const [venueTotals, setVenueTotals] = useState([]);
+  const [topOutfits, setTopOutfits] = useState([]);
+
+  // Everything below reads the precomputed rollups: bucket counts, not record counts
+  const load = useCallback(async () => {
+    const db = openDb();
+    try {
+      const dow = await getEarningsRollup(db, { granularity: 'dow', days: null });
+      const totalEarnings = dow.reduce((sum, d) => sum + d.earnings, 0);
+      const totalShifts = dow.reduce((sum, d) => sum + d.shifts, 0);
+      const best = dow.reduce((acc, d) => {
+        const avg = d.shifts ? d.earnings / d.shifts : 0;
+        return avg > acc.avg ? { dow: d.dow, avg } : acc;
+      }, { dow: null, avg: 0 });
+      setKpis({
+        totalEarnings,
+        totalShifts,
+        avgPerShift: totalShifts ? totalEarnings / totalShifts : 0,
+        bestDay: best.dow == null ? '—' : DAY_NAMES[best.dow],
+      });
+
+      const weeks = await getEarningsRollup(db, { granularity: 'week', days: TREND_WEEKS * 7 - 1, fill: true });
+      setTrends(weeks.slice(-TREND_WEEKS).map(w => ({ label: w.key.slice(5).replace('-', '/'), value: w.earnings })));
+
+      const venues = await getAllVenues(db);
+      const perVenue = await Promise.all(venues.map(async v => {
+        const rows = await getEarningsRollup(db, { granularity: 'dow', days: null, venueId: v.id });
+        return { name: v.name || '—', value: rows.reduce((sum, d) => sum + d.earnings, 0) };
+      }));
+      setVenueTotals(perVenue.filter(v => v.value > 0).sort((a, b) => b.value - a.value).slice(0, 3));
+
+      const outfits = await getTopEarningOutfits(db, 3);
+      setTopOutfits(outfits.filter(o => (o.net || 0) > 0).map(o => ({ name: o.name || '—', value: o.net })));
+    } catch (e) {
+      console.warn('Analytics load failed', e);
+    }
+  }, []);
+
+  useEffect(() => { load(); }, [load]);
+
+  const maxTrend = Math.max(1, ...trends.map(t => t.value));
 
   return (
     <LinearGradient
@@ -40,7 +73,7 @@ export default function AnalyticsScreen() {
                 </View>
               </View>
               <View style={styles.headerActions}>
-                <TouchableOpacity style={styles.refreshButton} accessibilityRole="button" accessibilityLabel="Refresh analytics">
+                <TouchableOpacity style={styles.refreshButton} onPress={load} accessibilityRole="button" accessibilityLabel="Refresh analytics">
                   <Ionicons name="refresh" size={20} color={Colors.white} />
                 </TouchableOpacity>
               </View>
@@ -56,7 +89,7 @@ export default function AnalyticsScreen() {
                 <Ionicons name="cash" size={24} color={Colors.accent} />
               </View>
               <View style={styles.kpiText}>
-                <Text style={styles.kpiValue}>{formatCurrency(sampleKPIs.totalEarnings)}</Text>
+                <Text style={styles.kpiValue}>{formatCurrency(kpis.totalEarnings)}</Text>
                 <Text style={styles.kpiLabel}>Total Earnings</Text>
               </View>
             </View>
@@ -68,7 +101,7 @@ export default function AnalyticsScreen() {
                 <Ionicons name="calendar" size={24} color={Colors.secondary} />
               </View>
               <View style={styles.kpiText}>
-                <Text style={styles.kpiValue}>{sampleKPIs.totalShifts}</Text>
+                <Text style={styles.kpiValue}>{kpis.totalShifts}</Text>
                 <Text style={styles.kpiLabel}>Total Shifts</Text>
               </View>
             </View>
@@ -80,7 +113,7 @@ export default function AnalyticsScreen() {
                 <Ionicons name="trending-up" size={24} color={Colors.success} />
               </View>
               <View style={styles.kpiText}>
-                <Text style={styles.kpiValue}>{formatCurrency(sampleKPIs.avgPerShift)}</Text>
+                <Text style={styles.kpiValue}>{formatCurrency(kpis.avgPerShift)}</Text>
                 <Text style={styles.kpiLabel}>Avg per Shift</Text>
               </View>
             </View>
@@ -92,7 +125,7 @@ export default function AnalyticsScreen() {
                 <Ionicons name="sunny" size={24} color={Colors.warning} />
               </View>
               <View style={styles.kpiText}>
-                <Text style={styles.kpiValue}>{sampleKPIs.bestDay}</Text>
+                <Text style={styles.kpiValue}>{kpis.bestDay}</Text>
                 <Text style={styles.kpiLabel}>Best Day</Text>
               </View>
             </View>
@@ -106,9 +139,9 @@ export default function AnalyticsScreen() {
             <GradientButton title="Export" variant="secondary" size="small" onPress={() => {}} />
           </View>
           <View style={styles.trendChart}>
-            {sampleTrends.map((t, idx) => (
+            {trends.map((t, idx) => (
               <View key={idx} style={styles.trendBar}>
-                <View style={[styles.trendFill, { height: Math.min(120, Math.max(8, (t.value / 5200) * 120)) }]} />
+                <View style={[styles.trendFill, { height: Math.min(120, Math.max(8, (t.value / maxTrend) * 120)) }]} />
                 <Text style={styles.trendLabel}>{t.label}</Text>
               </View>
             ))}
@@ -120,10 +153,10 @@ export default function AnalyticsScreen() {
           <GradientCard variant="minimal" style={styles.breakdownCard}>
             <Text style={styles.breakdownTitle}>By Venue</Text>
             <View style={styles.breakdownList}>
-              {['Velvet Lounge', 'Neon Room', 'Crystal Palace'].map((v, i) => (
+              {venueTotals.map((v, i) => (
                 <View key={i} style={styles.breakdownRow}>
-                  <Text style={styles.breakdownName}>{v}</Text>
-                  <Text style={styles.breakdownValue}>{formatCurrency(5200 - i * 600)}</Text>
+                  <Text style={styles.breakdownName}>{v.name}</Text>
+                  <Text style={styles.breakdownValue}>{formatCurrency(v.value)}</Text>
                 </View>
               ))}
             </View>
@@ -132,10 +165,10 @@ export default function AnalyticsScreen() {
           <GradientCard variant="minimal" style={styles.breakdownCard}>
             <Text style={styles.breakdownTitle}>By Outfit</Text>
             <View style={styles.breakdownList}>
-              {['Midnight Sparkle', 'Rose Quartz', 'Onyx Flair'].map((v, i) => (
+              {topOutfits.map((v, i) => (
                 <View key={i} style={styles.breakdownRow}>
-                  <Text style={styles.breakdownName}>{v}</Text>
-                  <Text style={styles.breakdownValue}>{formatCurrency(4200 - i * 550)}</Text>
+                  <Text style={styles.breakdownName}>{v.name}</Text>
+                  <Text style={styles.breakdownValue}>{formatCurrency(v.value)}</Text>
                 </View>
               ))}
             </View>
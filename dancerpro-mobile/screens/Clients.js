@@ -2,11 +2,12 @@ import React, { useEffect, useState } from 'react';
 import { View, Text, StyleSheet, FlatList, Animated, Platform, ScrollView, TouchableOpacity, Dimensions } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
 import { LinearGradient } from 'expo-linear-gradient';
-import { openDb, getAllClients, insertClient, updateClient, deleteClient, getKpiSnapshot, getClientPerformance, getRecentShifts, getClientTransactions, insertTransaction } from '../lib/db';
+import { openDb, getAllClients, insertClient, updateClient, deleteClient, getKpiSnapshot, getClientPerformance, getRecentShifts, getClientTransactions, insertTransaction, searchClients } from '../lib/db';
 import { seedPerformanceForExistingClients } from '../lib/mockData';
 import { GradientButton, ModernInput, GradientCard, Toast } from '../components/UI';
 import { useNavigation } from '@react-navigation/native';
 import { formatCurrency, isValidE164, toE164, prettyPhone } from '../utils/formatters';
+import { useDebouncedValue } from '../utils/useDebouncedValue';
 import { secureGet, secureSet } from '../lib/secureStorage';
 import { Colors } from '../constants/Colors';
 import { buildApiEndpoint, fetchWithTimeout, getAuthToken } from '../lib/http';
@@ -34,6 +35,11 @@ export default function Clients({ route }) {
   const [notes, setNotes] = useState('');
   const [toast, setToast] = useState({ message: '', type: 'info', visible: false });
   const [canSeed, setCanSeed] = useState(false);
+
+  // Search: null results means "no query", show every client
+  const [search, setSearch] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
+  const debouncedSearch = useDebouncedValue(search.trim());
   
   // Transaction history state
   const [clientTransactions, setClientTransactions] = useState([]);
@@ -60,6 +66,22 @@ export default function Clients({ route }) {
     })();
   }, []);
 
+  // Re-run the search when the query settles or the client list changes. The empty query still goes
+  // through searchClients so the index is built before the first keystroke.
+  useEffect(() => {
+    let cancelled = false;
+    (async () => {
+      try {
+        const rows = await searchClients(openDb(), debouncedSearch, { limit: 0 });
+        if (!cancelled) setSearchResults(debouncedSearch ? rows : null);
+      } catch (e) {
+        console.warn('Client search failed', e);
+        if (!cancelled) setSearchResults(null);
+      }
+    })();
+    return () => { cancelled = true; };
+  }, [debouncedSearch, items]);
+
   // Load KPI snapshot to show client net totals (web/native)
   useEffect(() => {
     (async () => {
@@ -626,9 +648,19 @@ export default function Clients({ route }) {
         </LinearGradient>
       </View>
 
+      <View style={styles.searchContainer}>
+        <ModernInput
+          value={search}
+          onChangeText={setSearch}
+          placeholder="Search clients by name, phone, tag or note"
+          autoCorrect={false}
+          autoCapitalize="none"
+        />
+      </View>
+
       {/* Client List */}
       <FlatList
-        data={items}
+        data={searchResults ?? items}
         keyExtractor={(item) => item.id}
         contentContainerStyle={styles.listContainer}
         showsVerticalScrollIndicator={false}
@@ -650,8 +682,8 @@ export default function Clients({ route }) {
           <GradientCard variant="minimal" style={styles.emptyCard}>
             <View style={styles.emptyState}>
               <Ionicons name="people-outline" size={64} color={Colors.textMuted} />
-              <Text style={styles.emptyTitle}>No Clients Yet</Text>
-              <Text style={styles.emptySubtitle}>Add your first client to start tracking relationships and earnings</Text>
+              <Text style={styles.emptyTitle}>{searchResults ? 'No Matching Clients' : 'No Clients Yet'}</Text>
+              <Text style={styles.emptySubtitle}>{searchResults ? `Nothing matches "${debouncedSearch}"` : 'Add your first client to start tracking relationships and earnings'}</Text>
               <GradientButton
                 title="Add Your First Client"
                 variant="primary"
@@ -1223,6 +1255,10 @@ const styles = StyleSheet.create({
   addButton: {
     minWidth: 100,
   },
+  searchContainer: {
+    paddingHorizontal: Colors.spacing.lg,
+    paddingBottom: Colors.spacing.md,
+  },
   listContainer: {
     paddingHorizontal: Colors.spacing.lg,
     paddingBottom: Colors.spacing.xl,
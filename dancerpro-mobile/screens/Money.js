@@ -2,13 +2,15 @@ import React, { useEffect, useState, useMemo, useRef } from 'react';
 import { View, Text, StyleSheet, FlatList, TextInput, TouchableOpacity, Animated, Platform, ScrollView, Dimensions } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
 import { LinearGradient } from 'expo-linear-gradient';
-import { openDb, getRecentTransactions, computeTransactionTotals, insertTransaction, getShiftsWithVenues, deleteTransaction, getAllClients, getAllOutfits, getAllVenues, getKpiSnapshot } from '../lib/db';
+import { openDb, batch, queryTransactions, summarizeTransactions, getTransactionFacetCounts, insertTransaction, getShiftsWithVenues, deleteTransaction, getAllClients, getAllOutfits, getAllVenues, getKpiSnapshot } from '../lib/db';
 import { GradientCard, GradientButton, ModernInput, Toast, Segmented, Button, Input } from '../components/UI';
 import { formatCurrency } from '../utils/formatters';
+import { useDebouncedValue } from '../utils/useDebouncedValue';
 import { Colors } from '../constants/Colors';
 import { clients as sampleClients } from '../data/sampleData';
 
 const { width } = Dimensions.get('window');
+const PAGE_SIZE = 40;
 
 export default function Money({ route }) {
   const [items, setItems] = useState([]);
@@ -38,10 +40,34 @@ export default function Money({ route }) {
   const [toDate, setToDate] = useState('');
   const [filterCategory, setFilterCategory] = useState('');
   const [filterClientId, setFilterClientId] = useState('');
+  const [searchText, setSearchText] = useState('');
+  const [filterTxType, setFilterTxType] = useState('');
+  // Per-chip counts for the current filters (getTransactionFacetCounts); null without a db
+  const [facetCounts, setFacetCounts] = useState(null);
+  const debouncedSearch = useDebouncedValue(searchText.trim());
   const [toast, setToast] = useState({ message: '', type: 'info', visible: false });
   const [recentCats, setRecentCats] = useState([]);
   const [lastAdded, setLastAdded] = useState(null);
+  // DB-backed list: pages of the filtered query, plus summaries of the window and of the filters
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [windowSummary, setWindowSummary] = useState(null);
+  const [listSummary, setListSummary] = useState(null);
+  const [dataVersion, setDataVersion] = useState(0);
+  const listGeneration = useRef(0);
+  const queryFilters = useMemo(() => ({
+    days: txDays === 'all' ? null : txDays,
+    type: filterTxType || undefined,
+    from: fromDate || undefined,
+    to: toDate || undefined,
+    category: filterCategory || undefined,
+    clientId: filterClientId || undefined,
+    venueId: filterVenueId || undefined,
+    search: debouncedSearch || undefined,
+  }), [txDays, filterTxType, fromDate, toDate, filterCategory, filterClientId, filterVenueId, debouncedSearch]);
+  const querySort = useMemo(() => ({ field: 'amount', direction: sortAsc ? 'asc' : 'desc' }), [sortAsc]);
   const categoryTotals = useMemo(() => {
+    if (listSummary) return listSummary.byCategory;
     try {
       const map = new Map();
       const filtered = applyFilters(items);
@@ -63,11 +89,12 @@ export default function Money({ route }) {
     } catch {
       return [];
     }
-  }, [items, fromDate, toDate, filterCategory]);
+  }, [items, fromDate, toDate, filterTxType, filterCategory, debouncedSearch, listSummary]);
   const allCategories = useMemo(() => {
+    if (windowSummary) return windowSummary.categories;
     const set = new Set((items || []).map(i => (i.category || '').trim()).filter(Boolean));
     return Array.from(set);
-  }, [items]);
+  }, [items, windowSummary]);
   const suggestions = useMemo(() => {
     const s = new Set([...(allCategories || []), ...(recentCats || [])]);
     return Array.from(s);
@@ -121,13 +148,15 @@ export default function Money({ route }) {
   // Type-aware suggestions: defaults + categories from same-type history + recent picks
   const typeSuggestions = useMemo(() => {
     const base = type === 'income' ? incomeDefaults : expenseDefaults;
-    const fromHistory = Array.from(new Set((items || [])
-      .filter(i => i.type === type)
-      .map(i => (i.category || '').trim())
-      .filter(Boolean)));
+    const fromHistory = windowSummary
+      ? (windowSummary.categoriesByType[type] || [])
+      : Array.from(new Set((items || [])
+        .filter(i => i.type === type)
+        .map(i => (i.category || '').trim())
+        .filter(Boolean)));
     const s = new Set([...(base || []), ...(fromHistory || []), ...(recentCats || [])]);
     return Array.from(s);
-  }, [type, items, recentCats, incomeDefaults, expenseDefaults]);
+  }, [type, items, windowSummary, recentCats, incomeDefaults, expenseDefaults]);
 
   // Set sensible default when switching type
   useEffect(() => {
@@ -139,11 +168,6 @@ export default function Money({ route }) {
     if (!db) return; // web fallback uses sample data
     (async () => {
       try {
-        const daysValue = txDays === 'all' ? 50000 : txDays;
-        const rows = await getRecentTransactions(db, daysValue);
-        setItems(rows);
-        setTotals(computeTransactionTotals(rows));
-
         const shiftsWithVenues = await getShiftsWithVenues(db);
         setShiftOptions(shiftsWithVenues);
 
@@ -162,7 +186,79 @@ export default function Money({ route }) {
         console.warn('Money DB load failed, using sample data', e);
       }
     })();
-  }, [txDays]);
+  }, [txDays, dataVersion]);
+
+  // First page of the filtered list; later pages load as the list scrolls (loadMore)
+  useEffect(() => {
+    const db = openDb();
+    if (!db) return;
+    const generation = ++listGeneration.current;
+    (async () => {
+      try {
+        const page = await queryTransactions(db, { filters: queryFilters, sort: querySort, limit: PAGE_SIZE });
+        if (generation !== listGeneration.current) return;
+        setItems(page.items);
+        setNextCursor(page.nextCursor);
+        const summary = await summarizeTransactions(db, queryFilters);
+        if (generation !== listGeneration.current) return;
+        setListSummary(summary);
+        const counts = await getTransactionFacetCounts(db, queryFilters);
+        if (generation === listGeneration.current) setFacetCounts(counts);
+      } catch (e) {
+        console.warn('Money transaction query failed', e);
+      }
+    })();
+  }, [queryFilters, querySort, dataVersion]);
+
+  // Range totals and category suggestions (ignore the list filters)
+  useEffect(() => {
+    const db = openDb();
+    if (!db) return;
+    let cancelled = false;
+    (async () => {
+      try {
+        const summary = await summarizeTransactions(db, { days: txDays === 'all' ? null : txDays });
+        if (cancelled) return;
+        setWindowSummary(summary);
+        setTotals(summary.totals);
+      } catch (e) {
+        console.warn('Money totals failed', e);
+      }
+    })();
+    return () => { cancelled = true; };
+  }, [txDays, dataVersion]);
+
+  async function loadMore() {
+    const db = openDb();
+    if (!db || !nextCursor || loadingMore) return;
+    const generation = listGeneration.current;
+    setLoadingMore(true);
+    try {
+      const page = await queryTransactions(db, { filters: queryFilters, sort: querySort, cursor: nextCursor, limit: PAGE_SIZE });
+      if (generation !== listGeneration.current) return;
+      setItems(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (e) {
+      console.warn('Money load more failed', e);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  // Every matching row (not just the loaded pages) for export
+  async function exportFilteredCSV() {
+    const db = openDb();
+    if (!db) {
+      exportCSV(applyFilters(items));
+      return;
+    }
+    try {
+      const all = await queryTransactions(db, { filters: queryFilters, sort: querySort, limit: 0 });
+      exportCSV(all.items);
+    } catch (e) {
+      console.warn('Export CSV failed', e);
+    }
+  }
 
   // Persist selected Money range (web) and restore on mount
   useEffect(() => {
@@ -363,10 +459,7 @@ export default function Money({ route }) {
         const created = await insertTransaction(db, transactionData);
         
         // Refresh data after successful insertion
-        const daysValue = txDays === 'all' ? 50000 : txDays;
-        const rows = await getRecentTransactions(db, daysValue);
-        setItems(rows);
-        setTotals(computeTransactionTotals(rows));
+        setDataVersion(v => v + 1);
         setLastAdded(created);
         
         // Update recent categories
@@ -442,10 +535,7 @@ export default function Money({ route }) {
     try {
       if (db) {
         await deleteTransaction(db, lastAdded.id);
-        const daysValue = txDays === 'all' ? 50000 : txDays;
-        const rows = await getRecentTransactions(db, daysValue);
-        setItems(rows);
-        setTotals(computeTransactionTotals(rows));
+        setDataVersion(v => v + 1);
       } else {
         const next = items.filter(i => i.id !== lastAdded.id);
         setItems(next);
@@ -468,11 +558,16 @@ export default function Money({ route }) {
       const afterFrom = fromDate ? d >= fromDate : true;
       const beforeTo = toDate ? d <= toDate : true;
       const matchCat = filterCategory ? (item.category || '').toLowerCase().includes(filterCategory.toLowerCase()) : true;
+      const needle = debouncedSearch.toLowerCase();
+      const matchSearch = needle
+        ? [item.category, item.description, item.note].some(v => String(v || '').toLowerCase().includes(needle))
+        : true;
+      const matchType = filterTxType ? item.type === filterTxType : true;
       const matchClient = filterClientId ? item.clientId === filterClientId : true;
       const matchVenue = filterVenueId
         ? ((item.venueId && item.venueId === filterVenueId) || (item.shiftId && shiftVenueById.get(item.shiftId) === filterVenueId))
         : true;
-      return afterFrom && beforeTo && matchCat && matchClient && matchVenue;
+      return afterFrom && beforeTo && matchType && matchCat && matchSearch && matchClient && matchVenue;
     });
   }
 
@@ -566,19 +661,7 @@ export default function Money({ route }) {
               setLastAdded(transaction);
               setShowQuickForm(false);
               // Refresh data
-              const db = openDb();
-              if (db) {
-                (async () => {
-                  try {
-                    const daysValue = txDays === 'all' ? 50000 : txDays;
-                    const rows = await getRecentTransactions(db, daysValue);
-                    setItems(rows);
-                    setTotals(computeTransactionTotals(rows));
-                  } catch (e) {
-                    console.warn('Failed to refresh after quick add', e);
-                  }
-                })();
-              }
+              if (openDb()) setDataVersion(v => v + 1);
               setToast({ message: 'Transaction added successfully', type: 'success', visible: true });
               setTimeout(() => setToast({ message: '', type: 'info', visible: false }), 3000);
             }}
@@ -624,6 +707,19 @@ export default function Money({ route }) {
         <Input placeholder="From YYYY-MM-DD" value={fromDate} onChangeText={setFromDate} />
         <Input placeholder="To YYYY-MM-DD" value={toDate} onChangeText={setToDate} />
         <Input placeholder="Category contains" value={filterCategory} onChangeText={setFilterCategory} />
+        <Input placeholder="Search notes and categories" value={searchText} onChangeText={setSearchText} autoCorrect={false} autoCapitalize="none" />
+        <View style={{ flexDirection: 'row', flexWrap: 'wrap', gap: 6 }}>
+          {[['', 'All'], ['income', 'Income'], ['expense', 'Expense']].map(([value, label]) => {
+            const typeCounts = facetCounts?.type;
+            const n = !typeCounts ? null : value ? (typeCounts[value] || 0) : Object.values(typeCounts).reduce((a, c) => a + c, 0);
+            const active = filterTxType === value;
+            return (
+              <TouchableOpacity key={label} onPress={() => setFilterTxType(value)} style={[styles.filterChip, active && styles.filterChipActive]}>
+                <Text style={[styles.filterChipText, active && styles.filterChipTextActive]}>{n == null ? label : `${label} (${n})`}</Text>
+              </TouchableOpacity>
+            );
+          })}
+        </View>
         {filterClientId ? (
           <Button label={`Clear Client Filter (${clientsById.get(filterClientId)?.name || filterClientId})`} variant="ghost" onPress={() => setFilterClientId('')} />
         ) : null}
@@ -662,7 +758,7 @@ export default function Money({ route }) {
         ) : (
           <Button label="Filter by Venue" variant="ghost" onPress={() => setVenueFilterOpen(true)} />
         )}
-        <TouchableOpacity onPress={() => exportCSV(applyFilters(items))}>
+        <TouchableOpacity onPress={exportFilteredCSV}>
           <Text style={styles.exportBtn}>Export CSV</Text>
         </TouchableOpacity>
         <TouchableOpacity onPress={async () => {
@@ -715,7 +811,7 @@ export default function Money({ route }) {
                     }
                   } catch {}
                 }} style={styles.modalRow}>
-                  <Text style={styles.modalRowText}>{item.name || item.id}</Text>
+                  <Text style={styles.modalRowText}>{facetCounts ? `${item.name || item.id} (${facetCounts.venueId[item.id] || 0})` : (item.name || item.id)}</Text>
                 </TouchableOpacity>
               )}
               ListEmptyComponent={() => (
@@ -799,12 +895,21 @@ export default function Money({ route }) {
       ) : null}
       <FlatList
         data={(function() {
+          // DB pages arrive filtered and sorted; the local fallback filters and sorts here
+          if (openDb()) return items;
           const rows = applyFilters(items);
           const arr = [...rows];
           arr.sort((a, b) => (sortAsc ? (a.amount || 0) - (b.amount || 0) : (b.amount || 0) - (a.amount || 0)));
           return arr;
         })()}
         keyExtractor={(item) => item.id}
+        onEndReached={loadMore}
+        onEndReachedThreshold={0.5}
+        initialNumToRender={20}
+        maxToRenderPerBatch={20}
+        windowSize={7}
+        removeClippedSubviews
+        ListFooterComponent={loadingMore ? <Text style={styles.note}>Loading more…</Text> : null}
         ItemSeparatorComponent={() => <View style={styles.separator} />}
         renderItem={({ item }) => (
           <TransactionRow
@@ -1541,11 +1646,13 @@ function QuickTransactionForm({ onClose, onSuccess, venueOptions = [], clientOpt
         throw new Error('Database not available');
       }
 
-      // Insert all transactions
-      for (const tx of transactions) {
-        const { id, ...txData } = tx; // Remove temp id
-        await insertTransaction(db, txData);
-      }
+      // Insert all transactions (persisted together once the batch ends)
+      await batch(db, async () => {
+        for (const tx of transactions) {
+          const { id, ...txData } = tx; // Remove temp id
+          await insertTransaction(db, txData);
+        }
+      });
 
       onSuccess(transactions[transactions.length - 1]); // Pass last transaction for undo
     } catch (e) {
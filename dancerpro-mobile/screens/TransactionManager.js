@@ -1,14 +1,21 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
 import { View, Text, StyleSheet, ScrollView, FlatList, TouchableOpacity } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
-import { openDb, getRecentTransactions, computeTransactionTotals, insertTransaction, updateTransaction, deleteTransaction, getAllClients, getAllVenues, getAllOutfits } from '../lib/db';
+import { openDb, queryTransactions, summarizeTransactions, insertTransaction, updateTransaction, deleteTransaction, getAllClients, getAllVenues, getAllOutfits } from '../lib/db';
 import { GradientCard, GradientButton, ModernInput, Toast, Tag, Segmented } from '../components/UI';
 import { Colors } from '../constants/Colors';
 import { formatCurrency } from '../utils/formatters';
 
+const WINDOW_DAYS = 90;
+const PAGE_SIZE = 30;
+
 export default function TransactionManager() {
   const [transactions, setTransactions] = useState([]);
   const [totals, setTotals] = useState({ income: 0, expense: 0, net: 0 });
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Bumped on every reload so pages requested for an older list are dropped
+  const listGeneration = useRef(0);
 
   const [clients, setClients] = useState([]);
   const [venues, setVenues] = useState([]);
@@ -54,14 +61,35 @@ export default function TransactionManager() {
 
   async function loadData() {
     const db = openDb();
-    const tx = await getRecentTransactions(db, 90);
-    setTransactions(tx);
-    setTotals(computeTransactionTotals(tx));
+    const generation = ++listGeneration.current;
+    // First page only; the rest is fetched as the list scrolls
+    const page = await queryTransactions(db, { filters: { days: WINDOW_DAYS }, limit: PAGE_SIZE });
+    if (generation !== listGeneration.current) return;
+    setTransactions(page.items);
+    setNextCursor(page.nextCursor);
+    const summary = await summarizeTransactions(db, { days: WINDOW_DAYS });
+    if (generation === listGeneration.current) setTotals(summary.totals);
     setClients(await getAllClients(db));
     setVenues(await getAllVenues(db));
     setOutfits(await getAllOutfits(db));
   }
 
+  async function loadMore() {
+    if (!nextCursor || loadingMore) return;
+    const generation = listGeneration.current;
+    setLoadingMore(true);
+    try {
+      const page = await queryTransactions(openDb(), { filters: { days: WINDOW_DAYS }, cursor: nextCursor, limit: PAGE_SIZE });
+      if (generation !== listGeneration.current) return;
+      setTransactions(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      console.error('Load more error', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
   useEffect(() => { loadData(); }, []);
 
   function openForm(item) {
@@ -202,7 +230,7 @@ export default function TransactionManager() {
   );
 
   return (
-    <ScrollView style={styles.container}>
+    <View style={styles.container}>
       <GradientCard variant="glow" style={styles.summaryCard}>
         <View style={styles.summaryRow}>
           <View style={styles.summaryItem}>
@@ -228,7 +256,13 @@ export default function TransactionManager() {
           renderItem={renderTransactionItem}
           ItemSeparatorComponent={() => <View style={styles.separator} />}
           ListEmptyComponent={<Text style={styles.emptyText}>No transactions yet</Text>}
-          scrollEnabled={false}
+          ListFooterComponent={loadingMore ? <Text style={styles.emptyText}>Loading more…</Text> : null}
+          onEndReached={loadMore}
+          onEndReachedThreshold={0.5}
+          initialNumToRender={PAGE_SIZE}
+          maxToRenderPerBatch={PAGE_SIZE}
+          windowSize={7}
+          removeClippedSubviews
         />
       </GradientCard>
 
@@ -315,7 +349,7 @@ export default function TransactionManager() {
           </GradientCard>
         </View>
       )}
-    </ScrollView>
+    </View>
   );
 }
 
@@ -328,7 +362,7 @@ const styles = StyleSheet.create({
   summaryValue: { color: Colors.text, fontSize: Colors.typography.fontSize.lg, fontWeight: Colors.typography.fontWeight.semibold },
   addButton: { marginTop: Colors.spacing.sm },
 
-  listCard: { padding: Colors.spacing.sm },
+  listCard: { flex: 1, padding: Colors.spacing.sm },
   separator: { height: 1, backgroundColor: Colors.border },
   emptyText: { color: Colors.textMuted, textAlign: 'center', padding: Colors.spacing.md },
 
@@ -1,11 +1,12 @@
 import React, { useEffect, useState, useMemo, memo, useCallback } from 'react';
 import { View, Text, StyleSheet, FlatList, Animated, Platform, Alert, Dimensions, TouchableOpacity, ScrollView } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
-import { openDb, getAllVenues, insertVenue, updateVenue, deleteVenue, insertTransaction, getAllClients, getVenuePerformance, getVenueShifts, getShiftsWithVenues, getShiftTransactionTotals, insertShift, updateShift, deleteShift } from '../lib/db';
+import { openDb, getAllVenues, insertVenue, updateVenue, deleteVenue, insertTransaction, getAllClients, getVenuePerformance, getVenueShifts, getShiftsWithVenues, getShiftTransactionTotals, insertShift, updateShift, deleteShift, searchVenues } from '../lib/db';
 import { LinearGradient } from 'expo-linear-gradient';
 import { GradientButton, ModernInput, GradientCard, Toast } from '../components/UI';
 import DateTimePicker from '../components/DateTimePicker';
 import { formatCurrency } from '../utils/formatters';
+import { useDebouncedValue } from '../utils/useDebouncedValue';
 import { Colors } from '../constants/Colors';
 import { shifts as sampleShifts, venues as sampleVenues, clients as sampleClients } from '../data/sampleData';
 
@@ -43,6 +44,10 @@ export default function Venues() {
   const [shiftEndStr, setShiftEndStr] = useState(new Date(new Date().getTime() + 2 * 60 * 60 * 1000).toISOString());
   const [activeTab, setActiveTab] = useState('venues'); // 'venues' or 'shifts'
   const [clientOptions, setClientOptions] = useState([]);
+  // Venue search: null results means "no query", show every venue
+  const [search, setSearch] = useState('');
+  const [searchResults, setSearchResults] = useState(null);
+  const debouncedSearch = useDebouncedValue(search.trim());
   
   const clientsById = useMemo(() => {
     const map = new Map();
@@ -62,6 +67,21 @@ export default function Venues() {
     loadShifts();
   }, []);
 
+  // The empty query still goes through searchVenues so the index is built before the first keystroke
+  useEffect(() => {
+    let cancelled = false;
+    (async () => {
+      try {
+        const rows = await searchVenues(openDb(), debouncedSearch, { limit: 0 });
+        if (!cancelled) setSearchResults(debouncedSearch ? rows : null);
+      } catch (e) {
+        console.warn('Venue search failed', e);
+        if (!cancelled) setSearchResults(null);
+      }
+    })();
+    return () => { cancelled = true; };
+  }, [debouncedSearch, items]);
+
   // Load persisted venues on web
   useEffect(() => {
     if (typeof window !== 'undefined' && window.localStorage) {
@@ -119,17 +139,8 @@ export default function Venues() {
       const db = openDb();
       const rows = await getShiftsWithVenues(db);
       setShifts(rows);
-      // Load transaction totals for each shift
-      const totalsMap = new Map();
-      for (const shift of rows) {
-        try {
-          const totals = await getShiftTransactionTotals(db, shift.id);
-          totalsMap.set(shift.id, totals);
-        } catch (e) {
-          console.warn('Failed to load totals for shift', shift.id, e);
-        }
-      }
-      setTotalsByShift(totalsMap);
+      // Transaction totals for every shift, keyed by shift id
+      setTotalsByShift(await getShiftTransactionTotals(db));
     } catch (e) {
       console.warn('Shifts load failed', e);
     }
@@ -236,7 +247,8 @@ export default function Venues() {
       if (editId) {
         // Update existing venue
         if (db) {
-          await updateVenue(db, editId, {
+          await updateVenue(db, {
+            id: editId,
             name: name.trim(),
             location: location.trim(),
             avgEarnings: earnings
@@ -631,7 +643,7 @@ export default function Venues() {
       const db = openDb();
       if (db) {
         if (editingShift) {
-          await updateShift(db, editingShift.id, shiftData);
+          await updateShift(db, { id: editingShift.id, ...shiftData });
         } else {
           await insertShift(db, shiftData);
         }
@@ -836,8 +848,17 @@ export default function Venues() {
                 </View>
               )}
 
+              <ModernInput
+                value={search}
+                onChangeText={setSearch}
+                placeholder="Search venues by name or location"
+                autoCorrect={false}
+                autoCapitalize="none"
+                style={styles.input}
+              />
+
               <FlatList
-                data={items}
+                data={searchResults ?? items}
                 keyExtractor={(item) => item.id.toString()}
                 renderItem={renderVenueItem}
                 style={styles.list}
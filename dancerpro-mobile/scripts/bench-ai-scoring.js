@@ -0,0 +1,120 @@
+// Client x venue compatibility scoring (lib/aiScoring.js) at 500 clients x 200 venues x 100k shifts.
+// Usage: node scripts/bench-ai-scoring.js [--clients 500] [--venues 200] [--shifts 100000] [--sample 10]
+// "precompute" is the one computeAggregates pass; "matrix" scores every pair; "top 3" picks each
+// client's best venues with the bounded heap and builds their rationale. "per-pair" is the previous
+// approach (each pair looks up client and venue performance by scanning that client's and venue's
+// shifts, builds its rationale, then every row is sorted); it runs for --sample clients and is
+// extrapolated to all of them.
+
+function argNumber(name, fallback) {
+  const idx = process.argv.indexOf(`--${name}`);
+  const value = idx === -1 ? NaN : Number(process.argv[idx + 1]);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const CLIENTS = argNumber('clients', 500);
+const VENUES = argNumber('venues', 200);
+const SHIFTS = argNumber('shifts', 100000);
+const SAMPLE = Math.min(argNumber('sample', 10), CLIENTS);
+const DAY_MS = 24 * 60 * 60 * 1000;
+const WEIGHTS = {
+  base_client_venue_weight: 0.35,
+  base_venue_avg_weight: 0.20,
+  base_dow_weight: 0.15,
+  tag_weight: 0.15,
+  city_match_weight: 0.10,
+  capacity_weight: 0.10,
+  event_weight: 0.15,
+};
+
+function makeData() {
+  let seed = 42;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const cities = ['Atlanta', 'Miami', 'Houston', 'Las Vegas', 'Dallas'];
+  const tags = ['vip', 'regular', 'late', 'bottle', 'stage'];
+  const now = Date.now();
+  const venues = Array.from({ length: VENUES }, (_, i) => ({
+    id: `v${i}`, name: `Club ${i}`, city: cities[i % cities.length], capacity: Math.floor(rand() * 500), tags: [tags[i % tags.length]],
+  }));
+  const clients = Array.from({ length: CLIENTS }, (_, i) => ({
+    id: `c${i}`, name: `Client ${i}`, city: cities[(i * 7) % cities.length], tags: i % 3 ? [tags[i % tags.length]] : [], notes: i % 5 ? '' : `regular at Club ${i % VENUES}`,
+  }));
+  const shifts = Array.from({ length: SHIFTS }, (_, i) => ({
+    id: `s${i}`,
+    clientId: `c${Math.floor(rand() * CLIENTS)}`,
+    venueId: `v${Math.floor(rand() * VENUES)}`,
+    earnings: Math.round(rand() * 900),
+    notes: i % 997 ? '' : 'event night',
+    start: new Date(now - Math.floor(rand() * 365 * DAY_MS)).toISOString(),
+  }));
+  return { clients, venues, shifts, now };
+}
+
+function ms(start) {
+  return Number(process.hrtime.bigint() - start) / 1e6;
+}
+
+async function main() {
+  const { computeAggregates, scoreMatrix, topVenues, explainPair, adjacentDowScore } = await import('../lib/aiScoring.js');
+  const { clients, venues, shifts, now } = makeData();
+  console.log(`AI scoring: ${CLIENTS} clients x ${VENUES} venues x ${SHIFTS} shifts`);
+
+  let start = process.hrtime.bigint();
+  const aggregates = computeAggregates({ shifts, venues }, { periodDays: 120, now });
+  const precomputeMs = ms(start);
+
+  start = process.hrtime.bigint();
+  const matrix = scoreMatrix(clients, venues, aggregates, WEIGHTS);
+  const matrixMs = ms(start);
+
+  start = process.hrtime.bigint();
+  clients.forEach((client, i) => topVenues(matrix, i, 3).forEach(j => explainPair(client, venues[j], aggregates, WEIGHTS)));
+  const topMs = ms(start);
+
+  // Previous approach, on a sample of clients
+  const byClient = new Map();
+  const byVenue = new Map();
+  shifts.forEach(s => {
+    if (!byClient.has(s.clientId)) byClient.set(s.clientId, []);
+    byClient.get(s.clientId).push(s);
+    if (!byVenue.has(s.venueId)) byVenue.set(s.venueId, []);
+    byVenue.get(s.venueId).push(s);
+  });
+  const scanBestDay = list => {
+    const totals = new Float64Array(7); const counts = new Int32Array(7);
+    list.forEach(s => {
+      const t = new Date(s.start).getTime();
+      if (t < now - 120 * DAY_MS || t > now) return;
+      const dow = new Date(t).getDay();
+      totals[dow] += Number(s.earnings || 0); counts[dow] += 1;
+    });
+    let best = null; let bestAvg = 0;
+    for (let d = 0; d < 7; d++) { const avg = counts[d] ? totals[d] / counts[d] : 0; if (avg > bestAvg) { bestAvg = avg; best = d; } }
+    return best;
+  };
+  start = process.hrtime.bigint();
+  for (const client of clients.slice(0, SAMPLE)) {
+    const rows = venues.map(venue => {
+      const pair = explainPair(client, venue, aggregates, WEIGHTS);
+      adjacentDowScore(scanBestDay(byClient.get(client.id) || []), scanBestDay(byVenue.get(venue.id) || []));
+      return pair;
+    });
+    rows.sort((a, b) => b.score - a.score).slice(0, 3);
+  }
+  const perPairMs = ms(start) * (CLIENTS / SAMPLE);
+
+  const total = precomputeMs + matrixMs + topMs;
+  console.table([{
+    'precompute ms': precomputeMs.toFixed(1),
+    'matrix ms': matrixMs.toFixed(1),
+    'top 3 ms': topMs.toFixed(1),
+    'total ms': total.toFixed(1),
+    'per-pair ms (extrapolated)': perPairMs.toFixed(0),
+    speedup: `${(perPairMs / total).toFixed(0)}x`,
+  }]);
+}
+
+main().catch(e => {
+  console.error(e);
+  process.exitCode = 1;
+});
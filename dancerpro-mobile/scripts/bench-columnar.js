@@ -0,0 +1,115 @@
+// Money aggregations over transaction objects versus the columnar tables in lib/columnar.js.
+// Usage: node scripts/bench-columnar.js [--sizes 100000,1000000] [--runs 5]
+// "objects" is the per-record walk lib/db.js used before (Number(r.amount || 0) and type string
+// compares on every row). "columnar" is the same aggregation over the typed-array view that
+// lib/db.js keeps for the transactions collection. "build" is the one-off encode when the view is
+// first used; "write" is the cost of patching it for one update (remove + add).
+
+function argList(name, fallback) {
+  const idx = process.argv.indexOf(`--${name}`);
+  if (idx === -1) return fallback;
+  const values = String(process.argv[idx + 1] || '').split(',').map(Number).filter(n => Number.isFinite(n) && n > 0);
+  return values.length ? values : fallback;
+}
+
+const SIZES = argList('sizes', [100000, 1000000]);
+const RUNS = argList('runs', [5])[0];
+
+function makeTransactions(count) {
+  const base = Date.UTC(2024, 0, 1);
+  return Array.from({ length: count }, (_, i) => ({
+    id: `tx_${i}`,
+    type: i % 3 ? 'income' : 'expense',
+    amount: String((i % 400) + 0.5),
+    shiftId: i % 4 ? `s_${Math.floor(i / 20)}` : null,
+    clientId: `c_${i % 50}`,
+    date: new Date(base + i * 60000).toISOString(),
+  }));
+}
+
+function objectTotals(rows) {
+  return rows.reduce((acc, r) => {
+    const amt = Number(r.amount || 0);
+    if (r.type === 'income') acc.income += amt;
+    else if (r.type === 'expense') acc.expense += amt;
+    return acc;
+  }, { income: 0, expense: 0 });
+}
+
+function objectShiftTotals(rows) {
+  const map = new Map();
+  rows.forEach(t => {
+    const id = t.shiftId || null;
+    if (!id) return;
+    const prev = map.get(id) || { income: 0, expense: 0 };
+    const amt = Number(t.amount || 0);
+    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
+    map.set(id, prev);
+  });
+  return map;
+}
+
+function timeMs(fn) {
+  const samples = [];
+  let result;
+  for (let i = 0; i < RUNS; i++) {
+    const start = process.hrtime.bigint();
+    result = fn();
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  return { ms: samples[Math.floor(samples.length / 2)], result };
+}
+
+async function main() {
+  const { createColumnarView, incomeExpenseTotals } = await import('../lib/columnar.js');
+  const schema = {
+    amount: { kind: 'number', get: t => Number(t.amount || 0) },
+    type: { kind: 'dict', get: t => t.type },
+    shiftId: { kind: 'dict', get: t => t.shiftId },
+  };
+  console.log(`Transaction aggregation: sizes ${SIZES.join(', ')}, median of ${RUNS} runs`);
+  const rows = [];
+  for (const size of SIZES) {
+    const tx = makeTransactions(size);
+    const view = createColumnarView(schema);
+    const build = timeMs(() => view.build(tx));
+    const writeSamples = timeMs(() => {
+      const start = process.hrtime.bigint();
+      for (let i = 0; i < 1000; i++) {
+        const prev = tx[i];
+        const next = { ...prev, amount: prev.amount };
+        view.remove(prev);
+        view.add(next);
+        tx[i] = next;
+      }
+      return Number(process.hrtime.bigint() - start) / 1e6 / 1000;
+    });
+    const table = view.table();
+
+    const objTotals = timeMs(() => objectTotals(tx));
+    const colTotals = timeMs(() => incomeExpenseTotals(table));
+    if (Math.abs(objTotals.result.income - colTotals.result.income) > 1e-6) throw new Error('totals mismatch');
+    const objByShift = timeMs(() => objectShiftTotals(tx));
+    const colByShift = timeMs(() => incomeExpenseTotals(table, { groupBy: 'shiftId' }));
+    if (objByShift.result.size !== colByShift.result.values.length) throw new Error('shift totals mismatch');
+
+    rows.push({
+      size,
+      'build ms': build.ms.toFixed(2),
+      'write us': (writeSamples.result * 1000).toFixed(2),
+      'totals objects ms': objTotals.ms.toFixed(2),
+      'totals columnar ms': colTotals.ms.toFixed(2),
+      'totals speedup': `${(objTotals.ms / colTotals.ms).toFixed(1)}x`,
+      'by shift objects ms': objByShift.ms.toFixed(2),
+      'by shift columnar ms': colByShift.ms.toFixed(2),
+      'by shift speedup': `${(objByShift.ms / colByShift.ms).toFixed(1)}x`,
+    });
+  }
+  console.table(rows);
+}
+
+main().catch(e => {
+  console.error(e);
+  process.exitCode = 1;
+});
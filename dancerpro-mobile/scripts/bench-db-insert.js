@@ -0,0 +1,106 @@
+// Insert latency of lib/db.js versus collection size, per storage driver.
+// Usage: node scripts/bench-db-insert.js [--sizes 1000,10000,50000] [--ops 50]
+// The localStorage driver runs against an in-memory Storage shim (it still pays the full
+// JSON.stringify of the collection on every write). The IndexedDB driver needs an IndexedDB
+// implementation in Node: `npm install --no-save fake-indexeddb`; it is skipped otherwise.
+// Each sample is one insertTransaction() plus flushDb(), i.e. until the write is persisted.
+
+function argList(name, fallback) {
+  const idx = process.argv.indexOf(`--${name}`);
+  if (idx === -1) return fallback;
+  const values = String(process.argv[idx + 1] || '').split(',').map(Number).filter(n => Number.isFinite(n) && n > 0);
+  return values.length ? values : fallback;
+}
+
+const SIZES = argList('sizes', [1000, 10000, 50000]);
+const OPS = argList('ops', [50])[0];
+
+function installWindow() {
+  const data = new Map();
+  global.window = {
+    localStorage: {
+      getItem: k => (data.has(k) ? data.get(k) : null),
+      setItem: (k, v) => { data.set(k, String(v)); },
+      removeItem: k => { data.delete(k); },
+    },
+  };
+}
+
+function setUser(id) {
+  global.window.localStorage.setItem('userData', JSON.stringify({ id }));
+}
+
+function makeTransactions(count) {
+  const base = Date.UTC(2024, 0, 1);
+  return Array.from({ length: count }, (_, i) => ({
+    id: `tx_${i}`,
+    type: i % 3 ? 'income' : 'expense',
+    amount: String((i % 400) + 0.5),
+    clientId: `c_${i % 50}`,
+    venueId: `v_${i % 20}`,
+    date: new Date(base + i * 3600000).toISOString(),
+    notes: 'bench',
+  }));
+}
+
+async function measure(db, size) {
+  await db.importAllDataSnapshot(null, { transactions: makeTransactions(size) });
+  await db.flushDb();
+  const samples = [];
+  for (let i = 0; i < OPS; i++) {
+    const start = process.hrtime.bigint();
+    await db.insertTransaction(null, { id: `bench_${size}_${i}`, type: 'income', amount: '10', date: new Date().toISOString() });
+    await db.flushDb();
+    samples.push(Number(process.hrtime.bigint() - start) / 1e6);
+  }
+  samples.sort((a, b) => a - b);
+  const mean = samples.reduce((a, b) => a + b, 0) / samples.length;
+  return {
+    size,
+    ops: OPS,
+    meanMs: mean.toFixed(3),
+    p50Ms: samples[Math.floor(samples.length * 0.5)].toFixed(3),
+    p95Ms: samples[Math.floor(samples.length * 0.95)].toFixed(3),
+  };
+}
+
+async function main() {
+  installWindow();
+  const fakeIndexedDb = (() => {
+    try {
+      return require('fake-indexeddb');
+    } catch {
+      return null;
+    }
+  })();
+  const db = await import('../lib/db.js');
+  console.log(`Insert latency: sizes ${SIZES.join(', ')}, ${OPS} inserts per size`);
+
+  const drivers = [
+    ['localStorage', () => { delete global.indexedDB; }],
+    ['indexeddb', () => {
+      if (!fakeIndexedDb) throw new Error('fake-indexeddb is not installed');
+      global.indexedDB = fakeIndexedDb.indexedDB;
+    }],
+  ];
+  for (const [name, install] of drivers) {
+    try {
+      install();
+    } catch (e) {
+      console.warn(`Skipping ${name} driver: ${e.message}`);
+      continue;
+    }
+    const rows = [];
+    for (const size of SIZES) {
+      setUser(`bench_${name}_${size}`);
+      rows.push(await measure(db, size));
+    }
+    console.log(`\n[${name}]`);
+    console.table(rows);
+  }
+}
+
+main().catch(e => {
+  console.error(e);
+  process.exitCode = 1;
+});
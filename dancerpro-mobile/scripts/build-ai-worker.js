@@ -0,0 +1,65 @@
+// Generates public/ai-worker.js, the Web Worker that runs AI insights off the UI thread on web
+// (see lib/aiWorker.js). Metro cannot bundle worker entry points, so the lib modules the worker
+// needs are concatenated here, each wrapped in its own function scope, with their relative
+// imports and exports rewired. The output is committed; rerun after changing any of them:
+//
+//   npm run build:ai-worker          # write public/ai-worker.js
+//   node scripts/build-ai-worker.js --check   # exit 1 if it is out of date
+const fs = require('fs');
+const path = require('path');
+
+const libDir = path.join(__dirname, '..', 'lib');
+const outFile = path.join(__dirname, '..', 'public', 'ai-worker.js');
+const ENTRY = 'aiWorker.js';
+
+const IMPORT_RE = /^import\s*\{([^}]*)\}\s*from\s*'\.\/([\w.]+)';\s*$/gm;
+const EXPORT_RE = /^export\s+(?:const|let|function\*?|class)\s*([\w$]+)/gm;
+
+const scopeName = file => `__${path.basename(file, '.js')}`;
+
+// Modules in dependency order (imports first)
+function collect(file, seen = new Set(), order = []) {
+  if (seen.has(file)) return order;
+  seen.add(file);
+  const source = fs.readFileSync(path.join(libDir, file), 'utf8');
+  for (const [, , dep] of source.matchAll(IMPORT_RE)) collect(dep, seen, order);
+  order.push({ file, source });
+  return order;
+}
+
+function wrap({ file, source }) {
+  if (/^import\s/m.test(source.replace(IMPORT_RE, ''))) {
+    throw new Error(`${file}: only named relative imports ("import { a } from './x.js'") are supported`);
+  }
+  if (/^export\s+(default|\{)/m.test(source)) {
+    throw new Error(`${file}: only "export const|let|function|class" declarations are supported`);
+  }
+  const names = Array.from(source.matchAll(EXPORT_RE), m => m[1]);
+  const body = source
+    .replace(IMPORT_RE, (_, list, dep) => `const {${list}} = ${scopeName(dep)};`)
+    .replace(/^export\s+/gm, '')
+    .trimEnd();
+  return `// ---- lib/${file} ----\nconst ${scopeName(file)} = (() => {\n${body}\n\nreturn { ${names.join(', ')} };\n})();\n`;
+}
+
+function buildWorkerSource() {
+  const modules = collect(ENTRY).map(wrap).join('\n');
+  return `// Generated by scripts/build-ai-worker.js from lib/${ENTRY} and its imports. Do not edit.\n'use strict';\n\n${modules}\n${scopeName(ENTRY)}.serveInsights(self);\n`;
+}
+
+if (require.main === module) {
+  const source = buildWorkerSource();
+  if (process.argv.includes('--check')) {
+    const current = fs.existsSync(outFile) ? fs.readFileSync(outFile, 'utf8') : '';
+    if (current !== source) {
+      console.error('public/ai-worker.js is out of date; run npm run build:ai-worker');
+      process.exit(1);
+    }
+    console.log('public/ai-worker.js is up to date');
+  } else {
+    fs.writeFileSync(outFile, source);
+    console.log(`Wrote ${path.relative(process.cwd(), outFile)}`);
+  }
+}
+
+module.exports = { buildWorkerSource, outFile };
@@ -0,0 +1,23 @@
+// In-memory window.localStorage for specs that load lib/ modules in Node. lib/recordStore.js then
+// uses its localStorage fallback and reads the signed-in user from the `userData` entry.
+
+/**
+ * Replace global.window with one holding an empty localStorage, signed in as `userId`.
+ * @param {string} userId
+ * @param {{ onSetItem?: (key: string) => void }} [options] called on every setItem
+ * @returns {Map<string, string>} the backing store
+ */
+function installLocalStorage(userId, { onSetItem } = {}) {
+  const store = new Map();
+  global.window = {
+    localStorage: {
+      getItem: k => (store.has(k) ? store.get(k) : null),
+      setItem: (k, v) => { if (onSetItem) onSetItem(k); store.set(k, String(v)); },
+      removeItem: k => { store.delete(k); },
+    },
+  };
+  store.set('userData', JSON.stringify({ id: userId }));
+  return store;
+}
+
+module.exports = { installLocalStorage };
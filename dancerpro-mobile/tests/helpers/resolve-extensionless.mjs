@@ -0,0 +1,10 @@
+// Module resolve hook for Node specs: lets lib/ modules import siblings without the `.js` extension
+// ('./db'), as Metro does in the app. Registered with module.register() before importing them.
+export async function resolve(specifier, context, nextResolve) {
+  if (/^\.\.?\//.test(specifier) && !/\.[cm]?js(on)?$/.test(specifier)) {
+    try {
+      return await nextResolve(`${specifier}.js`, context);
+    } catch {}
+  }
+  return nextResolve(specifier, context);
+}
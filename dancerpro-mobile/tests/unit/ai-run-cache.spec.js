@@ -0,0 +1,67 @@
+const { test, expect } = require('@playwright/test');
+const { register } = require('module');
+const { pathToFileURL } = require('url');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Memoized AI insights runs in lib/aiEngine.js, with the cloud snapshot cached by an earlier
+// session and a stand-in for GET /api/sync/import.
+
+const USER_ID = 'ai-cache-user';
+
+// lib/config.js reads window.location; lib/http.js reads the token from the global localStorage
+function installWindow() {
+  const store = installLocalStorage(USER_ID);
+  global.window.location = { search: '', hostname: 'localhost', origin: 'http://localhost:8081' };
+  global.localStorage = global.window.localStorage;
+  store.set('authToken', 'token');
+}
+
+// Serves `current` with ETag `"v<n>"`; answers 304 when the caller already has it
+function fakeServer(initial) {
+  const server = { current: initial, version: 1, requests: [] };
+  server.fetch = async (url, { headers }) => {
+    server.requests.push(headers['If-None-Match'] || null);
+    const tag = `"v${server.version}"`;
+    if (headers['If-None-Match'] === tag) return { status: 304, ok: false, headers: { get: () => tag } };
+    const versions = Object.fromEntries(Object.keys(server.current).map(k => [k, `${server.version}`]));
+    const body = { snapshot: server.current, metadata: {}, versions };
+    return { status: 200, ok: true, json: async () => body, headers: { get: () => tag } };
+  };
+  return server;
+}
+
+test.describe('AI insights runs in lib/aiEngine.js', () => {
+  test('reopening in the same session reuses the run until the cloud snapshot changes', async () => {
+    installWindow();
+    process.env.EXPO_PUBLIC_BACKEND_URL = 'http://localhost:3001';
+    register('../helpers/resolve-extensionless.mjs', pathToFileURL(__filename));
+    const { writeDocument } = await import('../../lib/recordStore.js');
+    const db = await import('../../lib/db.js');
+    const ai = await import('../../lib/aiEngine.js');
+
+    const cloud = { clients: [{ id: 'c2', name: 'Cloud client' }] };
+    const server = fakeServer(cloud);
+    global.fetch = server.fetch;
+    // Cached by an earlier session
+    await writeDocument('cloudSnapshot', { etag: '"v1"', versions: { clients: '1' }, snapshot: cloud, metadata: {} });
+    await db.insertVenue(null, { id: 'v1', name: 'Club' });
+    await db.insertClient(null, { id: 'c1', name: 'Local client' });
+    await db.insertShift(null, { id: 's1', clientId: 'c1', venueId: 'v1', earnings: 300, start: new Date().toISOString() });
+
+    const first = await ai.buildAiInsights(90);
+    expect(first.assignments.map(a => a.client.id).sort()).toEqual(['c1', 'c2']);
+    expect(await ai.buildAiInsights(90)).toBe(first);
+    expect(await ai.streamAiInsights(90).promise).toBe(first);
+    expect(server.requests).toEqual(['"v1"']);
+
+    // A newer snapshot seen on revalidation starts a new run, which is then reused in turn
+    server.current = { clients: [...cloud.clients, { id: 'c3', name: 'New cloud client' }] };
+    server.version += 1;
+    ai.invalidateAiInsights();
+    const second = await ai.buildAiInsights(90);
+    expect(second === first).toBe(false);
+    expect(second.assignments.map(a => a.client.id).sort()).toEqual(['c1', 'c2', 'c3']);
+    expect(await ai.buildAiInsights(90)).toBe(second);
+    expect(server.requests).toEqual(['"v1"', '"v1"']);
+  });
+});
@@ -0,0 +1,116 @@
+const { test, expect } = require('@playwright/test');
+
+// Precomputed tables + score matrix in lib/aiScoring.js: rankings must match the per-pair scoring
+// lib/aiEngine.js did before (every pair scored on its own, with client and venue performance
+// scanned from the shifts, then a full sort).
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const WEIGHTS = {
+  base_client_venue_weight: 0.35,
+  base_venue_avg_weight: 0.20,
+  base_dow_weight: 0.15,
+  tag_weight: 0.15,
+  city_match_weight: 0.10,
+  capacity_weight: 0.10,
+  event_weight: 0.15,
+};
+
+const includes = (h, n) => !!h && !!n && String(h).toLowerCase().includes(String(n).toLowerCase());
+const norm = (v, m) => (m > 0 ? Math.min(1, Math.max(0, Number(v || 0)) / m) : 0);
+const dowScore = (a, b) => { if (a == null || b == null) return 0; const d = Math.abs(a - b); return d === 0 ? 1 : (d === 1 || d === 6) ? 0.6 : 0.25; };
+
+function scanPerformance(shifts, field, id, days, now) {
+  const byDow = Array.from({ length: 7 }, () => ({ total: 0, count: 0 }));
+  let count = 0;
+  shifts.forEach(s => {
+    const t = new Date(s.start).getTime();
+    if (s[field] !== id || t < now - days * DAY_MS || t > now) return;
+    count += 1;
+    byDow[new Date(t).getDay()].total += Number(s.earnings || 0);
+    byDow[new Date(t).getDay()].count += 1;
+  });
+  let bestDay = null; let best = 0;
+  byDow.forEach((v, dow) => { const avg = v.count ? v.total / v.count : 0; if (avg > best) { best = avg; bestDay = dow; } });
+  return { shiftCount: count, bestDay };
+}
+
+function referenceScore(client, venue, shifts, venues, days, now) {
+  const avgOf = list => (list.length ? list.reduce((a, s) => a + Number(s.earnings || 0), 0) / list.length : 0);
+  const placed = shifts.filter(s => s.venueId);
+  const maxAvg = groups => Math.max(0, ...Array.from(groups.values()).map(avgOf));
+  const group = key => placed.reduce((m, s) => { const k = key(s); if (k == null) return m; m.set(k, [...(m.get(k) || []), s]); return m; }, new Map());
+  const byVenue = group(s => s.venueId);
+  const byPair = group(s => (s.clientId ? `${s.clientId}|${s.venueId}` : null));
+  const cp = scanPerformance(shifts, 'clientId', client.id, days, now);
+  const vp = scanPerformance(shifts, 'venueId', venue.id, days, now);
+  const cTags = client.tags || []; const vTags = venue.tags || [];
+  let tag;
+  if (cTags.length && vTags.length) {
+    const v = new Set(vTags.map(t => t.toLowerCase()));
+    const c = new Set(cTags.map(t => t.toLowerCase()));
+    tag = Array.from(c).filter(t => v.has(t)).length / Math.max(1, Math.min(c.size, v.size));
+  } else {
+    tag = includes(client.notes, venue.name) || includes(client.notes, venue.location || venue.city || '') ? 1 : 0;
+  }
+  const cCity = client.city || client.location; const vCity = venue.city || venue.location;
+  const city = cCity && vCity ? (includes(cCity, vCity) || includes(vCity, cCity) ? 1 : 0) : vCity ? (includes(client.notes, vCity) ? 1 : 0) : 0;
+  const event = placed.some(s => s.venueId === venue.id && includes(s.notes, 'event')) ? 1 : 0;
+  const maxCap = Math.max(0, ...venues.map(v => Number(v.capacity || 0)));
+  const w = WEIGHTS;
+  return w.base_client_venue_weight * norm(avgOf(byPair.get(`${client.id}|${venue.id}`) || []), maxAvg(byPair))
+    + w.base_venue_avg_weight * norm(avgOf(byVenue.get(venue.id) || []), maxAvg(byVenue))
+    + w.base_dow_weight * dowScore(cp.bestDay, vp.bestDay)
+    + w.tag_weight * tag
+    + w.city_match_weight * city
+    + w.capacity_weight * norm(venue.capacity, maxCap)
+    + w.event_weight * event;
+}
+
+test.describe('AI compatibility scoring in lib/aiScoring.js', () => {
+  let seed = 5;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const pick = list => list[Math.floor(rand() * list.length)];
+  const now = Date.now();
+  const cities = ['Atlanta', 'Miami', 'Houston', null];
+  const tags = ['vip', 'regular', 'late', 'bottle'];
+  const venues = Array.from({ length: 15 }, (_, i) => ({
+    id: `v${i}`, name: `Club ${i}`, city: pick(cities), capacity: Math.floor(rand() * 400), tags: rand() < 0.5 ? [pick(tags), pick(tags)] : [],
+  }));
+  const clients = Array.from({ length: 25 }, (_, i) => ({
+    id: `c${i}`, name: `Client ${i}`, city: pick(cities), tags: rand() < 0.5 ? [pick(tags)] : [], notes: rand() < 0.3 ? `met at ${pick(venues).name}` : '',
+  }));
+  const shifts = Array.from({ length: 900 }, (_, i) => ({
+    id: `s${i}`,
+    clientId: rand() < 0.8 ? pick(clients).id : null,
+    venueId: rand() < 0.9 ? pick(venues).id : null,
+    earnings: Math.round(rand() * 800),
+    notes: rand() < 0.02 ? 'special event night' : '',
+    start: new Date(now - Math.floor(rand() * 200 * DAY_MS)).toISOString(),
+  }));
+
+  test('top venues and scores match per-pair scoring', async () => {
+    const { computeAggregates, rankAssignments, clientPerformance } = await import('../../lib/aiScoring.js');
+    const aggregates = computeAggregates({ shifts, venues }, { periodDays: 120, now });
+    const ranked = rankAssignments(clients, venues, aggregates, WEIGHTS, 3);
+    ranked.forEach(({ client, recommendations }) => {
+      const expected = venues
+        .map(venue => ({ venue, score: referenceScore(client, venue, shifts, venues, 120, now) }))
+        .sort((a, b) => b.score - a.score);
+      expect(recommendations.length).toBe(3);
+      recommendations.forEach((r, k) => {
+        expect(r.score).toBeCloseTo(expected[k].score, 9);
+        expect(r.client).toBe(client);
+      });
+      expect(clientPerformance(aggregates, client.id).shiftCount).toBe(scanPerformance(shifts, 'clientId', client.id, 120, now).shiftCount);
+    });
+  });
+
+  test('top-N keeps venue order on ties and handles N above the venue count', async () => {
+    const { computeAggregates, scoreMatrix, topVenues } = await import('../../lib/aiScoring.js');
+    const flat = venues.map(v => ({ id: v.id, name: v.name }));
+    const matrix = scoreMatrix(clients.slice(0, 1).map(c => ({ id: c.id })), flat, computeAggregates({}), WEIGHTS);
+    expect(topVenues(matrix, 0, 4)).toEqual([0, 1, 2, 3]);
+    expect(topVenues(matrix, 0, 50).length).toBe(flat.length);
+    expect(topVenues(matrix, 0, 0)).toEqual([]);
+  });
+});
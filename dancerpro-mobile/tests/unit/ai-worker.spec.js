@@ -0,0 +1,114 @@
+const { test, expect } = require('@playwright/test');
+const fs = require('fs');
+const vm = require('vm');
+const { buildWorkerSource, outFile } = require('../../scripts/build-ai-worker.js');
+
+// Off-thread AI insights (lib/aiJob.js, lib/aiWorker.js, public/ai-worker.js). The generated worker
+// script is evaluated in a vm context with a stand-in `self`.
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+const WEIGHTS = {
+  base_client_venue_weight: 0.35,
+  base_venue_avg_weight: 0.20,
+  base_dow_weight: 0.15,
+  tag_weight: 0.15,
+  city_match_weight: 0.10,
+  capacity_weight: 0.10,
+  event_weight: 0.15,
+};
+
+function startWorker() {
+  const listeners = [];
+  const posted = [];
+  const self = {
+    addEventListener: (type, fn) => { if (type === 'message') listeners.push(fn); },
+    postMessage: (data, transfer = []) => posted.push({ data, transfer }),
+  };
+  vm.runInNewContext(fs.readFileSync(outFile, 'utf8'), { self, AbortController, setImmediate, setTimeout, performance, console });
+  return { posted, send: data => listeners.forEach(fn => fn({ data })) };
+}
+
+const until = async (check, ms = 5000) => {
+  const stop = Date.now() + ms;
+  while (!check() && Date.now() < stop) await new Promise(r => setTimeout(r, 5));
+};
+
+test.describe('AI insights off the UI thread', () => {
+  let seed = 11;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const now = Date.now();
+  const venues = Array.from({ length: 40 }, (_, i) => ({ id: `v${i}`, name: `Club ${i}`, city: i % 3 ? 'Miami' : 'Tampa', capacity: i * 10 }));
+  const clients = Array.from({ length: 120 }, (_, i) => ({ id: `c${i}`, name: `Client ${i}`, valueScore: i % 10, tags: i % 7 ? [] : ['VIP'] }));
+  const shifts = Array.from({ length: 6000 }, (_, i) => ({
+    id: `s${i}`,
+    clientId: rand() < 0.9 ? `c${Math.floor(rand() * clients.length)}` : null,
+    venueId: rand() < 0.9 ? `v${Math.floor(rand() * venues.length)}` : null,
+    earnings: Math.round(rand() * 900),
+    notes: rand() < 0.01 ? 'event' : '',
+    start: new Date(now - Math.floor(rand() * 200 * DAY_MS)).toISOString(),
+  }));
+
+  const inputFor = (encodeShifts) => ({ clients, venues, events: [], shiftTable: encodeShifts(shifts), periodDays: 90, weights: WEIGHTS, now });
+
+  test('public/ai-worker.js is generated from the current lib modules', async () => {
+    expect(fs.readFileSync(outFile, 'utf8') === buildWorkerSource()).toBe(true);
+  });
+
+  test('the worker streams pairs, schedule and actions, then the score matrix', async () => {
+    const { encodeShifts, computeAggregates, scoreMatrix, rankedRows } = await import('../../lib/aiScoring.js');
+    const worker = startWorker();
+    expect(worker.posted[0].data.type).toBe('ready');
+    worker.send({ type: 'run', runId: 7, input: inputFor(encodeShifts) });
+    await until(() => worker.posted.some(m => m.data.type !== 'ready' && m.data.type !== 'partial'));
+
+    const messages = worker.posted.slice(1).map(m => m.data);
+    expect(messages.map(m => m.type)).toEqual(['partial', 'partial', 'partial', 'done']);
+    expect(messages.map(m => m.partial?.stage || null)).toEqual(['pairs', 'schedule', 'actions', null]);
+    messages.forEach(m => expect(m.runId).toBe(7));
+
+    const aggregates = computeAggregates({ shifts, venues }, { periodDays: 90, now });
+    const matrix = scoreMatrix(clients, venues, aggregates, WEIGHTS);
+    const done = messages[3];
+    expect(Array.from(done.result.scores)).toEqual(Array.from(matrix.scores));
+    expect(worker.posted[4].transfer[0]).toBe(done.result.scores.buffer);
+    expect(done.result.aggregates.venueMaxAvg).toBe(aggregates.venueMaxAvg);
+    const ranked = messages[0].partial.ranked;
+    expect(JSON.stringify(ranked)).toBe(JSON.stringify(rankedRows(matrix, aggregates, WEIGHTS, 3)));
+    expect(messages[1].partial.schedule.length).toBe(clients.length);
+  });
+
+  test('a cancelled run posts nothing more', async () => {
+    const { encodeShifts } = await import('../../lib/aiScoring.js');
+    const worker = startWorker();
+    worker.send({ type: 'run', runId: 1, input: inputFor(encodeShifts) });
+    worker.send({ type: 'cancel', runId: 1 });
+    worker.send({ type: 'run', runId: 2, input: inputFor(encodeShifts) });
+    await until(() => worker.posted.some(m => m.data.type === 'done'));
+    await new Promise(r => setTimeout(r, 20));
+    expect(worker.posted.some(m => m.data.runId === 1)).toBe(false);
+    expect(worker.posted.filter(m => m.data.runId === 2).length).toBe(4);
+  });
+
+  test('on the JS thread the job runs in short slices with the same results', async () => {
+    const { encodeShifts, scoreMatrix, computeAggregates } = await import('../../lib/aiScoring.js');
+    const { insightsJob, runJob, cancelledError, isCancelled } = await import('../../lib/aiJob.js');
+    let turns = 0;
+    let running = true;
+    const spin = () => { turns += 1; if (running) setImmediate(spin); };
+    setImmediate(spin);
+    const stages = [];
+    const result = await runJob(insightsJob(inputFor(encodeShifts)), { budgetMs: 1, onPartial: p => stages.push(p.stage) });
+    running = false;
+    expect(stages).toEqual(['pairs', 'schedule', 'actions']);
+    expect(turns > 5).toBe(true);
+    const matrix = scoreMatrix(clients, venues, computeAggregates({ shifts, venues }, { periodDays: 90, now }), WEIGHTS);
+    expect(Array.from(result.scores)).toEqual(Array.from(matrix.scores));
+
+    const controller = new AbortController();
+    const pending = runJob(insightsJob(inputFor(encodeShifts)), { signal: controller.signal });
+    controller.abort();
+    const error = await pending.catch(e => e);
+    expect(isCancelled(error)).toBe(true);
+    expect(isCancelled(cancelledError())).toBe(true);
+  });
+});
@@ -0,0 +1,103 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Parity between backend/lib/analytics.js and the on-device aggregates in lib/db.js, with lib/db.js
+// reading an in-memory localStorage seeded with a fixture.
+
+const USER_ID = 'parity-user';
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+// Deterministic pseudo-random data spread over the last ~100 days (inside every tested window)
+function buildFixture() {
+  let seed = 42;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const now = Date.now();
+  const venues = Array.from({ length: 6 }, (_, i) => ({ id: `v${i}`, name: `Venue ${i}`, capacity: 50 + i * 10 }));
+  const clients = Array.from({ length: 12 }, (_, i) => ({ id: `c${i}`, name: `Client ${i}` }));
+  const outfits = Array.from({ length: 8 }, (_, i) => ({ id: `o${i}`, name: `Outfit ${i}` }));
+  const shifts = Array.from({ length: 400 }, (_, i) => {
+    const start = new Date(now - Math.floor(rand() * 100 * DAY_MS) - DAY_MS);
+    return {
+      id: `s${i}`,
+      venueId: venues[Math.floor(rand() * venues.length)].id,
+      clientId: rand() < 0.8 ? clients[Math.floor(rand() * clients.length)].id : undefined,
+      start: start.toISOString(),
+      earnings: Math.round(rand() * 50000) / 100,
+    };
+  });
+  const transactions = Array.from({ length: 900 }, (_, i) => ({
+    id: `t${i}`,
+    type: rand() < 0.7 ? 'income' : 'expense',
+    amount: String(Math.round(rand() * 40000) / 100),
+    clientId: rand() < 0.6 ? clients[Math.floor(rand() * clients.length)].id : null,
+    outfitId: rand() < 0.4 ? outfits[Math.floor(rand() * outfits.length)].id : null,
+    date: new Date(now - Math.floor(rand() * 100 * DAY_MS)).toISOString(),
+  }));
+  return { venues, clients, outfits, shifts, transactions, events: [] };
+}
+
+function expectPerformanceParity(server, device) {
+  expect(server.shiftCount).toBe(device.shiftCount);
+  expect(server.bestDay).toBe(device.bestDay);
+  expect(server.totalEarnings).toBeCloseTo(device.totalEarnings, 6);
+  expect(server.avgEarnings).toBeCloseTo(device.avgEarnings, 6);
+  expect(server.bestDayAvg).toBeCloseTo(device.bestDayAvg, 6);
+  expect(server.earningsHistory.length).toBe(device.earningsHistory.length);
+}
+
+test.describe('Server analytics parity with lib/db.js', () => {
+  let db;
+  let analytics;
+  let fixture;
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    analytics = require('../../backend/lib/analytics.js');
+    fixture = buildFixture();
+    await db.importAllDataSnapshot(null, fixture);
+  });
+
+  test('KPI snapshot matches getKpiSnapshot', async () => {
+    const device = await db.getKpiSnapshot(null);
+    const server = analytics.kpiSnapshot(fixture);
+    expect(server.counts).toEqual(device.counts);
+    expect(server.totals.income).toBeCloseTo(device.totals.income, 6);
+    expect(server.totals.expense).toBeCloseTo(device.totals.expense, 6);
+    expect(server.totals.net).toBeCloseTo(device.totals.net, 6);
+    expect(server.byClient.map(r => r.clientId)).toEqual(device.byClient.map(r => r.clientId));
+    server.byClient.forEach((row, i) => expect(row.net).toBeCloseTo(device.byClient[i].net, 6));
+    expect(server.topClient?.clientId).toBe(device.topClient?.clientId);
+  });
+
+  test('top outfits match getTopEarningOutfits', async () => {
+    const device = await db.getTopEarningOutfits(null, 5);
+    const server = analytics.topEarningOutfits(fixture, 5);
+    expect(server.map(o => o.id)).toEqual(device.map(o => o.id));
+    server.forEach((o, i) => expect(o.net).toBeCloseTo(device[i].net, 6));
+  });
+
+  test('client performance matches getClientPerformance', async () => {
+    for (const client of fixture.clients) {
+      for (const days of [30, 120]) {
+        const device = await db.getClientPerformance(null, client.id, days);
+        const server = analytics.clientPerformance(fixture, client.id, days);
+        expectPerformanceParity(server, device);
+        expect(server.earningsHistory.map(p => p.label)).toEqual(device.earningsHistory.map(p => p.label));
+        server.earningsHistory.forEach((p, i) => expect(p.value).toBeCloseTo(device.earningsHistory[i].value, 6));
+      }
+    }
+  });
+
+  test('venue performance matches getVenuePerformance', async () => {
+    for (const venue of fixture.venues) {
+      for (const days of [30, 120]) {
+        const device = await db.getVenuePerformance(null, venue.id, days);
+        const server = analytics.venuePerformance(fixture, venue.id, days);
+        expectPerformanceParity(server, device);
+        expect(server.earningsHistory.map(p => p.date)).toEqual(device.earningsHistory.map(p => p.date));
+        server.earningsHistory.forEach((p, i) => expect(p.earnings).toBeCloseTo(device.earningsHistory[i].earnings, 6));
+      }
+    }
+  });
+});
@@ -0,0 +1,122 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Write batching in lib/recordStore.js via db.batch(), on the localStorage fallback: a batch of
+// inserts must serialize each touched collection once, flushes wait for an idle callback, and
+// pagehide/visibilitychange persist pending writes straight away.
+
+const USER_ID = 'batch-user';
+
+function installWindow() {
+  const writes = [];
+  const listeners = {};
+  const idle = [];
+  const store = installLocalStorage(USER_ID, { onSetItem: k => writes.push(k) });
+  Object.assign(global.window, {
+    addEventListener: (type, fn) => { (listeners[type] = listeners[type] || []).push(fn); },
+    requestIdleCallback: fn => idle.push(fn),
+    cancelIdleCallback: () => {},
+  });
+  global.document = {
+    visibilityState: 'visible',
+    addEventListener: (type, fn) => { (listeners[type] = listeners[type] || []).push(fn); },
+  };
+  const runIdle = () => idle.splice(0).forEach(fn => fn({ didTimeout: false, timeRemaining: () => 50 }));
+  const fire = type => (listeners[type] || []).forEach(fn => fn());
+  return { store, writes, runIdle, fire };
+}
+
+const settle = () => new Promise(resolve => setTimeout(resolve, 0));
+
+test.describe('Batched writes in lib/db.js', () => {
+  let db;
+  let env;
+
+  test.beforeAll(async () => {
+    env = installWindow();
+    db = require('../../lib/db.js');
+  });
+
+  test('a batch of inserts serializes each collection once', async () => {
+    env.writes.length = 0;
+    await db.batch(null, async () => {
+      for (let i = 0; i < 2000; i++) {
+        await db.insertTransaction(null, { id: `t${i}`, type: 'income', amount: '5', date: new Date().toISOString() });
+        if (i % 100 === 0) await db.insertClient(null, { id: `c${i}` });
+      }
+    });
+    expect(env.writes).toEqual([]);
+    env.runIdle();
+    await db.flushDb(null);
+    expect(env.writes.sort()).toEqual([`clients_${USER_ID}`, `transactions_${USER_ID}`]);
+    expect(JSON.parse(env.store.get(`transactions_${USER_ID}`)).length).toBe(2000);
+    expect((await db.getKpiSnapshot(null)).counts.transactions).toBe(2000);
+  });
+
+  test('lists handed out during a batch are not mutated by later writes', async () => {
+    let before;
+    await db.batch(null, async () => {
+      await db.insertClient(null, { id: 'x1' });
+      before = await db.getAllClients(null);
+      await db.insertClient(null, { id: 'x2' });
+    });
+    expect(before[0].id).toBe('x1');
+    expect((await db.getAllClients(null))[0].id).toBe('x2');
+    await db.flushDb(null);
+  });
+
+  test('concurrent writes to one collection all land', async () => {
+    const before = await db.getKpiSnapshot(null);
+    const insert = i => db.insertTransaction(null, { id: `p${i}`, type: 'income', amount: '7', clientId: `pc${i % 2}`, date: new Date().toISOString() });
+    await Promise.all(Array.from({ length: 5 }, (_, i) => insert(i)));
+    await db.batch(null, () => Promise.all([
+      ...[0, 1, 2].map(i => db.insertClient(null, { id: `pc${i}` })),
+      ...[5, 6, 7, 8, 9].map(insert),
+    ]));
+    await Promise.all([db.updateClient(null, { id: 'pc0', name: 'First' }), db.deleteTransaction(null, 'p9'), db.deleteTransaction(null, 'p8')]);
+
+    const { transactions } = await db.getAllDataSnapshot(null);
+    const ids = transactions.map(t => t.id).filter(id => /^p\d$/.test(id)).sort();
+    expect(ids).toEqual(['p0', 'p1', 'p2', 'p3', 'p4', 'p5', 'p6', 'p7']);
+    const clients = (await db.getAllClients(null)).filter(c => /^pc\d$/.test(c.id));
+    expect(clients.map(c => c.id).sort()).toEqual(['pc0', 'pc1', 'pc2']);
+    expect(clients.find(c => c.id === 'pc0').name).toBe('First');
+
+    const after = await db.getKpiSnapshot(null);
+    expect(after.counts.transactions).toBe(before.counts.transactions + 8);
+    expect(after.counts.clients).toBe(before.counts.clients + 3);
+    expect(after.totals.income).toBe(before.totals.income + 56);
+    expect(await db.checkKpiAggregates(null)).toEqual({ ok: true, mismatches: [] });
+
+    env.runIdle();
+    await db.flushDb(null);
+    expect(JSON.parse(env.store.get(`transactions_${USER_ID}`)).length).toBe(transactions.length);
+  });
+
+  test('the data version changes on every write and only on writes', async () => {
+    const start = db.getDataVersion(null);
+    await db.getAllClients(null);
+    await db.updateClient(null, { id: 'no-such-client', name: 'x' });
+    expect(db.getDataVersion(null)).toBe(start);
+    await db.updateClient(null, { id: 'x1', name: 'Renamed' });
+    const afterUpdate = db.getDataVersion(null);
+    expect(afterUpdate === start).toBe(false);
+    await db.deleteClient(null, 'x2');
+    expect(db.getDataVersion(null) === afterUpdate).toBe(false);
+    await db.flushDb(null);
+  });
+
+  test('pending writes are persisted when the page is hidden or unloaded', async () => {
+    env.writes.length = 0;
+    await db.insertVenue(null, { id: 'v1', name: 'Club' });
+    global.document.visibilityState = 'hidden';
+    env.fire('visibilitychange');
+    await settle();
+    expect(env.writes).toEqual([`venues_${USER_ID}`]);
+
+    await db.deleteVenue(null, 'v1');
+    env.fire('pagehide');
+    await settle();
+    expect(JSON.parse(env.store.get(`venues_${USER_ID}`))).toEqual([]);
+  });
+});
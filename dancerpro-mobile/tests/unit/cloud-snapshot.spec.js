@@ -0,0 +1,90 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Cloud snapshot cache and merge in lib/cloudSnapshot.js, with a stand-in for the conditional GET
+// /api/sync/import.
+
+// Serves `current` with ETag `"v<n>"`; answers 304 when the caller already has it
+function fakeServer(initial) {
+  const server = { current: initial, version: 1, requests: [], offline: false };
+  server.fetchIfChanged = async etag => {
+    server.requests.push(etag);
+    if (server.offline) throw new Error('offline');
+    const tag = `"v${server.version}"`;
+    if (etag === tag) return { notModified: true, etag };
+    const versions = Object.fromEntries(Object.keys(server.current).map(k => [k, JSON.stringify(server.current[k])]));
+    return { snapshot: JSON.parse(JSON.stringify(server.current)), metadata: {}, versions, etag: tag };
+  };
+  server.publish = next => { server.current = next; server.version += 1; };
+  return server;
+}
+
+test.describe('Cloud snapshot cache in lib/cloudSnapshot.js', () => {
+  test('revalidates with the stored ETag, across sessions', async () => {
+    const storage = installLocalStorage('cloud-user');
+    const { createCloudSnapshotCache } = await import('../../lib/cloudSnapshot.js');
+    const server = fakeServer({ clients: [{ id: 'c1', name: 'Ana' }] });
+
+    const first = createCloudSnapshotCache({ fetchIfChanged: server.fetchIfChanged, maxAgeMs: 60000 });
+    const a = await first.get();
+    expect(a.snapshot.clients[0].name).toBe('Ana');
+    expect(await first.get()).toBe(a);
+    expect(server.requests).toEqual([null]);
+    expect(Array.from(storage.keys()).some(k => k.includes('cloudSnapshot'))).toBe(true);
+
+    // A new session starts from the stored copy and only asks whether it is still current
+    const second = createCloudSnapshotCache({ fetchIfChanged: server.fetchIfChanged, maxAgeMs: 60000 });
+    const b = await second.get();
+    expect(server.requests).toEqual([null, '"v1"']);
+    expect(b.etag).toBe('"v1"');
+    expect(b.snapshot.clients[0].name).toBe('Ana');
+
+    server.publish({ clients: [{ id: 'c1', name: 'Ana Maria' }] });
+    second.expire();
+    const c = await second.get();
+    expect(c.etag).toBe('"v2"');
+    expect(c.snapshot.clients[0].name).toBe('Ana Maria');
+
+    // Offline: the cached copy is still served
+    server.offline = true;
+    second.expire();
+    expect(await second.get()).toBe(c);
+  });
+
+  test('merges deterministically and only re-merges changed collections', async () => {
+    installLocalStorage('merge-user');
+    const { mergeSnapshot } = await import('../../lib/cloudSnapshot.js');
+    const local = {
+      clients: [{ id: 'c1', name: 'Local', phone: '1' }, { name: 'No id' }, { id: 'c2', name: 'Two' }],
+      venues: [{ id: 'v1', name: 'Club' }],
+      shifts: [],
+    };
+    const cloud = {
+      etag: '"a"',
+      versions: { clients: 'x1', venues: 'y1' },
+      snapshot: { clients: [{ id: 'c1', name: 'Cloud' }, { name: 'Cloud no id' }, { id: 'c3', name: 'Three' }], venues: [{ id: 'v2', name: 'Bar' }], events: [{ venueId: 'v1' }] },
+    };
+    const first = mergeSnapshot(local, cloud);
+    expect(first.clients).toEqual([
+      { id: 'c1', name: 'Cloud', phone: '1' },
+      { name: 'No id' },
+      { id: 'c2', name: 'Two' },
+      { name: 'Cloud no id' },
+      { id: 'c3', name: 'Three' },
+    ]);
+    expect(first.events.length).toBe(1);
+    expect(JSON.stringify(mergeSnapshot(local, { ...cloud, versions: { ...cloud.versions, clients: 'x0' } }))).toBe(JSON.stringify(first));
+
+    const again = mergeSnapshot(local, cloud);
+    expect(again.clients === mergeSnapshot(local, cloud).clients).toBe(true);
+    // Only the cloud clients changed: venues keep their merged list
+    const changed = { ...cloud, etag: '"b"', versions: { ...cloud.versions, clients: 'x2' }, snapshot: { ...cloud.snapshot, clients: [] } };
+    const next = mergeSnapshot(local, changed);
+    expect(next.venues === again.venues).toBe(true);
+    expect(next.clients === again.clients).toBe(false);
+    expect(next.clients.length).toBe(3);
+    // A local write hands out a new list, which is merged again
+    const written = mergeSnapshot({ ...local, venues: [...local.venues, { id: 'v3' }] }, changed);
+    expect(written.venues.length).toBe(3);
+  });
+});
@@ -0,0 +1,57 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Typed-array transaction columns behind getShiftTransactionTotals in lib/db.js: after imports and
+// a mix of writes the per-shift totals must equal a walk of the records.
+
+const USER_ID = 'columnar-user';
+
+function scanShiftTotals(tx) {
+  const map = new Map();
+  tx.forEach(t => {
+    if (!t.shiftId) return;
+    const prev = map.get(t.shiftId) || { income: 0, expense: 0 };
+    const amt = Number(t.amount || 0);
+    if (t.type === 'income') prev.income += amt; else if (t.type === 'expense') prev.expense += amt;
+    map.set(t.shiftId, prev);
+  });
+  return map;
+}
+
+test.describe('Columnar transaction view in lib/db.js', () => {
+  let db;
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    await db.importAllDataSnapshot(null, {
+      transactions: Array.from({ length: 300 }, (_, i) => ({
+        id: `t${i}`,
+        type: ['income', 'expense', 'transfer'][i % 3],
+        amount: String((i % 70) + 0.25),
+        shiftId: i % 4 ? `s${i % 11}` : '',
+      })),
+    });
+  });
+
+  test('per-shift totals follow inserts, updates and deletes', async () => {
+    await db.getShiftTransactionTotals(null);
+    for (let i = 0; i < 30; i++) await db.insertTransaction(null, { id: `n${i}`, type: 'income', amount: '7', shiftId: 's_new' });
+    for (let i = 0; i < 50; i++) await db.deleteTransaction(null, `t${i * 5}`);
+    await db.updateTransaction(null, { id: 't1', shiftId: 's3', type: 'income' });
+    // Every transaction of s10 removed: the shift must drop out of the result
+    const all = await db.getAllDataSnapshot(null);
+    for (const t of all.transactions.filter(t => t.shiftId === 's10')) await db.deleteTransaction(null, t.id);
+
+    const expected = scanShiftTotals((await db.getAllDataSnapshot(null)).transactions);
+    const actual = await db.getShiftTransactionTotals(null);
+    expect(Array.from(actual.keys()).sort()).toEqual(Array.from(expected.keys()).sort());
+    expected.forEach((want, id) => {
+      const got = actual.get(id);
+      expect(got.income).toBeCloseTo(want.income, 6);
+      expect(got.expense).toBeCloseTo(want.expense, 6);
+      expect(got.net).toBeCloseTo(want.income - want.expense, 6);
+    });
+    expect(actual.has('s10')).toBe(false);
+  });
+});
@@ -0,0 +1,77 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Day/week/month rollups behind getEarningsRollup and the client/venue performance helpers in
+// lib/db.js: after writes, bucket totals must equal a scan of the records.
+
+const USER_ID = 'rollup-user';
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function scanByKey(shifts, keyOf, filter = () => true) {
+  const out = new Map();
+  shifts.filter(filter).forEach(s => {
+    const key = keyOf(new Date(s.start));
+    const prev = out.get(key) || { earnings: 0, shifts: 0 };
+    out.set(key, { earnings: prev.earnings + Number(s.earnings || 0), shifts: prev.shifts + 1 });
+  });
+  return out;
+}
+
+test.describe('Earnings rollups in lib/db.js', () => {
+  let db;
+  let seed = 11;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const randomShift = i => ({
+    id: `s${i}`,
+    clientId: `c${Math.floor(rand() * 4)}`,
+    venueId: `v${Math.floor(rand() * 3)}`,
+    start: new Date(Date.now() - Math.floor(rand() * 200 * DAY_MS) - 1000).toISOString(),
+    earnings: Math.round(rand() * 40000) / 100,
+  });
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    await db.importAllDataSnapshot(null, { shifts: Array.from({ length: 500 }, (_, i) => randomShift(i)) });
+    await db.getEarningsRollup(null, { granularity: 'day' });
+    for (let i = 500; i < 560; i++) await db.insertShift(null, randomShift(i));
+    for (let i = 0; i < 40; i++) await db.deleteShift(null, `s${i * 11}`);
+    for (let i = 0; i < 40; i++) await db.updateShift(null, { id: `s${i * 13 + 1}`, earnings: 99.5, venueId: 'v2' });
+  });
+
+  test('month buckets match a scan', async () => {
+    const shifts = await db.getShiftsWithVenues(null);
+    const rows = await db.getEarningsRollup(null, { granularity: 'month', days: 400 });
+    const expected = scanByKey(shifts, d => d.toISOString().slice(0, 7));
+    expect(rows.map(r => r.key)).toEqual(Array.from(expected.keys()).sort());
+    rows.forEach(r => {
+      expect(r.shifts).toBe(expected.get(r.key).shifts);
+      expect(r.earnings).toBeCloseTo(expected.get(r.key).earnings, 6);
+    });
+  });
+
+  test('venue day buckets and all-time day-of-week match a scan', async () => {
+    const shifts = await db.getShiftsWithVenues(null);
+    const days = await db.getEarningsRollup(null, { granularity: 'day', days: 400, venueId: 'v2' });
+    const expected = scanByKey(shifts, d => d.toISOString().slice(0, 10), s => s.venueId === 'v2');
+    expect(days.length).toBe(expected.size);
+    days.forEach(r => expect(r.earnings).toBeCloseTo(expected.get(r.key).earnings, 6));
+
+    const dow = await db.getEarningsRollup(null, { granularity: 'dow', days: null });
+    const expectedDow = scanByKey(shifts, d => String(d.getDay()));
+    dow.forEach(r => expect(r.shifts).toBe(expectedDow.get(r.key)?.shifts || 0));
+  });
+
+  test('windowed performance equals a scan of the window', async () => {
+    const shifts = await db.getShiftsWithVenues(null);
+    for (const days of [1, 30, 120]) {
+      const from = Date.now() - days * DAY_MS;
+      const inWindow = s => new Date(s.start).getTime() >= from && s.clientId === 'c1';
+      const perf = await db.getClientPerformance(null, 'c1', days);
+      const expected = shifts.filter(inWindow);
+      expect(perf.shiftCount).toBe(expected.length);
+      expect(perf.totalEarnings).toBeCloseTo(expected.reduce((a, s) => a + Number(s.earnings || 0), 0), 6);
+      expect(perf.earningsHistory.length).toBe(scanByKey(shifts, d => d.toISOString().slice(0, 10), inWindow).size);
+    }
+  });
+});
@@ -0,0 +1,55 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// getKpiSnapshot in lib/db.js reads materialized aggregates that every write updates in place.
+// After imports and a mix of writes the aggregates must still agree with a full recompute
+// (checkKpiAggregates), and a deliberately corrupted aggregate must be detected.
+
+const USER_ID = 'kpi-user';
+
+test.describe('Materialized KPI aggregates in lib/db.js', () => {
+  let db;
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    const transactions = Array.from({ length: 500 }, (_, i) => ({
+      id: `t${i}`,
+      type: i % 4 ? 'income' : 'expense',
+      amount: String((i % 90) + 0.35),
+      clientId: i % 5 ? `c${i % 9}` : null,
+      outfitId: i % 3 ? `o${i % 4}` : null,
+      date: new Date(Date.now() - i * 3600000).toISOString(),
+    }));
+    await db.importAllDataSnapshot(null, {
+      clients: Array.from({ length: 9 }, (_, i) => ({ id: `c${i}` })),
+      outfits: Array.from({ length: 4 }, (_, i) => ({ id: `o${i}` })),
+      transactions,
+    });
+  });
+
+  test('writes keep aggregates consistent with a full recompute', async () => {
+    await db.getKpiSnapshot(null);
+    for (let i = 0; i < 40; i++) await db.insertTransaction(null, { id: `n${i}`, type: 'income', amount: '12.5', clientId: 'c_new', outfitId: 'o1' });
+    for (let i = 0; i < 60; i++) await db.deleteTransaction(null, `t${i * 7}`);
+    await db.updateTransaction(null, { id: 't1', type: 'expense', clientId: 'c3' });
+    await db.insertClient(null, { id: 'c_new' });
+    await db.deleteOutfit(null, 'o3');
+
+    const check = await db.checkKpiAggregates(null);
+    expect(check.mismatches).toEqual([]);
+    const kpi = await db.getKpiSnapshot(null);
+    expect(kpi.counts).toEqual({ clients: 10, venues: 0, outfits: 3, shifts: 0, transactions: 480 });
+    expect(kpi.byClient.some(r => r.clientId === 'c_new')).toBeTruthy();
+  });
+
+  test('checker reports and repairs a drifted aggregate', async () => {
+    const all = await db.getAllDataSnapshot(null);
+    // Mutate a stored record behind the store's back so the aggregates go stale
+    all.transactions[0].amount = String(Number(all.transactions[0].amount) + 100);
+    const check = await db.checkKpiAggregates(null, { repair: true });
+    expect(check.ok).toBe(false);
+    expect(check.mismatches.length).toBeGreaterThan(0);
+    expect((await db.checkKpiAggregates(null)).ok).toBe(true);
+  });
+});
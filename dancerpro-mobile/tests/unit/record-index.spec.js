@@ -0,0 +1,68 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// lib/db.js range queries are served from lib/recordIndex.js indexes that are updated on every
+// write. After a mix of inserts/updates/deletes, each indexed query must return exactly what a full
+// scan of the collection returns.
+
+const USER_ID = 'index-user';
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function scanShifts(shifts, field, id, days) {
+  const end = Date.now();
+  const start = end - days * DAY_MS;
+  return shifts
+    .map(s => ({ s, t: new Date(s.start || s.end || s.date).getTime() }))
+    .filter(({ s, t }) => t >= start && t <= end && (!field || s[field] === id))
+    .sort((a, b) => b.t - a.t)
+    .map(x => x.s.id);
+}
+
+test.describe('Incremental record indexes in lib/db.js', () => {
+  let db;
+  let seed = 7;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const randomShift = i => ({
+    id: `s${i}`,
+    clientId: `c${Math.floor(rand() * 5)}`,
+    venueId: `v${Math.floor(rand() * 4)}`,
+    start: new Date(Date.now() - Math.floor(rand() * 150 * DAY_MS) - 1000).toISOString(),
+    earnings: Math.round(rand() * 30000) / 100,
+  });
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    await db.importAllDataSnapshot(null, { shifts: Array.from({ length: 300 }, (_, i) => randomShift(i)) });
+    // Build the index, then mutate through the public API so the index is maintained incrementally
+    await db.getRecentShifts(null, 7);
+    for (let i = 300; i < 400; i++) await db.insertShift(null, randomShift(i));
+    for (let i = 0; i < 60; i++) {
+      const id = `s${Math.floor(rand() * 400)}`;
+      if (i % 3 === 0) await db.deleteShift(null, id);
+      else await db.updateShift(null, { id, clientId: `c${Math.floor(rand() * 5)}`, start: randomShift(0).start });
+    }
+  });
+
+  test('recent shifts match a full scan', async () => {
+    const all = await db.getShiftsWithVenues(null);
+    for (const days of [7, 30, 120]) {
+      const rows = await db.getRecentShifts(null, days);
+      expect(rows.map(s => s.id)).toEqual(scanShifts(all, null, null, days));
+    }
+  });
+
+  test('client and venue shift lists match a full scan', async () => {
+    const all = await db.getShiftsWithVenues(null);
+    for (let c = 0; c < 5; c++) {
+      const rows = await db.getClientShifts(null, `c${c}`, 120, 100000);
+      expect(rows.map(s => s.id)).toEqual(scanShifts(all, 'clientId', `c${c}`, 120));
+      const perf = await db.getClientPerformance(null, `c${c}`, 30);
+      expect(perf.shiftCount).toBe(scanShifts(all, 'clientId', `c${c}`, 30).length);
+    }
+    for (let v = 0; v < 4; v++) {
+      const rows = await db.getVenueShifts(null, `v${v}`, 60, 100000);
+      expect(rows.map(s => s.id)).toEqual(scanShifts(all, 'venueId', `v${v}`, 60));
+    }
+  });
+});
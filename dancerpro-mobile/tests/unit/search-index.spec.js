@@ -0,0 +1,64 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Full-text search in lib/db.js (lib/searchIndex.js): ranking, prefix and typo matching, and
+// results that follow later writes without a rebuild.
+
+const USER_ID = 'search-user';
+
+const ids = rows => rows.map(r => r.id);
+
+test.describe('Search index in lib/db.js', () => {
+  let db;
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    await db.importAllDataSnapshot(null, {
+      clients: [
+        { id: 'c1', name: 'Jonathan Reyes', contact: '+1 (555) 010-2233', tags: ['vip'] },
+        { id: 'c2', name: 'Jon Smith', contact: 'jon@example.com', notes: 'friend of Jonathan' },
+        { id: 'c3', name: 'Chloé Martin', contact: '+1 (555) 987-6543', tags: ['regular'] },
+        { id: 'c4', name: 'Marcus Jones', contact: '', notes: 'tips big on weekends' },
+      ],
+      venues: [
+        { id: 'v1', name: 'Velvet Room', location: 'Downtown' },
+        { id: 'v2', name: 'Club Onyx', location: 'Velvet Street' },
+      ],
+      transactions: [
+        { id: 't1', type: 'income', amount: 100, category: 'VIP Dance', note: 'birthday party', date: new Date().toISOString() },
+        { id: 't2', type: 'expense', amount: 40, category: 'House Fee', date: new Date().toISOString() },
+      ],
+    });
+  });
+
+  test('ranks name matches above other fields and exact terms above prefixes', async () => {
+    expect(ids(await db.searchClients(null, 'jonathan'))).toEqual(['c1', 'c2']);
+    expect(ids(await db.searchClients(null, 'jon'))[0]).toBe('c2');
+    expect(ids(await db.searchVenues(null, 'velvet'))).toEqual(['v1', 'v2']);
+  });
+
+  test('matches prefixes, typos, accents, phone digits and every query term', async () => {
+    expect(ids(await db.searchClients(null, 'mar jo'))).toEqual(['c4']);
+    expect(ids(await db.searchClients(null, 'jonahtan'))[0]).toBe('c1');
+    expect(ids(await db.searchClients(null, 'chloe'))).toEqual(['c3']);
+    expect(ids(await db.searchClients(null, '5550102'))).toEqual(['c1']);
+    expect(ids(await db.searchClients(null, 'weekend vip'))).toEqual([]);
+    // Short terms allow no edits
+    expect(ids(await db.searchClients(null, 'jpn'))).toEqual([]);
+    expect(ids(await db.searchTransactions(null, 'birth'))).toEqual(['t1']);
+  });
+
+  test('follows inserts, updates and deletes', async () => {
+    await db.insertClient(null, { id: 'c5', name: 'Jonas Weber' });
+    expect(ids(await db.searchClients(null, 'jona')).includes('c5')).toBe(true);
+    await db.updateClient(null, { id: 'c5', name: 'Felix Weber' });
+    expect(ids(await db.searchClients(null, 'jona')).includes('c5')).toBe(false);
+    expect(ids(await db.searchClients(null, 'felix'))).toEqual(['c5']);
+    await db.deleteClient(null, 'c5');
+    expect(ids(await db.searchClients(null, 'felix'))).toEqual([]);
+
+    const page = await db.queryTransactions(null, { filters: { search: 'fee' }, limit: 0 });
+    expect(ids(page.items)).toEqual(['t2']);
+  });
+});
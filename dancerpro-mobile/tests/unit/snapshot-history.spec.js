@@ -0,0 +1,105 @@
+const { test, expect } = require('@playwright/test');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { createSnapshotHistory } = require('../../backend/lib/snapshotHistory');
+
+// Versioned snapshot history in backend/lib/snapshotHistory.js.
+
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+function makeSnapshot(count, offset = 0) {
+  return {
+    transactions: Array.from({ length: count }, (_, i) => ({
+      id: `t${i + offset}`,
+      type: i % 3 ? 'income' : 'expense',
+      amount: (i * 37) % 500,
+      category: ['VIP Dance', 'Stage Tips', 'House Fee'][i % 3],
+      date: new Date(Date.UTC(2025, 0, 1) + (i % 90) * DAY_MS).toISOString(),
+    })),
+    clients: Array.from({ length: 40 }, (_, i) => ({ id: `c${i}`, name: `Client ${i}` })),
+    settings: { currency: 'USD', theme: 'dark' },
+  };
+}
+
+function chunkFiles(root, userId) {
+  const dir = path.join(root, userId, 'chunks');
+  if (!fs.existsSync(dir)) return [];
+  return fs.readdirSync(dir).flatMap(prefix => fs.readdirSync(path.join(dir, prefix)));
+}
+
+function referencedChunks(root, userId) {
+  const dir = path.join(root, userId, 'manifests');
+  const hashes = new Set();
+  fs.readdirSync(dir).forEach(name => {
+    const manifest = JSON.parse(fs.readFileSync(path.join(dir, name), 'utf8'));
+    Object.values(manifest.collections).forEach(c => c.chunks.forEach(h => hashes.add(h)));
+  });
+  return hashes;
+}
+
+function withRoot(fn) {
+  const root = fs.mkdtempSync(path.join(os.tmpdir(), 'snapshot-history-'));
+  try {
+    fn(root);
+  } finally {
+    fs.rmSync(root, { recursive: true, force: true });
+  }
+}
+
+test.describe('Snapshot history in backend/lib/snapshotHistory.js', () => {
+  test('stores only the chunks a new version changes', () => withRoot(root => {
+    const history = createSnapshotHistory({ rootDir: root });
+    const first = history.record('u1', { snapshot: makeSnapshot(2000), metadata: { deviceId: 'd1' } });
+    expect(first.chunksAdded).toBe(chunkFiles(root, 'u1').length);
+    expect(first.chunksAdded > 10).toBe(true);
+
+    // Identical content writes nothing
+    expect(history.record('u1', { snapshot: makeSnapshot(2000) }).chunksAdded).toBe(0);
+
+    // Prepending a record only rewrites the block it lands in
+    const snapshot = makeSnapshot(2000);
+    snapshot.transactions.unshift({ id: 'new', type: 'income', amount: 5, category: 'DJ Tip', date: '2025-04-01T00:00:00.000Z' });
+    const before = chunkFiles(root, 'u1').length;
+    const third = history.record('u1', { snapshot });
+    expect(third.chunksAdded <= 2).toBe(true);
+    expect(chunkFiles(root, 'u1').length).toBe(before + third.chunksAdded);
+    expect(third.recordCounts).toEqual({ transactions: 2001, clients: 40 });
+  }));
+
+  test('restores every version exactly', () => withRoot(root => {
+    const history = createSnapshotHistory({ rootDir: root });
+    const payloads = [
+      { snapshot: makeSnapshot(500), metadata: { deviceId: 'd1', updatedAt: '2025-05-01T00:00:00.000Z' } },
+      { snapshot: { ...makeSnapshot(480, 20), settings: null, empty: [] }, metadata: { deviceId: 'd2' } },
+      { snapshot: makeSnapshot(0), metadata: {} },
+    ];
+    payloads.forEach(payload => history.record('u1', payload));
+    payloads.forEach((payload, i) => {
+      const loaded = history.load('u1', i + 1);
+      expect(loaded.version).toBe(i + 1);
+      expect(JSON.stringify(loaded.snapshot)).toBe(JSON.stringify(payload.snapshot));
+      expect(loaded.metadata).toEqual(payload.metadata);
+    });
+    expect(history.list('u1').map(v => v.version)).toEqual([3, 2, 1]);
+    expect(history.load('u1', 4)).toBe(null);
+    expect(history.load('other', 1)).toBe(null);
+  }));
+
+  test('prunes versions past keep and the chunks only they used', () => withRoot(root => {
+    const history = createSnapshotHistory({ rootDir: root, keep: 3 });
+    const snapshots = Array.from({ length: 5 }, (_, i) => makeSnapshot(300, i * 300));
+    snapshots.forEach(snapshot => history.record('u1', { snapshot }));
+    expect(history.list('u1').map(v => v.version)).toEqual([5, 4, 3]);
+    expect(history.load('u1', 1)).toBe(null);
+    expect(history.load('u1', 2)).toBe(null);
+    expect(JSON.stringify(history.load('u1', 3).snapshot)).toBe(JSON.stringify(snapshots[2]));
+    // Every chunk left on disk belongs to a kept version, and every kept chunk is there
+    expect(chunkFiles(root, 'u1').map(name => name.replace(/\.json$/, '')).sort())
+      .toEqual(Array.from(referencedChunks(root, 'u1')).sort());
+    // Other users are untouched
+    history.record('u2', { snapshot: snapshots[0] });
+    expect(history.list('u2').length).toBe(1);
+    expect(history.list('u1').length).toBe(3);
+  }));
+});
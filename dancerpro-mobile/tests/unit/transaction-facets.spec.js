@@ -0,0 +1,104 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// Filter bitmaps behind queryTransactions / getTransactionFacetCounts in lib/db.js: for a spread of
+// filter combinations, before and after writes, the selection and every chip count must equal a
+// scan of the records.
+
+const USER_ID = 'facet-user';
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+test.describe('Transaction facet filters in lib/db.js', () => {
+  let db;
+  let seed = 11;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const pick = list => list[Math.floor(rand() * list.length)];
+  const now = Date.now();
+  const shifts = Array.from({ length: 12 }, (_, i) => ({ id: `s${i}`, venueId: `v${i % 4}` }));
+  const shiftVenue = new Map(shifts.map(s => [s.id, s.venueId]));
+  const randomTransaction = id => ({
+    id,
+    type: pick(['income', 'income', 'expense']),
+    amount: Math.round(rand() * 300),
+    category: pick(['VIP Dance', 'Stage Tips', 'House Fee', 'DJ Tip', '']),
+    clientId: pick(['c1', 'c2', 'c3', null]),
+    venueId: rand() < 0.3 ? pick(['v0', 'v1', 'v2', 'v3']) : null,
+    shiftId: rand() < 0.5 ? pick(shifts).id : null,
+    outfitId: rand() < 0.2 ? pick(['o1', 'o2']) : null,
+    date: new Date(now - Math.floor(rand() * 60) * DAY_MS - 3600000).toISOString(),
+  });
+  let transactions = Array.from({ length: 400 }, (_, i) => randomTransaction(`t${i}`));
+
+  const venuesOf = t => new Set([t.venueId, shiftVenue.get(t.shiftId)].filter(Boolean));
+  const matchesScan = (t, f, except) => (!f.days || new Date(t.date).getTime() >= now - f.days * DAY_MS)
+    && (except === 'type' || !f.type || [].concat(f.type).includes(t.type))
+    && (except === 'clientId' || !f.clientId || [].concat(f.clientId).includes(t.clientId))
+    && (except === 'outfitId' || !f.outfitId || t.outfitId === f.outfitId)
+    && (except === 'venueId' || !f.venueId || [].concat(f.venueId).some(v => venuesOf(t).has(v)))
+    && (except === 'category' || !f.category || t.category.toLowerCase().includes(f.category));
+  const scanCounts = (f, facet) => {
+    const counts = {};
+    transactions.filter(t => matchesScan(t, f, facet)).forEach(t => {
+      const keys = facet === 'venueId' ? Array.from(venuesOf(t)) : [facet === 'category' ? t.category : t[facet]].filter(Boolean);
+      keys.forEach(k => { counts[k] = (counts[k] || 0) + 1; });
+    });
+    return counts;
+  };
+  const combos = [
+    {},
+    { days: 30 },
+    { days: 30, type: 'income' },
+    { type: ['income', 'expense'], category: 'tip' },
+    { venueId: 'v1' },
+    { days: 45, venueId: ['v0', 'v2'], clientId: 'c2' },
+    { outfitId: 'o1', type: 'expense' },
+    { clientId: ['c1', 'c2'] },
+    { days: 30, clientId: ['c3'] },
+  ];
+
+  async function expectMatchesScan() {
+    for (const f of combos) {
+      const page = await db.queryTransactions(null, { filters: f, limit: 0 });
+      const expected = transactions.filter(t => matchesScan(t, f));
+      expect(page.items.map(t => t.id).sort()).toEqual(expected.map(t => t.id).sort());
+      // Date-ordered pages walk per-client posting lists; they must agree with the selection
+      const paged = [];
+      let cursor = null;
+      do {
+        const next = await db.queryTransactions(null, { filters: f, sort: { field: 'date' }, cursor, limit: 50 });
+        paged.push(...next.items);
+        cursor = next.nextCursor;
+      } while (cursor);
+      expect(paged.map(t => t.id).sort()).toEqual(expected.map(t => t.id).sort());
+      const counts = await db.getTransactionFacetCounts(null, f);
+      expect(counts.total).toBe(expected.length);
+      for (const facet of ['type', 'category', 'clientId', 'venueId', 'outfitId']) {
+        expect(counts[facet]).toEqual(scanCounts(f, facet));
+      }
+    }
+  }
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    await db.importAllDataSnapshot(null, { transactions, shifts });
+  });
+
+  test('selections and chip counts match a scan', async () => {
+    await expectMatchesScan();
+  });
+
+  test('selections and chip counts follow writes', async () => {
+    for (let i = 0; i < 60; i++) {
+      const t = randomTransaction(`n${i}`);
+      await db.insertTransaction(null, t);
+      transactions.push(t);
+    }
+    for (const t of transactions.filter((_, i) => i % 9 === 0)) await db.deleteTransaction(null, t.id);
+    transactions = transactions.filter((_, i) => i % 9 !== 0);
+    const changed = { ...transactions[5], category: 'DJ Tip', venueId: 'v3', outfitId: 'o2' };
+    await db.updateTransaction(null, changed);
+    transactions[5] = changed;
+    await expectMatchesScan();
+  });
+});
@@ -0,0 +1,86 @@
+const { test, expect } = require('@playwright/test');
+const { installLocalStorage } = require('../helpers/localStorage');
+
+// queryTransactions / summarizeTransactions in lib/db.js: walking every page with the returned
+// cursors must give exactly the filtered, sorted list a full scan produces.
+
+const USER_ID = 'query-user';
+const DAY_MS = 24 * 60 * 60 * 1000;
+
+async function allPages(db, query, limit) {
+  const ids = [];
+  let cursor = null;
+  let pages = 0;
+  do {
+    const page = await db.queryTransactions(null, { ...query, cursor, limit });
+    expect(page.items.length).toBeLessThanOrEqual(limit);
+    page.items.forEach(t => ids.push(t.id));
+    cursor = page.nextCursor;
+    pages += 1;
+  } while (cursor && pages < 1000);
+  return ids;
+}
+
+test.describe('Paginated transaction queries in lib/db.js', () => {
+  let db;
+  let seed = 7;
+  const rand = () => { seed = (seed * 16807) % 2147483647; return seed / 2147483647; };
+  const now = Date.now();
+  const transactions = Array.from({ length: 700 }, (_, i) => ({
+    id: `t${i}`,
+    type: rand() < 0.7 ? 'income' : 'expense',
+    amount: Math.round(rand() * 200) / 2,
+    category: ['VIP Dance', 'Stage Tips', 'House Fee', 'DJ Tip'][i % 4],
+    clientId: i % 3 ? `c${i % 5}` : null,
+    shiftId: i % 7 === 0 ? 's_v1' : null,
+    // Coarse times so many rows tie on the sort key (an hour off the window edges)
+    date: new Date(now - Math.floor(rand() * 120) * DAY_MS / 2 - 3600000).toISOString(),
+  }));
+  transactions.push({ id: 'undated', type: 'income', amount: 999 });
+
+  const time = t => new Date(t.date).getTime();
+  const inDays = days => t => t.date && time(t) >= now - days * DAY_MS;
+
+  test.beforeAll(async () => {
+    installLocalStorage(USER_ID);
+    db = require('../../lib/db.js');
+    await db.importAllDataSnapshot(null, { transactions, shifts: [{ id: 's_v1', venueId: 'v1' }] });
+  });
+
+  test('date-sorted pages cover the filtered window exactly once', async () => {
+    const ids = await allPages(db, { filters: { days: 30, clientId: 'c1' } }, 13);
+    const expected = transactions.filter(t => inDays(30)(t) && t.clientId === 'c1');
+    expect(ids.slice().sort()).toEqual(expected.map(t => t.id).sort());
+    expect(new Set(ids).size).toBe(ids.length);
+    const times = ids.map(id => time(transactions.find(t => t.id === id)));
+    times.forEach((t, i) => { if (i) expect(t <= times[i - 1]).toBe(true); });
+  });
+
+  test('amount-sorted pages match a full sort, with and without a window', async () => {
+    for (const filters of [{}, { days: 20 }, { venueId: 'v1' }, { category: 'tips', type: 'income' }]) {
+      const ids = await allPages(db, { filters, sort: { field: 'amount', direction: 'asc' } }, 17);
+      const expected = transactions.filter(t => t.date
+        && (!filters.days || inDays(filters.days)(t))
+        && (!filters.venueId || t.shiftId === 's_v1')
+        && (!filters.category || t.category.toLowerCase().includes(filters.category))
+        && (!filters.type || t.type === filters.type));
+      expect(ids.slice().sort()).toEqual(expected.map(t => t.id).sort());
+      const amounts = ids.map(id => transactions.find(t => t.id === id).amount);
+      amounts.forEach((a, i) => { if (i) expect(a >= amounts[i - 1]).toBe(true); });
+    }
+  });
+
+  test('summary matches a scan and later pages see new writes', async () => {
+    const summary = await db.summarizeTransactions(null, { days: 45 });
+    const window = transactions.filter(inDays(45));
+    const income = window.filter(t => t.type === 'income').reduce((a, t) => a + t.amount, 0);
+    expect(summary.count).toBe(window.length);
+    expect(summary.totals.income).toBeCloseTo(income, 6);
+    expect(summary.byCategory.reduce((a, c) => a + c.income, 0)).toBeCloseTo(income, 6);
+
+    const first = await db.queryTransactions(null, { filters: { days: 45 }, limit: 5 });
+    await db.insertTransaction(null, { id: 'fresh', type: 'income', amount: 1, date: new Date(now - DAY_MS * 40).toISOString() });
+    const rest = await allPages(db, { filters: { days: 45 }, cursor: first.nextCursor }, 50);
+    expect(rest.includes('fresh')).toBe(true);
+  });
+});
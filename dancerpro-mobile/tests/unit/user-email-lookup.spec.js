@@ -0,0 +1,64 @@
+const { test, expect } = require('@playwright/test');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { createStore, findUserByExactEmail } = require('../../backend/storage');
+
+// Email lookups in backend/storage: the server matches emails ignoring case, the Netlify functions
+// (netlify/functions/shared/utils.js) match them exactly. Also covers createStore() refusing to
+// fall back from sqlite unless STORAGE_FALLBACK=file.
+
+test.describe('User email lookup in backend/storage', () => {
+  test('exact lookups keep accounts that differ only by case apart', () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'email-lookup-'));
+    try {
+      const store = createStore({ driver: 'file', usersFile: path.join(dir, 'users.json'), snapshotDir: path.join(dir, 'snapshots') });
+      store.writeUsers([
+        { id: '1', email: 'Dancer@Example.com' },
+        { id: '2', email: 'dancer@example.com' },
+        { id: '3', email: 'Solo@Example.com' },
+      ]);
+      // Server semantics: case-insensitive, the first stored account wins
+      expect(store.findUserByEmail('dancer@example.com').id).toBe('1');
+      // Netlify semantics: exact match only
+      expect(findUserByExactEmail(store, 'dancer@example.com').id).toBe('2');
+      expect(findUserByExactEmail(store, 'Dancer@Example.com').id).toBe('1');
+      expect(findUserByExactEmail(store, 'Solo@Example.com').id).toBe('3');
+      expect(findUserByExactEmail(store, 'solo@example.com')).toBe(undefined);
+      expect(findUserByExactEmail(store, 'nobody@example.com')).toBe(undefined);
+    } finally {
+      fs.rmSync(dir, { recursive: true, force: true });
+    }
+  });
+});
+
+test.describe('Storage driver selection in backend/storage', () => {
+  test('a sqlite store that cannot open throws unless the file fallback is enabled', () => {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'storage-driver-'));
+    const saved = { SQLITE_FILE: process.env.SQLITE_FILE, STORAGE_FALLBACK: process.env.STORAGE_FALLBACK };
+    try {
+      // The database's parent is a regular file, so opening fails whether or not better-sqlite3 is installed
+      fs.writeFileSync(path.join(dir, 'not-a-dir'), '');
+      delete process.env.SQLITE_FILE;
+      delete process.env.STORAGE_FALLBACK;
+      const options = {
+        driver: 'sqlite',
+        sqliteFile: path.join(dir, 'not-a-dir', 'db.sqlite'),
+        usersFile: path.join(dir, 'users.json'),
+        snapshotDir: path.join(dir, 'snapshots'),
+      };
+      const throws = fn => { try { fn(); return false; } catch { return true; } };
+      expect(throws(() => createStore(options))).toBe(true);
+      expect(throws(() => createStore({ ...options, fallback: 'none' }))).toBe(true);
+
+      process.env.STORAGE_FALLBACK = 'file';
+      const store = createStore(options);
+      store.writeUsers([{ id: '1', email: 'a@example.com' }]);
+      expect(fs.existsSync(options.usersFile)).toBe(true);
+      expect(store.findUserByEmail('a@example.com').id).toBe('1');
+    } finally {
+      Object.entries(saved).forEach(([k, v]) => { if (v === undefined) delete process.env[k]; else process.env[k] = v; });
+      fs.rmSync(dir, { recursive: true, force: true });
+    }
+  });
+});
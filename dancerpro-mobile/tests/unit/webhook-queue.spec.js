@@ -0,0 +1,71 @@
+const { test, expect } = require('@playwright/test');
+const { WebhookQueue } = require('../../backend/lib/webhookQueue');
+const { twilioSignature, isValidTwilioSignature } = require('../../backend/lib/twilioSignature');
+
+// Webhook ingestion queue and signature check in backend/lib.
+
+const RANK = { queued: 0, sent: 2, delivered: 3 };
+const nextTurn = () => new Promise(resolve => setImmediate(resolve));
+
+test.describe('Webhook queue in backend/lib/webhookQueue.js', () => {
+  test('acknowledges without processing, then drains in batches', async () => {
+    const handled = [];
+    const queue = new WebhookQueue({ maxSize: 100, batchSize: 2, handle: e => handled.push(e.id) });
+    for (let id = 0; id < 5; id++) expect(queue.push({ id })).toBe(true);
+    expect(handled.length).toBe(0);
+    await nextTurn();
+    expect(handled).toEqual([0, 1]);
+    await nextTurn();
+    await nextTurn();
+    expect(handled).toEqual([0, 1, 2, 3, 4]);
+    const stats = queue.stats();
+    expect(stats.processed).toBe(5);
+    expect(stats.batches).toBe(3);
+    expect(stats.maxDepth).toBe(5);
+    expect(stats.lagMs.max >= 0).toBe(true);
+  });
+
+  test('collapses pending updates per key into the most advanced one', () => {
+    const handled = [];
+    const queue = new WebhookQueue({ handle: e => handled.push(`${e.sid}:${e.status}`), rank: e => RANK[e.status] });
+    queue.push({ sid: 'SM1', status: 'sent' }, 'SM1');
+    queue.push({ sid: 'SM2', status: 'queued' }, 'SM2');
+    queue.push({ sid: 'SM1', status: 'delivered' }, 'SM1');
+    queue.push({ sid: 'SM1', status: 'queued' }, 'SM1'); // late, out of order
+    queue.push({ sid: 'in' });
+    queue.push({ sid: 'in' });
+    queue.flush();
+    expect(handled).toEqual(['SM1:delivered', 'SM2:queued', 'in:undefined', 'in:undefined']);
+    expect(queue.stats().coalesced).toBe(2);
+    // Once processed, a key starts a new entry
+    queue.push({ sid: 'SM1', status: 'delivered' }, 'SM1');
+    queue.flush();
+    expect(handled.length).toBe(5);
+  });
+
+  test('drops when full and survives failing handlers', () => {
+    const queue = new WebhookQueue({ maxSize: 2, handle: e => { if (e.fail) throw new Error('boom'); } });
+    const errors = console.error;
+    console.error = () => {};
+    try {
+      expect(queue.push({ fail: true })).toBe(true);
+      expect(queue.push({})).toBe(true);
+      expect(queue.push({})).toBe(false);
+      queue.flush();
+    } finally {
+      console.error = errors;
+    }
+    const stats = queue.stats();
+    expect([stats.received, stats.dropped, stats.processed, stats.failures, stats.size]).toEqual([3, 1, 1, 1, 0]);
+  });
+
+  test('signs like Twilio', () => {
+    // The example from Twilio's webhook security documentation
+    const url = 'https://mycompany.com/myapp.php?foo=1&bar=2';
+    const params = { CallSid: 'CA1234567890ABCDE', Caller: '+12349013030', Digits: '1234', From: '+12349013030', To: '+18005551212' };
+    expect(twilioSignature('12345', url, params)).toBe('0/KCTR6DLpKmkAf8muzZqo1nDgQ=');
+    expect(isValidTwilioSignature('12345', '0/KCTR6DLpKmkAf8muzZqo1nDgQ=', url, params)).toBe(true);
+    expect(isValidTwilioSignature('12345', '0/KCTR6DLpKmkAf8muzZqo1nDgQ=', url, { ...params, Digits: '1' })).toBe(false);
+    expect(isValidTwilioSignature('12345', undefined, url, params)).toBe(false);
+  });
+});
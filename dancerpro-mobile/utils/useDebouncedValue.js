@@ -0,0 +1,14 @@
+import { useEffect, useState } from 'react';
+
+// `value`, once it has stopped changing for `delay` ms (e.g. a search box, so each keystroke does
+// not start a query)
+export function useDebouncedValue(value, delay = 150) {
+  const [debounced, setDebounced] = useState(value);
+
+  useEffect(() => {
+    const timer = setTimeout(() => setDebounced(value), delay);
+    return () => clearTimeout(timer);
+  }, [value, delay]);
+
+  return debounced;
+}